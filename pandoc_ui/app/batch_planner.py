@@ -0,0 +1,229 @@
+"""
+Batch planning: validate once, compile commands once, check inputs in one pass.
+"""
+
+import logging
+import os
+import shlex
+import time
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from ..infra.format_manager import FormatManager
+from ..infra.pandoc_runner import CommandTemplate, PandocRunner
+from ..infra.tracing import traced
+from ..models import ConversionProfile, InputFormat, OutputFormat
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchPlan:
+    """
+    A compiled batch.
+
+    Settings shared by every task are stored once, with one CommandTemplate per
+    input format. Each input is a row holding its path, interned directory,
+    file name and template index, so turning a row into a profile or argv only
+    fills in paths, and TaskQueue.add_plan() can copy the columns as they are.
+    """
+
+    output_format: OutputFormat
+    output_dir: Path
+    options: dict[str, Any]  # Shared by every profile; treat as read-only
+    archive_path: Path | None = None
+    input_formats: list[InputFormat | None] = field(default_factory=list)
+    commands: list[CommandTemplate] = field(default_factory=list)  # Parallel to input_formats
+    directories: list[Path] = field(default_factory=list)
+    inputs: list[Path] = field(default_factory=list)
+    dir_rows: array = field(default_factory=lambda: array("i"))  # Index into directories
+    names: list[str] = field(default_factory=list)
+    template_rows: array = field(default_factory=lambda: array("i"))  # Index into commands
+    skipped: list[tuple[Path, str]] = field(default_factory=list)  # (input, reason)
+    duration_seconds: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.inputs)
+
+    @property
+    def summary(self) -> str:
+        """Get summary of the plan."""
+        return (
+            f"{len(self.inputs)} tasks in {len(self.commands)} command templates, "
+            f"{len(self.skipped)} skipped, planned in {self.duration_seconds * 1000:.1f} ms"
+        )
+
+    def output_path(self, input_path: Path) -> Path:
+        """Get the output path of an input."""
+        return self.output_dir / f"{input_path.stem}.{self.output_format.value}"
+
+    def template(self, index: int) -> ConversionProfile:
+        """Get a profile carrying the settings of a command template (paths are placeholders)."""
+        return ConversionProfile(
+            input_path=Path("input"),
+            input_format=self.input_formats[index],
+            output_format=self.output_format,
+            options=self.options,
+            archive_path=self.archive_path,
+        )
+
+    def profile(self, row: int) -> ConversionProfile:
+        """Build the conversion profile of a row."""
+        input_path = self.inputs[row]
+        return ConversionProfile(
+            input_path=input_path,
+            output_path=self.output_path(input_path),
+            input_format=self.input_formats[self.template_rows[row]],
+            output_format=self.output_format,
+            options=self.options,
+            archive_path=self.archive_path,
+        )
+
+    def command(self, row: int, output_path: Path | None = None) -> list[str]:
+        """
+        Build the pandoc argv of a row.
+
+        Args:
+            row: Row index
+            output_path: File pandoc writes instead of the planned output path
+
+        Returns:
+            List of command arguments for subprocess
+        """
+        input_path = self.inputs[row]
+        return self.commands[self.template_rows[row]].fill(
+            input_path, output_path or self.output_path(input_path)
+        )
+
+
+def _regular_files(directory: str) -> frozenset[str]:
+    """List the names of the regular files in a directory (following symlinks)."""
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries if entry.is_file())
+    except OSError:
+        return frozenset()
+
+
+@traced("plan_batch", "plan")
+def plan_batch(
+    files: list[Path],
+    output_format: OutputFormat,
+    output_dir: Path,
+    runner: PandocRunner,
+    format_manager: FormatManager,
+    custom_args: str = "",
+    archive_path: Path | None = None,
+) -> BatchPlan:
+    """
+    Plan a batch conversion.
+
+    Pandoc and the custom arguments are validated once, reader detection and
+    the compatibility check run once per file extension, and command
+    templates are compiled once per input format. Inputs are checked against
+    one listing per directory instead of a stat per file (directory entries
+    carry the file type on common filesystems); missing and unconvertible
+    inputs are skipped with a reason.
+
+    Args:
+        files: Input files in batch order (archive member paths if archive_path is set)
+        output_format: Output format of every task
+        output_dir: Directory receiving the outputs
+        runner: Runner the tasks will use; its compiled templates are shared
+        format_manager: Format table used for detection and compatibility checks
+        custom_args: Extra pandoc arguments for every task
+        archive_path: Archive the inputs are members of
+
+    Returns:
+        BatchPlan with one row per input to convert
+
+    Raises:
+        RuntimeError: If the pandoc executable is missing
+        ValueError: If custom_args cannot be parsed
+    """
+    start_time = time.perf_counter()
+
+    error = runner.check_pandoc()
+    if error:
+        raise RuntimeError(error)
+    if custom_args:
+        try:
+            shlex.split(custom_args)
+        except ValueError as e:
+            raise ValueError(f"Invalid custom arguments: {e}") from e
+
+    plan = BatchPlan(
+        output_format=output_format,
+        output_dir=output_dir,
+        options={"custom_args": custom_args} if custom_args else {},
+        archive_path=archive_path,
+    )
+    output_format_str = output_format.value
+    by_format: dict[InputFormat | None, int] = {}
+
+    def template_for(extension: str) -> int | str:
+        """Get the template row for an extension, or the reason its files are skipped."""
+        input_format_str = format_manager.detect_format_from_extension(f"input{extension}")
+        if input_format_str and not format_manager.can_convert(input_format_str, output_format_str):
+            return f"Cannot convert from {input_format_str} to {output_format_str}"
+        try:
+            input_format = InputFormat(input_format_str) if input_format_str else None
+        except ValueError:
+            input_format = None
+
+        row = by_format.get(input_format)
+        if row is None:
+            row = by_format[input_format] = len(plan.commands)
+            plan.input_formats.append(input_format)
+            plan.commands.append(runner.compile_template(plan.template(row)))
+        return row
+
+    # Hot loop over every input: string operations and dict lookups only
+    by_extension: dict[str, int | str] = {}
+    dir_index: dict[str, int] = {}
+    listings: list[frozenset[str]] = []
+    check_files = archive_path is None
+    directories = plan.directories
+    inputs = plan.inputs
+    dir_rows = plan.dir_rows
+    names = plan.names
+    template_rows = plan.template_rows
+    skipped = plan.skipped
+    sep = os.sep
+    for path in files:
+        text = os.fspath(path)
+        directory, found, name = text.rpartition(sep)
+        dot = name.rfind(".")
+        extension = name[dot:] if dot > 0 else ""
+
+        template = by_extension.get(extension)
+        if template is None:
+            template = by_extension[extension] = template_for(extension)
+        if template.__class__ is str:
+            skipped.append((path, template))
+            continue
+
+        dir_row = dir_index.get(directory)
+        if dir_row is None:
+            dir_row = dir_index[directory] = len(directories)
+            if not found:
+                directory = "."
+            elif not directory:
+                directory = sep
+            directories.append(Path(directory))
+            if check_files:
+                listings.append(_regular_files(directory))
+        if check_files and name not in listings[dir_row]:
+            skipped.append((path, "Input file does not exist"))
+            continue
+
+        inputs.append(path)
+        dir_rows.append(dir_row)
+        names.append(name)
+        template_rows.append(template)
+
+    plan.duration_seconds = time.perf_counter() - start_time
+    logger.info(f"Batch plan: {plan.summary}")
+    return plan
@@ -0,0 +1,88 @@
+"""
+Fail-fast support for batches: error signatures and a circuit breaker.
+"""
+
+import re
+from dataclasses import dataclass
+
+# Parts of an error message that differ between tasks failing the same way
+_QUOTED = re.compile(r"\"[^\"\n]*\"|'[^'\n]*'|`[^`\n]*`")
+_PATH = re.compile(r"(?:[A-Za-z]:)?[\w.~-]*[\\/][^\s:,;()\"']*|[\w-]+\.[A-Za-z][\w]{0,7}\b")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_SPACE = re.compile(r"[ \t]+")
+
+SIGNATURE_LINES = 3
+SIGNATURE_LENGTH = 200
+
+
+def error_signature(message: str | None) -> str:
+    """
+    Normalize an error message so that tasks failing for the same reason match.
+
+    Paths, file names, quoted values and numbers are replaced by placeholders,
+    and only the first few non-empty lines are kept, so "Unknown option --foo"
+    has one signature however many inputs hit it.
+
+    Args:
+        message: Error message of a failed task
+
+    Returns:
+        Normalized signature (empty for an empty message)
+    """
+    if not message:
+        return ""
+    lines = []
+    for line in message.splitlines():
+        line = _QUOTED.sub("<value>", line)
+        line = _PATH.sub("<path>", line)
+        line = _NUMBER.sub("<n>", line)
+        line = _SPACE.sub(" ", line).strip()
+        if line:
+            lines.append(line)
+            if len(lines) == SIGNATURE_LINES:
+                break
+    return "\n".join(lines)[:SIGNATURE_LENGTH]
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Trips after a run of consecutive failures with the same error signature.
+
+    A success, or a failure with another signature, starts the count over.
+    The breaker is not thread-safe; TaskQueue calls it under its mutex.
+    """
+
+    threshold: int
+    signature: str = ""
+    error_message: str = ""
+    failures: int = 0
+
+    def record(self, success: bool, error_message: str | None = None) -> bool:
+        """
+        Record a finished task.
+
+        Args:
+            success: Whether the task succeeded
+            error_message: Error message of a failed task
+
+        Returns:
+            True when this result trips the breaker
+        """
+        if success:
+            self.reset()
+            return False
+
+        signature = error_signature(error_message)
+        if signature != self.signature or not self.failures:
+            self.signature = signature
+            self.failures = 0
+        self.error_message = error_message or "Unknown error"
+        self.failures += 1
+        return self.threshold > 0 and self.failures == self.threshold
+
+    def reset(self) -> None:
+        """Forget the current run of failures."""
+        self.signature = ""
+        self.error_message = ""
+        self.failures = 0
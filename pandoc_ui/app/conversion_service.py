@@ -2,24 +2,77 @@
 Conversion service - orchestrates pandoc detection and execution.
 """
 
+import dataclasses
 import logging
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from ..infra.metrics import get_metrics_registry
 from ..infra.pandoc_detector import PandocDetector, PandocInfo
-from ..infra.pandoc_runner import PandocRunner
-from ..models import ConversionProfile, ConversionResult
+from ..infra.pandoc_progress import PandocProgress
+from ..infra.pandoc_runner import CANCEL_POLL_SECONDS, PandocRunner
+from ..infra.tracing import traced
+from ..models import ConversionProfile, ConversionResult, InputFormat
+from .folder_scanner import FolderScanner
+from .scheduler import Lane, get_scheduler
+from .throughput import get_throughput_tracker
+from .timeout_policy import TimeoutPolicy
+
+if TYPE_CHECKING:
+    from ..infra.archive_io import ArchiveWriter
 
 logger = logging.getLogger(__name__)
 
+# Powers of four from 1 KiB to 1 GiB
+OUTPUT_SIZE_BUCKETS = tuple(1024 * 4**i for i in range(11))
+
+_metrics = get_metrics_registry()
+CONVERSIONS = _metrics.counter(
+    "pandoc_ui_conversions_total",
+    "Pandoc conversions by result and format pair",
+    ("result", "input_format", "output_format"),
+)
+CONVERSION_SECONDS = _metrics.histogram(
+    "pandoc_ui_conversion_duration_seconds",
+    "Time spent converting one document",
+    ("output_format",),
+)
+OUTPUT_BYTES = _metrics.histogram(
+    "pandoc_ui_output_size_bytes",
+    "Size of converted documents",
+    ("output_format",),
+    buckets=OUTPUT_SIZE_BUCKETS,
+)
+
 
 class ConversionService:
-    """Orchestrates document conversion using pandoc."""
+    """
+    Orchestrates document conversion using pandoc.
 
-    def __init__(self) -> None:
-        """Initialize conversion service."""
-        self.detector = PandocDetector()
+    The application shares one instance per process; get it from
+    service_registry.get_conversion_service(). It is safe to use from
+    several worker threads.
+    """
+
+    def __init__(self, detector: PandocDetector | None = None) -> None:
+        """
+        Initialize conversion service.
+
+        Args:
+            detector: Pandoc detector to use (a new one if None)
+        """
+        self.detector = detector or PandocDetector()
+        self._lock = threading.Lock()
         self._runner: PandocRunner | None = None
         self._pandoc_info: PandocInfo | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._pin_source_date = False
+        self.throughput = get_throughput_tracker()
+        self.timeout_policy = TimeoutPolicy()
+        self.scheduler = get_scheduler()
 
     def is_pandoc_available(self) -> bool:
         """
@@ -37,9 +90,10 @@ class ConversionService:
         Returns:
             PandocInfo with path, version, and availability
         """
-        if self._pandoc_info is None:
-            self._pandoc_info = self.detector.detect()
-        return self._pandoc_info
+        with self._lock:
+            if self._pandoc_info is None:
+                self._pandoc_info = self.detector.detect()
+            return self._pandoc_info
 
     def _get_runner(self) -> PandocRunner:
         """
@@ -51,21 +105,70 @@ class ConversionService:
         Raises:
             RuntimeError: If pandoc is not available
         """
-        if self._runner is None:
+        runner = self._runner
+        if runner is None:
             pandoc_info = self.get_pandoc_info()
             if not pandoc_info.available:
                 raise RuntimeError("Pandoc is not available on this system")
 
-            self._runner = PandocRunner(pandoc_info.path)
+            with self._lock:
+                if self._runner is None:
+                    self._runner = PandocRunner(pandoc_info.path)
+                    self._runner.pin_source_date = self._pin_source_date
+                runner = self._runner
+
+        return runner
 
-        return self._runner
+    def get_runner(self) -> PandocRunner:
+        """
+        Get the runner conversions use, e.g. to compile a batch's commands.
+
+        Raises:
+            RuntimeError: If pandoc is not available
+        """
+        return self._get_runner()
+
+    @property
+    def pin_source_date(self) -> bool:
+        """Get whether pandoc's SOURCE_DATE_EPOCH is pinned to each input's mtime."""
+        return self._pin_source_date
+
+    @pin_source_date.setter
+    def pin_source_date(self, enabled: bool) -> None:
+        """
+        Pin SOURCE_DATE_EPOCH to each input's mtime, or stop doing so.
 
-    def convert(self, profile: ConversionProfile) -> ConversionResult:
+        Pinned, unchanged inputs give byte-identical docx and epub output that
+        is left untouched, but those outputs embed the input's date, not today's.
+        """
+        with self._lock:
+            self._pin_source_date = enabled
+            if self._runner is not None:
+                self._runner.pin_source_date = enabled
+
+    def invalidate(self) -> None:
+        """Forget the detected pandoc and its runner so both are set up again on next use."""
+        with self._lock:
+            self._pandoc_info = None
+            self._runner = None
+            self.detector.clear_cache()
+
+    @traced("convert", "convert")
+    def convert(
+        self,
+        profile: ConversionProfile,
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[PandocProgress], None] | None = None,
+    ) -> ConversionResult:
         """
         Convert document using the provided profile.
 
         Args:
             profile: Conversion configuration
+            timeout: Seconds before pandoc is killed (from timeout_policy if None)
+            cancel_event: Event that kills pandoc when set
+            progress: Called with pandoc's phase changes and warnings as they happen
 
         Returns:
             ConversionResult with success status and details
@@ -74,11 +177,18 @@ class ConversionService:
 
         try:
             runner = self._get_runner()
-            result = runner.execute(profile)
+            profile = self._prepare_profile(profile)
+            if timeout is None:
+                timeout = self._timeout_for(profile)
+            result = runner.execute(
+                profile, timeout=timeout, cancel_event=cancel_event, progress=progress
+            )
+            self._record_metrics(profile, result)
 
             if result.success:
                 logger.info(f"Conversion completed successfully in {result.duration_seconds:.2f}s")
                 logger.info(f"Output saved to: {result.output_path}")
+                self._record_throughput(profile, result)
             else:
                 logger.error(f"Conversion failed: {result.error_message}")
 
@@ -88,21 +198,252 @@ class ConversionService:
             logger.error(f"Conversion service error: {str(e)}")
             return ConversionResult(success=False, error_message=f"Service error: {str(e)}")
 
-    def convert_async(self, profile: ConversionProfile) -> ConversionResult:
+    @traced("convert_to_archive", "convert")
+    def convert_to_archive(
+        self,
+        profile: ConversionProfile,
+        writer: "ArchiveWriter",
+        arcname: str,
+        aliases: tuple[str, ...] = (),
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[PandocProgress], None] | None = None,
+    ) -> ConversionResult:
         """
-        Convert document asynchronously (placeholder for Phase 1).
-
-        For Phase 1, this is a synchronous implementation.
-        Will be enhanced with proper async support in later phases.
+        Convert document and append the output to an archive.
 
         Args:
             profile: Conversion configuration
+            writer: Archive writer receiving the output
+            arcname: Member name inside the archive
+            aliases: Additional member names with the same content
+            timeout: Seconds before pandoc is killed (from timeout_policy if None)
+            cancel_event: Event that kills pandoc when set
+            progress: Called with pandoc's phase changes and warnings as they happen
 
         Returns:
             ConversionResult with success status and details
         """
-        # For Phase 1, delegate to synchronous implementation
-        return self.convert(profile)
+        logger.info(f"Starting conversion: {profile.input_path} -> {writer.archive_path}:{arcname}")
+
+        try:
+            runner = self._get_runner()
+            profile = self._prepare_profile(profile)
+            if timeout is None:
+                timeout = self._timeout_for(profile)
+            result = runner.execute_to_archive(
+                profile,
+                writer,
+                arcname,
+                aliases,
+                timeout=timeout,
+                cancel_event=cancel_event,
+                progress=progress,
+            )
+            self._record_metrics(profile, result)
+
+            if result.success:
+                self._record_throughput(profile, result)
+            else:
+                logger.error(f"Conversion failed: {result.error_message}")
+
+            return result
+
+        except Exception as e:
+            logger.error(f"Conversion service error: {str(e)}")
+            return ConversionResult(success=False, error_message=f"Service error: {str(e)}")
+
+    def _prepare_profile(self, profile: ConversionProfile) -> ConversionProfile:
+        """
+        Fill in details the runner cannot infer on its own.
+
+        Archive members reach pandoc on stdin, where it cannot see the file name,
+        so the reader is taken from the member's extension.
+        """
+        if profile.archive_path is None or profile.input_format is not None:
+            return profile
+
+        reader = FolderScanner.input_format_for(profile.input_path)
+        try:
+            input_format = InputFormat(reader) if reader else None
+        except ValueError:
+            input_format = None
+        if input_format is None:
+            logger.warning(f"Cannot detect input format of archive member {profile.input_path}")
+            return profile
+
+        return dataclasses.replace(profile, input_format=input_format)
+
+    @staticmethod
+    def _input_format_key(profile: ConversionProfile) -> str | None:
+        """Get the input format key throughput is measured under."""
+        if profile.input_format:
+            return profile.input_format.value
+        return FolderScanner.input_format_for(profile.input_path)
+
+    def _timeout_for(self, profile: ConversionProfile) -> float:
+        """Get a conversion's timeout from its input size and the format pair's throughput."""
+        input_bytes = None
+        if profile.archive_path is None:
+            try:
+                input_bytes = profile.input_path.stat().st_size
+            except OSError:
+                pass
+        return self.timeout_policy.timeout_for(
+            self.throughput,
+            self._input_format_key(profile),
+            profile.output_format.value,
+            input_bytes,
+        )
+
+    def _record_throughput(self, profile: ConversionProfile, result: ConversionResult) -> None:
+        """Feed a successful conversion into the throughput measurements."""
+        input_format = self._input_format_key(profile)
+        if input_format is None:
+            return
+
+        input_bytes = result.resources.input_bytes if result.resources else None
+        if input_bytes is None:
+            try:
+                input_bytes = profile.input_path.stat().st_size
+            except OSError:
+                return
+
+        self.throughput.record(
+            input_format, profile.output_format.value, input_bytes, result.duration_seconds
+        )
+
+    def _record_metrics(self, profile: ConversionProfile, result: ConversionResult) -> None:
+        """Count a finished conversion and record its latency and output size."""
+        output_format = profile.output_format.value
+        input_format = profile.input_format.value if profile.input_format else "auto"
+        CONVERSIONS.labels(
+            "success" if result.success else "failure", input_format, output_format
+        ).inc()
+        CONVERSION_SECONDS.labels(output_format).observe(result.duration_seconds)
+        if result.success and result.resources and result.resources.output_bytes is not None:
+            OUTPUT_BYTES.labels(output_format).observe(result.resources.output_bytes)
+
+    def convert_async(
+        self,
+        profile: ConversionProfile,
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> "Future[ConversionResult]":
+        """
+        Start a conversion on the service's worker threads.
+
+        The conversion runs in the scheduler's interactive lane, like a
+        single-file conversion from the GUI: someone is waiting on the future,
+        so it starts at once and running batches shrink to make room.
+
+        The future never raises for conversion errors; they are reported in the
+        result. Future.cancel() only works before the conversion starts; set
+        cancel_event to kill a running pandoc. Use asyncio.wrap_future() to
+        await the result from asyncio code.
+
+        Args:
+            profile: Conversion configuration
+            timeout: Seconds before pandoc is killed (from timeout_policy if None)
+            cancel_event: Event that kills pandoc when set
+
+        Returns:
+            Future resolving to the ConversionResult
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.scheduler.budget, thread_name_prefix="pandoc-ui-convert"
+                )
+            executor = self._executor
+        return executor.submit(self._convert_interactive, profile, timeout, cancel_event)
+
+    def _convert_interactive(
+        self,
+        profile: ConversionProfile,
+        timeout: float | None,
+        cancel_event: threading.Event | None,
+    ) -> ConversionResult:
+        """Convert in the scheduler's interactive lane."""
+        with self.scheduler.interactive():
+            return self.convert(profile, timeout, cancel_event)
+
+    def convert_many(
+        self,
+        profiles: Iterable[ConversionProfile],
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> Iterator[tuple[ConversionProfile, ConversionResult]]:
+        """
+        Convert many documents, yielding results as they finish.
+
+        profiles is consumed lazily and at most max_concurrency conversions run
+        at once, so it can be a generator over millions of files. The call
+        takes its share of the budget in the scheduler's batch lane, like a
+        TaskQueue, so it runs fewer at once while interactive conversions or
+        earlier batches hold the budget. Setting
+        cancel_event, or closing the returned generator, stops taking new
+        profiles and kills the running pandoc processes; those still yield a
+        "Conversion cancelled" result when cancelled through the event.
+
+        Args:
+            profiles: Conversion configurations
+            max_concurrency: Most conversions run at once (scheduler budget if None)
+            timeout: Seconds before each pandoc run is killed (from timeout_policy if None)
+            cancel_event: Event that cancels the remaining work when set
+
+        Yields:
+            (profile, result) pairs in completion order
+        """
+        limit = max(1, max_concurrency or self.scheduler.budget)
+        profile_iter = iter(profiles)
+        cancel = threading.Event()  # also set when the caller closes the generator
+        running: dict[Future[ConversionResult], ConversionProfile] = {}
+
+        share = _SchedulerShare()
+        self.scheduler.register(share, Lane.BATCH, limit)
+        executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix="pandoc-ui-many")
+        try:
+            exhausted = False
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    cancel.set()
+                while not exhausted and not cancel.is_set() and len(running) < share.limit:
+                    profile = next(profile_iter, None)
+                    if profile is None:
+                        exhausted = True
+                        break
+                    future = executor.submit(self.convert, profile, timeout, cancel)
+                    running[future] = profile
+                if not running:
+                    if exhausted or cancel.is_set():
+                        return
+                    # The scheduler gave the whole budget to others; wait for a share
+                    share.changed.wait(CANCEL_POLL_SECONDS)
+                    share.changed.clear()
+                    continue
+
+                # Poll so a cancel_event set meanwhile reaches the running conversions
+                done, _ = wait(running, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield running.pop(future), future.result()
+        finally:
+            cancel.set()
+            self.scheduler.unregister(share)
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker threads used by convert_async().
+
+        Args:
+            wait: Wait for started conversions to finish
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
 
     def validate_input_file(self, file_path: Path) -> bool:
         """
@@ -132,7 +473,24 @@ class ConversionService:
 
     def refresh_pandoc_detection(self) -> None:
         """Force re-detection of pandoc installation."""
-        self.detector.clear_cache()
-        self._pandoc_info = None
-        self._runner = None
+        from .service_registry import get_service_registry
+
+        registry = get_service_registry()
+        if registry.get_conversion_service() is self:
+            registry.invalidate()
+        else:
+            self.invalidate()
         logger.info("Pandoc detection cache cleared")
+
+
+class _SchedulerShare:
+    """The concurrency a convert_many() call is granted by the scheduler."""
+
+    def __init__(self) -> None:
+        self.limit = 0
+        self.changed = threading.Event()
+
+    def set_concurrency_limit(self, limit: int) -> None:
+        """Apply the scheduler's concurrency limit (0 means start nothing new)."""
+        self.limit = limit
+        self.changed.set()
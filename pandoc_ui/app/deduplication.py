@@ -0,0 +1,217 @@
+"""
+Duplicate input detection for batch conversions.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ..infra.tracing import traced
+from .folder_scanner import FolderScanner
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Writers whose standalone output defaults its title to the input's file name
+NAME_SENSITIVE_FORMATS = frozenset(
+    {
+        "chunkedhtml",
+        "dzslides",
+        "epub",
+        "epub2",
+        "epub3",
+        "html",
+        "html4",
+        "html5",
+        "revealjs",
+        "s5",
+        "slideous",
+        "slidy",
+    }
+)
+
+# (directory, stem or None): inputs only share output within the same context
+_Context = tuple[str, str | None]
+
+
+@dataclass
+class DeduplicationPlan:
+    """Result of grouping batch inputs by content."""
+
+    unique_files: list[Path]
+    duplicates: dict[Path, list[Path]] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    @property
+    def duplicate_count(self) -> int:
+        """Get number of inputs that do not need their own conversion."""
+        return sum(len(paths) for paths in self.duplicates.values())
+
+    @property
+    def summary(self) -> str:
+        """Get summary of deduplication results."""
+        return (
+            f"{len(self.unique_files)} unique files, "
+            f"{self.duplicate_count} duplicates in {len(self.duplicates)} groups"
+        )
+
+
+def _hash_file(path: Path) -> str:
+    """Hash file contents."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@traced("plan_deduplication", "plan")
+def plan_deduplication(
+    files: list[Path], max_workers: int = 4, output_format: str | None = None
+) -> DeduplicationPlan:
+    """
+    Group byte-identical inputs so each distinct document is converted once.
+
+    Files are grouped in three increasingly expensive passes: by (device, inode),
+    which catches symlinks and hardlinks without reading anything; then by size
+    and reader format; and finally by content hash, computed in parallel only for
+    files whose size and format collide.
+
+    Identical bytes are not enough for identical output: relative images and
+    resources resolve against the input's own directory, and some writers take
+    the default title from its file name. So only inputs in the same directory
+    are grouped, and for writers in NAME_SENSITIVE_FORMATS (or an unknown
+    format) only those with the same stem as well.
+
+    Args:
+        files: Input files in batch order
+        max_workers: Number of threads used for hashing
+        output_format: Pandoc writer the batch converts to, or None if unknown
+
+    Returns:
+        DeduplicationPlan whose unique_files keep the original order, with the
+        first file of each group as its representative
+    """
+    start_time = time.time()
+    errors: list[str] = []
+
+    name_matters = output_format is None or output_format in NAME_SENSITIVE_FORMATS
+
+    # Pass 1: same underlying file, seen from the same context
+    by_inode: dict[tuple[_Context, int, int], list[Path]] = {}
+    sizes: dict[tuple[_Context, int, int], int] = {}
+    for path in files:
+        try:
+            stat = path.stat()
+        except OSError as e:
+            errors.append(f"Cannot stat {path}: {e}")
+            # Keep unreadable files as their own group so the runner reports them
+            by_inode[(("", None), -1, len(by_inode))] = [path]
+            continue
+
+        context = (str(path.parent), path.stem if name_matters else None)
+        key = (context, stat.st_dev, stat.st_ino)
+        by_inode.setdefault(key, []).append(path)
+        sizes[key] = stat.st_size
+
+    # Pass 2: candidate groups by context, size and reader
+    by_size: dict[tuple[_Context, int, str | None], list[tuple[_Context, int, int]]] = {}
+    for key, size in sizes.items():
+        reader = FolderScanner.input_format_for(by_inode[key][0])
+        by_size.setdefault((key[0], size, reader), []).append(key)
+
+    # Pass 3: content hash for colliding sizes only, once per underlying file
+    to_hash = {key[1:]: key for keys in by_size.values() if len(keys) > 1 for key in keys}
+    digests: dict[tuple[int, int], str] = {}
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                inode: executor.submit(_hash_file, by_inode[key][0])
+                for inode, key in to_hash.items()
+            }
+            for inode, future in futures.items():
+                try:
+                    digests[inode] = future.result()
+                except OSError as e:
+                    errors.append(f"Cannot read {by_inode[to_hash[inode]][0]}: {e}")
+
+    # Merge inode groups that share (context, size, reader, digest)
+    group_of: dict[tuple[_Context, int, int], tuple[_Context, int, int]] = {}
+    leaders: dict[tuple[_Context, int, str | None, str], tuple[_Context, int, int]] = {}
+    for (context, size, reader), keys in by_size.items():
+        for key in keys:
+            digest = digests.get(key[1:])
+            if digest is None:
+                continue
+            leader = leaders.setdefault((context, size, reader, digest), key)
+            if leader != key:
+                group_of[key] = leader
+
+    members: dict[tuple[_Context, int, int], list[Path]] = {}
+    for key, paths in by_inode.items():
+        members.setdefault(group_of.get(key, key), []).extend(paths)
+
+    # Representative is the earliest file of each group in batch order
+    order = {path: index for index, path in enumerate(files)}
+    unique_files: list[Path] = []
+    duplicates: dict[Path, list[Path]] = {}
+    for paths in members.values():
+        paths.sort(key=lambda p: order[p])
+        unique_files.append(paths[0])
+        if len(paths) > 1:
+            duplicates[paths[0]] = paths[1:]
+    unique_files.sort(key=lambda p: order[p])
+
+    plan = DeduplicationPlan(
+        unique_files=unique_files,
+        duplicates=duplicates,
+        errors=errors,
+        duration_seconds=time.time() - start_time,
+    )
+    logger.info(f"Deduplication: {plan.summary} ({plan.duration_seconds:.2f}s)")
+    return plan
+
+
+def link_or_copy(source: Path, target: Path) -> str:
+    """
+    Materialize a converted output at another path.
+
+    A hardlink is tried first; copying is the fallback for filesystems or
+    devices that do not support linking.
+
+    Args:
+        source: Existing output file
+        target: Path that should receive the same content
+
+    Returns:
+        'hardlink', 'copy' or 'same' if target already is source
+    """
+    if source == target:
+        return "same"
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if target.exists() and os.path.samefile(source, target):
+            return "same"
+    except OSError:
+        pass
+
+    temp_target = target.with_name(f".{target.name}.{os.getpid()}.link")
+    try:
+        os.link(source, temp_target)
+        os.replace(temp_target, target)
+        return "hardlink"
+    except OSError as e:
+        logger.debug(f"Hardlink {source} -> {target} failed ({e}), copying")
+        temp_target.unlink(missing_ok=True)
+
+    shutil.copy2(source, temp_target)
+    os.replace(temp_target, target)
+    return "copy"
@@ -3,12 +3,19 @@ Folder scanner for recursive file enumeration with extension filtering.
 """
 
 import logging
-from dataclasses import dataclass
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import Any
 
+from ..infra.archive_io import ArchiveFormat, get_shared_archive
+from ..infra.tracing import traced
 from ..models import OutputFormat
+from .throughput import ThroughputTracker, get_throughput_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +36,7 @@ class ScanResult:
     filtered_count: int
     errors: list[str]
     scan_duration_seconds: float
+    archive_path: Path | None = None  # Set when files are virtual members of an archive
 
     @property
     def success(self) -> bool:
@@ -45,6 +53,39 @@ class ScanResult:
         )
 
 
+@dataclass
+class _DirListing:
+    """Directory contents as seen by the batch estimator."""
+
+    file_count: int = 0
+    total_bytes: float = 0.0
+    count_by_format: dict[str, int] = field(default_factory=dict)
+    bytes_by_format: dict[str, float] = field(default_factory=dict)
+    subdirs: list[str] = field(default_factory=list)
+    complete: bool = True
+
+
+def _mean_with_interval(
+    samples: list[float], lower_bound: float, exact: bool
+) -> tuple[float, tuple[float, float]]:
+    """Get sample mean and a 95% normal-approximation confidence interval."""
+    if not samples:
+        return lower_bound, (lower_bound, lower_bound)
+
+    raw_mean = sum(samples) / len(samples)
+    mean = max(lower_bound, raw_mean)
+    if exact:
+        return mean, (mean, mean)
+
+    if len(samples) < 2:
+        # A single probe says little about the spread
+        return mean, (lower_bound, 2 * mean)
+
+    variance = sum((x - raw_mean) ** 2 for x in samples) / (len(samples) - 1)
+    half_width = 1.96 * math.sqrt(variance / len(samples))
+    return mean, (max(lower_bound, mean - half_width), mean + half_width)
+
+
 class FolderScanner:
     """Scans directories for files matching specified criteria."""
 
@@ -66,10 +107,35 @@ class FolderScanner:
         "json": {".json"},  # For pandoc JSON format
     }
 
+    # Extension categories whose pandoc reader name differs from the category key
+    PANDOC_READERS = {"restructuredtext": "rst"}
+    _extension_formats: dict[str, str] | None = None
+
+    # Batch estimator limits
+    ESTIMATE_EXACT_DIR_LIMIT = 256
+    ESTIMATE_MAX_PROBES = 2048
+    ESTIMATE_STATS_PER_FORMAT = 16
+
+    DEFAULT_IGNORE_PATTERNS = frozenset(
+        {
+            ".git",
+            ".svn",
+            ".hg",
+            "__pycache__",
+            "node_modules",
+            ".venv",
+            "venv",
+            "env",
+            ".DS_Store",
+            "Thumbs.db",
+        }
+    )
+
     def __init__(self) -> None:
         """Initialize folder scanner."""
         self._scan_stats = {"total_scanned": 0, "last_scan_duration": 0.0, "errors_encountered": []}
 
+    @traced("scan_folder", "scan")
     def scan_folder(
         self,
         folder_path: Path,
@@ -110,18 +176,7 @@ class FolderScanner:
 
         # Default ignore patterns
         if ignore_patterns is None:
-            ignore_patterns = {
-                ".git",
-                ".svn",
-                ".hg",
-                "__pycache__",
-                "node_modules",
-                ".venv",
-                "venv",
-                "env",
-                ".DS_Store",
-                "Thumbs.db",
-            }
+            ignore_patterns = set(self.DEFAULT_IGNORE_PATTERNS)
 
         try:
             # Validate input folder
@@ -129,6 +184,9 @@ class FolderScanner:
                 errors.append(f"Folder does not exist: {folder_path}")
                 return ScanResult([], 0, 0, errors, time.time() - start_time)
 
+            if folder_path.is_file() and ArchiveFormat.from_path(folder_path):
+                return self.scan_archive(folder_path, extensions, max_files, ignore_patterns)
+
             if not folder_path.is_dir():
                 errors.append(f"Path is not a directory: {folder_path}")
                 return ScanResult([], 0, 0, errors, time.time() - start_time)
@@ -190,6 +248,82 @@ class FolderScanner:
             scan_duration_seconds=time.time() - start_time,
         )
 
+    @traced("scan_archive", "scan")
+    def scan_archive(
+        self,
+        archive_path: Path,
+        extensions: set[str] | None = None,
+        max_files: int = 10000,
+        ignore_patterns: set[str] | None = None,
+    ) -> ScanResult:
+        """
+        Enumerate archive members as virtual inputs without extracting them.
+
+        Each returned file is ``archive_path / member_name``; ScanResult.archive_path
+        marks them as virtual. The same hidden-file and ignore rules as a
+        recursive folder scan apply to member paths.
+
+        Args:
+            archive_path: Zip or tar archive
+            extensions: File extensions to include (e.g. {'.md', '.rst'})
+            max_files: Maximum number of files to return
+            ignore_patterns: Directory/file patterns to ignore
+
+        Returns:
+            ScanResult with virtual member paths and statistics
+        """
+        start_time = time.time()
+
+        if extensions is None:
+            extensions = self.get_supported_extensions()
+        extensions = {(ext if ext.startswith(".") else f".{ext}").lower() for ext in extensions}
+        if ignore_patterns is None:
+            ignore_patterns = set(self.DEFAULT_IGNORE_PATTERNS)
+
+        try:
+            # Shared with the batch's tasks, so the archive is read only once
+            with get_shared_archive(archive_path) as shared:
+                members = shared.members()
+        except Exception as e:
+            error_msg = f"Cannot read archive {archive_path}: {str(e)}"
+            logger.error(error_msg)
+            return ScanResult([], 0, 0, [error_msg], time.time() - start_time, archive_path)
+
+        total_count = 0
+        filtered_files: list[Path] = []
+        for name, _size in members:
+            parts = [part for part in name.split("/") if part and part != "."]
+            if not parts or any(
+                part in ignore_patterns or part.startswith(".") or part == ".." for part in parts
+            ):
+                continue
+
+            total_count += 1
+            if os.path.splitext(parts[-1])[1].lower() in extensions:
+                if len(filtered_files) >= max_files:
+                    logger.warning(f"Reached max_files limit ({max_files}), stopping scan")
+                    break
+                filtered_files.append(archive_path.joinpath(*parts))
+
+        filtered_files.sort()
+        scan_duration = time.time() - start_time
+        self._scan_stats["total_scanned"] = total_count
+        self._scan_stats["last_scan_duration"] = scan_duration
+
+        logger.info(
+            f"Archive scan completed: {archive_path} {total_count} total, "
+            f"{len(filtered_files)} filtered, {scan_duration:.2f}s"
+        )
+
+        return ScanResult(
+            files=filtered_files,
+            total_count=total_count,
+            filtered_count=len(filtered_files),
+            errors=[],
+            scan_duration_seconds=scan_duration,
+            archive_path=archive_path,
+        )
+
     def _scan_recursive(
         self, folder_path: Path, ignore_patterns: set[str], max_files: int
     ) -> list[Path]:
@@ -307,39 +441,168 @@ class FolderScanner:
         """
         return self.DEFAULT_EXTENSIONS.copy()
 
+    @classmethod
+    def input_format_for(cls, file_path: Path | str) -> str | None:
+        """
+        Get the pandoc reader for a file based on its extension.
+
+        Args:
+            file_path: File path or name
+
+        Returns:
+            Reader name (e.g. 'markdown', 'rst') or None if the extension is unknown
+        """
+        if cls._extension_formats is None:
+            cls._extension_formats = {
+                ext: cls.PANDOC_READERS.get(category, category)
+                for category, ext_set in cls.DEFAULT_EXTENSIONS.items()
+                for ext in ext_set
+            }
+
+        return cls._extension_formats.get(os.path.splitext(str(file_path))[1].lower())
+
     def estimate_batch_size(
-        self, folder_path: Path, extensions: set[str] | None = None
+        self,
+        folder_path: Path,
+        extensions: set[str] | None = None,
+        time_budget_seconds: float = 0.5,
+        output_format: OutputFormat | None = None,
+        concurrency: int = 4,
+        throughput: ThroughputTracker | None = None,
+        ignore_patterns: set[str] | None = None,
+        seed: int | None = None,
     ) -> dict[str, Any]:
         """
         Estimate batch processing requirements without full scan.
 
+        Small trees are enumerated exactly. Larger trees are estimated with
+        random root-to-leaf probes (Knuth's estimator): each probe descends into a
+        random subdirectory per level and weights the files it sees by the product
+        of the branching factors, giving an unbiased estimate of the tree total.
+        Probing stops when the time budget is spent, so the call returns in
+        bounded time regardless of tree size.
+
         Args:
             folder_path: Directory to estimate
             extensions: File extensions to count
+            time_budget_seconds: Wall-clock budget for the estimate
+            output_format: Target format, used to pick measured throughput
+            concurrency: Number of parallel conversions assumed for the duration
+            throughput: Throughput measurements (default: global tracker)
+            ignore_patterns: Directory/file patterns to ignore
+            seed: Random seed for reproducible sampling
 
         Returns:
-            Dictionary with size estimates and recommendations
+            Dictionary with size estimates, 95% confidence intervals and recommendations
         """
-        try:
-            # Sample scan to estimate
-            sample_result = self.scan_folder(
-                folder_path=folder_path,
-                extensions=extensions,
-                mode=ScanMode.SINGLE_LEVEL,
-                max_files=100,
-            )
-
-            # Try recursive sample
-            recursive_sample = self.scan_folder(
-                folder_path=folder_path,
-                extensions=extensions,
-                mode=ScanMode.RECURSIVE,
-                max_files=500,
-            )
+        start_time = time.perf_counter()
 
-            # Estimate total size
-            single_level_count = sample_result.filtered_count
-            recursive_count = recursive_sample.filtered_count
+        try:
+            if extensions is None:
+                extensions = self.get_supported_extensions()
+            extensions = {(ext if ext.startswith(".") else f".{ext}").lower() for ext in extensions}
+            if ignore_patterns is None:
+                ignore_patterns = set(self.DEFAULT_IGNORE_PATTERNS)
+            if throughput is None:
+                throughput = get_throughput_tracker()
+
+            output_key = output_format.value if output_format else None
+            concurrency = max(1, concurrency)
+            deadline = start_time + max(0.0, time_budget_seconds)
+            rng = random.Random(seed)
+            listings: dict[str, _DirListing] = {}
+
+            def get_listing(path: str) -> _DirListing:
+                listing = listings.get(path)
+                if listing is None:
+                    listing = self._list_directory(path, extensions, ignore_patterns, rng, deadline)
+                    listings[path] = listing
+                return listing
+
+            def duration_of(files: dict[str, float], sizes: dict[str, float]) -> float:
+                seconds = 0.0
+                for fmt, count in files.items():
+                    overhead, per_byte = throughput.model(fmt, output_key)
+                    seconds += count * overhead + sizes.get(fmt, 0.0) * per_byte
+                return seconds / concurrency
+
+            root = str(folder_path)
+            root_listing = get_listing(root)
+
+            # Exact breadth-first walk while the tree is small
+            exact = root_listing.complete
+            pending = list(root_listing.subdirs)
+            exact_deadline = start_time + time_budget_seconds / 2
+            while pending and exact:
+                if (
+                    len(listings) >= self.ESTIMATE_EXACT_DIR_LIMIT
+                    or time.perf_counter() > exact_deadline
+                ):
+                    exact = False
+                    break
+                listing = get_listing(pending.pop())
+                exact = listing.complete
+                pending.extend(listing.subdirs)
+
+            file_samples: list[float] = []
+            byte_samples: list[float] = []
+            duration_samples: list[float] = []
+
+            if exact:
+                files_by_format: dict[str, float] = {}
+                bytes_by_format: dict[str, float] = {}
+                for listing in listings.values():
+                    for fmt, count in listing.count_by_format.items():
+                        files_by_format[fmt] = files_by_format.get(fmt, 0.0) + count
+                        bytes_by_format[fmt] = (
+                            bytes_by_format.get(fmt, 0.0) + listing.bytes_by_format[fmt]
+                        )
+                file_samples.append(sum(files_by_format.values()))
+                byte_samples.append(sum(bytes_by_format.values()))
+                duration_samples.append(duration_of(files_by_format, bytes_by_format))
+            else:
+                while len(file_samples) < self.ESTIMATE_MAX_PROBES:
+                    if file_samples and time.perf_counter() > deadline:
+                        break
+
+                    weight = 1.0
+                    probe_files: dict[str, float] = {}
+                    probe_bytes: dict[str, float] = {}
+                    listing = root_listing
+                    finished = True
+                    while True:
+                        for fmt, count in listing.count_by_format.items():
+                            probe_files[fmt] = probe_files.get(fmt, 0.0) + weight * count
+                            probe_bytes[fmt] = (
+                                probe_bytes.get(fmt, 0.0) + weight * listing.bytes_by_format[fmt]
+                            )
+                        if not listing.subdirs:
+                            break
+                        if time.perf_counter() > deadline:
+                            finished = False
+                            break
+                        weight *= len(listing.subdirs)
+                        listing = get_listing(rng.choice(listing.subdirs))
+
+                    # Truncated probes are biased low; keep one only if nothing else finished
+                    if not finished and file_samples:
+                        break
+                    file_samples.append(sum(probe_files.values()))
+                    byte_samples.append(sum(probe_bytes.values()))
+                    duration_samples.append(duration_of(probe_files, probe_bytes))
+                    if not finished:
+                        break
+
+            # Everything actually listed is a hard lower bound
+            seen_files = float(sum(listing.file_count for listing in listings.values()))
+            seen_bytes = float(sum(listing.total_bytes for listing in listings.values()))
+
+            files_mean, files_ci = _mean_with_interval(file_samples, seen_files, exact)
+            bytes_mean, bytes_ci = _mean_with_interval(byte_samples, seen_bytes, exact)
+            duration_mean, duration_ci = _mean_with_interval(duration_samples, 0.0, exact)
+
+            single_level_count = root_listing.file_count
+            recursive_count = max(single_level_count, int(round(files_mean)))
 
             # Calculate recommended settings
             if recursive_count > 1000:
@@ -352,12 +615,29 @@ class FolderScanner:
                 recommended_mode = ScanMode.RECURSIVE
                 recommended_batch_size = recursive_count
 
+            elapsed = time.perf_counter() - start_time
+            logger.debug(
+                f"Estimated {files_mean:.0f} files in {folder_path} "
+                f"({len(listings)} directories listed, {len(file_samples)} probes, "
+                f"{elapsed:.3f}s, exact={exact})"
+            )
+
             return {
                 "single_level_estimate": single_level_count,
                 "recursive_estimate": recursive_count,
                 "recommended_mode": recommended_mode,
-                "recommended_batch_size": recommended_batch_size,
-                "estimated_duration_minutes": max(1, recursive_count // 100),
+                "recommended_batch_size": max(1, recommended_batch_size),
+                "estimated_duration_minutes": max(1, math.ceil(duration_mean / 60)),
+                "estimated_files": files_mean,
+                "files_confidence_interval": files_ci,
+                "estimated_total_bytes": bytes_mean,
+                "bytes_confidence_interval": bytes_ci,
+                "estimated_duration_seconds": duration_mean,
+                "duration_confidence_interval": duration_ci,
+                "is_exact": exact,
+                "sampled_directories": len(listings),
+                "probe_count": len(file_samples),
+                "estimation_seconds": elapsed,
             }
 
         except Exception as e:
@@ -368,8 +648,87 @@ class FolderScanner:
                 "recommended_mode": ScanMode.SINGLE_LEVEL,
                 "recommended_batch_size": 10,
                 "estimated_duration_minutes": 1,
+                "estimated_files": 0.0,
+                "files_confidence_interval": (0.0, 0.0),
+                "estimated_total_bytes": 0.0,
+                "bytes_confidence_interval": (0.0, 0.0),
+                "estimated_duration_seconds": 0.0,
+                "duration_confidence_interval": (0.0, 0.0),
+                "is_exact": False,
+                "sampled_directories": 0,
+                "probe_count": 0,
+                "estimation_seconds": time.perf_counter() - start_time,
             }
 
+    def _list_directory(
+        self,
+        path: str,
+        extensions: set[str],
+        ignore_patterns: set[str],
+        rng: random.Random,
+        deadline: float,
+    ) -> "_DirListing":
+        """
+        List one directory for the batch estimator.
+
+        Matching files are counted by name only; sizes are taken from a random
+        sample of at most ESTIMATE_STATS_PER_FORMAT files per format and
+        extrapolated, so huge flat directories stay cheap.
+        """
+        listing = _DirListing()
+        matched: dict[str, list[os.DirEntry[str]]] = {}
+
+        try:
+            with os.scandir(path) as entries:
+                for index, entry in enumerate(entries):
+                    if index and index % 4096 == 0 and time.perf_counter() > deadline:
+                        listing.complete = False
+                        break
+
+                    name = entry.name
+                    if name in ignore_patterns or name.startswith("."):
+                        continue
+
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            listing.subdirs.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+
+                    ext = os.path.splitext(name)[1].lower()
+                    if ext in extensions:
+                        fmt = self.input_format_for(name) or ext.lstrip(".")
+                        matched.setdefault(fmt, []).append(entry)
+
+        except OSError as e:
+            logger.debug(f"Estimator could not list {path}: {e}")
+            return listing
+
+        for fmt, fmt_entries in matched.items():
+            count = len(fmt_entries)
+            if count > self.ESTIMATE_STATS_PER_FORMAT:
+                sample = rng.sample(fmt_entries, self.ESTIMATE_STATS_PER_FORMAT)
+            else:
+                sample = fmt_entries
+
+            sizes = []
+            for entry in sample:
+                try:
+                    sizes.append(entry.stat().st_size)
+                except OSError:
+                    continue
+            mean_size = sum(sizes) / len(sizes) if sizes else 0.0
+
+            listing.count_by_format[fmt] = count
+            listing.bytes_by_format[fmt] = mean_size * count
+            listing.file_count += count
+            listing.total_bytes += mean_size * count
+
+        return listing
+
     @property
     def scan_statistics(self) -> dict[str, Any]:
         """Get scanning statistics."""
@@ -0,0 +1,158 @@
+"""
+Failure classification and retry policy for batch conversions.
+"""
+
+import random
+import re
+import signal
+from dataclasses import dataclass
+from enum import Enum
+
+from ..models import ConversionResult
+
+
+class FailureKind(Enum):
+    """Whether a failed conversion can succeed when run again."""
+
+    TRANSIENT = "transient"
+    DETERMINISTIC = "deterministic"
+
+
+@dataclass(frozen=True)
+class FailureClass:
+    """Classification of a failed conversion."""
+
+    kind: FailureKind
+    category: str
+    reduce_concurrency: bool = False  # Caused by load, so fewer parallel runs help
+
+    @property
+    def transient(self) -> bool:
+        """Check whether a retry may succeed."""
+        return self.kind == FailureKind.TRANSIENT
+
+
+# Transient causes recognised in error messages (pandoc's stderr, or the exception
+# text when pandoc could not be started), checked in order
+_TRANSIENT_PATTERNS: tuple[tuple[str, re.Pattern, bool], ...] = (
+    (
+        "out_of_memory",
+        re.compile(
+            r"out of memory|cannot allocate memory|heap exhausted|memory exhausted|"
+            r"\bENOMEM\b|\[Errno 12\]|^Killed$",
+            re.IGNORECASE | re.MULTILINE,
+        ),
+        True,
+    ),
+    (
+        "resource_exhausted",
+        re.compile(
+            r"resource temporarily unavailable|\bEAGAIN\b|\[Errno 11\]|"
+            r"too many open files|\bEMFILE\b|\bENFILE\b|\[Errno 2[34]\]",
+            re.IGNORECASE,
+        ),
+        True,
+    ),
+    (
+        "file_locked",
+        re.compile(
+            r"resource busy|file is locked|text file busy|\bEBUSY\b|\[Errno 16\]|"
+            r"\[Errno 26\]|being used by another process|lock violation",
+            re.IGNORECASE,
+        ),
+        False,
+    ),
+)
+
+# Pandoc exit statuses of failures that may go away on their own
+_TRANSIENT_EXIT_CODES = {
+    61: "network",  # PandocHttpError: fetching a remote resource failed
+}
+
+TIMEOUT_PREFIX = "Pandoc conversion timed out"
+STALL_PREFIX = "Pandoc stalled"
+CANCELLED_MESSAGE = "Conversion cancelled"
+
+
+def classify_failure(result: ConversionResult) -> FailureClass:
+    """
+    Classify a failed conversion from its exit status, signal and error message.
+
+    Timeouts, stalls, processes killed by SIGKILL (the OOM killer's signal),
+    memory or process-table exhaustion, locked files and network errors are
+    transient. Everything else, such as unknown options, parse errors, missing
+    templates and missing inputs, fails the same way every time and is
+    deterministic.
+
+    Args:
+        result: Result of a failed conversion
+
+    Returns:
+        FailureClass with the kind and a short category name
+    """
+    message = result.error_message or ""
+    exit_code = result.exit_code
+
+    if message == CANCELLED_MESSAGE:
+        return FailureClass(FailureKind.DETERMINISTIC, "cancelled")
+    if message.startswith(TIMEOUT_PREFIX):
+        return FailureClass(FailureKind.TRANSIENT, "timeout", reduce_concurrency=True)
+    if message.startswith(STALL_PREFIX):
+        return FailureClass(FailureKind.TRANSIENT, "stalled")
+    if exit_code in (-signal.SIGKILL, 128 + signal.SIGKILL):
+        return FailureClass(FailureKind.TRANSIENT, "out_of_memory", reduce_concurrency=True)
+
+    for category, pattern, reduce_concurrency in _TRANSIENT_PATTERNS:
+        if pattern.search(message):
+            return FailureClass(FailureKind.TRANSIENT, category, reduce_concurrency)
+
+    if exit_code in _TRANSIENT_EXIT_CODES:
+        return FailureClass(FailureKind.TRANSIENT, _TRANSIENT_EXIT_CODES[exit_code])
+    if exit_code is not None and exit_code < 0:
+        return FailureClass(FailureKind.DETERMINISTIC, "crashed")
+    return FailureClass(FailureKind.DETERMINISTIC, "pandoc_error" if exit_code else "error")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how soon to retry failed conversions.
+
+    Only transient failures are retried, with exponential backoff: attempt n
+    waits base_delay_seconds * 2 ** (n - 1), capped at max_delay_seconds, minus
+    a random share of up to jitter so retries of a burst of failures spread
+    out instead of hitting the machine again at the same moment.
+    """
+
+    max_attempts: int = 3  # Including the first run
+    base_delay_seconds: float = 1.0
+    max_delay_seconds: float = 30.0
+    jitter: float = 0.5  # Fraction of the delay that is randomized
+    reduce_concurrency: bool = True  # Lower concurrency after load-related failures
+
+    def should_retry(self, failure: FailureClass, attempts: int) -> bool:
+        """
+        Check whether a failed task gets another attempt.
+
+        Args:
+            failure: Classification of the latest failure
+            attempts: Attempts made so far, including the failed one
+
+        Returns:
+            True if the task should run again
+        """
+        return failure.transient and attempts < self.max_attempts
+
+    def delay(self, attempts: int, rng: random.Random | None = None) -> float:
+        """
+        Get the backoff before the next attempt.
+
+        Args:
+            attempts: Attempts made so far
+            rng: Random source for the jitter (module random if None)
+
+        Returns:
+            Seconds to wait
+        """
+        delay = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** (attempts - 1))
+        return delay * (1.0 - self.jitter * (rng or random).random())
@@ -0,0 +1,192 @@
+"""
+Application-wide conversion scheduling with priority lanes.
+"""
+
+import logging
+import os
+import threading
+import weakref
+from collections.abc import Iterator
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class Lane(IntEnum):
+    """Priority lanes, highest priority first."""
+
+    INTERACTIVE = 0  # Single-file conversions the user is waiting for
+    BATCH = 1  # Folder and archive batches
+    BACKGROUND = 2  # Work nobody is waiting for
+
+
+class ConcurrencyClient(Protocol):
+    """Something whose concurrency the scheduler can adjust, such as a TaskQueue."""
+
+    def set_concurrency_limit(self, limit: int) -> None:
+        """Apply a new limit (0 means start nothing new)."""
+
+
+class ConversionScheduler:
+    """
+    Shares one concurrency budget between interactive conversions and batches.
+
+    Interactive conversions are always admitted at once and count against the
+    budget while they run. What is left is handed to registered batch clients
+    and then background clients, in registration order within a lane, each up
+    to the concurrency it asked for. When an interactive conversion starts,
+    batch limits shrink: running batch jobs finish, but their queues start no
+    new ones until the budget allows. Limits grow back when it ends.
+    """
+
+    def __init__(self, budget: int | None = None) -> None:
+        """
+        Initialize scheduler.
+
+        Args:
+            budget: Total concurrent conversions (defaults to the CPU count)
+        """
+        self._lock = threading.Lock()
+        # Serializes recompute-and-notify so clients never see limits out of order
+        self._rebalance_lock = threading.RLock()
+        self._budget = max(1, budget or os.cpu_count() or 1)
+        self._interactive = 0
+        # id(client) -> (weak reference, lane, requested concurrency)
+        self._clients: dict[int, tuple[weakref.ref, Lane, int]] = {}
+        self._limits: dict[int, int] = {}
+
+    @property
+    def budget(self) -> int:
+        """Get the total concurrency budget."""
+        with self._lock:
+            return self._budget
+
+    def set_budget(self, budget: int) -> None:
+        """
+        Set the total concurrency budget.
+
+        Args:
+            budget: Total concurrent conversions (at least 1)
+        """
+        with self._lock:
+            self._budget = max(1, budget)
+        logger.info(f"Conversion budget set to {max(1, budget)}")
+        self._rebalance()
+
+    @property
+    def interactive_count(self) -> int:
+        """Get the number of running interactive conversions."""
+        with self._lock:
+            return self._interactive
+
+    def register(self, client: ConcurrencyClient, lane: Lane, requested: int) -> None:
+        """
+        Register a client or update its lane and requested concurrency.
+
+        The client's set_concurrency_limit() is called with its share straight
+        away and again whenever the share changes. It is called without the
+        scheduler lock held, from whichever thread caused the change.
+
+        Args:
+            client: Client to schedule
+            lane: Priority lane (BATCH or BACKGROUND)
+            requested: Concurrency the client would use on its own
+        """
+        if lane == Lane.INTERACTIVE:
+            raise ValueError("Interactive work is admitted with interactive(), not registered")
+
+        key = id(client)
+        with self._lock:
+            self._clients[key] = (weakref.ref(client), lane, max(1, requested))
+        self._rebalance()
+
+    def unregister(self, client: ConcurrencyClient) -> None:
+        """
+        Release a client's share of the budget.
+
+        Args:
+            client: Previously registered client
+        """
+        key = id(client)
+        with self._lock:
+            if self._clients.pop(key, None) is None:
+                return
+            self._limits.pop(key, None)
+        self._rebalance()
+
+    def limit_for(self, client: ConcurrencyClient) -> int | None:
+        """Get a client's current limit, or None if it is not registered."""
+        with self._lock:
+            return self._limits.get(id(client))
+
+    @contextmanager
+    def interactive(self) -> Iterator[None]:
+        """
+        Run an interactive conversion inside this context.
+
+        Admission is immediate; batch clients are shrunk to make room.
+        """
+        with self._lock:
+            self._interactive += 1
+        self._rebalance()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._interactive -= 1
+            self._rebalance()
+
+    def _rebalance(self) -> None:
+        """Recompute client limits and notify the clients whose limit changed."""
+        with self._rebalance_lock:
+            self._apply_limits(self._compute_limits())
+
+    def _compute_limits(self) -> list[tuple[int, ConcurrencyClient, int]]:
+        """Hand out the budget by lane; return (key, client, limit) for changed limits."""
+        with self._lock:
+            available = max(0, self._budget - self._interactive)
+            live = []
+            for key, (ref, lane, requested) in list(self._clients.items()):
+                client = ref()
+                if client is None:
+                    del self._clients[key]
+                    self._limits.pop(key, None)
+                else:
+                    live.append((lane, key, client, requested))
+            # Stable sort keeps registration order within a lane
+            live.sort(key=lambda entry: entry[0])
+
+            changed = []
+            for _lane, key, client, requested in live:
+                limit = min(requested, available)
+                available -= limit
+                if self._limits.get(key) != limit:
+                    self._limits[key] = limit
+                    changed.append((key, client, limit))
+        return changed
+
+    def _apply_limits(self, changed: list[tuple[int, ConcurrencyClient, int]]) -> None:
+        """Notify clients of new limits, dropping those whose Qt object is gone."""
+        for key, client, limit in changed:
+            try:
+                client.set_concurrency_limit(limit)
+            except RuntimeError as e:
+                # Qt object already deleted
+                logger.debug(f"Dropping scheduler client: {e}")
+                with self._lock:
+                    self._clients.pop(key, None)
+                    self._limits.pop(key, None)
+
+
+# Global instance for easy access
+_scheduler: ConversionScheduler | None = None
+
+
+def get_scheduler() -> ConversionScheduler:
+    """Get global conversion scheduler instance."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ConversionScheduler()
+    return _scheduler
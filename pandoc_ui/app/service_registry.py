@@ -0,0 +1,94 @@
+"""
+Process-wide registry of shared conversion services.
+"""
+
+import logging
+import threading
+
+from ..infra.format_manager import FormatManager
+from ..infra.pandoc_detector import PandocDetector
+from .conversion_service import ConversionService
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """
+    Owns the single pandoc detector, conversion service and format table.
+
+    Pandoc detection, version probing and runner setup then happen once per
+    process instead of once per worker or task queue. Holders keep the same
+    objects across invalidate(), which only drops what was learned about the
+    pandoc installation, so the next conversion detects it afresh.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty registry; services are created on first use."""
+        self._lock = threading.Lock()
+        self._detector: PandocDetector | None = None
+        self._conversion_service: ConversionService | None = None
+        self._format_manager: FormatManager | None = None
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Get a counter that increases with every invalidate() call."""
+        with self._lock:
+            return self._generation
+
+    def get_detector(self) -> PandocDetector:
+        """Get the shared pandoc detector."""
+        with self._lock:
+            if self._detector is None:
+                self._detector = PandocDetector()
+            return self._detector
+
+    def get_conversion_service(self) -> ConversionService:
+        """Get the shared conversion service."""
+        detector = self.get_detector()
+        with self._lock:
+            if self._conversion_service is None:
+                self._conversion_service = ConversionService(detector=detector)
+            return self._conversion_service
+
+    def get_format_manager(self) -> FormatManager:
+        """Get the shared format table."""
+        with self._lock:
+            if self._format_manager is None:
+                self._format_manager = FormatManager()
+            return self._format_manager
+
+    def invalidate(self) -> None:
+        """
+        Forget the detected pandoc installation, e.g. after the user changes pandoc.
+
+        The detector cache and the service's pandoc info and runner are cleared;
+        conversions already running finish with the old runner.
+        """
+        with self._lock:
+            self._generation += 1
+            detector = self._detector
+            service = self._conversion_service
+
+        if service is not None:
+            service.invalidate()
+        elif detector is not None:
+            detector.clear_cache()
+        logger.info("Pandoc services invalidated")
+
+
+# Global instance for easy access
+_service_registry: ServiceRegistry | None = None
+
+
+def get_service_registry() -> ServiceRegistry:
+    """Get global service registry instance."""
+    global _service_registry
+    if _service_registry is None:
+        _service_registry = ServiceRegistry()
+    return _service_registry
+
+
+def get_conversion_service() -> ConversionService:
+    """Get the process-wide conversion service."""
+    return get_service_registry().get_conversion_service()
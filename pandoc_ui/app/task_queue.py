@@ -2,14 +2,40 @@
 Task queue manager for batch processing with QThreadPool.
 """
 
+import csv
+import gc
+import heapq
 import logging
+import os
 import time
-from dataclasses import dataclass
+import weakref
+from collections import Counter, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from enum import Enum
-
-from PySide6.QtCore import QMutex, QMutexLocker, QObject, QRunnable, QThreadPool, Signal
-
+from pathlib import Path
+
+from PySide6.QtCore import (
+    QMutex,
+    QMutexLocker,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+    Signal,
+)
+
+from ..infra.archive_io import ArchiveWriter
+from ..infra.metrics import get_metrics_registry
+from ..infra.pandoc_progress import PandocProgress
+from ..infra.tracing import get_tracer, now_ns, span, traced
 from ..models import ConversionProfile, ConversionResult
+from .batch_planner import BatchPlan
+from .circuit_breaker import CircuitBreaker
+from .deduplication import link_or_copy
+from .retry_policy import RetryPolicy, classify_failure
+from .scheduler import ConversionScheduler, Lane, get_scheduler
+from .task_store import ProfileTemplate, ResourceSummary, TaskStore
 
 logger = logging.getLogger(__name__)
 
@@ -24,9 +50,69 @@ class TaskStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+# Compact status codes stored in TaskStore.status
+STATUS_CODES: dict[TaskStatus, int] = {status: code for code, status in enumerate(TaskStatus)}
+STATUSES_BY_CODE: tuple[TaskStatus, ...] = tuple(TaskStatus)
+_PENDING = STATUS_CODES[TaskStatus.PENDING]
+_RUNNING = STATUS_CODES[TaskStatus.RUNNING]
+_COMPLETED = STATUS_CODES[TaskStatus.COMPLETED]
+_FAILED = STATUS_CODES[TaskStatus.FAILED]
+_CANCELLED = STATUS_CODES[TaskStatus.CANCELLED]
+
+# Columns of export_report(); sizes in bytes, times in seconds
+REPORT_COLUMNS = (
+    "task_id",
+    "input_path",
+    "output_path",
+    "status",
+    "wall_seconds",
+    "user_cpu_seconds",
+    "system_cpu_seconds",
+    "peak_rss_bytes",
+    "read_bytes",
+    "write_bytes",
+    "input_bytes",
+    "output_bytes",
+    "error",
+)
+
+ResultSink = Callable[[str, ConversionResult], None]
+
+_metrics = get_metrics_registry()
+TASKS = _metrics.counter(
+    "pandoc_ui_tasks_total",
+    "Batch tasks finished, by status and format pair",
+    ("status", "input_format", "output_format"),
+)
+CACHE_HITS = _metrics.counter(
+    "pandoc_ui_cache_hits_total",
+    "Pandoc runs avoided (deduplicated) or output writes skipped (unchanged_output)",
+    ("cache",),
+)
+QUEUE_WAIT = _metrics.histogram(
+    "pandoc_ui_queue_wait_seconds", "Time from start_queue() until a task starts running"
+)
+QUEUE_DEPTH = _metrics.gauge("pandoc_ui_queue_depth", "Pending tasks in all task queues")
+ACTIVE_JOBS = _metrics.gauge("pandoc_ui_active_jobs", "Tasks currently running")
+CONCURRENCY_LIMIT = _metrics.gauge(
+    "pandoc_ui_concurrency_limit", "Concurrent tasks allowed across running task queues"
+)
+
+
+def _task_labels(status: TaskStatus, template: ProfileTemplate) -> tuple[str, str, str]:
+    """Get the pandoc_ui_tasks_total labels of a task."""
+    input_format = template.input_format.value if template.input_format else "auto"
+    return status.value, input_format, template.output_format.value
+
+
+@dataclass(slots=True)
 class BatchTask:
-    """Individual task in the batch queue."""
+    """
+    Individual task in the batch queue.
+
+    The queue stores tasks in a TaskStore; BatchTask objects are views built on
+    demand, so changing one does not change the queue.
+    """
 
     id: str
     profile: ConversionProfile
@@ -35,6 +121,8 @@ class BatchTask:
     start_time: float | None = None
     end_time: float | None = None
     error_message: str | None = None
+    duplicate_outputs: list[Path] = field(default_factory=list)
+    position: int = 0  # Row in the queue's TaskStore
 
     @property
     def duration(self) -> float | None:
@@ -44,6 +132,40 @@ class BatchTask:
         return None
 
 
+@dataclass(frozen=True)
+class ProgressSnapshot:
+    """Aggregated queue progress delivered to the GUI at a fixed rate."""
+
+    total: int
+    completed: int
+    failed: int
+    running: int
+    elapsed_seconds: float
+    throughput: float  # Finished tasks per second over the recent window
+    eta_seconds: float | None
+    cancelled: int = 0
+
+    @property
+    def finished(self) -> int:
+        """Get number of tasks that completed or failed."""
+        return self.completed + self.failed
+
+    @property
+    def pending(self) -> int:
+        """Get number of tasks not started yet."""
+        return max(0, self.total - self.finished - self.running - self.cancelled)
+
+    @property
+    def done(self) -> bool:
+        """Check if no task is pending or running."""
+        return self.finished + self.cancelled >= self.total
+
+    @property
+    def percent(self) -> int:
+        """Get progress in percent."""
+        return int(self.finished * 100 / self.total) if self.total else 0
+
+
 class ConversionTask(QRunnable):
     """Runnable task for conversion work."""
 
@@ -58,39 +180,120 @@ class ConversionTask(QRunnable):
         super().__init__()
         self.task = task
         self.task_queue = task_queue
+        self.submitted_ns = now_ns() if get_tracer().enabled else 0
         self.setAutoDelete(True)
 
     def run(self) -> None:
         """Execute the conversion task."""
+        store = self.task_queue._store
+        row = self.task.position
+        if self.submitted_ns:
+            get_tracer().record(
+                "queue_wait", self.submitted_ns, now_ns(), "queue", task_id=self.task.id
+            )
+        task_span = span("task", "queue", task_id=self.task.id)
         try:
             # Update task status to running
             with QMutexLocker(self.task_queue._mutex):
-                self.task.status = TaskStatus.RUNNING
+                if store.status[row] == _CANCELLED:
+                    return  # cancelled after it was handed to the pool
+                if self.task_queue._halted:
+                    # The batch was halted after this task was handed to the
+                    # pool; leave it pending for resume_queue()
+                    self.task_queue._next_row = min(self.task_queue._next_row, row)
+                    if row in self.task_queue._canary_open:
+                        self.task_queue._canary_rows.append(row)
+                    return
                 self.task.start_time = time.time()
+                store.mark_started(row, self.task.start_time)
+                self.task_queue._set_status(row, _RUNNING)
+                self.task.status = TaskStatus.RUNNING
                 self.task_queue._active_jobs += 1
+                queue_wait = time.perf_counter() - self.task_queue._batch_started
+            QUEUE_WAIT.observe(queue_wait)
 
             # Emit task started signal
-            self.task_queue.task_started.emit(self.task.id, self.task.profile.input_path.name)
+            if self.task_queue._task_signals:
+                self.task_queue.task_started.emit(self.task.id, self.task.profile.input_path.name)
 
             # Perform conversion using shared service
-            result = self.task_queue._conversion_service.convert(self.task.profile)
+            service = self.task_queue._conversion_service
+            # Only when requested: a progress callback makes pandoc run with --verbose
+            live = {"progress": self._report_progress} if self.task_queue._live_progress else {}
+            archive_writer = self.task_queue._archive_writer
+            deduplicated = 0
+            if archive_writer is not None:
+                arcname = self.task_queue._archive_name(self.task.profile.output_path)
+                aliases = tuple(
+                    self.task_queue._archive_name(path) for path in self.task.duplicate_outputs
+                )
+                result = service.convert_to_archive(
+                    self.task.profile, archive_writer, arcname, aliases, **live
+                )
+                if result.success:
+                    deduplicated = len(aliases)
+            else:
+                result = service.convert(self.task.profile, **live)
+
+                # Reuse the output for byte-identical inputs
+                if result.success and result.output_path and self.task.duplicate_outputs:
+                    deduplicated = self._materialize_duplicates(result.output_path)
+
+            # Transient failures go back to pending and run again after a backoff
+            if not result.success:
+                with QMutexLocker(self.task_queue._mutex):
+                    retrying = self.task_queue._schedule_retry(row, result)
+                if retrying:
+                    return
+            elif self.task_queue._pressure_limit is not None:
+                with QMutexLocker(self.task_queue._mutex):
+                    self.task_queue._relieve_pressure()
 
             # Update task with result
             with QMutexLocker(self.task_queue._mutex):
+                self.task_queue._deduplicated_count += deduplicated
+                # Duplicates fail with their representative, or when not written
+                self.task_queue._duplicates_failed += (
+                    len(self.task.duplicate_outputs) - deduplicated
+                )
+                if result.output_changed is True:
+                    self.task_queue._written_count += 1
+                elif result.output_changed is False:
+                    self.task_queue._unchanged_count += 1
                 self.task.result = result
                 self.task.end_time = time.time()
-                self.task.status = TaskStatus.COMPLETED if result.success else TaskStatus.FAILED
+                store.mark_finished(row, self.task.end_time, result)
                 if not result.success:
                     self.task.error_message = result.error_message
+                    store.set_error(row, result.error_message)
+                self.task_queue._set_status(row, _COMPLETED if result.success else _FAILED)
+                self.task.status = STATUSES_BY_CODE[store.status[row]]
                 self.task_queue._active_jobs -= 1
+                result_sink = self.task_queue._result_sink
+                template = store.template(row)
+                halt = self.task_queue._record_outcome(row, result.success, result.error_message)
+
+            TASKS.labels(*_task_labels(self.task.status, template)).inc()
+            if deduplicated:
+                CACHE_HITS.labels("deduplicated").inc(deduplicated)
+            if result.output_changed is False:
+                CACHE_HITS.labels("unchanged_output").inc()
 
-            # Emit appropriate signals
+            if halt:
+                self.task_queue.batch_halted.emit(*halt)
+
+            # Stream the full result out; the queue keeps only a summary
+            if result_sink is not None:
+                result_sink(self.task.id, result)
+
+            # Emit appropriate signals (failures are always reported)
             if result.success:
-                self.task_queue.task_completed.emit(
-                    self.task.id,
-                    str(result.output_path) if result.output_path else "",
-                    self.task.duration or 0.0,
-                )
+                if self.task_queue._task_signals:
+                    self.task_queue.task_completed.emit(
+                        self.task.id,
+                        str(result.output_path) if result.output_path else "",
+                        self.task.duration or 0.0,
+                    )
             else:
                 self.task_queue.task_failed.emit(
                     self.task.id,
@@ -101,24 +304,93 @@ class ConversionTask(QRunnable):
         except Exception as e:
             # Handle unexpected errors
             with QMutexLocker(self.task_queue._mutex):
-                self.task.status = TaskStatus.FAILED
-                self.task.end_time = time.time()
-                self.task.error_message = f"Task execution error: {str(e)}"
-                self.task_queue._active_jobs -= 1
-
-            self.task_queue.task_failed.emit(
-                self.task.id, self.task.profile.input_path.name, str(e)
-            )
+                # A task that already finished (e.g. a failing result sink) keeps its status
+                was_running = store.status[row] == _RUNNING
+                if was_running:
+                    self.task.end_time = time.time()
+                    self.task.error_message = f"Task execution error: {str(e)}"
+                    store.mark_finished(row, self.task.end_time, None)
+                    store.set_error(row, self.task.error_message)
+                    self.task_queue._set_status(row, _FAILED)
+                    self.task_queue._active_jobs -= 1
+                    self.task_queue._duplicates_failed += len(self.task.duplicate_outputs)
+                    template = store.template(row)
+                    halt = self.task_queue._record_outcome(row, False, self.task.error_message)
+
+            if was_running:
+                TASKS.labels(*_task_labels(TaskStatus.FAILED, template)).inc()
+                self.task_queue.task_failed.emit(
+                    self.task.id, self.task.profile.input_path.name, str(e)
+                )
+                if halt:
+                    self.task_queue.batch_halted.emit(*halt)
 
             logger.error(f"Task {self.task.id} failed with error: {str(e)}")
 
         finally:
-            # Check if queue is finished
+            task_span.set_attribute("status", STATUSES_BY_CODE[store.status[row]].value)
+            task_span.end()
+            # Hand the next pending task to the pool, then check if queue is finished
+            self.task_queue._task_done()
             self.task_queue._check_queue_completion()
 
+    def _report_progress(self, event: PandocProgress) -> None:
+        """Forward a phase change or warning of the running pandoc (worker thread)."""
+        filename = self.task.profile.input_path.name
+        if event.warning:
+            self.task_queue.task_warning.emit(self.task.id, filename, event.message)
+        else:
+            self.task_queue.task_progress.emit(self.task.id, filename, event.percent, event.message)
+
+    def _materialize_duplicates(self, output_path: Path) -> int:
+        """Link or copy the converted output to the outputs of duplicate inputs."""
+        count = 0
+        for duplicate_output in self.task.duplicate_outputs:
+            try:
+                link_or_copy(output_path, duplicate_output)
+                count += 1
+            except OSError as e:
+                logger.warning(f"Could not write duplicate output {duplicate_output}: {e}")
+        return count
+
 
 class TaskQueue(QObject):
-    """Manages batch conversion tasks using QThreadPool."""
+    """
+    Manages batch conversion tasks using QThreadPool.
+
+    Tasks are handed to the pool lazily: at most SUBMIT_WINDOW_FACTOR times the
+    thread count are queued or running at once, and each finishing task submits
+    the next pending one. Pausing stops that refill without touching running
+    jobs, and cancelling only has to mark the pending rows.
+
+    With set_fail_fast(), a batch that is certain to fail stops early: a canary
+    run converts the smallest few inputs before anything else is submitted, and
+    a circuit breaker watches the normalized error signatures of finished
+    tasks. If every canary fails, or the breaker sees the same error on enough
+    consecutive tasks, the queue halts (a pause that also hands back tasks
+    already submitted to the pool) and emits batch_halted with the error.
+
+    With set_retry_policy(), transient failures (timeouts, OOM kills, EAGAIN,
+    locked files) return to pending and run again after an exponential
+    backoff with jitter; load-related ones also halve the queue's concurrency,
+    which then recovers by one job per PRESSURE_RECOVERY_TASKS successes.
+    Deterministic failures are final at once.
+
+    While running, the queue is registered with the app-wide ConversionScheduler,
+    which may lower its concurrency below max_concurrent_jobs (down to zero new
+    tasks) while interactive conversions run.
+
+    Workers only bump counters under the mutex; progress_snapshot is emitted
+    from a timer in the queue's own thread at PROGRESS_INTERVAL_MS, so the GUI
+    receives a bounded number of progress events however fast tasks finish.
+    The per-task started/completed/queue_progress signals can be switched off
+    for large batches; task_failed and queue_finished are always emitted.
+    With set_live_progress(True) pandoc runs with --verbose and each task
+    reports its phases and warnings while it runs.
+
+    Duplicate outputs of a task share its outcome: queue_finished counts each
+    as a task of its own, failed when its representative fails.
+    """
 
     # Signals
     task_started = Signal(str, str)  # task_id, filename
@@ -126,30 +398,111 @@ class TaskQueue(QObject):
     task_failed = Signal(str, str, str)  # task_id, filename, error_message
     queue_progress = Signal(int, int)  # completed_count, total_count
     queue_finished = Signal(int, int, float)  # total_tasks, successful_tasks, total_duration
-
-    def __init__(self, max_concurrent_jobs: int = 4, parent: QObject | None = None) -> None:
+    progress_snapshot = Signal(object)  # ProgressSnapshot
+    batch_halted = Signal(str, str, int)  # reason, error_message, failed_count
+    task_progress = Signal(str, str, int, str)  # task_id, filename, percent, phase message
+    task_warning = Signal(str, str, str)  # task_id, filename, warning
+
+    PROGRESS_INTERVAL_MS = 33  # ~30 snapshots per second
+    THROUGHPUT_WINDOW_SECONDS = 5.0
+    SUBMIT_WINDOW_FACTOR = 2  # Tasks in flight per pool thread
+    CANARY_CANDIDATES = 2000  # Pending inputs sized when picking canary tasks
+    PRESSURE_RECOVERY_TASKS = 10  # Successes per job of concurrency regained
+
+    def __init__(
+        self,
+        max_concurrent_jobs: int = 4,
+        parent: QObject | None = None,
+        task_signals: bool = True,
+        lane: Lane = Lane.BATCH,
+        scheduler: ConversionScheduler | None = None,
+    ) -> None:
         """
         Initialize task queue.
 
         Args:
             max_concurrent_jobs: Maximum number of concurrent tasks
             parent: Parent QObject
+            task_signals: Emit task_started, task_completed and queue_progress
+                for every task
+            lane: Scheduler lane (BATCH or BACKGROUND)
+            scheduler: Scheduler sharing the concurrency budget (global one if None)
         """
         super().__init__(parent)
 
-        self._thread_pool = QThreadPool()
+        self._thread_pool = QThreadPool(self)  # joins running workers when the queue is destroyed
         self._thread_pool.setMaxThreadCount(max_concurrent_jobs)
 
-        self._tasks: dict[str, BatchTask] = {}
-        self._task_order: list[str] = []
+        # Concurrency: our own maximum, capped by the scheduler's limit while registered
+        self._max_jobs = max_concurrent_jobs
+        self._lane = lane
+        self._scheduler = scheduler or get_scheduler()
+        self._scheduled = False
+        self._lane_limit: int | None = None
+
+        self._store = TaskStore()
+        # Per-status counts, kept in step by _set_status so no operation has to
+        # scan every task
+        self._status_counts: list[int] = [0] * len(STATUSES_BY_CODE)
+        self._total_duration = 0.0
+        self._result_sink: ResultSink | None = None
         self._active_jobs = 0
+        self._batch_started = time.perf_counter()
+
+        # Lazy submission: rows [_next_row, _submit_end) are still to be handed out
+        self._next_row = 0
+        self._submit_end = 0
+        self._in_flight = 0
+        self._paused = False
+        self._finish_reported = False
+
+        # Fail-fast: canary rows still to submit / still running, and the breaker
+        self._canary_size = 0
+        self._canary_started = False
+        self._canary_rows: list[int] = []
+        self._canary_open: set[int] = set()
+        self._canary_ran = 0
+        self._canary_failed = 0
+        self._breaker = CircuitBreaker(threshold=0)
+        self._halted = False
+
+        # Retries: attempts per retried row, (due time, row) heap of rows waiting
+        # for their backoff, and a concurrency cap lowered under load
+        self._retry_policy: RetryPolicy | None = None
+        self._attempts: dict[int, int] = {}
+        self._retry_due: list[tuple[float, int]] = []
+        self._retry_rows: set[int] = set()
+        self._retried_count = 0
+        self._pressure_limit: int | None = None
+        self._pressure_successes = 0
+
+        # Duplicate inputs share their representative's outcome and count
+        # towards the batch totals
+        self._duplicate_total = 0
+        self._deduplicated_count = 0
+        self._duplicates_failed = 0
+        self._written_count = 0
+        self._unchanged_count = 0
+        self._archive_writer: ArchiveWriter | None = None
+        self._archive_root: Path | None = None
         self._mutex = QMutex()
 
-        # Shared conversion service to avoid repeated initialization overhead
-        from ..app.conversion_service import ConversionService
+        # Aggregated progress
+        self._task_signals = task_signals
+        self._live_progress = False
+        self._queue_start_time: float | None = None
+        self._rate_samples: deque[tuple[float, int]] = deque()
+        self._last_snapshot: ProgressSnapshot | None = None
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setInterval(self.PROGRESS_INTERVAL_MS)
+        self._progress_timer.timeout.connect(self._emit_progress_snapshot)
+
+        # Process-wide conversion service: pandoc is detected once, not per queue
+        from .service_registry import get_conversion_service
 
-        self._conversion_service = ConversionService()
+        self._conversion_service = get_conversion_service()
 
+        _live_queues.add(self)
         logger.info(f"TaskQueue initialized with {max_concurrent_jobs} max concurrent jobs")
 
     def set_max_concurrent_jobs(self, count: int) -> None:
@@ -160,69 +513,506 @@ class TaskQueue(QObject):
             count: Maximum concurrent jobs (1-16)
         """
         count = max(1, min(16, count))  # Clamp between 1 and 16
-        self._thread_pool.setMaxThreadCount(count)
+        with QMutexLocker(self._mutex):
+            self._max_jobs = count
+            self._apply_concurrency()
+            scheduled = self._scheduled
+        if scheduled:
+            self._scheduler.register(self, self._lane, count)
         logger.info(f"TaskQueue max concurrent jobs set to {count}")
 
-    def add_task(self, task_id: str, profile: ConversionProfile) -> bool:
+    def set_concurrency_limit(self, limit: int) -> None:
+        """
+        Apply the scheduler's concurrency limit.
+
+        Called by the ConversionScheduler; running tasks are never interrupted,
+        a lower limit only delays new ones.
+
+        Args:
+            limit: Maximum concurrent tasks allowed (0 starts nothing new)
+        """
+        with QMutexLocker(self._mutex):
+            self._lane_limit = limit
+            self._apply_concurrency()
+        logger.debug(f"TaskQueue concurrency limit set to {limit}")
+
+    def _concurrency(self) -> int:
+        """Get the number of tasks allowed to run at once (caller holds the mutex)."""
+        limit = self._max_jobs
+        if self._lane_limit is not None:
+            limit = min(limit, self._lane_limit)
+        if self._pressure_limit is not None:
+            limit = min(limit, self._pressure_limit)
+        return limit
+
+    def _apply_concurrency(self) -> None:
+        """Resize the pool to the current concurrency and refill (caller holds the mutex)."""
+        # A QThreadPool always keeps at least one thread; a zero limit is
+        # enforced by _refill() submitting nothing
+        self._thread_pool.setMaxThreadCount(max(1, self._concurrency()))
+        self._refill()
+
+    def _release_lane(self) -> None:
+        """Give the queue's share of the budget back to the scheduler."""
+        with QMutexLocker(self._mutex):
+            if not self._scheduled:
+                return
+            self._scheduled = False
+            self._lane_limit = None
+        self._scheduler.unregister(self)
+
+    def _set_status(self, row: int, code: int) -> None:
+        """Move a task to a new status code, updating counts (caller holds the mutex)."""
+        old_code = self._store.status[row]
+        if old_code == code:
+            return
+
+        self._status_counts[old_code] -= 1
+        self._status_counts[code] += 1
+        self._store.status[row] = code
+
+        if code in (_COMPLETED, _FAILED):
+            self._total_duration += self._store.duration(row) or 0.0
+
+    def _task_view(self, row: int) -> BatchTask:
+        """Build a BatchTask view of a stored task (caller holds the mutex)."""
+        store = self._store
+        status = STATUSES_BY_CODE[store.status[row]]
+        return BatchTask(
+            id=store.task_id(row),
+            profile=store.profile(row),
+            status=status,
+            result=store.result(row, status == TaskStatus.COMPLETED),
+            start_time=store.start_time(row),
+            end_time=store.end_time(row),
+            error_message=store.error(row),
+            duplicate_outputs=store.duplicate_outputs(row),
+            position=row,
+        )
+
+    def set_result_sink(self, sink: ResultSink | None) -> None:
+        """
+        Receive each task's full ConversionResult as it finishes.
+
+        The queue itself keeps only a compact summary per task (status, timing,
+        error message). A sink can write full results, such as pandoc commands,
+        to a report. It is called from worker threads.
+
+        Args:
+            sink: Callable taking (task_id, result), or None to stop streaming
+        """
+        with QMutexLocker(self._mutex):
+            self._result_sink = sink
+
+    def set_task_signals(self, enabled: bool) -> None:
+        """
+        Enable or disable per-task started/completed/progress signals.
+
+        Args:
+            enabled: Emit one signal per task event (disable for large batches and
+                rely on progress_snapshot instead)
+        """
+        with QMutexLocker(self._mutex):
+            self._task_signals = enabled
+
+    def set_live_progress(self, enabled: bool) -> None:
+        """
+        Enable or disable task_progress and task_warning while tasks run.
+
+        Args:
+            enabled: Run pandoc with --verbose and report its phases and
+                warnings as they happen
+        """
+        with QMutexLocker(self._mutex):
+            self._live_progress = enabled
+
+    def set_archive_output(
+        self, writer: ArchiveWriter | None, output_root: Path | None = None
+    ) -> None:
+        """
+        Send task outputs into an archive instead of the filesystem.
+
+        Each task's output path, relative to output_root, becomes its member name.
+        The caller owns the writer and closes it after queue_finished.
+
+        Args:
+            writer: Archive writer, or None to write files again
+            output_root: Directory that output paths are relative to
+        """
+        with QMutexLocker(self._mutex):
+            self._archive_writer = writer
+            self._archive_root = output_root
+
+    def set_fail_fast(self, canary_size: int, failure_threshold: int) -> None:
+        """
+        Stop batches that fail the same way on every task.
+
+        Args:
+            canary_size: Number of smallest inputs converted before the rest of
+                the batch; the queue halts if all of them fail (0 disables)
+            failure_threshold: Consecutive failures with the same error
+                signature that halt the queue (0 disables)
+        """
+        with QMutexLocker(self._mutex):
+            self._canary_size = max(0, canary_size)
+            self._breaker = CircuitBreaker(threshold=max(0, failure_threshold))
+
+    @property
+    def is_halted(self) -> bool:
+        """Check whether the canary run or the circuit breaker halted the queue."""
+        with QMutexLocker(self._mutex):
+            return self._halted
+
+    def _pick_canary(self) -> None:
+        """Choose the smallest pending inputs as canary tasks (caller holds the mutex)."""
+        self._canary_started = True
+        pending = self._store.rows_with_status(_PENDING)
+        if len(pending) <= self._canary_size:
+            return  # the whole batch is no bigger than the canary run
+
+        # Size an evenly spread sample so huge batches do not stall start_queue()
+        stride = max(1, len(pending) // self.CANARY_CANDIDATES)
+        candidates = pending[::stride]
+
+        def size(row: int) -> float:
+            try:
+                return os.stat(self._store.input_path(row)).st_size
+            except OSError:
+                return float("inf")  # archive members and missing files go last
+
+        self._canary_rows = heapq.nsmallest(self._canary_size, candidates, key=size)
+        self._canary_open = set(self._canary_rows)
+        self._canary_rows.reverse()  # submitted by pop(), smallest first
+        self._canary_ran = 0
+        self._canary_failed = 0
+        logger.info(f"Canary run: {len(self._canary_rows)} tasks before the rest of the batch")
+
+    def _record_outcome(
+        self, row: int, success: bool, error_message: str | None
+    ) -> tuple[str, str, int] | None:
+        """
+        Feed a finished task to the canary run and circuit breaker (caller holds the mutex).
+
+        Returns:
+            batch_halted arguments if the queue has just halted, otherwise None
+        """
+        halt = None
+        if self._breaker.record(success, error_message):
+            halt = ("circuit_breaker", self._breaker.error_message, self._breaker.failures)
+
+        if row in self._canary_open:
+            self._canary_open.discard(row)
+            self._canary_ran += 1
+            if not success:
+                self._canary_failed += 1
+            if not self._canary_open:
+                # Rows dropped from the canary run before starting don't count
+                if self._canary_failed and self._canary_failed == self._canary_ran:
+                    halt = halt or ("canary", error_message or "Unknown error", self._canary_failed)
+                else:
+                    logger.info(f"Canary run passed ({self._canary_failed} failed)")
+
+        if halt and not self._halted:
+            self._halted = self._paused = True
+            logger.warning(f"Batch halted by {halt[0]} after {halt[2]} failures: {halt[1]}")
+            return halt
+        return None
+
+    def set_retry_policy(self, policy: RetryPolicy | None) -> None:
+        """
+        Retry transient failures.
+
+        Args:
+            policy: Retry policy, or None to record every failure at once
+        """
+        with QMutexLocker(self._mutex):
+            self._retry_policy = policy
+
+    def _schedule_retry(self, row: int, result: ConversionResult) -> bool:
+        """
+        Send a failed task back to pending if a retry may succeed (caller holds the mutex).
+
+        Returns:
+            True if the task will run again
+        """
+        policy = self._retry_policy
+        if policy is None or self._halted:
+            return False
+        failure = classify_failure(result)
+        attempts = self._attempts.get(row, 1)
+        if not policy.should_retry(failure, attempts):
+            return False
+
+        delay = policy.delay(attempts)
+        self._attempts[row] = attempts + 1
+        heapq.heappush(self._retry_due, (time.monotonic() + delay, row))
+        self._retry_rows.add(row)
+        self._retried_count += 1
+        self._set_status(row, _PENDING)
+        self._active_jobs -= 1
+        logger.warning(
+            f"Task {self._store.task_id(row)} failed ({failure.category}), retrying in "
+            f"{delay:.1f}s (attempt {attempts + 1}/{policy.max_attempts}): {result.error_message}"
+        )
+
+        concurrency = self._concurrency()
+        if failure.reduce_concurrency and policy.reduce_concurrency and concurrency > 1:
+            self._pressure_limit = concurrency // 2
+            self._pressure_successes = 0
+            logger.warning(
+                f"Concurrency lowered to {self._pressure_limit} after {failure.category}"
+            )
+            self._apply_concurrency()
+        return True
+
+    def _relieve_pressure(self) -> None:
+        """Count a success towards regaining concurrency lost under load (caller holds the mutex)."""
+        if self._pressure_limit is None:
+            return
+        self._pressure_successes += 1
+        if self._pressure_successes < self.PRESSURE_RECOVERY_TASKS:
+            return
+        self._pressure_successes = 0
+        self._pressure_limit += 1
+        if self._pressure_limit >= self._max_jobs:
+            self._pressure_limit = None
+        self._apply_concurrency()
+
+    def _archive_name(self, output_path: Path | None) -> str:
+        """Get the archive member name for an output path."""
+        if output_path is None:
+            return "output"
+        if self._archive_root is not None:
+            try:
+                return output_path.relative_to(self._archive_root).as_posix()
+            except ValueError:
+                pass
+        return output_path.name
+
+    def add_task(
+        self,
+        task_id: str,
+        profile: ConversionProfile,
+        duplicate_outputs: list[Path] | None = None,
+    ) -> bool:
         """
         Add a task to the queue.
 
         Args:
             task_id: Unique identifier for the task
             profile: Conversion profile
+            duplicate_outputs: Output paths of byte-identical inputs that receive
+                a hardlink or copy of this task's output instead of their own run
 
         Returns:
             True if task was added, False if task_id already exists
         """
         with QMutexLocker(self._mutex):
-            if task_id in self._tasks:
+            if task_id in self._store:
                 logger.warning(f"Task {task_id} already exists in queue")
                 return False
 
-            task = BatchTask(id=task_id, profile=profile)
-            self._tasks[task_id] = task
-            self._task_order.append(task_id)
+            self._store.add(task_id, profile, _PENDING, duplicate_outputs)
+            self._status_counts[_PENDING] += 1
+            self._duplicate_total += len(duplicate_outputs or ())
 
             logger.debug(f"Task {task_id} added to queue: {profile.input_path.name}")
             return True
 
-    def start_queue(self) -> None:
-        """Start processing all tasks in the queue."""
+    def add_plan(
+        self,
+        plan: BatchPlan,
+        duplicate_outputs: dict[int, list[Path]] | None = None,
+        id_prefix: str = "batch",
+    ) -> int:
+        """
+        Add every task of a batch plan.
+
+        Task ids are "{id_prefix}_{row}_{file name}", numbered after the tasks
+        already queued.
+
+        Args:
+            plan: Batch plan from plan_batch()
+            duplicate_outputs: Plan row -> output paths of byte-identical inputs
+            id_prefix: Prefix of the generated task ids
+
+        Returns:
+            Number of tasks added
+
+        Raises:
+            ValueError: If a generated task id is already queued
+        """
         with QMutexLocker(self._mutex):
-            pending_tasks = [
-                task for task in self._tasks.values() if task.status == TaskStatus.PENDING
-            ]
+            first = len(self._store)
+            task_ids = [f"{id_prefix}_{first + i:04d}_{name}" for i, name in enumerate(plan.names)]
+            clashes = [task_id for task_id in task_ids if task_id in self._store]
+            if clashes:
+                raise ValueError(f"Tasks already in queue: {clashes[:3]}")
+
+            self._store.add_plan(plan, task_ids, _PENDING, duplicate_outputs)
+            self._status_counts[_PENDING] += len(task_ids)
+            if duplicate_outputs:
+                self._duplicate_total += sum(len(outputs) for outputs in duplicate_outputs.values())
 
-            if not pending_tasks:
+        logger.info(f"Added {len(task_ids)} planned tasks to queue")
+        return len(task_ids)
+
+    @traced("start_queue", "queue")
+    def start_queue(self) -> None:
+        """Start processing all pending tasks in the queue."""
+        with QMutexLocker(self._mutex):
+            pending_count = self._status_counts[_PENDING]
+            if not pending_count:
                 logger.warning("No pending tasks to start")
                 return
+            self._scheduled = True
+            max_jobs = self._max_jobs
 
-            logger.info(f"Starting queue with {len(pending_tasks)} tasks")
+        # Registering applies our share of the budget via set_concurrency_limit()
+        self._scheduler.register(self, self._lane, max_jobs)
 
-            # Submit all pending tasks to thread pool
-            for task in pending_tasks:
-                runnable_task = ConversionTask(task, self)
-                self._thread_pool.start(runnable_task)
+        # Workers allocate while refilling, so a cyclic GC pass may run on a
+        # worker thread; collect here first so Qt objects stuck in cycles are
+        # destroyed on this thread rather than there. Outside the mutex, so
+        # running workers are not blocked behind the collection.
+        gc.collect()
 
-    def cancel_queue(self) -> None:
-        """Cancel all pending and running tasks."""
         with QMutexLocker(self._mutex):
-            # Mark pending tasks as cancelled
-            for task in self._tasks.values():
-                if task.status == TaskStatus.PENDING:
-                    task.status = TaskStatus.CANCELLED
+            logger.info(f"Starting queue with {pending_count} tasks")
+            if self._queue_start_time is None:
+                self._queue_start_time = time.time()
+            self._batch_started = time.perf_counter()
+
+            self._finish_reported = False
+            if self._canary_size and not self._canary_started:
+                self._pick_canary()
+
+            # Tasks added from now on wait for the next start_queue() call
+            self._next_row = min(self._next_row, self._store.rows_with_status(_PENDING)[0])
+            self._submit_end = len(self._store)
+            self._refill()
+
+        self._progress_timer.start()
+
+    def _refill(self) -> None:
+        """Submit pending tasks until the in-flight window is full (caller holds the mutex)."""
+        if self._paused:
+            return
+
+        window = self.SUBMIT_WINDOW_FACTOR * self._concurrency()
+        status = self._store.status
+        retry_due = self._retry_due
+        if retry_due:
+            now = time.monotonic()
+            while self._in_flight < window and retry_due and retry_due[0][0] <= now:
+                row = heapq.heappop(retry_due)[1]
+                self._retry_rows.discard(row)
+                if status[row] == _PENDING:
+                    self._in_flight += 1
+                    self._thread_pool.start(ConversionTask(self._task_view(row), self))
+        if self._canary_open:
+            # Nothing else starts until the canary tasks have finished
+            while self._in_flight < window and self._canary_rows:
+                row = self._canary_rows.pop()
+                if status[row] == _PENDING:
+                    self._in_flight += 1
+                    self._thread_pool.start(ConversionTask(self._task_view(row), self))
+                else:
+                    self._canary_open.discard(row)
+            return
+        while self._in_flight < window and self._next_row < self._submit_end:
+            row = self._next_row
+            self._next_row += 1
+            if status[row] != _PENDING or (self._retry_rows and row in self._retry_rows):
+                continue
+            self._in_flight += 1
+            self._thread_pool.start(ConversionTask(self._task_view(row), self))
+
+    def _task_done(self) -> None:
+        """Release a task's in-flight slot and submit the next one."""
+        with QMutexLocker(self._mutex):
+            self._in_flight -= 1
+            self._refill()
 
-            # Clear the thread pool (running tasks will continue but won't report back)
-            self._thread_pool.clear()
+    def pause_queue(self) -> None:
+        """Stop submitting new tasks; running and already submitted tasks finish normally."""
+        with QMutexLocker(self._mutex):
+            if not self._paused:
+                self._paused = True
+                logger.info("Task queue paused")
+
+    def resume_queue(self) -> None:
+        """Resume submitting tasks after pause_queue() or a halt."""
+        with QMutexLocker(self._mutex):
+            if self._paused:
+                self._paused = False
+                self._halted = False
+                self._breaker.reset()
+                logger.info("Task queue resumed")
+                self._refill()
+
+    @property
+    def is_paused(self) -> bool:
+        """Check whether task submission is paused."""
+        with QMutexLocker(self._mutex):
+            return self._paused
+
+    def cancel_queue(self) -> None:
+        """Cancel all pending tasks; running tasks finish normally."""
+        with QMutexLocker(self._mutex):
+            # Mark pending tasks as cancelled; the few already submitted to the
+            # pool see the status and return without converting
+            cancelled: Counter[tuple[str, str, str]] = Counter()
+            for row in self._store.rows_with_status(_PENDING):
+                self._set_status(row, _CANCELLED)
+                cancelled[_task_labels(TaskStatus.CANCELLED, self._store.template(row))] += 1
+            self._next_row = self._submit_end
+            self._paused = self._halted = False
+            self._canary_rows.clear()
+            self._canary_open.clear()
+            self._retry_due.clear()
+            self._retry_rows.clear()
+            idle = self._in_flight == 0
 
             logger.info("Task queue cancelled")
 
+        for labels, count in cancelled.items():
+            TASKS.labels(*labels).inc(count)
+
+        # Otherwise the last in-flight task reports completion and releases it
+        if idle:
+            self._check_queue_completion()
+            self._release_lane()
+
     def clear_queue(self) -> None:
         """Clear all tasks from the queue."""
+        self._release_lane()
         with QMutexLocker(self._mutex):
-            self._tasks.clear()
-            self._task_order.clear()
+            self._store.clear()
             self._active_jobs = 0
+            self._next_row = 0
+            self._submit_end = 0
+            self._paused = self._halted = False
+            self._finish_reported = False
+            self._canary_started = False
+            self._canary_rows.clear()
+            self._canary_open.clear()
+            self._breaker.reset()
+            self._attempts.clear()
+            self._retry_due.clear()
+            self._retry_rows.clear()
+            self._retried_count = 0
+            self._pressure_limit = None
+            self._duplicate_total = 0
+            self._deduplicated_count = 0
+            self._duplicates_failed = 0
+            self._written_count = 0
+            self._unchanged_count = 0
+            self._status_counts = [0] * len(STATUSES_BY_CODE)
+            self._total_duration = 0.0
+            self._queue_start_time = None
+            self._rate_samples.clear()
+            self._last_snapshot = None
 
             logger.info("Task queue cleared")
 
@@ -237,8 +1027,8 @@ class TaskQueue(QObject):
             TaskStatus or None if task doesn't exist
         """
         with QMutexLocker(self._mutex):
-            task = self._tasks.get(task_id)
-            return task.status if task else None
+            row = self._store.row(task_id)
+            return STATUSES_BY_CODE[self._store.status[row]] if row is not None else None
 
     def get_task_result(self, task_id: str) -> ConversionResult | None:
         """
@@ -248,11 +1038,15 @@ class TaskQueue(QObject):
             task_id: Task identifier
 
         Returns:
-            ConversionResult or None if task doesn't exist or hasn't completed
+            ConversionResult or None if task doesn't exist or hasn't completed.
+            It is rebuilt from the compact store, so command is not set; use
+            set_result_sink() to capture full results.
         """
         with QMutexLocker(self._mutex):
-            task = self._tasks.get(task_id)
-            return task.result if task else None
+            row = self._store.row(task_id)
+            if row is None:
+                return None
+            return self._store.result(row, self._store.status[row] == _COMPLETED)
 
     def get_queue_summary(self) -> dict[str, int]:
         """
@@ -262,16 +1056,87 @@ class TaskQueue(QObject):
             Dictionary with counts for each status
         """
         with QMutexLocker(self._mutex):
-            summary = {status.value: 0 for status in TaskStatus}
-
-            for task in self._tasks.values():
-                summary[task.status.value] += 1
-
-            summary["total"] = len(self._tasks)
+            summary = {
+                status.value: count
+                for status, count in zip(STATUSES_BY_CODE, self._status_counts, strict=True)
+            }
+            summary["total"] = len(self._store)
             summary["active_jobs"] = self._active_jobs
+            summary["deduplicated"] = self._deduplicated_count
+            summary["duplicates_failed"] = self._duplicates_failed
+            summary["written"] = self._written_count
+            summary["unchanged"] = self._unchanged_count
+            summary["retried"] = self._retried_count
 
             return summary
 
+    def get_resource_summary(self, top: int = 5) -> ResourceSummary:
+        """
+        Get resource usage totals of the finished tasks.
+
+        Args:
+            top: Number of most CPU-expensive tasks to list
+
+        Returns:
+            ResourceSummary over all tasks whose pandoc run was measured
+        """
+        with QMutexLocker(self._mutex):
+            return self._store.resource_summary(top)
+
+    def export_report(self, path: Path) -> int:
+        """
+        Write a per-task CSV report with status, timing and resource usage.
+
+        Args:
+            path: CSV file to write
+
+        Returns:
+            Number of task rows written
+        """
+        # Copy the rows under the mutex, write the file without it
+        with QMutexLocker(self._mutex):
+            store = self._store
+            rows = [
+                (
+                    store.task_id(row),
+                    store.input_path(row),
+                    store.output_path(row),
+                    STATUSES_BY_CODE[store.status[row]].value,
+                    store.resources(row),
+                    store.error(row),
+                )
+                for row in range(len(store))
+            ]
+
+        def cell(value: object) -> object:
+            return "" if value is None else value
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORT_COLUMNS)
+            for task_id, input_path, output_path, status, usage, error in rows:
+                measured = (
+                    (
+                        f"{usage.wall_seconds:.6f}",
+                        cell(usage.user_cpu_seconds),
+                        cell(usage.system_cpu_seconds),
+                        cell(usage.peak_rss_bytes),
+                        cell(usage.read_bytes),
+                        cell(usage.write_bytes),
+                        cell(usage.input_bytes),
+                        cell(usage.output_bytes),
+                    )
+                    if usage is not None
+                    else ("",) * 8
+                )
+                writer.writerow(
+                    (task_id, input_path, cell(output_path), status, *measured, cell(error))
+                )
+
+        logger.info(f"Batch report written to {path} ({len(rows)} tasks)")
+        return len(rows)
+
     def get_completed_tasks(self) -> list[BatchTask]:
         """
         Get list of completed tasks.
@@ -280,11 +1145,7 @@ class TaskQueue(QObject):
             List of completed BatchTask objects
         """
         with QMutexLocker(self._mutex):
-            return [
-                task
-                for task in self._tasks.values()
-                if task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]
-            ]
+            return self._tasks_with_status(_COMPLETED, _FAILED)
 
     def get_successful_tasks(self) -> list[BatchTask]:
         """
@@ -294,7 +1155,7 @@ class TaskQueue(QObject):
             List of successful BatchTask objects
         """
         with QMutexLocker(self._mutex):
-            return [task for task in self._tasks.values() if task.status == TaskStatus.COMPLETED]
+            return self._tasks_with_status(_COMPLETED)
 
     def get_failed_tasks(self) -> list[BatchTask]:
         """
@@ -304,49 +1165,120 @@ class TaskQueue(QObject):
             List of failed BatchTask objects
         """
         with QMutexLocker(self._mutex):
-            return [task for task in self._tasks.values() if task.status == TaskStatus.FAILED]
+            return self._tasks_with_status(_FAILED)
+
+    def _tasks_with_status(self, *codes: int) -> list[BatchTask]:
+        """Get task views with the given status codes in queue order (caller holds the mutex)."""
+        return [self._task_view(row) for row in self._store.rows_with_status(*codes)]
 
     def _check_queue_completion(self) -> None:
         """Check if queue processing is complete and emit signal if so."""
+        finished = False
         with QMutexLocker(self._mutex):
             # Check if all tasks are completed or failed
-            pending_running = sum(
-                1
-                for task in self._tasks.values()
-                if task.status in [TaskStatus.PENDING, TaskStatus.RUNNING]
-            )
+            counts = self._status_counts
+            pending_running = counts[_PENDING] + counts[_RUNNING]
 
-            if pending_running == 0 and self._tasks:
-                # Queue is finished
-                total_tasks = len(self._tasks)
-                successful_tasks = sum(
-                    1 for task in self._tasks.values() if task.status == TaskStatus.COMPLETED
-                )
+            if pending_running == 0 and len(self._store):
+                if self._finish_reported:
+                    return  # a cancelled task returning after the queue finished
+                self._finish_reported = finished = True
 
-                # Calculate total duration
-                total_duration = sum(task.duration or 0.0 for task in self._tasks.values())
+                # Queue is finished; duplicate inputs count like their own tasks
+                total_tasks = len(self._store) + self._duplicate_total
+                successful_tasks = counts[_COMPLETED] + self._deduplicated_count
+                total_duration = self._total_duration
 
+                self.progress_snapshot.emit(self._make_snapshot())
                 self.queue_finished.emit(total_tasks, successful_tasks, total_duration)
                 logger.info(
                     f"Queue finished: {successful_tasks}/{total_tasks} successful, "
                     f"total duration: {total_duration:.2f}s"
                 )
-            else:
+            elif self._task_signals:
                 # Emit progress update
-                completed = sum(
-                    1
-                    for task in self._tasks.values()
-                    if task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]
-                )
-                total = len(self._tasks)
+                completed = counts[_COMPLETED] + counts[_FAILED]
+                total = len(self._store)
                 self.queue_progress.emit(completed, total)
 
+        if finished:
+            self._release_lane()
+
+    def get_progress_snapshot(self) -> ProgressSnapshot:
+        """
+        Get current aggregated progress.
+
+        Returns:
+            ProgressSnapshot built from counters, without touching individual tasks
+        """
+        with QMutexLocker(self._mutex):
+            return self._make_snapshot()
+
+    def _make_snapshot(self) -> ProgressSnapshot:
+        """Build a progress snapshot (caller holds the mutex)."""
+        now = time.time()
+        counts = self._status_counts
+        completed = counts[_COMPLETED]
+        failed = counts[_FAILED]
+        cancelled = counts[_CANCELLED]
+        finished = completed + failed
+        total = len(self._store)
+        elapsed = now - self._queue_start_time if self._queue_start_time else 0.0
+
+        # Throughput over a sliding window so the ETA follows rate changes
+        samples = self._rate_samples
+        samples.append((now, finished))
+        while len(samples) > 2 and now - samples[0][0] > self.THROUGHPUT_WINDOW_SECONDS:
+            samples.popleft()
+        window_seconds = now - samples[0][0]
+        if window_seconds > 0 and finished > samples[0][1]:
+            throughput = (finished - samples[0][1]) / window_seconds
+        else:
+            throughput = finished / elapsed if elapsed > 0 else 0.0
+
+        remaining = total - finished - cancelled
+        eta = remaining / throughput if throughput > 0 else (0.0 if remaining == 0 else None)
+
+        return ProgressSnapshot(
+            total=total,
+            completed=completed,
+            failed=failed,
+            running=self._active_jobs,
+            elapsed_seconds=elapsed,
+            throughput=throughput,
+            eta_seconds=eta,
+            cancelled=cancelled,
+        )
+
+    def _emit_progress_snapshot(self) -> None:
+        """Timer slot: emit a snapshot if anything changed since the last one."""
+        with QMutexLocker(self._mutex):
+            if self._retry_due:
+                self._refill()  # submit retries whose backoff has run out
+            snapshot = self._make_snapshot()
+            previous = self._last_snapshot
+            self._last_snapshot = snapshot
+
+        if snapshot.done:
+            self._progress_timer.stop()
+            return  # the final snapshot is emitted with queue_finished
+        if previous is None or (
+            (snapshot.finished, snapshot.running) != (previous.finished, previous.running)
+        ):
+            self.progress_snapshot.emit(snapshot)
+
     @property
     def active_jobs_count(self) -> int:
         """Get current number of active jobs."""
         with QMutexLocker(self._mutex):
             return self._active_jobs
 
+    @property
+    def deduplicated_count(self) -> int:
+        """Get number of outputs produced by reusing a duplicate input's conversion."""
+        with QMutexLocker(self._mutex):
+            return self._deduplicated_count
+
     @property
     def max_thread_count(self) -> int:
         """Get maximum thread count."""
@@ -356,10 +1288,47 @@ class TaskQueue(QObject):
         """
         Wait for all tasks to complete.
 
+        While the queue is paused this returns once the submitted tasks have
+        finished, even though pending tasks remain. Retries waiting for their
+        backoff are submitted from here when no event loop runs.
+
         Args:
-            timeout_ms: Timeout in milliseconds
+            timeout_ms: Timeout in milliseconds (negative waits forever, as in Qt)
 
         Returns:
             True if all tasks completed within timeout
         """
-        return self._thread_pool.waitForDone(timeout_ms)
+        unbounded = timeout_ms < 0
+        deadline = time.monotonic() + max(0, timeout_ms) / 1000
+        while True:
+            if unbounded:
+                remaining_ms = -1
+            else:
+                remaining_ms = max(0, int((deadline - time.monotonic()) * 1000))
+            if not self._thread_pool.waitForDone(remaining_ms):
+                return False
+            with QMutexLocker(self._mutex):
+                if not self._retry_due or self._paused:
+                    return True
+                due = self._retry_due[0][0]
+                if not unbounded and due > deadline:
+                    return False
+            time.sleep(max(0.0, due - time.monotonic()))
+            with QMutexLocker(self._mutex):
+                self._refill()
+
+
+# Queues alive in this process; gauges are summed over them when scraped
+_live_queues: "weakref.WeakSet[TaskQueue]" = weakref.WeakSet()
+
+
+def _sum_over_queues(value: Callable[[TaskQueue], int]) -> int:
+    """Sum a per-queue value without taking queue locks (exact enough for a gauge)."""
+    return sum(value(queue) for queue in list(_live_queues))
+
+
+QUEUE_DEPTH.set_function(lambda: _sum_over_queues(lambda q: q._status_counts[_PENDING]))
+ACTIVE_JOBS.set_function(lambda: _sum_over_queues(lambda q: q._active_jobs))
+CONCURRENCY_LIMIT.set_function(
+    lambda: _sum_over_queues(lambda q: q._concurrency() if q._scheduled else 0)
+)
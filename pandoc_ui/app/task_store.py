@@ -0,0 +1,461 @@
+"""
+Compact column storage for batch tasks.
+"""
+
+import heapq
+import math
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ..models import (
+    ConversionProfile,
+    ConversionResult,
+    InputFormat,
+    OutputFormat,
+    ResourceUsage,
+)
+
+if TYPE_CHECKING:
+    from .batch_planner import BatchPlan
+
+NO_TIME = math.nan
+NO_DIR = -1
+NO_COUNT = -1
+
+# output_changed column values
+CHANGED_UNKNOWN = -1
+CHANGED_NO = 0
+CHANGED_YES = 1
+
+
+@dataclass(frozen=True, slots=True)
+class ProfileTemplate:
+    """Profile settings shared by many tasks of a batch."""
+
+    input_format: InputFormat | None
+    output_format: OutputFormat
+    options: dict[str, Any]  # Shared between tasks; treat as read-only
+    archive_path: Path | None
+
+
+@dataclass
+class ResourceSummary:
+    """Resource usage totals of the measured tasks in a batch."""
+
+    measured_tasks: int = 0
+    wall_seconds: float = 0.0  # Sum over tasks, not elapsed batch time
+    user_cpu_seconds: float = 0.0
+    system_cpu_seconds: float = 0.0
+    peak_rss_bytes: int = 0  # Largest single task
+    read_bytes: int = 0
+    write_bytes: int = 0
+    input_bytes: int = 0
+    output_bytes: int = 0
+    most_expensive: list[tuple[str, float]] = field(default_factory=list)  # (task_id, CPU s)
+
+    @property
+    def cpu_seconds(self) -> float:
+        """Get total user plus system CPU time."""
+        return self.user_cpu_seconds + self.system_cpu_seconds
+
+
+class TaskStore:
+    """
+    Struct-of-arrays store for batch tasks.
+
+    Each task is a row index. Directories are interned in a table and file names
+    kept as strings, so a task costs a few array slots instead of a dataclass,
+    two Path objects and an options dict. Profiles sharing formats, options and
+    archive reference one ProfileTemplate. Results are not kept: a finished row
+    records its status, timing, output_changed flag, resource usage and, for
+    failures, the error message, which is enough to rebuild a ConversionResult
+    on request.
+
+    Status values are opaque small integers owned by the caller. The store is
+    not thread-safe; TaskQueue guards it with its mutex.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty store."""
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+
+        self._dirs: list[Path] = []
+        self._dir_rows: dict[Path, int] = {}
+        self._templates: list[ProfileTemplate] = []
+        self._template_rows: dict[tuple, int] = {}
+
+        self._input_dir = array("i")
+        self._input_name: list[str] = []
+        self._output_dir = array("i")
+        self._output_name: list[str | None] = []  # None: input stem + output suffix
+        self._template = array("i")
+
+        self.status = array("b")
+        self._start_time = array("d")
+        self._end_time = array("d")
+        self._output_changed = array("b")
+
+        # Resource usage of the pandoc run (NaN / NO_COUNT when not measured)
+        self._wall = array("d")
+        self._user_cpu = array("d")
+        self._system_cpu = array("d")
+        self._counts = {
+            name: array("q")
+            for name in (
+                "peak_rss_bytes",
+                "read_bytes",
+                "write_bytes",
+                "input_bytes",
+                "output_bytes",
+            )
+        }
+
+        # Sparse columns
+        self._errors: dict[int, str] = {}
+        self._duplicates: dict[int, list[Path]] = {}
+        self._result_paths: dict[int, Path | None] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._rows
+
+    def row(self, task_id: str) -> int | None:
+        """Get the row of a task id."""
+        return self._rows.get(task_id)
+
+    def task_id(self, row: int) -> str:
+        """Get the id of a row."""
+        return self._ids[row]
+
+    def add(
+        self,
+        task_id: str,
+        profile: ConversionProfile,
+        status: int,
+        duplicate_outputs: list[Path] | None = None,
+    ) -> int:
+        """
+        Append a task.
+
+        Args:
+            task_id: Unique task identifier
+            profile: Conversion profile to store
+            status: Initial status code
+            duplicate_outputs: Outputs that receive a copy of this task's output
+
+        Returns:
+            Row index of the new task
+        """
+        row = len(self._ids)
+        self._ids.append(task_id)
+        self._rows[task_id] = row
+
+        input_path = profile.input_path
+        self._input_dir.append(self._intern_dir(input_path.parent))
+        self._input_name.append(input_path.name)
+
+        output_path = profile.output_path
+        if output_path is None:
+            self._output_dir.append(NO_DIR)
+            self._output_name.append(None)
+        else:
+            self._output_dir.append(self._intern_dir(output_path.parent))
+            derived = f"{input_path.stem}.{profile.output_format.value}"
+            self._output_name.append(None if output_path.name == derived else output_path.name)
+
+        self._template.append(self._intern_template(profile))
+        self.status.append(status)
+        self._start_time.append(NO_TIME)
+        self._end_time.append(NO_TIME)
+        self._output_changed.append(CHANGED_UNKNOWN)
+        self._wall.append(NO_TIME)
+        self._user_cpu.append(NO_TIME)
+        self._system_cpu.append(NO_TIME)
+        for column in self._counts.values():
+            column.append(NO_COUNT)
+        if duplicate_outputs:
+            self._duplicates[row] = list(duplicate_outputs)
+        return row
+
+    def _intern_dir(self, directory: Path) -> int:
+        row = self._dir_rows.get(directory)
+        if row is None:
+            row = self._dir_rows[directory] = len(self._dirs)
+            self._dirs.append(directory)
+        return row
+
+    def add_plan(
+        self,
+        plan: "BatchPlan",
+        task_ids: list[str],
+        status: int,
+        duplicate_outputs: dict[int, list[Path]] | None = None,
+    ) -> int:
+        """
+        Append every row of a batch plan at once.
+
+        The plan already holds inputs as interned directories and file names,
+        so its columns are copied without building a profile per task.
+
+        Args:
+            plan: Batch plan to append
+            task_ids: Unique identifier of each plan row
+            status: Initial status code of every row
+            duplicate_outputs: Plan row -> outputs that receive a copy of its output
+
+        Returns:
+            Row index of the first appended task
+        """
+        first = len(self._ids)
+        count = len(plan)
+        self._ids.extend(task_ids)
+        self._rows.update(zip(task_ids, range(first, first + count), strict=True))
+
+        dir_map = [self._intern_dir(directory) for directory in plan.directories]
+        self._input_dir.extend(array("i", [dir_map[row] for row in plan.dir_rows]))
+        self._input_name.extend(plan.names)
+        self._output_dir.extend(array("i", [self._intern_dir(plan.output_dir)]) * count)
+        self._output_name.extend([None] * count)  # Derived from the input name
+
+        template_map = [
+            self._intern_template(plan.template(index)) for index in range(len(plan.commands))
+        ]
+        self._template.extend(array("i", [template_map[row] for row in plan.template_rows]))
+
+        self.status.extend(array("b", [status]) * count)
+        no_time = array("d", [NO_TIME]) * count
+        for column in (
+            self._start_time,
+            self._end_time,
+            self._wall,
+            self._user_cpu,
+            self._system_cpu,
+        ):
+            column.extend(no_time)
+        self._output_changed.extend(array("b", [CHANGED_UNKNOWN]) * count)
+        no_count = array("q", [NO_COUNT]) * count
+        for column in self._counts.values():
+            column.extend(no_count)
+        if duplicate_outputs:
+            for row, outputs in duplicate_outputs.items():
+                self._duplicates[first + row] = list(outputs)
+        return first
+
+    def _intern_template(self, profile: ConversionProfile) -> int:
+        options = profile.options or {}
+        key = (
+            profile.input_format,
+            profile.output_format,
+            repr(sorted(options.items())),
+            profile.archive_path,
+        )
+        row = self._template_rows.get(key)
+        if row is None:
+            row = self._template_rows[key] = len(self._templates)
+            self._templates.append(
+                ProfileTemplate(
+                    input_format=profile.input_format,
+                    output_format=profile.output_format,
+                    options=dict(options),
+                    archive_path=profile.archive_path,
+                )
+            )
+        return row
+
+    def input_path(self, row: int) -> Path:
+        """Get the input path of a row."""
+        return self._dirs[self._input_dir[row]] / self._input_name[row]
+
+    def output_path(self, row: int) -> Path | None:
+        """Get the output path of a row."""
+        output_dir = self._output_dir[row]
+        if output_dir == NO_DIR:
+            return None
+        name = self._output_name[row]
+        if name is None:
+            template = self._templates[self._template[row]]
+            name = f"{Path(self._input_name[row]).stem}.{template.output_format.value}"
+        return self._dirs[output_dir] / name
+
+    def template(self, row: int) -> ProfileTemplate:
+        """Get the shared profile settings of a row."""
+        return self._templates[self._template[row]]
+
+    def profile(self, row: int) -> ConversionProfile:
+        """Rebuild the conversion profile of a row."""
+        template = self._templates[self._template[row]]
+        return ConversionProfile(
+            input_path=self.input_path(row),
+            output_path=self.output_path(row),
+            input_format=template.input_format,
+            output_format=template.output_format,
+            options=template.options,
+            archive_path=template.archive_path,
+        )
+
+    def duplicate_outputs(self, row: int) -> list[Path]:
+        """Get the duplicate outputs of a row."""
+        return self._duplicates.get(row, [])
+
+    def mark_started(self, row: int, when: float) -> None:
+        """Record a task's start time."""
+        self._start_time[row] = when
+
+    def mark_finished(self, row: int, when: float, result: ConversionResult | None) -> None:
+        """
+        Record the outcome of a task and drop everything else about its result.
+
+        Args:
+            row: Task row
+            when: End time
+            result: Conversion result (None for unexpected task errors)
+        """
+        self._end_time[row] = when
+        if result is None:
+            return
+
+        if result.output_changed is not None:
+            self._output_changed[row] = CHANGED_YES if result.output_changed else CHANGED_NO
+        if result.output_path != self.output_path(row):
+            self._result_paths[row] = result.output_path
+        if result.resources is not None:
+            self._record_resources(row, result.resources)
+
+    def _record_resources(self, row: int, usage: ResourceUsage) -> None:
+        self._wall[row] = usage.wall_seconds
+        if usage.user_cpu_seconds is not None:
+            self._user_cpu[row] = usage.user_cpu_seconds
+        if usage.system_cpu_seconds is not None:
+            self._system_cpu[row] = usage.system_cpu_seconds
+        for name, column in self._counts.items():
+            value = getattr(usage, name)
+            if value is not None:
+                column[row] = value
+
+    def resources(self, row: int) -> ResourceUsage | None:
+        """Get the resource usage of a row, or None if it was not measured."""
+        wall = self._wall[row]
+        if math.isnan(wall):
+            return None
+
+        user, system = self._user_cpu[row], self._system_cpu[row]
+        counts = {name: column[row] for name, column in self._counts.items()}
+        return ResourceUsage(
+            wall_seconds=wall,
+            user_cpu_seconds=None if math.isnan(user) else user,
+            system_cpu_seconds=None if math.isnan(system) else system,
+            **{name: None if value == NO_COUNT else value for name, value in counts.items()},
+        )
+
+    def resource_summary(self, top: int = 5) -> ResourceSummary:
+        """
+        Total the measured resource usage.
+
+        Args:
+            top: Number of most CPU-expensive tasks to list
+
+        Returns:
+            ResourceSummary over all measured rows
+        """
+
+        def total(column: array) -> float:
+            return sum(value for value in column if value >= 0)  # skips NaN and NO_COUNT
+
+        counts = self._counts
+        cpu = (
+            (user + system, row)
+            for row, (user, system) in enumerate(zip(self._user_cpu, self._system_cpu, strict=True))
+            if user >= 0 and system >= 0
+        )
+        return ResourceSummary(
+            measured_tasks=sum(1 for wall in self._wall if wall >= 0),
+            wall_seconds=total(self._wall),
+            user_cpu_seconds=total(self._user_cpu),
+            system_cpu_seconds=total(self._system_cpu),
+            peak_rss_bytes=max(max(counts["peak_rss_bytes"], default=0), 0),
+            read_bytes=int(total(counts["read_bytes"])),
+            write_bytes=int(total(counts["write_bytes"])),
+            input_bytes=int(total(counts["input_bytes"])),
+            output_bytes=int(total(counts["output_bytes"])),
+            most_expensive=[(self._ids[row], seconds) for seconds, row in heapq.nlargest(top, cpu)],
+        )
+
+    def set_error(self, row: int, message: str | None) -> None:
+        """Record a task's error message."""
+        if message is None:
+            self._errors.pop(row, None)
+        else:
+            self._errors[row] = message
+
+    def error(self, row: int) -> str | None:
+        """Get a task's error message."""
+        return self._errors.get(row)
+
+    def start_time(self, row: int) -> float | None:
+        """Get a task's start time."""
+        value = self._start_time[row]
+        return None if math.isnan(value) else value
+
+    def end_time(self, row: int) -> float | None:
+        """Get a task's end time."""
+        value = self._end_time[row]
+        return None if math.isnan(value) else value
+
+    def duration(self, row: int) -> float | None:
+        """Get a task's duration in seconds."""
+        start, end = self._start_time[row], self._end_time[row]
+        if math.isnan(start) or math.isnan(end):
+            return None
+        return end - start
+
+    def result(self, row: int, success: bool) -> ConversionResult | None:
+        """
+        Rebuild the result of a finished row.
+
+        Args:
+            row: Task row
+            success: Whether the task completed successfully
+
+        Returns:
+            ConversionResult, or None if the task has not finished
+        """
+        if math.isnan(self._end_time[row]):
+            return None
+
+        changed = self._output_changed[row]
+        return ConversionResult(
+            success=success,
+            output_path=self._result_paths.get(row, self.output_path(row)) if success else None,
+            error_message=self._errors.get(row),
+            duration_seconds=self.duration(row) or 0.0,
+            output_changed=None if changed == CHANGED_UNKNOWN else changed == CHANGED_YES,
+            resources=self.resources(row),
+        )
+
+    def rows_with_status(self, *codes: int) -> list[int]:
+        """
+        Get rows whose status is one of codes, in insertion order.
+
+        The status column is scanned with bytes.find in C, so the cost is
+        dominated by the number of matching rows rather than the store size.
+        """
+        data = self.status.tobytes()
+        rows: list[int] = []
+        for code in codes:
+            needle = bytes((code,))
+            position = data.find(needle)
+            while position != -1:
+                rows.append(position)
+                position = data.find(needle, position + 1)
+        if len(codes) > 1:
+            rows.sort()
+        return rows
+
+    def clear(self) -> None:
+        """Remove all tasks."""
+        self.__init__()
@@ -0,0 +1,158 @@
+"""
+Conversion throughput tracking for duration estimates.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = "*"
+
+
+@dataclass
+class _RegressionStats:
+    """Running sums for a least-squares fit of duration against input size."""
+
+    count: int = 0
+    sum_bytes: float = 0.0
+    sum_seconds: float = 0.0
+    sum_bytes_sq: float = 0.0
+    sum_bytes_seconds: float = 0.0
+
+    def add(self, input_bytes: float, seconds: float) -> None:
+        self.count += 1
+        self.sum_bytes += input_bytes
+        self.sum_seconds += seconds
+        self.sum_bytes_sq += input_bytes * input_bytes
+        self.sum_bytes_seconds += input_bytes * seconds
+
+    def fit(self, default_per_byte: float) -> tuple[float, float] | None:
+        """
+        Fit ``seconds = overhead + bytes / throughput``.
+
+        Args:
+            default_per_byte: Slope assumed when sizes are too similar to fit one
+
+        Returns:
+            (overhead_seconds, seconds_per_byte) or None if there is not enough data
+        """
+        if self.count == 0:
+            return None
+
+        mean_bytes = self.sum_bytes / self.count
+        mean_seconds = self.sum_seconds / self.count
+        variance = self.sum_bytes_sq / self.count - mean_bytes * mean_bytes
+
+        if self.count < 3 or variance <= 1e-9 * max(1.0, mean_bytes * mean_bytes):
+            # All samples of similar size: keep the default slope, fit the overhead
+            return max(0.0, mean_seconds - default_per_byte * mean_bytes), default_per_byte
+
+        covariance = self.sum_bytes_seconds / self.count - mean_bytes * mean_seconds
+        slope = max(0.0, covariance / variance)
+        intercept = max(0.0, mean_seconds - slope * mean_bytes)
+        return intercept, slope
+
+
+class ThroughputTracker:
+    """
+    Records measured conversion durations per format pair.
+
+    Each (input_format, output_format) pair keeps running regression sums so the
+    tracker costs O(1) memory per pair and O(1) time per sample. Lookups fall back
+    from the exact pair to the input format, then to all conversions, then to
+    built-in defaults.
+    """
+
+    # Rough pandoc figures used until real measurements exist
+    DEFAULT_OVERHEAD_SECONDS = 0.25
+    DEFAULT_BYTES_PER_SECOND = 2_000_000.0
+
+    def __init__(self) -> None:
+        """Initialize empty tracker."""
+        self._stats: dict[tuple[str, str], _RegressionStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, input_format: str, output_format: str, input_bytes: int, duration_seconds: float
+    ) -> None:
+        """
+        Record one measured conversion.
+
+        Args:
+            input_format: Input format key (e.g. 'markdown')
+            output_format: Output format key (e.g. 'html')
+            input_bytes: Size of the input document
+            duration_seconds: Wall time of the conversion
+        """
+        if duration_seconds < 0 or input_bytes < 0:
+            return
+
+        keys = (
+            (input_format, output_format),
+            (input_format, WILDCARD),
+            (WILDCARD, WILDCARD),
+        )
+        with self._lock:
+            for key in keys:
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = _RegressionStats()
+                stats.add(float(input_bytes), duration_seconds)
+
+    def model(
+        self, input_format: str | None, output_format: str | None = None
+    ) -> tuple[float, float]:
+        """
+        Get the cost model for a format pair.
+
+        Returns:
+            (overhead_seconds, seconds_per_byte)
+        """
+        candidates = []
+        if input_format and output_format:
+            candidates.append((input_format, output_format))
+        if input_format:
+            candidates.append((input_format, WILDCARD))
+        candidates.append((WILDCARD, WILDCARD))
+
+        default_per_byte = 1.0 / self.DEFAULT_BYTES_PER_SECOND
+        with self._lock:
+            for key in candidates:
+                stats = self._stats.get(key)
+                fitted = stats.fit(default_per_byte) if stats else None
+                if fitted is not None:
+                    return fitted
+
+        return self.DEFAULT_OVERHEAD_SECONDS, default_per_byte
+
+    def estimate_seconds(
+        self, input_format: str | None, input_bytes: float, output_format: str | None = None
+    ) -> float:
+        """Estimate conversion time for a single document."""
+        overhead, per_byte = self.model(input_format, output_format)
+        return overhead + input_bytes * per_byte
+
+    def sample_count(self, input_format: str = WILDCARD, output_format: str = WILDCARD) -> int:
+        """Get number of recorded samples for a format pair."""
+        with self._lock:
+            stats = self._stats.get((input_format, output_format))
+            return stats.count if stats else 0
+
+    def clear(self) -> None:
+        """Forget all measurements."""
+        with self._lock:
+            self._stats.clear()
+
+
+# Global instance for easy access
+_throughput_tracker: ThroughputTracker | None = None
+
+
+def get_throughput_tracker() -> ThroughputTracker:
+    """Get global throughput tracker instance."""
+    global _throughput_tracker
+    if _throughput_tracker is None:
+        _throughput_tracker = ThroughputTracker()
+    return _throughput_tracker
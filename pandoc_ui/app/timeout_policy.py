@@ -0,0 +1,59 @@
+"""
+Per-task pandoc timeouts derived from measured conversion throughput.
+"""
+
+from dataclasses import dataclass
+
+from .throughput import ThroughputTracker
+
+
+@dataclass(frozen=True)
+class TimeoutPolicy:
+    """
+    Scales each conversion's timeout with its expected duration.
+
+    The timeout is min_seconds plus factor times the duration the throughput
+    tracker predicts for the input's size and format pair, capped at
+    max_seconds (or default_seconds, if that is longer). Until min_samples conversions of the exact pair have been
+    measured the prediction is not trusted: inputs of at least
+    large_input_bytes get the cap, everything else default_seconds, so a hung
+    small file where the stall detector can't run (macOS, Windows) frees its
+    slot as soon as it did before timeouts were adaptive.
+    """
+
+    factor: float = 10.0
+    min_seconds: float = 30.0
+    default_seconds: float = 300.0
+    max_seconds: float = 1800.0
+    min_samples: int = 3
+    large_input_bytes: int = 5 * 1024 * 1024
+
+    def timeout_for(
+        self,
+        throughput: ThroughputTracker,
+        input_format: str | None,
+        output_format: str,
+        input_bytes: int | None,
+    ) -> float:
+        """
+        Get the timeout of a conversion.
+
+        Args:
+            throughput: Measured conversion durations
+            input_format: Input format key, or None if unknown
+            output_format: Output format key
+            input_bytes: Size of the input, or None if unknown
+
+        Returns:
+            Seconds before pandoc is killed
+        """
+        cap = max(self.default_seconds, self.max_seconds)
+        if input_format is None or input_bytes is None:
+            return self.default_seconds
+        if throughput.sample_count(input_format, output_format) < self.min_samples:
+            if input_bytes >= self.large_input_bytes:
+                return cap
+            return self.default_seconds
+
+        estimate = throughput.estimate_seconds(input_format, input_bytes, output_format)
+        return min(cap, self.min_seconds + self.factor * estimate)
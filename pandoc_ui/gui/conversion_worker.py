@@ -5,11 +5,21 @@ Worker thread for performing conversions without blocking the GUI.
 from PySide6.QtCore import QThread, Signal
 
 from ..app.conversion_service import ConversionService
+from ..app.scheduler import get_scheduler
+from ..app.service_registry import get_conversion_service
+from ..infra.pandoc_progress import PandocProgress
+from ..infra.tracing import span
 from ..models import ConversionProfile, ConversionResult
 
 
 class ConversionWorker(QThread):
-    """Worker thread for document conversion."""
+    """
+    Worker thread for document conversion.
+
+    Progress follows the phases pandoc reports while it runs (parsing,
+    filters, writing, LaTeX passes), and its warnings are logged as they
+    happen.
+    """
 
     # Signals
     progress_updated = Signal(int)  # Progress percentage
@@ -23,19 +33,19 @@ class ConversionWorker(QThread):
 
         Args:
             profile: Conversion configuration
-            service: ConversionService instance (optional, creates new if None)
+            service: ConversionService instance (optional, shared service if None)
             parent: Parent QObject
         """
         super().__init__(parent)
         self.profile = profile
-        self.service = service or ConversionService()
+        self.service: ConversionService = service or get_conversion_service()
 
     def run(self):
         """Execute conversion in background thread."""
         try:
             self.status_updated.emit("Initializing conversion...")
             self.log_message.emit(f"🚀 Starting conversion: {self.profile.input_path.name}")
-            self.progress_updated.emit(10)
+            self.progress_updated.emit(0)
 
             # Check pandoc availability
             if not self.service.is_pandoc_available():
@@ -49,7 +59,6 @@ class ConversionWorker(QThread):
             self.log_message.emit(
                 f"✅ Pandoc detected: {pandoc_info.path} (v{pandoc_info.version})"
             )
-            self.progress_updated.emit(25)
 
             # Validate input file
             self.status_updated.emit("Validating input file...")
@@ -61,23 +70,27 @@ class ConversionWorker(QThread):
                 return
 
             self.log_message.emit(f"📄 Input file validated: {self.profile.input_path}")
-            self.progress_updated.emit(40)
 
             # Perform conversion
             self.status_updated.emit(f"Converting to {self.profile.output_format.value.upper()}...")
             self.log_message.emit(f"🔄 Converting to {self.profile.output_format.value}...")
-            self.progress_updated.emit(50)
 
-            result = self.service.convert(self.profile)
+            # Admitted at once; running batches start fewer new jobs meanwhile
+            with get_scheduler().interactive():
+                result = self.service.convert(self.profile, progress=self._on_pandoc_progress)
 
             if result.success:
-                self.progress_updated.emit(90)
                 self.log_message.emit(f"✅ Conversion completed in {result.duration_seconds:.2f}s")
                 self.log_message.emit(f"📁 Output saved to: {result.output_path}")
 
+                if result.output_changed is False:
+                    self.log_message.emit("💾 Output unchanged, existing file left untouched")
+
                 # Verify output file
-                if result.output_path and result.output_path.exists():
-                    file_size = result.output_path.stat().st_size
+                with span("verify_output", "io"):
+                    output_exists = bool(result.output_path and result.output_path.exists())
+                    file_size = result.output_path.stat().st_size if output_exists else 0
+                if output_exists:
                     self.log_message.emit(f"📊 Output file size: {file_size:,} bytes")
                     self.status_updated.emit("Conversion completed successfully!")
                 else:
@@ -101,3 +114,11 @@ class ConversionWorker(QThread):
 
             result = ConversionResult(success=False, error_message=error_msg)
             self.conversion_finished.emit(result)
+
+    def _on_pandoc_progress(self, event: PandocProgress) -> None:
+        """Report a phase change or warning of the running pandoc."""
+        if event.warning:
+            self.log_message.emit(f"⚠️ {event.message}")
+            return
+        self.progress_updated.emit(event.percent)
+        self.status_updated.emit(f"{event.message}...")
@@ -0,0 +1,50 @@
+"""
+Background duplicate detection for batch conversions.
+"""
+
+import logging
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from ..app.deduplication import DeduplicationPlan, plan_deduplication
+
+logger = logging.getLogger(__name__)
+
+
+class DeduplicationSignals(QObject):
+    """Signals of a DeduplicationWorker (a QRunnable cannot emit them itself)."""
+
+    finished = Signal(object)  # DeduplicationPlan
+
+
+class DeduplicationWorker(QRunnable):
+    """
+    Hashes batch inputs on a QThreadPool thread.
+
+    Grouping a large batch reads every file whose size collides with another,
+    which would freeze the GUI if done on its thread. The plan arrives through
+    signals.finished, queued to the thread that created the worker.
+    """
+
+    def __init__(self, files: list[Path], output_format: str | None = None):
+        """
+        Initialize worker.
+
+        Args:
+            files: Batch inputs in batch order
+            output_format: Pandoc writer of the batch, or None if unknown
+        """
+        super().__init__()
+        self.files = list(files)
+        self.output_format = output_format
+        self.signals = DeduplicationSignals()
+
+    def run(self) -> None:
+        """Plan the deduplication; on error every input is converted on its own."""
+        try:
+            plan = plan_deduplication(self.files, output_format=self.output_format)
+        except Exception as e:
+            logger.warning(f"Duplicate detection failed, converting every input: {e}")
+            plan = DeduplicationPlan(unique_files=self.files, errors=[str(e)])
+        self.signals.finished.emit(plan)
@@ -0,0 +1,334 @@
+"""
+Bounded, rate-limited conversion log view.
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+    QTimer,
+)
+from PySide6.QtGui import QBrush, QColor
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QHBoxLayout,
+    QLineEdit,
+    QListView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from ..i18n import _
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+LEVEL_COLORS = {"WARNING": QColor("#b36b00"), "ERROR": QColor("red")}
+
+# Roles exposed to the filter proxy
+LevelRole = Qt.ItemDataRole.UserRole + 1
+
+
+@dataclass(slots=True)
+class LogEntry:
+    """Single log line."""
+
+    timestamp: str
+    level: str
+    message: str
+
+    @property
+    def text(self) -> str:
+        """Get the line as displayed."""
+        return f"[{self.timestamp}] {self.message}"
+
+
+class LogModel(QAbstractListModel):
+    """
+    Ring buffer of log entries exposed as a list model.
+
+    Messages are queued by append() and only reach the model when flush() runs,
+    so a burst of thousands of messages costs one row insertion (and one repaint)
+    per flush. The buffer keeps the newest ``capacity`` entries; every entry is
+    also written to an optional rotating history file, which holds the full log.
+    """
+
+    DEFAULT_CAPACITY = 10_000
+    HISTORY_MAX_BYTES = 5 * 1024 * 1024
+    HISTORY_BACKUP_COUNT = 5
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        history_file: Path | None = None,
+        parent=None,
+    ):
+        """
+        Initialize log model.
+
+        Args:
+            capacity: Maximum number of entries kept in memory
+            history_file: Rotating file receiving every entry (None: memory only)
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.capacity = max(1, capacity)
+        self._entries: deque[LogEntry] = deque()
+        self._pending: list[LogEntry] = []
+        self._total_count = 0
+        self._history: RotatingFileHandler | None = None
+
+        if history_file is not None:
+            try:
+                history_file.parent.mkdir(parents=True, exist_ok=True)
+                self._history = RotatingFileHandler(
+                    history_file,
+                    maxBytes=self.HISTORY_MAX_BYTES,
+                    backupCount=self.HISTORY_BACKUP_COUNT,
+                    encoding="utf-8",
+                    delay=True,
+                )
+            except OSError as e:
+                logger.warning(f"Cannot open log history file {history_file}: {e}")
+
+    def append(self, message: str, level: str = "INFO") -> None:
+        """Queue a message for the next flush."""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self._pending.append(LogEntry(timestamp, level.upper(), message))
+        self._total_count += 1
+
+    def flush(self) -> int:
+        """
+        Move queued messages into the model.
+
+        Returns:
+            Number of entries added
+        """
+        if not self._pending:
+            return 0
+
+        self._write_history(self._pending)
+        pending = self._pending[-self.capacity :]
+        self._pending = []
+
+        overflow = len(self._entries) + len(pending) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _dropped in range(overflow):
+                self._entries.popleft()
+            self.endRemoveRows()
+
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(pending) - 1)
+        self._entries.extend(pending)
+        self.endInsertRows()
+        return len(pending)
+
+    def _write_history(self, entries: list[LogEntry]) -> None:
+        """Append entries to the history file in a single write."""
+        if self._history is None:
+            return
+
+        date = datetime.now().strftime("%Y-%m-%d")
+        text = "\n".join(f"{date} {e.timestamp} {e.level:<7} {e.message}" for e in entries)
+        record = logging.LogRecord(__name__, logging.INFO, __file__, 0, text, None, None)
+        self._history.handle(record)
+
+    def clear(self) -> None:
+        """Remove all entries, including queued ones (history is kept)."""
+        self.beginResetModel()
+        self._entries.clear()
+        self._pending.clear()
+        self.endResetModel()
+
+    def close(self) -> None:
+        """Flush and close the history file."""
+        self.flush()
+        if self._history is not None:
+            self._history.close()
+            self._history = None
+
+    def entries(self) -> list[LogEntry]:
+        """Get buffered entries, oldest first."""
+        return list(self._entries)
+
+    @property
+    def pending_count(self) -> int:
+        """Get number of messages waiting for the next flush."""
+        return len(self._pending)
+
+    @property
+    def total_count(self) -> int:
+        """Get number of messages appended since creation."""
+        return self._total_count
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._entries):
+            return None
+
+        entry = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return entry.text
+        if role == LevelRole:
+            return entry.level
+        if role == Qt.ForegroundRole and entry.level in LEVEL_COLORS:
+            return QBrush(LEVEL_COLORS[entry.level])
+        return None
+
+
+class LogFilterModel(QSortFilterProxyModel):
+    """Filters log rows by minimum level and case-insensitive search text."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._min_level = 0
+        self._search = ""
+
+    def set_min_level(self, level: str) -> None:
+        """Show only entries at or above level."""
+        self._begin_filter_change()
+        self._min_level = LEVELS.index(level) if level in LEVELS else 0
+        self._end_filter_change()
+
+    def set_search_text(self, text: str) -> None:
+        """Show only entries containing text."""
+        self._begin_filter_change()
+        self._search = text.lower()
+        self._end_filter_change()
+
+    def _begin_filter_change(self) -> None:
+        # Qt 6.10 replaced invalidateFilter() with a begin/end pair
+        if hasattr(self, "beginFilterChange"):
+            self.beginFilterChange()
+
+    def _end_filter_change(self) -> None:
+        if hasattr(self, "endFilterChange"):
+            self.endFilterChange()
+        else:
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent) -> bool:
+        if not self._min_level and not self._search:
+            return True
+
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        level = index.data(LevelRole)
+        if level in LEVELS and LEVELS.index(level) < self._min_level:
+            return False
+        return not self._search or self._search in index.data(Qt.DisplayRole).lower()
+
+
+class LogView(QWidget):
+    """
+    Conversion log widget: level filter, search box and a virtualized list.
+
+    Only visible rows are ever laid out or painted, and queued messages are
+    flushed on a timer, so memory and frame time stay flat however many
+    messages a batch produces.
+    """
+
+    FLUSH_INTERVAL_MS = 33  # ~30 Hz
+
+    def __init__(
+        self,
+        capacity: int = LogModel.DEFAULT_CAPACITY,
+        history_file: Path | None = None,
+        parent=None,
+    ):
+        """
+        Initialize log view.
+
+        Args:
+            capacity: Maximum number of entries kept in memory
+            history_file: Rotating file receiving every entry
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.model = LogModel(capacity, history_file, self)
+        self.filter_model = LogFilterModel(self)
+        self.filter_model.setSourceModel(self.model)
+
+        self.levelComboBox = QComboBox()
+        self.levelComboBox.addItem(_("All"), "DEBUG")
+        self.levelComboBox.addItem(_("Info"), "INFO")
+        self.levelComboBox.addItem(_("Warnings"), "WARNING")
+        self.levelComboBox.addItem(_("Errors"), "ERROR")
+        self.levelComboBox.currentIndexChanged.connect(self._onLevelChanged)
+
+        self.searchEdit = QLineEdit()
+        self.searchEdit.setPlaceholderText(_("Search log..."))
+        self.searchEdit.setClearButtonEnabled(True)
+        self.searchEdit.textChanged.connect(self.filter_model.set_search_text)
+
+        self.listView = QListView()
+        self.listView.setModel(self.filter_model)
+        self.listView.setUniformItemSizes(True)
+        self.listView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.listView.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.listView.setWordWrap(False)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+        filter_layout.addWidget(self.levelComboBox)
+        filter_layout.addWidget(self.searchEdit, 1)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.listView)
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def appendMessage(self, message: str, level: str = "INFO") -> None:
+        """Queue a message; it is shown on the next timer tick."""
+        self.model.append(message, level)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def append(self, text: str) -> None:
+        """Queue a plain line (QTextEdit compatible)."""
+        self.appendMessage(text)
+
+    def flush(self) -> None:
+        """Show queued messages, following the tail if the view was at the bottom."""
+        scroll_bar = self.listView.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+
+        if not self.model.flush():
+            self._flush_timer.stop()
+            return
+
+        if at_bottom:
+            self.listView.scrollToBottom()
+
+    def clear(self) -> None:
+        """Remove all entries from the view."""
+        self.model.clear()
+
+    def shutdown(self) -> None:
+        """Flush pending messages and close the history file."""
+        self._flush_timer.stop()
+        self.model.close()
+
+    def toPlainText(self) -> str:
+        """Get buffered log text (QTextEdit compatible)."""
+        self.model.flush()
+        return "\n".join(entry.text for entry in self.model.entries())
+
+    def _onLevelChanged(self, index: int) -> None:
+        self.filter_model.set_min_level(self.levelComboBox.itemData(index))
@@ -278,9 +278,9 @@ class MainWindow(QMainWindow):
 
     def checkPandocAvailability(self):
         """Check if pandoc is available on startup."""
-        from ..app.conversion_service import ConversionService
+        from ..app.service_registry import get_conversion_service
 
-        service = ConversionService()
+        service = get_conversion_service()
         if service.is_pandoc_available():
             pandoc_info = service.get_pandoc_info()
             self.addLogMessage(f"✅ Pandoc detected: {pandoc_info.path} (v{pandoc_info.version})")
@@ -3,13 +3,12 @@ UI components for pandoc-ui GUI application.
 """
 
 import logging
-from datetime import datetime
+import time
 from pathlib import Path
 
-from PySide6.QtCore import QFile, QIODevice, QObject, QTimer, Signal, Slot
+from PySide6.QtCore import QFile, QIODevice, QObject, QThreadPool, QTimer, Signal, Slot
 from PySide6.QtUiTools import QUiLoader
 from PySide6.QtWidgets import (
-    QApplication,
     QCheckBox,
     QComboBox,
     QFileDialog,
@@ -23,27 +22,64 @@ from PySide6.QtWidgets import (
     QRadioButton,
     QSpinBox,
     QSplitter,
-    QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
+from ..app.batch_planner import plan_batch
+from ..app.deduplication import DeduplicationPlan
 from ..app.folder_scanner import FolderScanner, ScanMode
 from ..app.profile_repository import ProfileRepository, UIProfile
-from ..app.task_queue import TaskQueue
-from ..infra.config_manager import initialize_config
-from ..infra.format_manager import FormatManager
-from ..infra.settings_store import Language, SettingsStore
+from ..app.retry_policy import RetryPolicy
+from ..app.service_registry import get_service_registry
+from ..app.timeout_policy import TimeoutPolicy
+from ..app.task_queue import ProgressSnapshot, TaskQueue
+from ..infra.archive_io import ArchiveFormat, ArchiveWriter
+from ..infra.config_manager import get_config_manager, initialize_config
+from ..infra.pandoc_progress import PHASE_PERCENT, PandocPhase
+from ..infra.settings_store import ApplicationSettings, Language, SettingsStore
 from ..i18n import _, get_current_language
 from ..models import ConversionProfile, ConversionResult, InputFormat, OutputFormat
 from .conversion_worker import ConversionWorker
+from .deduplication_worker import DeduplicationWorker
+from .log_view import LogView
 
 logger = logging.getLogger(__name__)
 
 
+def _log_history_file() -> Path:
+    """Get the rotating file that keeps the full conversion log."""
+    return get_config_manager().get_logs_dir() / "conversion.log"
+
+
+def _format_eta(seconds: float) -> str:
+    """Format a remaining time as m:ss or h:mm:ss."""
+    minutes, secs = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def _format_bytes(size: int) -> str:
+    """Format a byte count with a binary unit."""
+    if size < 1024:
+        return f"{size} B"
+    value = size / 1024
+    units = ["KiB", "MiB", "GiB"]
+    while value >= 1024 and len(units) > 1:
+        value /= 1024
+        units.pop(0)
+    return f"{value:.1f} {units[0]}"
+
+
 class MainWindowUI(QObject):
     """Main window UI component handler."""
 
+    # Batches larger than this log failures only, not every started/completed file
+    PER_TASK_LOG_LIMIT = 500
+    # Fail fast: smallest files converted first, and same-error failures that halt a batch
+    BATCH_CANARY_SIZE = 3
+    BATCH_FAILURE_THRESHOLD = 10
+
     # Signals
     conversion_requested = Signal(ConversionProfile)
 
@@ -54,6 +90,9 @@ class MainWindowUI(QObject):
 
         # State
         self.current_worker: ConversionWorker | None = None
+        self.dedup_worker: DeduplicationWorker | None = None
+        # Output format, path and archive format of a batch waiting for its dedup plan
+        self.pending_batch: tuple[OutputFormat, Path, ArchiveFormat | None] | None = None
         self.input_file_path: Path | None = None
         self.input_folder_path: Path | None = None
         self.is_batch_mode: bool = False
@@ -62,18 +101,21 @@ class MainWindowUI(QObject):
         # Initialize configuration management first
         initialize_config()
 
-        # Initialize format manager
-        self.format_manager = FormatManager()
+        # Shared format table
+        self.format_manager = get_service_registry().get_format_manager()
 
         # Batch processing components
         self.task_queue: TaskQueue | None = None
+        self.archive_writer: ArchiveWriter | None = None
         self.folder_scanner = FolderScanner()
         self.batch_files: list[Path] = []
+        self.batch_archive_path: Path | None = None
 
         # Profile and settings management
         self.profile_repository = ProfileRepository()
         self.settings_store = SettingsStore()
-        self.current_settings = self.settings_store.load_settings()
+        self.applySettings(self.settings_store.load_settings())
+        self.settings_store.add_listener(self.applySettings)
 
         # Command preview timer for debounced updates
         self.preview_update_timer = QTimer()
@@ -105,6 +147,7 @@ class MainWindowUI(QObject):
             if not success:
                 logger.warning("UI file loading failed, creating programmatic UI")
                 self._createProgrammaticUI()
+            self._installLogView()
 
             # Set window properties
             self.main_window.setWindowTitle("Pandoc UI - Document Converter")
@@ -201,6 +244,27 @@ class MainWindowUI(QObject):
             logger.warning(f"Failed to load UI file: {str(e)}")
             return False
 
+    def _installLogView(self):
+        """Replace the designer's QTextEdit log with the bounded LogView."""
+        old_log = getattr(self.ui, "logTextEdit", None)
+        if old_log is None or isinstance(old_log, LogView):
+            return
+
+        log_view = LogView(history_file=_log_history_file())
+        log_view.setMinimumSize(old_log.minimumSize())
+        log_view.listView.setFont(old_log.font())
+
+        container = old_log.parentWidget()
+        layout = container.layout() if container else None
+        if layout is None or layout.replaceWidget(old_log, log_view) is None:
+            logger.warning("Could not place log view, keeping designer log widget")
+            log_view.deleteLater()
+            return
+
+        old_log.hide()
+        old_log.deleteLater()
+        self.ui.logTextEdit = log_view
+
     def _createProgrammaticUI(self):
         """Create UI programmatically as fallback."""
         logger.info("Creating programmatic UI")
@@ -341,8 +405,8 @@ class MainWindowUI(QObject):
         log_buttons_layout.addStretch()
         log_layout.addLayout(log_buttons_layout)
 
-        self.logTextEdit = QTextEdit()
-        self.logTextEdit.setMaximumHeight(150)
+        self.logTextEdit = LogView(history_file=_log_history_file())
+        self.logTextEdit.setMaximumHeight(180)
         log_layout.addWidget(self.logTextEdit)
 
         main_layout.addWidget(log_group)
@@ -431,7 +495,7 @@ class MainWindowUI(QObject):
         self.convertButton = QPushButton("Convert")
         self.statusLabel = QLabel("Ready")
         self.progressBar = QProgressBar()
-        self.logTextEdit = QTextEdit()
+        self.logTextEdit = LogView(history_file=_log_history_file())
 
         layout.addWidget(QLabel("Input:"))
         input_layout = QHBoxLayout()
@@ -508,7 +572,7 @@ class MainWindowUI(QObject):
 
                 self.ui = UIWrapper()
                 self.ui.convertButton = emergency_button
-                self.ui.logTextEdit = QTextEdit()
+                self.ui.logTextEdit = LogView(history_file=_log_history_file())
                 layout.addWidget(self.ui.logTextEdit)
 
                 emergency_widget.show()
@@ -736,6 +800,7 @@ class MainWindowUI(QObject):
         self.input_file_path = None
         self.input_folder_path = None
         self.batch_files.clear()
+        self.batch_archive_path = None
 
         self.addLogMessage(
             f"🔄 Mode changed to: {'Batch' if self.is_batch_mode else 'Single File'}"
@@ -784,6 +849,7 @@ class MainWindowUI(QObject):
 
         if scan_result.success:
             self.batch_files = scan_result.files
+            self.batch_archive_path = scan_result.archive_path
             self.addLogMessage(
                 f"✅ Found {scan_result.filtered_count} files ({scan_result.scan_duration_seconds:.2f}s)"
             )
@@ -793,6 +859,7 @@ class MainWindowUI(QObject):
                 )
         else:
             self.batch_files = []
+            self.batch_archive_path = None
             for error in scan_result.errors:
                 self.addLogMessage(f"❌ Scan error: {error}")
 
@@ -908,7 +975,8 @@ class MainWindowUI(QObject):
             return
 
         output_path = Path(output_dir)
-        if not output_path.exists():
+        archive_format = ArchiveFormat.from_path(output_path)
+        if archive_format is None and not output_path.exists():
             try:
                 output_path.mkdir(parents=True)
                 self.addLogMessage(f"📁 Created output directory: {output_path}")
@@ -918,51 +986,96 @@ class MainWindowUI(QObject):
                 )
                 return
 
+        # Group byte-identical inputs so each distinct document is converted once;
+        # hashing runs on a pool thread (archive members are virtual paths and
+        # cannot be stat'ed or hashed)
+        self.pending_batch = (output_format_data, output_path, archive_format)
+        if self.batch_archive_path is not None:
+            self.onDeduplicationPlanned(DeduplicationPlan(unique_files=list(self.batch_files)))
+            return
+        self.ui.convertButton.setEnabled(False)
+        self.ui.statusLabel.setText(f"Checking {len(self.batch_files)} files for duplicates...")
+        self.dedup_worker = DeduplicationWorker(self.batch_files, output_format_data.value)
+        self.dedup_worker.setAutoDelete(False)
+        self.dedup_worker.signals.finished.connect(self.onDeduplicationPlanned)
+        QThreadPool.globalInstance().start(self.dedup_worker)
+
+    @Slot(object)
+    def onDeduplicationPlanned(self, dedup_plan: DeduplicationPlan):
+        """Finish starting the batch once its duplicate inputs are known."""
+        if self.pending_batch is None:
+            return
+        output_format_data, output_path, archive_format = self.pending_batch
+        self.pending_batch = None
+        self.ui.convertButton.setEnabled(True)
+
+        if dedup_plan.duplicate_count:
+            self.addLogMessage(f"♻️ Duplicate inputs detected: {dedup_plan.summary}")
+
+        # Validate pandoc and options and compile the command templates once
+        try:
+            batch_plan = plan_batch(
+                dedup_plan.unique_files,
+                output_format_data,
+                output_path,
+                get_service_registry().get_conversion_service().get_runner(),
+                self.format_manager,
+                custom_args=self.custom_args,
+                archive_path=self.batch_archive_path,
+            )
+        except (RuntimeError, ValueError) as e:
+            QMessageBox.warning(self.main_window, "Error", f"Cannot start batch conversion: {e}")
+            return
+        for input_file, reason in batch_plan.skipped:
+            self.addLogMessage(f"⚠️ Skipping {input_file.name}: {reason}")
+        if not batch_plan:
+            QMessageBox.warning(
+                self.main_window, "Error", "None of the batch files can be converted"
+            )
+            return
+
         # Create task queue
         self.task_queue = TaskQueue(max_concurrent_jobs=4, parent=self.main_window)
 
+        # An output "directory" ending in .zip/.tar.gz streams outputs into that archive
+        if archive_format is not None:
+            try:
+                self.archive_writer = ArchiveWriter(output_path, archive_format)
+            except Exception as e:
+                QMessageBox.critical(self.main_window, "Error", f"Failed to create archive: {e}")
+                self.task_queue = None
+                return
+            self.task_queue.set_archive_output(self.archive_writer, output_root=output_path)
+            self.addLogMessage(f"📦 Writing outputs into archive: {output_path}")
+
         # Connect task queue signals
         self.task_queue.task_started.connect(self.onBatchTaskStarted)
         self.task_queue.task_completed.connect(self.onBatchTaskCompleted)
         self.task_queue.task_failed.connect(self.onBatchTaskFailed)
-        self.task_queue.queue_progress.connect(self.onBatchProgress)
+        self.task_queue.progress_snapshot.connect(self.onBatchSnapshot)
         self.task_queue.queue_finished.connect(self.onBatchFinished)
-
-        # Add tasks to queue
-        for i, input_file in enumerate(self.batch_files):
-            output_file = output_path / f"{input_file.stem}.{output_format_data.value}"
-
-            # Auto-detect input format for each file
-            input_format_str = self.format_manager.detect_format_from_extension(str(input_file))
-            try:
-                input_format_data = InputFormat(input_format_str) if input_format_str else None
-            except ValueError:
-                input_format_data = None
-
-            # Check format compatibility
-            if input_format_str and not self.format_manager.can_convert(
-                input_format_str, output_format_str
-            ):
-                self.addLogMessage(
-                    f"⚠️ Skipping {input_file.name}: Cannot convert from {input_format_str} to {output_format_str}"
-                )
-                continue
-
-            # Create conversion profile with custom arguments
-            options = {}
-            if self.custom_args:
-                options["custom_args"] = self.custom_args
-                
-            profile = ConversionProfile(
-                input_path=input_file,
-                output_path=output_file,
-                input_format=input_format_data,
-                output_format=output_format_data,
-                options=options,
+        self.task_queue.batch_halted.connect(self.onBatchHalted)
+        self.task_queue.task_progress.connect(self.onBatchTaskProgress)
+        self.task_queue.task_warning.connect(self.onBatchTaskWarning)
+        self.task_queue.set_fail_fast(self.BATCH_CANARY_SIZE, self.BATCH_FAILURE_THRESHOLD)
+        self.task_queue.set_retry_policy(RetryPolicy())
+
+        duplicate_outputs = {}
+        for row, input_file in enumerate(batch_plan.inputs):
+            duplicates = dedup_plan.duplicates.get(input_file)
+            if duplicates:
+                duplicate_outputs[row] = [batch_plan.output_path(d) for d in duplicates]
+        self.task_queue.add_plan(batch_plan, duplicate_outputs)
+
+        # Per-file log lines are noise for big batches; failures are still logged
+        if len(batch_plan) > self.PER_TASK_LOG_LIMIT:
+            self.task_queue.set_task_signals(False)
+            self.addLogMessage(
+                f"ℹ️ Large batch: logging failures only (more than {self.PER_TASK_LOG_LIMIT} files)"
             )
-
-            task_id = f"batch_{i:04d}_{input_file.name}"
-            self.task_queue.add_task(task_id, profile)
+        else:
+            # Log pandoc's phases and warnings while each file converts
+            self.task_queue.set_live_progress(True)
 
         # Update UI for batch processing
         self.ui.convertButton.setEnabled(False)
@@ -1010,19 +1123,17 @@ class MainWindowUI(QObject):
 
     @Slot(str)
     def addLogMessage(self, message: str, level: str = "INFO"):
-        """Add message to log window."""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}"
-
-        self.ui.logTextEdit.append(formatted_message)
-
-        # Auto-scroll to bottom
-        cursor = self.ui.logTextEdit.textCursor()
-        cursor.movePosition(cursor.MoveOperation.End)
-        self.ui.logTextEdit.setTextCursor(cursor)
-
-        # Process events to update UI
-        QApplication.processEvents()
+        """
+        Add message to log window.
+
+        Messages are queued and shown by the log view's flush timer, so this is
+        cheap enough to call several times per batch task.
+        """
+        if level == "INFO" and message.startswith("❌"):
+            level = "ERROR"
+        elif level == "INFO" and message.startswith("⚠️"):
+            level = "WARNING"
+        self.ui.logTextEdit.appendMessage(message, level)
 
     @Slot(ConversionResult)
     def onConversionFinished(self, result: ConversionResult):
@@ -1070,21 +1181,49 @@ class MainWindowUI(QObject):
     @Slot(str, str, str)
     def onBatchTaskFailed(self, task_id: str, filename: str, error_message: str):
         """Handle batch task failed with red highlighting."""
-        # Add message with HTML for red coloring
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] <span style='color: red;'>❌ Failed: {filename} - {error_message}</span>"
-
-        # Use insertHtml for colored text
-        self.ui.logTextEdit.append("")  # Add empty line first
-        cursor = self.ui.logTextEdit.textCursor()
-        cursor.movePosition(cursor.MoveOperation.End)
-        cursor.insertHtml(formatted_message)
-        self.ui.logTextEdit.setTextCursor(cursor)
-
-        # Auto-scroll to bottom
-        cursor.movePosition(cursor.MoveOperation.End)
-        self.ui.logTextEdit.setTextCursor(cursor)
-        QApplication.processEvents()
+        self.addLogMessage(f"❌ Failed: {filename} - {error_message}", "ERROR")
+
+    @Slot(str, str, int, str)
+    def onBatchTaskProgress(self, task_id: str, filename: str, percent: int, message: str):
+        """Log the phases of a running batch task after it started parsing."""
+        if percent > PHASE_PERCENT[PandocPhase.PARSING]:
+            self.addLogMessage(f"⏳ {filename}: {message}")
+
+    @Slot(str, str, str)
+    def onBatchTaskWarning(self, task_id: str, filename: str, message: str):
+        """Log a warning of a running batch task."""
+        self.addLogMessage(f"⚠️ {filename}: {message}")
+
+    @Slot(str, str, int)
+    def onBatchHalted(self, reason: str, error_message: str, failed_count: int):
+        """Handle a batch halted by its canary run or circuit breaker."""
+        if not self.task_queue:
+            return
+        if reason == "canary":
+            what = f"All {failed_count} test conversions of the smallest files failed"
+        else:
+            what = f"{failed_count} files in a row failed with the same error"
+        self.addLogMessage(f"⛔ Batch paused: {what}", "ERROR")
+        self.ui.statusLabel.setText("Batch paused after repeated failures")
+
+        reply = QMessageBox.question(
+            self.main_window,
+            "Batch Conversion Paused",
+            f"{what}:\n\n{error_message}\n\n"
+            f"The remaining files would most likely fail the same way. "
+            f"Check the conversion settings and custom arguments.\n\n"
+            f"Continue the batch anyway?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No,
+        )
+        if not self.task_queue:
+            return
+        if reply == QMessageBox.Yes:
+            self.addLogMessage("▶️ Continuing batch conversion")
+            self.task_queue.resume_queue()
+        else:
+            self.addLogMessage("🛑 Batch conversion cancelled")
+            self.task_queue.cancel_queue()
 
     @Slot(int, int)
     def onBatchProgress(self, completed: int, total: int):
@@ -1093,10 +1232,67 @@ class MainWindowUI(QObject):
         self.ui.progressBar.setValue(progress)
         self.ui.statusLabel.setText(f"Converting... ({completed}/{total} files)")
 
+    @Slot(object)
+    def onBatchSnapshot(self, snapshot: ProgressSnapshot):
+        """Handle aggregated batch progress (delivered at a fixed rate)."""
+        self.ui.progressBar.setValue(snapshot.percent)
+        status = f"Converting... ({snapshot.finished}/{snapshot.total} files"
+        if snapshot.failed:
+            status += f", {snapshot.failed} failed"
+        if snapshot.throughput > 0:
+            status += f", {snapshot.throughput:.1f} files/s"
+        if snapshot.eta_seconds is not None and not snapshot.done:
+            status += f", ETA {_format_eta(snapshot.eta_seconds)}"
+        self.ui.statusLabel.setText(status + ")")
+
+    def reportBatchResources(self):
+        """Log the batch's resource usage and export the per-task report."""
+        resources = self.task_queue.get_resource_summary(top=3)
+        if resources.measured_tasks:
+            self.addLogMessage(
+                f"📊 Resources: {resources.cpu_seconds:.2f}s CPU, "
+                f"peak {_format_bytes(resources.peak_rss_bytes)} RSS, "
+                f"read {_format_bytes(resources.read_bytes)}, "
+                f"wrote {_format_bytes(resources.write_bytes)}"
+            )
+            expensive = ", ".join(
+                f"{task_id} ({seconds:.2f}s)"
+                for task_id, seconds in resources.most_expensive
+            )
+            if expensive:
+                self.addLogMessage(f"🐢 Most expensive: {expensive}")
+
+        report_path = (
+            get_config_manager().get_logs_dir()
+            / f"batch-{time.strftime('%Y%m%d-%H%M%S')}.csv"
+        )
+        try:
+            self.task_queue.export_report(report_path)
+            self.addLogMessage(f"📄 Batch report: {report_path}")
+        except OSError as e:
+            logger.warning(f"Could not write batch report: {e}")
+
     @Slot(int, int, float)
     def onBatchFinished(self, total_tasks: int, successful_tasks: int, total_duration: float):
         """Handle batch conversion completion."""
         failed_tasks = total_tasks - successful_tasks
+        summary = self.task_queue.get_queue_summary() if self.task_queue else {}
+        deduplicated = summary.get("deduplicated", 0)
+
+        # Finish the archive before reporting, so it is complete when the user looks
+        if self.archive_writer:
+            try:
+                self.archive_writer.close()
+                self.addLogMessage(
+                    f"📦 Archive written: {self.archive_writer.archive_path} "
+                    f"({self.archive_writer.entry_count} files)"
+                )
+            except RuntimeError as e:
+                self.addLogMessage(f"❌ Archive error: {e}")
+            self.archive_writer = None
+
+        if self.task_queue:
+            self.reportBatchResources()
 
         # Update UI
         self.ui.progressBar.setValue(100)
@@ -1131,6 +1327,20 @@ class MainWindowUI(QObject):
                 f"Check the log for details on failed conversions.",
             )
 
+        if deduplicated:
+            self.addLogMessage(f"♻️ {deduplicated} duplicate files reused an existing conversion")
+        if summary.get("duplicates_failed"):
+            self.addLogMessage(
+                f"❌ {summary['duplicates_failed']} duplicates failed with their original"
+            )
+        if summary.get("retried"):
+            self.addLogMessage(f"🔁 {summary['retried']} transient failures were retried")
+        if summary.get("unchanged"):
+            self.addLogMessage(
+                f"💾 Outputs written: {summary.get('written', 0)}, "
+                f"unchanged and left untouched: {summary['unchanged']}"
+            )
+
         # Clean up task queue
         if self.task_queue:
             self.task_queue.deleteLater()
@@ -1183,9 +1393,9 @@ class MainWindowUI(QObject):
 
     def checkPandocAvailability(self):
         """Check if pandoc is available on startup."""
-        from ..app.conversion_service import ConversionService
+        from ..app.service_registry import get_conversion_service
 
-        service = ConversionService()
+        service = get_conversion_service()
         if service.is_pandoc_available():
             pandoc_info = service.get_pandoc_info()
             
@@ -1247,8 +1457,13 @@ The application will not work without Pandoc.""",
                 self.addLogMessage("🛑 Cancelling batch conversion...")
                 self.task_queue.cancel_queue()
                 self.task_queue.wait_for_completion(3000)  # Wait up to 3 seconds
+                if self.archive_writer:
+                    self.archive_writer.abort()
+                    self.archive_writer = None
 
         self.addLogMessage("👋 Closing Pandoc UI")
+        if isinstance(self.ui.logTextEdit, LogView):
+            self.ui.logTextEdit.shutdown()
         return True
 
     # Profile Management Methods
@@ -1427,6 +1642,17 @@ The application will not work without Pandoc.""",
                 _("Failed to switch to %s. Translation files may be missing.") % language_text
             )
 
+    def applySettings(self, settings: ApplicationSettings):
+        """Apply loaded or just saved settings to the conversion service."""
+        self.current_settings = settings
+        service = get_service_registry().get_conversion_service()
+        # Timeouts scale with input size and measured throughput; the default applies before that
+        service.timeout_policy = TimeoutPolicy(
+            default_seconds=float(settings.pandoc_timeout_seconds),
+            max_seconds=float(settings.pandoc_max_timeout_seconds),
+        )
+        service.pin_source_date = settings.pin_source_date
+
     def collectUIState(self) -> dict:
         """Collect current UI state for profile saving."""
         return {
@@ -0,0 +1,998 @@
+"""
+Streaming archive input and output for batch conversions.
+"""
+
+import atexit
+import bz2
+import io
+import logging
+import lzma
+import os
+import posixpath
+import re
+import shutil
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import IO
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Relative resource references in common pandoc input formats
+RESOURCE_REFERENCE_PATTERN = re.compile(
+    rb"!\[[^\]]*\]\(\s*<?([^)\s>]+)"  # markdown image
+    rb"|\b(?:src|href|data)\s*=\s*[\"']([^\"']+)[\"']"  # html
+    rb"|\.\. (?:image|figure|include)::\s*(\S+)"  # rst
+    rb"|\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}"  # latex
+    rb"|\\(?:input|include)\{([^}]+)\}"  # latex
+    rb"|\bimage::?([^\[\s]+)\["  # asciidoc
+    rb"|\[\[(?:file:)?([^\]\s]+\.(?:png|jpe?g|gif|svg|pdf))\]"  # org
+)
+REFERENCE_OVERLAP = 4096
+
+
+class ArchiveFormat(Enum):
+    """Supported archive formats."""
+
+    ZIP = "zip"
+    TAR_GZ = "tar.gz"
+
+    @classmethod
+    def from_path(cls, path: Path | str) -> "ArchiveFormat | None":
+        """
+        Detect archive format from a file name.
+
+        Returns:
+            ArchiveFormat or None if the name is not a supported archive
+        """
+        name = str(path).lower()
+        if name.endswith(".zip"):
+            return cls.ZIP
+        if name.endswith((".tar.gz", ".tgz")):
+            return cls.TAR_GZ
+        return None
+
+
+@dataclass
+class _ArchiveEntry:
+    """Pending archive member."""
+
+    arcname: str
+    aliases: tuple[str, ...] = ()
+    data: bytes | None = None
+    source: Path | None = None
+    remove_source: bool = False
+
+    @property
+    def pending_bytes(self) -> int:
+        """Bytes this entry holds in memory while queued."""
+        return len(self.data) if self.data is not None else 0
+
+
+class ArchiveWriter:
+    """
+    Appends converted documents to a zip or tar.gz archive from many threads.
+
+    A single writer thread owns the archive and serializes all appends, so
+    worker threads only hand entries over a queue and never contend on the
+    archive itself. The queue is bounded both in entries and in bytes held in
+    memory: producers block in add_bytes()/add_file() until the writer catches
+    up. Large binary outputs should be passed as files, which are streamed from
+    disk in chunks and never held in memory.
+
+    The archive is written to a hidden ``.part`` file and renamed into place by
+    close(), so an aborted batch never leaves a truncated archive behind.
+    """
+
+    DEFAULT_MAX_PENDING_BYTES = 64 * 1024 * 1024
+    DEFAULT_MAX_PENDING_ENTRIES = 1024
+
+    def __init__(
+        self,
+        archive_path: Path,
+        archive_format: ArchiveFormat | None = None,
+        max_pending_bytes: int = DEFAULT_MAX_PENDING_BYTES,
+        max_pending_entries: int = DEFAULT_MAX_PENDING_ENTRIES,
+    ) -> None:
+        """
+        Initialize writer and start its thread.
+
+        Args:
+            archive_path: Final archive location
+            archive_format: Archive format (default: detected from archive_path)
+            max_pending_bytes: Maximum in-memory bytes queued for writing
+            max_pending_entries: Maximum number of queued entries
+
+        Raises:
+            ValueError: If the format cannot be determined from archive_path
+        """
+        archive_format = archive_format or ArchiveFormat.from_path(archive_path)
+        if archive_format is None:
+            raise ValueError(f"Unsupported archive type: {archive_path}")
+
+        self.archive_path = archive_path
+        self.archive_format = archive_format
+        self.max_pending_bytes = max(1, max_pending_bytes)
+        self.max_pending_entries = max(1, max_pending_entries)
+
+        self._part_path = archive_path.with_name(f".{archive_path.name}.part")
+        self._queue: deque[_ArchiveEntry] = deque()
+        self._cond = threading.Condition()
+        self._pending_bytes = 0
+        self._peak_pending_bytes = 0
+        self._closed = False
+        self._aborted = False
+        self._error: BaseException | None = None
+        self._names: set[str] = set()
+        self._entry_count = 0
+        self._bytes_written = 0
+
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="archive-writer", daemon=True)
+        self._thread.start()
+
+        logger.info(f"Archive writer started: {archive_path} ({archive_format.value})")
+
+    def add_bytes(self, arcname: str, data: bytes, aliases: tuple[str, ...] = ()) -> None:
+        """
+        Queue in-memory content for the archive.
+
+        Args:
+            arcname: Member name inside the archive
+            data: Member content
+            aliases: Additional member names with the same content
+
+        Raises:
+            RuntimeError: If the writer failed or was closed
+        """
+        self._put(_ArchiveEntry(arcname=arcname, aliases=tuple(aliases), data=data))
+
+    def add_file(
+        self,
+        source: Path,
+        arcname: str,
+        aliases: tuple[str, ...] = (),
+        remove: bool = False,
+    ) -> None:
+        """
+        Queue a file on disk for the archive.
+
+        Args:
+            source: File to stream into the archive
+            arcname: Member name inside the archive
+            aliases: Additional member names with the same content
+            remove: Delete source once it has been written (ownership passes to the writer)
+
+        Raises:
+            RuntimeError: If the writer failed or was closed
+        """
+        self._put(
+            _ArchiveEntry(
+                arcname=arcname, aliases=tuple(aliases), source=source, remove_source=remove
+            )
+        )
+
+    def _put(self, entry: _ArchiveEntry) -> None:
+        """Queue an entry, blocking while the queue is over its memory bounds."""
+        size = entry.pending_bytes
+        with self._cond:
+            while (
+                self._error is None
+                and not self._closed
+                and self._queue
+                and (
+                    self._pending_bytes + size > self.max_pending_bytes
+                    or len(self._queue) >= self.max_pending_entries
+                )
+            ):
+                self._cond.wait()
+
+            if self._error is not None:
+                raise RuntimeError(f"Archive writer failed: {self._error}") from self._error
+            if self._closed:
+                raise RuntimeError("Archive writer is closed")
+
+            self._queue.append(entry)
+            self._pending_bytes += size
+            self._peak_pending_bytes = max(self._peak_pending_bytes, self._pending_bytes)
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        """Writer thread: drain the queue into the archive."""
+        archive: zipfile.ZipFile | tarfile.TarFile | None = None
+        try:
+            if self.archive_format == ArchiveFormat.ZIP:
+                archive = zipfile.ZipFile(
+                    self._part_path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True
+                )
+            else:
+                archive = tarfile.open(self._part_path, "w:gz")
+
+            while True:
+                with self._cond:
+                    while not self._queue and not self._closed:
+                        self._cond.wait()
+                    if not self._queue or self._aborted:
+                        break
+                    entry = self._queue.popleft()
+
+                try:
+                    self._write_entry(archive, entry)
+                finally:
+                    if entry.remove_source and entry.source is not None:
+                        entry.source.unlink(missing_ok=True)
+                    with self._cond:
+                        self._pending_bytes -= entry.pending_bytes
+                        self._cond.notify_all()
+
+            archive.close()
+            archive = None
+
+            if self._aborted:
+                self._part_path.unlink(missing_ok=True)
+            else:
+                os.replace(self._part_path, self.archive_path)
+                logger.info(
+                    f"Archive written: {self.archive_path} "
+                    f"({self._entry_count} entries, {self._bytes_written:,} bytes)"
+                )
+
+        except BaseException as e:
+            logger.error(f"Archive writer error: {e}")
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+            if archive is not None:
+                try:
+                    archive.close()
+                except Exception:
+                    pass
+            self._part_path.unlink(missing_ok=True)
+
+        finally:
+            # Release anything still queued after an abort or error
+            with self._cond:
+                while self._queue:
+                    entry = self._queue.popleft()
+                    if entry.remove_source and entry.source is not None:
+                        entry.source.unlink(missing_ok=True)
+                self._pending_bytes = 0
+                self._cond.notify_all()
+
+    def _write_entry(
+        self, archive: zipfile.ZipFile | tarfile.TarFile, entry: _ArchiveEntry
+    ) -> None:
+        """Write one entry and its aliases."""
+        names = [name for name in (entry.arcname, *entry.aliases) if name not in self._names]
+        if len(names) < 1 + len(entry.aliases):
+            logger.warning(f"Skipping duplicate archive member(s) for {entry.arcname}")
+        if not names:
+            return
+
+        mtime = time.time()
+        if isinstance(archive, zipfile.ZipFile):
+            date_time = time.localtime(mtime)[:6]
+            for name in names:
+                info = zipfile.ZipInfo(name, date_time=date_time)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                if entry.data is not None:
+                    archive.writestr(info, entry.data)
+                elif entry.source is not None:
+                    with (
+                        open(entry.source, "rb") as src,
+                        archive.open(info, "w", force_zip64=True) as dst,
+                    ):
+                        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+                self._record(name, entry)
+            return
+
+        first, *links = names
+        info = tarfile.TarInfo(first)
+        info.mtime = int(mtime)
+        info.mode = 0o644
+        if entry.data is not None:
+            info.size = len(entry.data)
+            archive.addfile(info, io.BytesIO(entry.data))
+        elif entry.source is not None:
+            info.size = entry.source.stat().st_size
+            with open(entry.source, "rb") as src:
+                archive.addfile(info, src)
+        self._record(first, entry)
+
+        # Identical content is stored once; aliases become tar hardlinks
+        for name in links:
+            link = tarfile.TarInfo(name)
+            link.type = tarfile.LNKTYPE
+            link.linkname = first
+            link.mtime = int(mtime)
+            link.mode = 0o644
+            archive.addfile(link)
+            self._names.add(name)
+            self._entry_count += 1
+
+    def _record(self, name: str, entry: _ArchiveEntry) -> None:
+        """Update statistics after writing a member."""
+        self._names.add(name)
+        self._entry_count += 1
+        if entry.data is not None:
+            self._bytes_written += len(entry.data)
+        elif entry.source is not None:
+            self._bytes_written += entry.source.stat().st_size
+
+    def close(self) -> None:
+        """
+        Finish writing and move the archive into place.
+
+        Raises:
+            RuntimeError: If the writer thread failed
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+        if self._error is not None:
+            raise RuntimeError(f"Archive writer failed: {self._error}") from self._error
+
+    def abort(self) -> None:
+        """Stop writing and discard the partial archive."""
+        with self._cond:
+            self._closed = True
+            self._aborted = True
+            self._cond.notify_all()
+        self._thread.join()
+        logger.info(f"Archive writer aborted: {self.archive_path}")
+
+    @property
+    def entry_count(self) -> int:
+        """Get number of members written so far."""
+        return self._entry_count
+
+    @property
+    def bytes_written(self) -> int:
+        """Get uncompressed bytes written so far."""
+        return self._bytes_written
+
+    @property
+    def peak_pending_bytes(self) -> int:
+        """Get the largest number of in-memory bytes that were queued at once."""
+        with self._cond:
+            return self._peak_pending_bytes
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def normalize_member_name(name: str) -> str:
+    """
+    Get the canonical form of an archive member name.
+
+    Archives made with ``tar czf docs.tgz .`` name their members ``./docs/a.md``;
+    inputs and lookups use ``docs/a.md``.
+
+    Args:
+        name: Member name as stored in the archive
+
+    Returns:
+        Name without empty and "." parts
+    """
+    return "/".join(part for part in name.split("/") if part and part != ".")
+
+
+class ArchiveReader:
+    """
+    Read-only access to the members of a zip or tar archive.
+
+    Members are looked up by their normalized name (see normalize_member_name),
+    whatever form the archive stores them in. Readers are not shared between
+    threads; SharedArchive.reader() gives each thread a cheap one.
+    """
+
+    def __init__(
+        self,
+        archive_path: Path,
+        archive_format: ArchiveFormat | None = None,
+        shared: "SharedArchive | None" = None,
+    ) -> None:
+        """
+        Open archive for reading.
+
+        Args:
+            archive_path: Archive file
+            archive_format: Archive format (default: detected from archive_path)
+            shared: Archive already opened and indexed, reused instead of
+                scanning archive_path again
+
+        Raises:
+            ValueError: If the format cannot be determined from archive_path
+        """
+        archive_format = archive_format or ArchiveFormat.from_path(archive_path)
+        if archive_format is None:
+            raise ValueError(f"Unsupported archive type: {archive_path}")
+
+        self.archive_path = archive_path
+        self.archive_format = archive_format
+        self._zip: zipfile.ZipFile | None = None
+        self._tar: tarfile.TarFile | None = None
+        self._owns_zip = shared is None
+        self._index: dict[str, zipfile.ZipInfo | tarfile.TarInfo] | None = None
+
+        self._shared = shared
+        if shared is not None:
+            self._index = shared.index
+            if shared.zip_file is not None:
+                self._zip = shared.zip_file
+            elif shared.compression is None:
+                # Plain tar: opening reads only the first header
+                self._tar = tarfile.open(archive_path, "r:")
+        elif archive_format == ArchiveFormat.ZIP:
+            self._zip = zipfile.ZipFile(archive_path)
+        else:
+            self._tar = tarfile.open(archive_path, "r:*")
+
+    @property
+    def index(self) -> dict[str, zipfile.ZipInfo | tarfile.TarInfo]:
+        """Get the regular file members by normalized name, in archive order."""
+        if self._index is None:
+            self._index = _index_members(self._zip, self._tar)
+        return self._index
+
+    def members(self) -> list[tuple[str, int]]:
+        """
+        List regular file members.
+
+        Returns:
+            List of (normalized member_name, size) in archive order
+        """
+        return [(name, _member_size(info)) for name, info in self.index.items()]
+
+    def has_member(self, name: str) -> bool:
+        """Check if a regular file member exists."""
+        return normalize_member_name(name) in self.index
+
+    def open(self, name: str) -> IO[bytes]:
+        """
+        Open a member for streaming reads.
+
+        Raises:
+            KeyError: If the member does not exist
+        """
+        info = self.index[normalize_member_name(name)]
+        if self._zip is not None:
+            return self._zip.open(info)
+        if self._tar is None:
+            assert self._shared is not None and isinstance(info, tarfile.TarInfo)
+            return self._shared.open_member(info)
+        stream = self._tar.extractfile(info)
+        if stream is None:
+            raise KeyError(f"Not a regular file: {name}")
+        return stream
+
+    def extract(self, name: str, dest_dir: Path) -> Path | None:
+        """
+        Extract a single member below dest_dir.
+
+        Args:
+            name: Member name
+            dest_dir: Directory that mirrors the archive layout
+
+        Returns:
+            Extracted path, or None if the member is missing or escapes dest_dir
+        """
+        normalized = posixpath.normpath(name)
+        if normalized.startswith(("/", "../")) or normalized == "..":
+            logger.warning(f"Refusing to extract unsafe archive member: {name}")
+            return None
+        if not self.has_member(normalized):
+            return None
+
+        target = dest_dir / normalized
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with self.open(normalized) as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+        return target
+
+    def stream_member(self, name: str, sink: IO[bytes], resource_dir: Path | None = None) -> int:
+        """
+        Stream a member into sink and extract the resources it references.
+
+        References are collected from the stream as it passes through, and only
+        those that exist in the archive are extracted, relative to the member's
+        directory, into resource_dir. Extraction happens before sink sees EOF, so a
+        reader like pandoc has every resource in place before it starts writing.
+
+        Args:
+            name: Member name
+            sink: Binary stream to copy the member into (not closed)
+            resource_dir: Directory receiving referenced resources (None: skip)
+
+        Returns:
+            Number of resources extracted
+        """
+        name = normalize_member_name(name)
+        references: set[str] = set()
+        tail = b""
+        with self.open(name) as src:
+            while chunk := src.read(COPY_CHUNK_SIZE):
+                sink.write(chunk)
+                if resource_dir is not None:
+                    window = tail + chunk
+                    for match in RESOURCE_REFERENCE_PATTERN.finditer(window):
+                        ref = next(group for group in match.groups() if group)
+                        references.add(ref.decode("utf-8", errors="ignore"))
+                    tail = window[-REFERENCE_OVERLAP:]
+        sink.flush()
+
+        if resource_dir is None:
+            return 0
+
+        base = posixpath.dirname(name)
+        extracted = 0
+        for ref in references:
+            if ref.startswith(("/", "#")) or ":" in ref.split("/", 1)[0]:
+                continue  # absolute path, anchor or URL
+            member = posixpath.normpath(posixpath.join(base, ref.split("#", 1)[0]))
+            if member != name and self.extract(member, resource_dir) is not None:
+                extracted += 1
+
+        if extracted:
+            logger.debug(f"Extracted {extracted} resources referenced by {name}")
+        return extracted
+
+    def close(self) -> None:
+        """Close the archive."""
+        if self._zip is not None and self._owns_zip:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        self.close()
+
+
+class SharedArchive:
+    """
+    An input archive opened and indexed once, then read by many threads.
+
+    A batch reads one member per task. Reopening the archive per task rescans
+    its member list, and in a tar.gz every backwards seek decompresses the
+    stream again from the start, so n members would cost O(n²).
+
+    A zip's central directory already gives random access, and zipfile allows
+    concurrent reads, so all readers share one ZipFile. A plain tar is indexed
+    once and each reader seeks in its own handle.
+
+    A compressed tar is decompressed once, sequentially, to index its members;
+    nothing is written to disk. For gzip the decompressor state is saved every
+    CHECKPOINT_SPACING uncompressed bytes (zlib can copy it), so reading any
+    member later decompresses at most that much before the member starts.
+    Streams left where a read stopped are kept for reuse, so members read in
+    archive order, as batches do, cost one more sequential pass in total; bzip2
+    and xz, whose state cannot be saved, rely on those alone.
+
+    Handles come from get_shared_archive() with a reference held; release()
+    them when done. The archive closes once it has been evicted from the cache
+    and its last reference is released.
+    """
+
+    CHECKPOINT_SPACING = 4 * 1024 * 1024
+    MAX_IDLE_STREAMS = 4
+
+    def __init__(self, archive_path: Path, archive_format: ArchiveFormat | None = None) -> None:
+        """
+        Create an unopened shared archive; open() reads and indexes it.
+
+        Args:
+            archive_path: Archive file
+            archive_format: Archive format (default: detected from archive_path)
+
+        Raises:
+            ValueError: If the format cannot be determined from archive_path
+        """
+        archive_format = archive_format or ArchiveFormat.from_path(archive_path)
+        if archive_format is None:
+            raise ValueError(f"Unsupported archive type: {archive_path}")
+
+        self.archive_path = archive_path
+        self.archive_format = archive_format
+        self.zip_file: zipfile.ZipFile | None = None
+        self.compression: str | None = None  # "gz", "bz2" or "xz" for compressed tars
+        self.index: dict[str, zipfile.ZipInfo | tarfile.TarInfo] = {}
+        self._opened = False
+        self._open_lock = threading.Lock()
+        self._lock = threading.Lock()  # references, checkpoints and idle streams
+        self._references = 0
+        self._evicted = False
+        self._closed = False
+        self._checkpoints: list[_Checkpoint] = []
+        self._idle_streams: list[_TarStream] = []
+
+    def open(self) -> "SharedArchive":
+        """
+        Read the member index once; later calls return at once.
+
+        Returns:
+            This archive
+        """
+        with self._open_lock:
+            if self._opened:
+                return self
+            if self.archive_format == ArchiveFormat.ZIP:
+                self.zip_file = zipfile.ZipFile(self.archive_path)
+                self.index = _index_members(self.zip_file, None)
+            else:
+                with open(self.archive_path, "rb") as f:
+                    magic = f.read(6)
+                self.compression = next(
+                    (kind for prefix, kind in _COMPRESSED_MAGIC if magic.startswith(prefix)), None
+                )
+                if self.compression is None:
+                    with tarfile.open(self.archive_path, "r:") as tar:
+                        self.index = _index_members(None, tar)
+                else:
+                    self._index_compressed()
+            self._opened = True
+            return self
+
+    def _index_compressed(self) -> None:
+        """Index a compressed tar in one sequential pass, saving gzip checkpoints."""
+        stream = _TarStream(self.archive_path, self.compression)
+        if self.compression == "gz":
+            stream.checkpoint_every(self.CHECKPOINT_SPACING, self._checkpoints.append)
+        try:
+            with tarfile.open(fileobj=stream, mode="r|") as tar:
+                self.index = {
+                    normalize_member_name(info.name): info
+                    for info in tar
+                    if info.isfile() and not info.issparse()
+                }
+        finally:
+            stream.close()
+        logger.debug(
+            f"Indexed {self.archive_path}: {len(self.index)} members, "
+            f"{len(self._checkpoints)} checkpoints"
+        )
+
+    def reader(self) -> ArchiveReader:
+        """Get a reader for the calling thread."""
+        return ArchiveReader(self.archive_path, self.archive_format, shared=self)
+
+    def members(self) -> list[tuple[str, int]]:
+        """
+        List regular file members.
+
+        Returns:
+            List of (normalized member_name, size) in archive order
+        """
+        return [(name, _member_size(info)) for name, info in self.index.items()]
+
+    def open_member(self, info: tarfile.TarInfo) -> IO[bytes]:
+        """Open a member of a compressed tar, starting from the nearest saved position."""
+        target = info.offset_data
+        with self._lock:
+            idle = [s for s in self._idle_streams if s.position <= target]
+            stream = max(idle, key=lambda s: s.position, default=None)
+            checkpoint = None
+            for candidate in self._checkpoints:
+                if candidate.position > target:
+                    break
+                checkpoint = candidate
+            if stream is not None and (
+                checkpoint is None or stream.position >= checkpoint.position
+            ):
+                self._idle_streams.remove(stream)
+            else:
+                stream = None
+        if stream is None:
+            stream = _TarStream(self.archive_path, self.compression, checkpoint)
+        stream.skip_to(target)
+        return io.BufferedReader(_MemberStream(self, stream, info.size), COPY_CHUNK_SIZE)
+
+    def _return_stream(self, stream: "_TarStream") -> None:
+        """Keep a stream for the next member after it, closing the one furthest back."""
+        with self._lock:
+            if not self._closed:
+                self._idle_streams.append(stream)
+                if len(self._idle_streams) <= self.MAX_IDLE_STREAMS:
+                    return
+                self._idle_streams.sort(key=lambda s: s.position)
+                stream = self._idle_streams.pop(0)
+        stream.close()
+
+    def acquire(self) -> "SharedArchive":
+        """Take a reference, keeping the archive open until release()."""
+        with self._lock:
+            self._references += 1
+        return self
+
+    def release(self) -> None:
+        """Drop a reference; closes the archive if it was evicted and this was the last."""
+        with self._lock:
+            self._references -= 1
+            close = self._evicted and self._references <= 0
+        if close:
+            self.close()
+
+    def _evict(self) -> None:
+        """Mark the archive evicted from the cache, closing it unless still in use."""
+        with self._lock:
+            self._evicted = True
+            close = self._references <= 0
+        if close:
+            self.close()
+
+    def __enter__(self) -> "SharedArchive":
+        return self
+
+    def __exit__(self, exc_type: object, exc: object, tb: object) -> None:
+        self.release()
+
+    def close(self) -> None:
+        """Close the zip and the decompressing streams."""
+        with self._lock:
+            self._closed = True
+            streams, self._idle_streams = self._idle_streams, []
+            self._checkpoints = []
+        for stream in streams:
+            stream.close()
+        if self.zip_file is not None:
+            self.zip_file.close()
+
+
+@dataclass
+class _Checkpoint:
+    """Saved gzip decompressor state at an uncompressed position."""
+
+    position: int  # Uncompressed offset of the next byte the decompressor produces
+    raw_offset: int  # Compressed offset of the next byte to read from the file
+    pending_input: bytes  # Compressed bytes read but not yet consumed
+    decompressor: "zlib._Decompress"
+
+
+class _TarStream:
+    """
+    Sequential reader of a compressed tar's uncompressed bytes.
+
+    Handles concatenated gzip, bzip2 and xz streams. Output is produced in
+    pieces of at most COPY_CHUNK_SIZE, so memory stays bounded however well
+    the data compresses.
+    """
+
+    def __init__(
+        self, archive_path: Path, compression: str | None, checkpoint: _Checkpoint | None = None
+    ) -> None:
+        self.compression = compression
+        self._file = open(archive_path, "rb")
+        self._pending = b""  # decompressed, not yet read
+        self._eof = False
+        self._on_checkpoint = None
+        self._spacing = 0
+        self._next_checkpoint = 0
+        if checkpoint is None:
+            self._decompressor = _new_decompressor(compression)
+            self._input = b""
+            self._produced = 0
+        else:
+            self._file.seek(checkpoint.raw_offset)
+            self._decompressor = checkpoint.decompressor.copy()
+            self._input = checkpoint.pending_input
+            self._produced = checkpoint.position
+
+    @property
+    def position(self) -> int:
+        """Get the uncompressed offset the next read() starts at."""
+        return self._produced - len(self._pending)
+
+    def checkpoint_every(self, spacing: int, callback) -> None:
+        """Call callback with a _Checkpoint each time spacing more bytes are produced."""
+        self._spacing = spacing
+        self._on_checkpoint = callback
+        self._next_checkpoint = self._produced
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size uncompressed bytes (all remaining if negative)."""
+        if size < 0:
+            parts = [self._pending]
+            self._pending = b""
+            while chunk := self._inflate():
+                parts.append(chunk)
+            return b"".join(parts)
+        if not self._pending:
+            self._pending = self._inflate()
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def skip_to(self, position: int) -> None:
+        """Discard uncompressed bytes up to position (which must not be behind)."""
+        while self.position < position:
+            if not self._pending:
+                self._pending = self._inflate()
+                if not self._pending:
+                    raise EOFError(f"Archive ended before offset {position}")
+            self._pending = self._pending[position - self.position :]
+
+    def _inflate(self) -> bytes:
+        """Decompress the next piece of output; empty at the end of the data."""
+        while not self._eof:
+            if self._on_checkpoint is not None and self._produced >= self._next_checkpoint:
+                self._on_checkpoint(
+                    _Checkpoint(
+                        self._produced, self._file.tell(), self._input, self._decompressor.copy()
+                    )
+                )
+                self._next_checkpoint = self._produced + self._spacing
+            decompressor = self._decompressor
+            if self.compression == "gz":
+                if not self._input and not decompressor.eof:
+                    self._input = self._file.read(COPY_CHUNK_SIZE)
+                    if not self._input:
+                        self._eof = True
+                        break
+                out = decompressor.decompress(self._input, COPY_CHUNK_SIZE)
+                self._input = decompressor.unconsumed_tail
+            else:
+                if decompressor.needs_input and not self._input:
+                    self._input = self._file.read(COPY_CHUNK_SIZE)
+                    if not self._input and not decompressor.eof:
+                        self._eof = True
+                        break
+                data = self._input if decompressor.needs_input else b""
+                out = decompressor.decompress(data, COPY_CHUNK_SIZE)
+                if data:
+                    self._input = b""
+            if decompressor.eof:
+                self._next_stream(decompressor.unused_data + self._input)
+            if out:
+                self._produced += len(out)
+                return out
+        return b""
+
+    def _next_stream(self, rest: bytes) -> None:
+        """Continue with a concatenated stream after the end of one, if there is one."""
+        if not rest:
+            rest = self._file.read(COPY_CHUNK_SIZE)
+        magic = next(prefix for prefix, kind in _COMPRESSED_MAGIC if kind == self.compression)
+        if rest.startswith(magic):
+            self._decompressor = _new_decompressor(self.compression)
+            self._input = rest
+        else:
+            self._eof = True  # end of data, or trailing padding
+
+    def close(self) -> None:
+        """Close the archive file."""
+        self._file.close()
+
+
+class _MemberStream(io.RawIOBase):
+    """One member's bytes from a _TarStream, which goes back to its archive on close."""
+
+    def __init__(self, archive: SharedArchive, stream: _TarStream, size: int) -> None:
+        super().__init__()
+        self._archive = archive
+        self._stream: _TarStream | None = stream
+        self._remaining = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._stream is None or self._remaining <= 0:
+            return 0
+        data = self._stream.read(min(len(buffer), self._remaining))
+        if not data:
+            raise EOFError("Archive ended inside a member")
+        buffer[: len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self) -> None:
+        if self._stream is not None:
+            stream, self._stream = self._stream, None
+            self._archive._return_stream(stream)
+        super().close()
+
+
+def _new_decompressor(compression: str | None):
+    """Create a decompressor for one gzip, bzip2 or xz stream."""
+    if compression == "gz":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if compression == "bz2":
+        return bz2.BZ2Decompressor()
+    return lzma.LZMADecompressor()
+
+
+# Magic bytes of the compressions tarfile's "r:*" mode accepts
+_COMPRESSED_MAGIC = (
+    (b"\x1f\x8b", "gz"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+)
+
+MAX_SHARED_ARCHIVES = 2
+_shared_archives: "OrderedDict[tuple, SharedArchive]" = OrderedDict()
+_shared_lock = threading.Lock()
+
+
+def get_shared_archive(archive_path: Path) -> SharedArchive:
+    """
+    Get the shared, indexed instance of an input archive, with a reference held.
+
+    The archive is opened on first use and reused by every task of the batch
+    (and by the scan that listed it). An archive that changed on disk is
+    opened again. Only the MAX_SHARED_ARCHIVES most recently used archives are
+    cached; an evicted one closes once its last user releases it. Opening
+    holds only that archive's own lock, so a large archive being indexed does
+    not block lookups of others.
+
+    Args:
+        archive_path: Archive file
+
+    Returns:
+        Opened SharedArchive of archive_path; call release(), or use it as a
+        context manager
+    """
+    stat = os.stat(archive_path)
+    key = (os.path.abspath(archive_path), stat.st_mtime_ns, stat.st_size)
+    with _shared_lock:
+        shared = _shared_archives.get(key)
+        if shared is None:
+            shared = _shared_archives[key] = SharedArchive(archive_path)
+        _shared_archives.move_to_end(key)
+        shared.acquire()
+        evicted = []
+        while len(_shared_archives) > MAX_SHARED_ARCHIVES:
+            evicted.append(_shared_archives.popitem(last=False)[1])
+    for archive in evicted:
+        archive._evict()
+    try:
+        return shared.open()
+    except BaseException:
+        shared.release()
+        raise
+
+
+@atexit.register
+def close_shared_archives() -> None:
+    """Evict every shared archive, closing those not in use."""
+    with _shared_lock:
+        archives = list(_shared_archives.values())
+        _shared_archives.clear()
+    for archive in archives:
+        archive._evict()
+
+
+def _index_members(
+    zip_file: zipfile.ZipFile | None, tar: tarfile.TarFile | None
+) -> dict[str, zipfile.ZipInfo | tarfile.TarInfo]:
+    """Index the regular file members of an archive by normalized name."""
+    if zip_file is not None:
+        return {
+            normalize_member_name(info.filename): info
+            for info in zip_file.infolist()
+            if not info.is_dir()
+        }
+    assert tar is not None
+    return {normalize_member_name(info.name): info for info in tar.getmembers() if info.isfile()}
+
+
+def _member_size(info: zipfile.ZipInfo | tarfile.TarInfo) -> int:
+    """Get the uncompressed size of a member."""
+    return info.file_size if isinstance(info, zipfile.ZipInfo) else info.size
@@ -0,0 +1,479 @@
+"""
+Prometheus/OpenMetrics metrics with a loopback HTTP endpoint and textfile export.
+"""
+
+import bisect
+import ipaddress
+import logging
+import math
+import os
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+TEXT_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Seconds; covers sub-millisecond no-op tasks up to the default pandoc timeout
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class _Metric:
+    """A metric family: one value (or histogram) per combination of label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], object] = {}
+        if not labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def labels(self, *values: object):
+        """
+        Get the child for one combination of label values.
+
+        Children are cached, so hot paths can keep the returned object.
+
+        Args:
+            *values: Label values in labelnames order
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self) -> list[tuple[tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+
+class _Value:
+    """A single counter or gauge value."""
+
+    __slots__ = ("_lock", "_value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add to the value."""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Subtract from the value (gauges only by convention)."""
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        """Replace the value (gauges only by convention)."""
+        with self._lock:
+            self._value = value
+
+    @property
+    def value(self) -> float:
+        """Get the current value."""
+        with self._lock:
+            return self._value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count; the name should end in _total."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment an unlabelled counter."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self.labels().inc(amount)
+
+    def value(self, *labels: object) -> float:
+        """Get the count for one combination of label values."""
+        return self.labels(*labels).value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, either set directly or computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._function: Callable[[], float] | None = None
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        """Set an unlabelled gauge."""
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """
+        Compute an unlabelled gauge when it is collected instead of on every change.
+
+        Args:
+            function: Called from the exporting thread; must be thread-safe
+        """
+        self._function = function
+
+    def value(self, *labels: object) -> float:
+        """Get the value for one combination of label values."""
+        if self._function is not None and not labels:
+            return float(self._function())
+        return self.labels(*labels).value
+
+    def _items(self) -> list[tuple[tuple[str, ...], object]]:
+        if self._function is None:
+            return super()._items()
+        try:
+            value = float(self._function())
+        except Exception as e:
+            logger.debug(f"Gauge {self.name} collection failed: {e}")
+            value = math.nan
+        child = _Value()
+        child.set(value)
+        return [((), child)]
+
+
+class _HistogramValue:
+    """Bucket counts, sum and count of one histogram series."""
+
+    __slots__ = ("_lock", "_upper_bounds", "_counts", "_sum")
+
+    def __init__(self, upper_bounds: tuple[float, ...]) -> None:
+        self._lock = threading.Lock()
+        self._upper_bounds = upper_bounds
+        self._counts = [0] * (len(upper_bounds) + 1)  # last one is +Inf
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        index = bisect.bisect_left(self._upper_bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        """Get cumulative bucket counts (ending with +Inf) and the sum."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total
+
+    @property
+    def count(self) -> int:
+        """Get the number of observations."""
+        with self._lock:
+            return sum(self._counts)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.upper_bounds = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        """Record an observation in an unlabelled histogram."""
+        self.labels().observe(value)
+
+
+class MetricsRegistry:
+    """Named metric families and their text exposition."""
+
+    def __init__(self) -> None:
+        """Initialize empty registry."""
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        """Add a metric, or return the existing one of the same name and type."""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} is already registered differently")
+        return existing
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge(name, help, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+    def get(self, name: str) -> _Metric | None:
+        """Get a registered metric by name."""
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self, openmetrics: bool = False) -> str:
+        """
+        Render all metrics in the Prometheus text format.
+
+        Args:
+            openmetrics: Use OpenMetrics 1.0 text instead of Prometheus 0.0.4
+
+        Returns:
+            Exposition text
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+
+        lines: list[str] = []
+        for metric in metrics:
+            family = metric.name
+            if openmetrics and metric.kind == "counter" and family.endswith("_total"):
+                family = family[: -len("_total")]
+            lines.append(f"# HELP {family} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {family} {metric.kind}")
+            lines.extend(_samples(metric))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _samples(metric: _Metric) -> Iterator[str]:
+    """Yield the sample lines of one metric family."""
+    for values, child in metric._items():
+        labels = list(zip(metric.labelnames, values, strict=True))
+        if isinstance(child, _HistogramValue):
+            cumulative, total = child.snapshot()
+            bounds = [*(_format_value(b) for b in metric.upper_bounds), "+Inf"]
+            for bound, count in zip(bounds, cumulative, strict=True):
+                yield f"{metric.name}_bucket{_format_labels([*labels, ('le', bound)])} {count}"
+            yield f"{metric.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{metric.name}_count{_format_labels(labels)} {cumulative[-1]}"
+        else:
+            yield f"{metric.name}{_format_labels(labels)} {_format_value(child.value)}"
+
+
+def _format_labels(labels: list[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels)
+    return "{" + inner + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 2**53:
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsServer:
+    """
+    Serves /metrics over HTTP on a loopback address.
+
+    Scrapes run on the server's own threads and only read metric values, so
+    conversions are never blocked by a slow scraper.
+    """
+
+    def __init__(
+        self, port: int = 0, host: str = "127.0.0.1", registry: MetricsRegistry | None = None
+    ) -> None:
+        """
+        Initialize server (call start() to listen).
+
+        Args:
+            port: TCP port (0 picks a free one)
+            host: Loopback address to bind
+            registry: Metrics to serve (global registry if None)
+
+        Raises:
+            ValueError: If host is not a loopback address
+        """
+        if host != "localhost" and not ipaddress.ip_address(host).is_loopback:
+            raise ValueError(f"Metrics are only served on loopback addresses, not {host}")
+        self.host = host
+        self.registry = registry or get_metrics_registry()
+        self._requested_port = port
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> int:
+        """Get the port being listened on (0 before start())."""
+        return self._server.server_address[1] if self._server else 0
+
+    def start(self) -> None:
+        """Start listening in a daemon thread."""
+        if self._server is not None:
+            return
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = registry.render(openmetrics).encode("utf-8")
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else TEXT_CONTENT_TYPE
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                logger.debug(f"Metrics scrape: {format % args}")
+
+        self._server = ThreadingHTTPServer((self.host, self._requested_port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-server", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self) -> None:
+        """Stop listening."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._server = None
+        self._thread = None
+
+
+class TextfileExporter:
+    """
+    Periodically rewrites a .prom file for node_exporter's textfile collector.
+
+    The file is replaced atomically, so the collector never reads a partial
+    write.
+    """
+
+    def __init__(
+        self, path: Path, interval: float = 15.0, registry: MetricsRegistry | None = None
+    ) -> None:
+        """
+        Initialize exporter (call start() to begin writing).
+
+        Args:
+            path: Output file, normally in the collector's directory and ending in .prom
+            interval: Seconds between rewrites
+            registry: Metrics to write (global registry if None)
+        """
+        self.path = path
+        self.interval = interval
+        self.registry = registry or get_metrics_registry()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def write(self) -> None:
+        """Write the current metrics now."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Not *.prom, so the collector skips it while it is being written
+        temp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(self.registry.render(), encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+    def start(self) -> None:
+        """Start rewriting the file in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-textfile", daemon=True)
+        self._thread.start()
+        logger.info(f"Writing metrics to {self.path} every {self.interval:g}s")
+
+    def stop(self) -> None:
+        """Stop the writer thread after a final write."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"Could not write metrics textfile {self.path}: {e}")
+            if self._stop.wait(self.interval):
+                break
+        try:
+            self.write()
+        except OSError as e:
+            logger.warning(f"Could not write metrics textfile {self.path}: {e}")
+
+
+# Global instance for easy access
+_metrics_registry: MetricsRegistry | None = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get global metrics registry instance."""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+    return _metrics_registry
@@ -0,0 +1,167 @@
+"""
+Bounded capture of pandoc's diagnostic output.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HEAD_BYTES = 16 * 1024
+TAIL_BYTES = 16 * 1024
+MAX_SPILL_FILES = 200
+READ_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass
+class CapturedOutput:
+    """Head and tail of a captured stream, with the full text spilled to a file if cut."""
+
+    head: bytes = b""
+    tail: bytes = b""
+    total_bytes: int = 0
+    spill_path: Path | None = None
+
+    @property
+    def omitted_bytes(self) -> int:
+        """Get the number of bytes between head and tail that are not in memory."""
+        return self.total_bytes - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        """
+        Decode the captured output.
+
+        Decoding happens only here, so successful runs never pay for it.
+
+        Returns:
+            The output, with a marker in place of the omitted middle
+        """
+        head = self.head.decode("utf-8", errors="replace")
+        tail = self.tail.decode("utf-8", errors="replace")
+        if self.omitted_bytes <= 0:
+            return head + tail
+        where = f"; full output in {self.spill_path}" if self.spill_path else ""
+        return f"{head}\n[... {self.omitted_bytes} bytes omitted{where} ...]\n{tail}"
+
+
+class OutputCapture:
+    """
+    Captures a child's output in an anonymous temporary file.
+
+    The child writes straight to the file, so nothing is buffered in this
+    process while it runs. Afterwards only the first head_bytes and last
+    tail_bytes are read back; when the output is longer, spill() copies the
+    whole file to a log directory so nothing is lost. Memory use is therefore
+    bounded however verbose the child is.
+    """
+
+    def __init__(self, head_bytes: int = HEAD_BYTES, tail_bytes: int = TAIL_BYTES):
+        """
+        Initialize capture.
+
+        Args:
+            head_bytes: Bytes kept from the start of the output
+            tail_bytes: Bytes kept from the end of the output
+        """
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.file = tempfile.TemporaryFile(prefix="pandoc-ui-out-")
+        self._read_offset = 0
+
+    def __enter__(self) -> "OutputCapture":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Delete the temporary file."""
+        self.file.close()
+
+    def read_new(self) -> Iterator[bytes]:
+        """
+        Read what the child wrote since the previous call while it still runs.
+
+        The file is read with os.pread, so the offset the child shares with
+        self.file never moves. Where pread is missing (Windows) nothing is
+        returned until the child exits.
+
+        Yields:
+            Chunks of at most READ_CHUNK_BYTES
+        """
+        if not hasattr(os, "pread"):
+            return
+        fd = self.file.fileno()
+        while True:
+            chunk = os.pread(fd, READ_CHUNK_BYTES, self._read_offset)
+            if not chunk:
+                return
+            self._read_offset += len(chunk)
+            yield chunk
+
+    def collect(self) -> CapturedOutput:
+        """
+        Read back the head and tail once the child has exited.
+
+        Returns:
+            CapturedOutput of the child's output; call spill() to keep the full
+            text when its omitted_bytes is positive
+        """
+        size = os.fstat(self.file.fileno()).st_size
+        self.file.seek(0)
+        if size <= self.head_bytes + self.tail_bytes:
+            return CapturedOutput(head=self.file.read(size), total_bytes=size)
+
+        head = self.file.read(self.head_bytes)
+        self.file.seek(size - self.tail_bytes)
+        return CapturedOutput(head=head, tail=self.file.read(self.tail_bytes), total_bytes=size)
+
+    def spill(self, spill_dir: Path, name: str) -> Path | None:
+        """
+        Copy the full output into spill_dir, pruning the oldest spill files.
+
+        Args:
+            spill_dir: Directory receiving the output
+            name: Stem of the file name, such as the input's name
+
+        Returns:
+            Path of the saved output, or None if it could not be written
+        """
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = spill_dir / f"{name}-{stamp}-{uuid.uuid4().hex[:8]}.log"
+        try:
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            self.file.seek(0)
+            with open(path, "wb") as f:
+                shutil.copyfileobj(self.file, f)
+        except OSError as e:
+            logger.warning(f"Could not save full pandoc output to {path}: {e}")
+            return None
+        prune_spill_files(spill_dir)
+        return path
+
+
+def prune_spill_files(spill_dir: Path, keep: int = MAX_SPILL_FILES) -> None:
+    """
+    Delete all but the newest spill files.
+
+    Args:
+        spill_dir: Directory holding the spill files
+        keep: Number of files to keep
+    """
+    try:
+        files = sorted(spill_dir.glob("*.log"), key=lambda path: path.stat().st_mtime)
+    except OSError:
+        return
+    for path in files[: max(0, len(files) - keep)]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,184 @@
+"""
+Live progress parsed from pandoc's --verbose output.
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+
+# Flag requesting the messages parsed below
+VERBOSE_FLAG = "--verbose"
+# Flags that already choose pandoc's verbosity
+VERBOSITY_FLAGS = frozenset({"--verbose", "--trace", "--quiet"})
+# Line prefixes of the informational messages --verbose and --trace add
+VERBOSE_PREFIXES = ("[INFO]", "[trace]", "[makePDF]")
+# Headers followed by unprefixed lines (temp dir, command line, environment,
+# the LaTeX source, each pass's log) that belong to the message
+BLOCK_PREFIXES = ("[makePDF]",)
+
+MAX_LINE_BYTES = 4096
+
+_LATEX_RUN = re.compile(rb"LaTeX run number (\d+)|Run #(\d+)")
+# Lines that end a verbose block: another tagged message or pandoc's error
+_BLOCK_END = re.compile(
+    r"\[(?:WARNING|ERROR|INFO|makePDF|trace)\]|Error producing|Error running filter|pandoc: "
+)
+_OMITTED_MARKER = "[... "
+
+
+class PandocPhase(Enum):
+    """Stage a running pandoc has reached."""
+
+    PARSING = "parsing"
+    FILTERS = "filters"
+    WRITING = "writing"
+    LATEX = "latex"
+
+
+# Rough share of the run done when a phase starts; LaTeX runs add 10 each
+PHASE_PERCENT = {
+    PandocPhase.PARSING: 10,
+    PandocPhase.FILTERS: 40,
+    PandocPhase.WRITING: 60,
+    PandocPhase.LATEX: 70,
+}
+MAX_RUNNING_PERCENT = 95
+
+
+@dataclass(frozen=True)
+class PandocProgress:
+    """A phase change or warning reported by a running pandoc."""
+
+    phase: PandocPhase
+    percent: int
+    message: str
+    warning: bool = False
+
+
+def with_verbose(cmd: list[str]) -> list[str]:
+    """
+    Add --verbose to a pandoc command unless it already sets the verbosity.
+
+    Args:
+        cmd: Pandoc command
+
+    Returns:
+        Command producing the messages PandocProgressParser understands
+    """
+    if VERBOSITY_FLAGS.intersection(cmd):
+        return cmd
+    return [*cmd[:1], VERBOSE_FLAG, *cmd[1:]]
+
+
+def strip_verbose(text: str) -> str:
+    """
+    Remove the informational messages --verbose adds from pandoc's output.
+
+    [INFO] and [trace] messages are single lines. A [makePDF] header is
+    followed by unprefixed lines (the LaTeX source, each pass's log, ...),
+    which are dropped up to the next tagged message or the start of pandoc's
+    error. Output of filters and the marker of an omitted middle are kept.
+
+    Args:
+        text: Captured pandoc output
+
+    Returns:
+        The warnings and errors, as pandoc prints them without --verbose
+    """
+    kept = []
+    in_block = False
+    for line in text.splitlines():
+        if line.startswith(VERBOSE_PREFIXES):
+            in_block = line.startswith(BLOCK_PREFIXES)
+            continue
+        if in_block and _BLOCK_END.match(line):
+            in_block = False
+        if not in_block or line.startswith(_OMITTED_MARKER):
+            kept.append(line)
+    return "\n".join(kept)
+
+
+class PandocProgressParser:
+    """
+    Turns pandoc's stderr into progress events, fed in arbitrary chunks.
+
+    Pandoc reads its input first, so a run starts in the parsing phase.
+    Recognised messages:
+        [INFO] Running filter X      filters
+        [makePDF] ...                writing the PDF's LaTeX source
+        [makePDF] LaTeX run number N LaTeX pass N (newer pandoc: Run #N)
+        [WARNING] ...                a warning, reported as it happens
+
+    Only phase changes, LaTeX passes and warnings produce events, so the
+    flood of lines --trace writes costs a prefix check each, not an event.
+    The percentage never goes backwards.
+    """
+
+    def __init__(self) -> None:
+        """Initialize parser at the parsing phase."""
+        self.phase = PandocPhase.PARSING
+        self.percent = PHASE_PERCENT[PandocPhase.PARSING]
+        self.warnings = 0
+        self._partial = b""
+
+    def start(self) -> PandocProgress:
+        """Get the event of pandoc having started to parse its input."""
+        return PandocProgress(self.phase, self.percent, "Parsing input")
+
+    def feed(self, data: bytes) -> list[PandocProgress]:
+        """
+        Parse a chunk of output.
+
+        Args:
+            data: Bytes written since the previous call; lines may be split
+                across calls
+
+        Returns:
+            Events for the complete lines in the chunk
+        """
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        if len(self._partial) > MAX_LINE_BYTES:
+            self._partial = self._partial[:MAX_LINE_BYTES]  # rest of a huge line is ignored
+
+        events = []
+        for line in lines:
+            event = self._parse_line(line.rstrip(b"\r"))
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _parse_line(self, line: bytes) -> PandocProgress | None:
+        """Get the event of one output line, if any."""
+        if line.startswith(b"[WARNING]"):
+            self.warnings += 1
+            return PandocProgress(self.phase, self.percent, _decode(line[9:]), warning=True)
+        if line.startswith(b"[INFO] Running filter"):
+            return self._enter(PandocPhase.FILTERS, _decode(line[6:]), always=True)
+        if line.startswith(b"[makePDF]"):
+            match = _LATEX_RUN.search(line)
+            if match is None:
+                if self.phase == PandocPhase.LATEX:
+                    return None  # a pass's log or the next pass's command line
+                return self._enter(PandocPhase.WRITING, "Writing LaTeX source")
+            run = int(match.group(1) or match.group(2))
+            percent = PHASE_PERCENT[PandocPhase.LATEX] + 10 * (run - 1)
+            return self._enter(PandocPhase.LATEX, f"LaTeX run {run}", percent, always=True)
+        return None
+
+    def _enter(
+        self, phase: PandocPhase, message: str, percent: int | None = None, always: bool = False
+    ) -> PandocProgress | None:
+        """Move to a phase, returning an event unless nothing changed."""
+        if phase == self.phase and not always:
+            return None
+        self.phase = phase
+        if percent is None:
+            percent = PHASE_PERCENT[phase]
+        self.percent = max(self.percent, min(percent, MAX_RUNNING_PERCENT))
+        return PandocProgress(phase, self.percent, message)
+
+
+def _decode(data: bytes) -> str:
+    """Decode a message, tolerating invalid UTF-8."""
+    return data.decode("utf-8", errors="replace").strip()
@@ -2,39 +2,464 @@
 Pandoc runner - builds and executes pandoc commands.
 """
 
+import hashlib
 import logging
+import os
 import platform
+import shlex
+import shutil
+import signal
 import subprocess
+import sys
+import tempfile
+import threading
 import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from ..models import ConversionProfile, ConversionResult, OutputFormat
+from ..models import ConversionProfile, ConversionResult, OutputFormat, ResourceUsage
+from .config_manager import get_config_manager
+from .output_capture import CapturedOutput, OutputCapture
+from .pandoc_progress import PandocProgress, PandocProgressParser, strip_verbose, with_verbose
+from .tracing import span
+
+if TYPE_CHECKING:
+    from .archive_io import ArchiveWriter
 
 logger = logging.getLogger(__name__)
 
+COMPARE_CHUNK_SIZE = 1024 * 1024
+
+DEFAULT_TIMEOUT_SECONDS = 300.0
+CANCEL_POLL_SECONDS = 0.1
+DEFAULT_STALL_SECONDS = 60.0
+STALL_POLL_SECONDS = 1.0
+PROGRESS_POLL_SECONDS = 0.25
+SPILL_DIR_NAME = "pandoc-output"
+
+
+class ConversionCancelled(Exception):
+    """Raised inside the runner when a conversion's cancel event is set."""
+
+
+class ConversionStalled(Exception):
+    """Raised inside the runner when pandoc stops making progress."""
+
+    def __init__(self, seconds: float) -> None:
+        super().__init__(f"No CPU or I/O progress for {seconds:g} seconds")
+        self.seconds = seconds
+
+
+# ru_maxrss is in kilobytes on Linux and bytes on macOS
+_MAXRSS_SCALE = 1 if sys.platform == "darwin" else 1024
+_PROC_IO = sys.platform.startswith("linux")
+_WAIT4 = hasattr(os, "wait4")
+# Pandoc gets its own process group so pdflatex and filters die with it
+_PROCESS_GROUPS = hasattr(os, "killpg")
+
+
+class AccountedPopen(subprocess.Popen):
+    """
+    Popen that records the child's resource usage when it is reaped.
+
+    On POSIX wait() and poll() reap the child themselves with os.wait4, which
+    reports its CPU time and peak RSS, and store its exit status in
+    returncode, so Popen finds it reaped and never calls waitpid without the
+    usage. On Linux the exited child is first waited for with WNOWAIT, so its
+    /proc/<pid>/io byte counters can be read before it is reaped. Windows
+    gets wall time only.
+    """
+
+    rusage = None  # os.wait4 resource usage once reaped
+    io_bytes: tuple[int, int] | None = None  # (read, written) on Linux
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._reap_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def poll(self) -> int | None:
+        """Check whether the child has exited, reaping it with its usage if so."""
+        if _WAIT4 and self.returncode is None:
+            self._reap(os.WNOHANG)
+        return super().poll()
+
+    def wait(self, timeout: float | None = None) -> int:
+        """Wait for the child to exit, reaping it with its usage."""
+        if _WAIT4 and self.returncode is None:
+            if timeout is None:
+                self._reap(0)
+            else:
+                # Polls like Popen.wait does, as waitpid has no timeout
+                deadline = time.monotonic() + timeout
+                delay = 0.0005
+                while not self._reap(os.WNOHANG):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired(self.args, timeout)
+                    delay = min(delay * 2, remaining, 0.05)
+                    time.sleep(delay)
+        return super().wait(timeout)
+
+    def _reap(self, wait_flags: int) -> bool:
+        """Reap the child with os.wait4; False while it is still running."""
+        with self._reap_lock:
+            if self.returncode is not None:
+                return True
+            if _PROC_IO:
+                try:
+                    exited = os.waitid(os.P_PID, self.pid, os.WEXITED | os.WNOWAIT | wait_flags)
+                except ChildProcessError:
+                    return True  # reaped elsewhere (e.g. SIGCHLD ignored); Popen copes
+                if exited is None:
+                    return False
+                self.io_bytes = _read_proc_io(self.pid)
+            try:
+                pid, status, rusage = os.wait4(self.pid, wait_flags)
+            except ChildProcessError:
+                return True
+            if not pid:
+                return False
+            self.rusage = rusage
+            self.returncode = os.waitstatus_to_exitcode(status)
+            return True
+
+    def resource_usage(self, wall_seconds: float) -> ResourceUsage:
+        """Build the usage record of the finished child."""
+        usage = ResourceUsage(wall_seconds=wall_seconds)
+        if self.rusage is not None:
+            usage.user_cpu_seconds = self.rusage.ru_utime
+            usage.system_cpu_seconds = self.rusage.ru_stime
+            usage.peak_rss_bytes = self.rusage.ru_maxrss * _MAXRSS_SCALE
+            # Block I/O unless the exact byte counters below are available
+            usage.read_bytes = self.rusage.ru_inblock * 512
+            usage.write_bytes = self.rusage.ru_oublock * 512
+        if self.io_bytes is not None:
+            usage.read_bytes, usage.write_bytes = self.io_bytes
+        return usage
+
+
+def _kill_process_group(process: subprocess.Popen) -> None:
+    """Kill pandoc along with the pdflatex, filters and other processes it started."""
+    if _PROCESS_GROUPS:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except ProcessLookupError:
+            pass  # whole group gone; kill() below is a no-op on the reaped child
+    process.kill()
+
+
+def _read_proc_io(pid: int) -> tuple[int, int] | None:
+    """Read (rchar, wchar) from /proc/<pid>/io."""
+    try:
+        with open(f"/proc/{pid}/io", encoding="ascii") as f:
+            counters = dict(line.split(": ", 1) for line in f.read().splitlines() if line)
+        return int(counters["rchar"]), int(counters["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _read_progress(pid: int) -> tuple[int, int] | None:
+    """
+    Read the CPU ticks and I/O bytes of a process and its descendants from /proc.
+
+    Descendants count so that pandoc waiting on pdflatex or a filter is not
+    mistaken for a hung pandoc.
+
+    Returns:
+        (CPU ticks, bytes read plus written), or None if the process is gone or
+        this is not Linux
+    """
+    if not _PROC_IO:
+        return None
+    ticks = io = 0
+    found = False
+    pids = [pid]
+    seen = {pid}
+    by_parent: dict[int, list[int]] | None = None
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f"/proc/{current}/stat", "rb") as f:
+                stat = f.read()
+            threads = os.listdir(f"/proc/{current}/task")
+        except OSError:
+            continue  # exited meanwhile
+        # Fields after the parenthesised command name; utime, stime, cutime
+        # and cstime are fields 14-17 of the whole line
+        ticks += sum(int(field) for field in stat[stat.rfind(b")") + 2 :].split()[11:15])
+        found = True
+        counters = _read_proc_io(current)
+        if counters is not None:
+            io += counters[0] + counters[1]
+        try:
+            children = _read_task_children(current, threads)
+        except OSError:
+            # Kernel without CONFIG_PROC_CHILDREN (or a thread exited): find
+            # children by their ppid instead, so a busy pdflatex still counts
+            if by_parent is None:
+                by_parent = _children_by_parent()
+            children = by_parent.get(current, [])
+        pids.extend(child for child in children if child not in seen)
+        seen.update(children)
+    return (ticks, io) if found else None
+
+
+def _read_task_children(pid: int, threads: list[str]) -> list[int]:
+    """
+    Read a process's children from /proc/<pid>/task/<tid>/children.
+
+    Raises:
+        OSError: If a children file cannot be read
+    """
+    children: list[int] = []
+    for thread in threads:
+        with open(f"/proc/{pid}/task/{thread}/children", "rb") as f:
+            children.extend(int(child) for child in f.read().split())
+    return children
+
+
+def _children_by_parent() -> dict[int, list[int]]:
+    """Map every process to its children by the ppid in each /proc/<pid>/stat."""
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue  # exited meanwhile
+        ppid = int(stat[stat.rfind(b")") + 2 :].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _stat(path: Path) -> os.stat_result | None:
+    """Stat a file, or None if it cannot be stat'ed."""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _error_message(output: CapturedOutput, verbose: bool) -> str:
+    """Build the error message of a failed run from its captured output."""
+    text = output.text()
+    if verbose:
+        text = strip_verbose(text)
+    return text.strip() or "Unknown pandoc error"
+
+
+def _file_size(path: Path | None) -> int | None:
+    """Get a file's size, or None if it cannot be stat'ed."""
+    if path is None:
+        return None
+    try:
+        return path.stat().st_size
+    except OSError:
+        return None
+
+
+# Writers that produce binary containers and must write to a file, not stdout
+BINARY_OUTPUT_FORMATS = frozenset(
+    {
+        OutputFormat.DOCX,
+        OutputFormat.ODT,
+        OutputFormat.EPUB,
+        OutputFormat.EPUB2,
+        OutputFormat.EPUB3,
+        OutputFormat.PPTX,
+        OutputFormat.PDF,
+    }
+)
+
+
+def temp_output_path(output_path: Path) -> Path:
+    """
+    Get a temporary sibling path for writing an output atomically.
+
+    The temp file lives in the same directory so the final rename never crosses
+    filesystems, keeps the original suffix so pandoc still infers the writer
+    (e.g. PDF) from it, and is hidden so folder scans skip it.
+    """
+    unique = f"{os.getpid()}-{time.monotonic_ns()}"
+    return output_path.with_name(f".{output_path.stem}.{unique}.tmp{output_path.suffix}")
+
+
+def _file_digest(path: str) -> bytes:
+    """Hash file contents."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        while chunk := f.read(COMPARE_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def commit_output(temp_path: Path, output_path: Path) -> bool | None:
+    """
+    Move a finished temp output into place unless the content is unchanged.
+
+    Args:
+        temp_path: Freshly written output
+        output_path: Final output location
+
+    Returns:
+        True if output_path was written, False if the existing file already had
+        identical content (its mtime is left untouched), None if no temp output exists
+    """
+    try:
+        temp_size = os.stat(temp_path).st_size
+    except FileNotFoundError:
+        return None
+
+    try:
+        existing_size = os.stat(output_path).st_size
+    except FileNotFoundError:
+        existing_size = None
+
+    if existing_size == temp_size and _file_digest(str(temp_path)) == _file_digest(
+        str(output_path)
+    ):
+        os.unlink(temp_path)
+        return False
+
+    os.replace(temp_path, output_path)
+    return True
+
+
+@dataclass(frozen=True, slots=True)
+class CommandTemplate:
+    """
+    Pandoc argv for one combination of formats and options, compiled once.
+
+    Tasks of a batch differ only in their input, output and resource paths,
+    which fill() splices in.
+    """
+
+    head: tuple[str, ...]  # Executable and reader
+    writer: tuple[str, ...]  # -t FORMAT
+    tail: tuple[str, ...]  # Writer-specific and custom options
+    stdin_input: bool  # Input is streamed on stdin (archive members)
+
+    def fill(
+        self,
+        input_path: Path,
+        output_path: Path | None = None,
+        resource_path: Path | None = None,
+    ) -> list[str]:
+        """
+        Build the argv of one task.
+
+        Args:
+            input_path: Input file (ignored when the input comes on stdin)
+            output_path: File pandoc writes, or None for stdout
+            resource_path: Directory pandoc searches for images and other resources
+
+        Returns:
+            List of command arguments for subprocess
+        """
+        cmd = list(self.head)
+        if not self.stdin_input:
+            cmd.append(str(input_path))
+        cmd.extend(self.writer)
+        if output_path is not None:
+            cmd.extend(("-o", str(output_path)))
+        if resource_path is not None:
+            cmd.extend(("--resource-path", str(resource_path)))
+        cmd.extend(self.tail)
+        return cmd
+
 
 class PandocRunner:
-    """Builds and executes pandoc commands."""
+    """
+    Builds and executes pandoc commands.
+
+    Command templates are compiled once per combination of formats and
+    options, and the pandoc executable is checked once per runner, so a batch
+    pays for option parsing and validation once rather than per file.
 
-    def __init__(self, pandoc_path: Path):
+    On Linux a stall detector kills pandoc once neither it nor its child
+    processes have used CPU or done I/O for stall_seconds, so a hung run
+    frees its slot long before the timeout, while a big document that keeps
+    working runs until the timeout.
+    """
+
+    def __init__(self, pandoc_path: Path, stall_seconds: float | None = DEFAULT_STALL_SECONDS):
         """
         Initialize runner with pandoc binary path.
 
         Args:
             pandoc_path: Path to pandoc executable
+            stall_seconds: Seconds without progress before pandoc is killed (None disables)
         """
         self.pandoc_path = pandoc_path
+        self.stall_seconds = stall_seconds
+        # Where output too long to keep in memory is saved (logs dir if None)
+        self.spill_dir: Path | None = None
+        # Also save long output of successful runs, not just of failed ones
+        self.spill_successful_output = False
+        # Set SOURCE_DATE_EPOCH to the input's mtime (see _build_env)
+        self.pin_source_date = False
+        self._templates: dict[tuple, CommandTemplate] = {}
+        self._checked_pandoc: Path | None = None
 
-    def build_command(self, profile: ConversionProfile) -> list[str]:
+    def build_command(
+        self,
+        profile: ConversionProfile,
+        output_path: Path | None = None,
+        to_stdout: bool = False,
+        resource_path: Path | None = None,
+    ) -> list[str]:
         """
         Build pandoc command list from conversion profile.
 
         Args:
             profile: Conversion configuration
+            output_path: Path pandoc should write to instead of profile.output_path
+            to_stdout: Omit the output file so pandoc writes to stdout
+            resource_path: Directory pandoc searches for images and other resources
 
         Returns:
             List of command arguments for subprocess
         """
+        output_path = output_path or profile.output_path
+        return self.compile_template(profile).fill(
+            profile.input_path,
+            None if to_stdout else output_path,
+            resource_path,
+        )
+
+    def compile_template(self, profile: ConversionProfile) -> CommandTemplate:
+        """
+        Get the command template for a profile's formats and options.
+
+        Templates are cached, so profiles sharing formats and options (as the
+        tasks of a batch do) parse custom arguments only once.
+
+        Args:
+            profile: Conversion configuration (paths are ignored)
+
+        Returns:
+            Compiled CommandTemplate
+        """
+        options = profile.options or {}
+        key = (
+            self.pandoc_path,
+            profile.input_format,
+            profile.output_format,
+            repr(sorted(options.items())),
+            profile.archive_path is not None,
+        )
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = self._compile(profile, options)
+        return template
+
+    def _compile(self, profile: ConversionProfile, options: dict) -> CommandTemplate:
+        """Compile the command template of a profile."""
         # Use the pandoc path as-is for subprocess.run (it handles path quoting)
         pandoc_executable = str(self.pandoc_path)
 
@@ -44,131 +469,580 @@ class PandocRunner:
             pandoc_executable = str(self.pandoc_path.resolve())
             logger.debug(f"Windows pandoc executable: {pandoc_executable}")
 
-        cmd = [pandoc_executable]
+        head = [pandoc_executable]
 
         # Input format (if specified)
         if profile.input_format:
-            cmd.extend(["-f", profile.input_format.value])
-
-        # Input file
-        cmd.append(str(profile.input_path))
-
-        # Output format
-        cmd.extend(["-t", profile.output_format.value])
+            head.extend(["-f", profile.input_format.value])
 
-        # Output file
-        if profile.output_path:
-            cmd.extend(["-o", str(profile.output_path)])
+        tail = []
 
         # Add format-specific options
         if profile.output_format == OutputFormat.PDF:
-            cmd.extend(["--pdf-engine", "pdflatex"])
+            tail.extend(["--pdf-engine", "pdflatex"])
         elif profile.output_format == OutputFormat.HTML:
-            cmd.append("--standalone")
+            tail.append("--standalone")
 
         # Add custom options from profile
-        if profile.options:
-            for key, value in profile.options.items():
-                if key == "custom_args" and value:
-                    # Handle custom arguments string
-                    import shlex
-                    try:
-                        custom_parts = shlex.split(str(value))
-                        cmd.extend(custom_parts)
-                    except ValueError as e:
-                        logger.warning(f"Invalid custom arguments format: {e}")
-                elif value is True:
-                    cmd.append(f"--{key}")
-                elif value is not False and value is not None:
-                    cmd.extend([f"--{key}", str(value)])
+        for key, value in options.items():
+            if key == "custom_args" and value:
+                # Handle custom arguments string
+                try:
+                    tail.extend(shlex.split(str(value)))
+                except ValueError as e:
+                    logger.warning(f"Invalid custom arguments format: {e}")
+            elif value is True:
+                tail.append(f"--{key}")
+            elif value is not False and value is not None:
+                tail.extend([f"--{key}", str(value)])
 
-        return cmd
+        return CommandTemplate(
+            head=tuple(head),
+            writer=("-t", profile.output_format.value),
+            tail=tuple(tail),
+            stdin_input=profile.archive_path is not None,
+        )
 
-    def execute(self, profile: ConversionProfile) -> ConversionResult:
+    def execute(
+        self,
+        profile: ConversionProfile,
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[PandocProgress], None] | None = None,
+    ) -> ConversionResult:
         """
         Execute pandoc conversion synchronously.
 
+        Pandoc writes to a temporary file next to the output, which is renamed
+        into place only when it differs from the existing output. A cancelled or
+        failed run never leaves a truncated output behind, and an unchanged
+        output keeps its original mtime.
+
         Args:
             profile: Conversion configuration
+            timeout: Seconds before pandoc is killed (DEFAULT_TIMEOUT_SECONDS if None)
+            cancel_event: Event that kills pandoc when set
+            progress: Called with phase changes and warnings while pandoc runs;
+                pandoc is run with --verbose when set
 
         Returns:
             ConversionResult with success status and details
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
+        temp_path: Path | None = None
+        resource_dir: Path | None = None
 
         try:
             # Validate input file exists
-            if not profile.input_path.exists():
-                error_msg = f"Input file does not exist: {profile.input_path}"
+            input_source = profile.archive_path or profile.input_path
+            if not input_source.exists():
+                error_msg = f"Input file does not exist: {input_source}"
                 logger.error(error_msg)
                 return ConversionResult(success=False, error_message=error_msg)
 
-            # Validate pandoc executable exists
-            if not self.pandoc_path.exists():
-                error_msg = f"Pandoc executable not found: {self.pandoc_path}"
+            # Validate pandoc executable exists (once per runner)
+            error_msg = self.check_pandoc()
+            if error_msg:
                 logger.error(error_msg)
                 return ConversionResult(success=False, error_message=error_msg)
+            input_stat = _stat(input_source)
 
             # Create output directory if needed
             if profile.output_path and profile.output_path.parent:
                 profile.output_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = temp_output_path(profile.output_path)
 
             # Build command
-            cmd = self.build_command(profile)
-            cmd_str = " ".join(f'"{arg}"' if " " in arg else arg for arg in cmd)
+            resource_dir = self._make_resource_dir(profile)
+            resource_path = self._resource_path(profile, resource_dir)
+            cmd = self.build_command(profile, output_path=temp_path, resource_path=resource_path)
+            display_cmd = self.build_command(profile) if temp_path or resource_dir else cmd
+            if progress is not None:
+                cmd, display_cmd = with_verbose(cmd), with_verbose(display_cmd)
+            cmd_str = " ".join(f'"{arg}"' if " " in arg else arg for arg in display_cmd)
 
             logger.info(f"Executing pandoc command: {cmd_str}")
             logger.debug(f"Working directory: {Path.cwd()}")
             logger.debug(f"Pandoc path exists: {self.pandoc_path.exists()}")
-            logger.debug(f"Input file exists: {profile.input_path.exists()}")
+            logger.debug(f"Input file exists: {input_source.exists()}")
 
             # Execute pandoc
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout
-                cwd=None,  # Use current working directory
+            result, usage = self._run_pandoc(
+                cmd, profile, resource_dir, False, timeout, cancel_event, input_stat, progress
             )
+            if profile.archive_path is None and input_stat is not None:
+                usage.input_bytes = input_stat.st_size
 
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
 
             logger.debug(f"Pandoc exit code: {result.returncode}")
-            logger.debug(f"Pandoc stdout: {result.stdout[:200]}...")
-            logger.debug(f"Pandoc stderr: {result.stderr[:200]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Pandoc output: {result.stderr.text()[:200]}...")
 
             if result.returncode == 0:
+                output_changed = None
+                if temp_path and profile.output_path:
+                    with span("commit_output", "io"):
+                        output_changed = commit_output(temp_path, profile.output_path)
+                    if output_changed is False:
+                        logger.info(f"Output unchanged, kept existing: {profile.output_path}")
+
+                usage.output_bytes = _file_size(profile.output_path)
                 logger.info(f"Pandoc conversion successful in {duration:.2f}s")
                 return ConversionResult(
                     success=True,
                     output_path=profile.output_path,
                     duration_seconds=duration,
                     command=cmd_str,
+                    output_changed=output_changed,
+                    resources=usage,
                 )
             else:
-                error_msg = result.stderr.strip() if result.stderr else "Unknown pandoc error"
+                error_msg = _error_message(result.stderr, progress is not None)
+                logger.error(f"Pandoc conversion failed: {error_msg}")
+                return ConversionResult(
+                    success=False,
+                    error_message=error_msg,
+                    duration_seconds=duration,
+                    command=cmd_str,
+                    resources=usage,
+                    exit_code=result.returncode,
+                )
+
+        except subprocess.TimeoutExpired as e:
+            return ConversionResult(
+                success=False,
+                error_message=f"Pandoc conversion timed out after {e.timeout:g} seconds",
+                duration_seconds=time.perf_counter() - start_time,
+            )
+
+        except ConversionCancelled:
+            return ConversionResult(
+                success=False,
+                error_message="Conversion cancelled",
+                duration_seconds=time.perf_counter() - start_time,
+            )
+
+        except ConversionStalled as e:
+            return ConversionResult(
+                success=False,
+                error_message=f"Pandoc stalled: {e}",
+                duration_seconds=time.perf_counter() - start_time,
+            )
+
+        except Exception as e:
+            return ConversionResult(
+                success=False,
+                error_message=f"Conversion failed: {str(e)}",
+                duration_seconds=time.perf_counter() - start_time,
+            )
+
+        finally:
+            # Never leave partial output behind
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+            if resource_dir is not None:
+                shutil.rmtree(resource_dir, ignore_errors=True)
+
+    def execute_to_archive(
+        self,
+        profile: ConversionProfile,
+        writer: "ArchiveWriter",
+        arcname: str,
+        aliases: tuple[str, ...] = (),
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[PandocProgress], None] | None = None,
+    ) -> ConversionResult:
+        """
+        Execute pandoc conversion and append the output to an archive.
+
+        Text writers stream to stdout and the bytes go straight to the archive
+        writer. Binary writers (docx, epub, pdf, ...) need a real file, so they
+        write to a temporary file that the archive writer streams from and deletes.
+        Nothing is written next to profile.output_path.
+
+        Args:
+            profile: Conversion configuration
+            writer: Archive writer receiving the output
+            arcname: Member name inside the archive
+            aliases: Additional member names with the same content
+            timeout: Seconds before pandoc is killed (DEFAULT_TIMEOUT_SECONDS if None)
+            cancel_event: Event that kills pandoc when set
+            progress: Called with phase changes and warnings while pandoc runs
+
+        Returns:
+            ConversionResult with success status and details
+        """
+        start_time = time.perf_counter()
+        temp_path: Path | None = None
+        resource_dir: Path | None = None
+
+        try:
+            input_source = profile.archive_path or profile.input_path
+            if not input_source.exists():
+                error_msg = f"Input file does not exist: {input_source}"
+                logger.error(error_msg)
+                return ConversionResult(success=False, error_message=error_msg)
+
+            error_msg = self.check_pandoc()
+            if error_msg:
+                logger.error(error_msg)
+                return ConversionResult(success=False, error_message=error_msg)
+            input_stat = _stat(input_source)
+
+            binary = profile.output_format in BINARY_OUTPUT_FORMATS
+            if binary:
+                fd, temp_name = tempfile.mkstemp(
+                    prefix="pandoc-ui-", suffix=f".{profile.output_format.value}"
+                )
+                os.close(fd)
+                temp_path = Path(temp_name)
+
+            resource_dir = self._make_resource_dir(profile)
+            cmd = self.build_command(
+                profile,
+                output_path=temp_path,
+                to_stdout=not binary,
+                resource_path=self._resource_path(profile, resource_dir),
+            )
+            if progress is not None:
+                cmd = with_verbose(cmd)
+            cmd_str = " ".join(f'"{arg}"' if " " in arg else arg for arg in cmd)
+            logger.debug(f"Executing pandoc command for archive member {arcname}: {cmd_str}")
+
+            result, usage = self._run_pandoc(
+                cmd,
+                profile,
+                resource_dir,
+                not binary,
+                timeout,
+                cancel_event,
+                input_stat,
+                progress,
+            )
+            if profile.archive_path is None and input_stat is not None:
+                usage.input_bytes = input_stat.st_size
+
+            duration = time.perf_counter() - start_time
+
+            if result.returncode != 0:
+                error_msg = _error_message(result.stderr, progress is not None)
                 logger.error(f"Pandoc conversion failed: {error_msg}")
                 return ConversionResult(
                     success=False,
                     error_message=error_msg,
                     duration_seconds=duration,
                     command=cmd_str,
+                    resources=usage,
+                    exit_code=result.returncode,
                 )
 
-        except subprocess.TimeoutExpired:
+            # Hand the output to the archive writer (blocks while its queue is full)
+            if temp_path is not None:
+                usage.output_bytes = _file_size(temp_path)
+                writer.add_file(temp_path, arcname, aliases=aliases, remove=True)
+                temp_path = None
+            else:
+                usage.output_bytes = len(result.stdout)
+                writer.add_bytes(arcname, result.stdout, aliases=aliases)
+
+            return ConversionResult(
+                success=True,
+                output_path=writer.archive_path,
+                duration_seconds=duration,
+                command=cmd_str,
+                output_changed=True,
+                resources=usage,
+            )
+
+        except subprocess.TimeoutExpired as e:
             return ConversionResult(
                 success=False,
-                error_message="Pandoc conversion timed out after 5 minutes",
-                duration_seconds=time.time() - start_time,
+                error_message=f"Pandoc conversion timed out after {e.timeout:g} seconds",
+                duration_seconds=time.perf_counter() - start_time,
+            )
+
+        except ConversionCancelled:
+            return ConversionResult(
+                success=False,
+                error_message="Conversion cancelled",
+                duration_seconds=time.perf_counter() - start_time,
+            )
+
+        except ConversionStalled as e:
+            return ConversionResult(
+                success=False,
+                error_message=f"Pandoc stalled: {e}",
+                duration_seconds=time.perf_counter() - start_time,
             )
 
         except Exception as e:
             return ConversionResult(
                 success=False,
                 error_message=f"Conversion failed: {str(e)}",
-                duration_seconds=time.time() - start_time,
+                duration_seconds=time.perf_counter() - start_time,
             )
 
+        finally:
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+            if resource_dir is not None:
+                shutil.rmtree(resource_dir, ignore_errors=True)
+
+    def _make_resource_dir(self, profile: ConversionProfile) -> Path | None:
+        """Create a scratch directory for resources of an archive member."""
+        if profile.archive_path is None:
+            return None
+        return Path(tempfile.mkdtemp(prefix="pandoc-ui-res-"))
+
+    def _resource_path(self, profile: ConversionProfile, resource_dir: Path | None) -> Path | None:
+        """Get the resource directory mirroring the archive member's directory."""
+        if resource_dir is None or profile.archive_member is None:
+            return None
+        return resource_dir.joinpath(*profile.archive_member.split("/")[:-1])
+
+    def _run_pandoc(
+        self,
+        cmd: list[str],
+        profile: ConversionProfile,
+        resource_dir: Path | None,
+        stream_output: bool,
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+        input_stat: os.stat_result | None = None,
+        progress: Callable[[PandocProgress], None] | None = None,
+    ) -> tuple[subprocess.CompletedProcess, ResourceUsage]:
+        """
+        Run pandoc, streaming the input on stdin when it is an archive member.
+
+        The member is copied from the archive by a feeder thread through a pipe,
+        so it never touches the disk. Resources it references are extracted into
+        resource_dir before stdin is closed.
+
+        Pandoc's diagnostics go to an OutputCapture rather than a pipe, so a
+        verbose run costs a bounded amount of memory; stdout joins them unless
+        it carries the converted document. Output too long to keep is spilled
+        to a log file only when pandoc failed, unless spill_successful_output.
+
+        With a progress callback the capture is parsed by PandocProgressParser
+        every PROGRESS_POLL_SECONDS while pandoc runs. Pandoc writes to a file,
+        never a pipe this thread must drain, so parsing can't block it.
+
+        Args:
+            stream_output: Pandoc writes the output to stdout, which is returned as bytes
+            progress: Called with phase changes and warnings while pandoc runs
+
+        Returns:
+            Completed process, whose stdout is the output bytes (None unless
+            stream_output) and stderr a CapturedOutput, and the resources it
+            used (input/output sizes unset)
+
+        Raises:
+            subprocess.TimeoutExpired: If pandoc runs longer than timeout
+            ConversionCancelled: If cancel_event is set while pandoc runs
+            ConversionStalled: If pandoc stops making progress
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            raise ConversionCancelled()
+        env = self._build_env(profile, input_stat)
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT_SECONDS
+
+        start = time.perf_counter()
+        member = profile.archive_member
+        shared = None
+        if member is not None:
+            from .archive_io import get_shared_archive
+
+            # Opened (and a tar.gz indexed) once per batch, before pandoc
+            # starts waiting on stdin; the feeder releases it
+            shared = get_shared_archive(profile.archive_path)
+        with OutputCapture() as capture:
+            with span("spawn", "pandoc"):
+                try:
+                    process = AccountedPopen(
+                        cmd,
+                        stdin=subprocess.DEVNULL if member is None else subprocess.PIPE,
+                        stdout=subprocess.PIPE if stream_output else capture.file,
+                        stderr=capture.file,
+                        env=env,
+                        start_new_session=_PROCESS_GROUPS,
+                    )
+                except BaseException:
+                    if shared is not None:
+                        shared.release()
+                    raise
+
+            feeder: threading.Thread | None = None
+            feed_errors: list[Exception] = []
+            if shared is not None:
+                stdin = process.stdin
+                assert stdin is not None
+
+                def feed() -> None:
+                    try:
+                        with shared.reader() as reader:
+                            reader.stream_member(member, stdin, resource_dir)
+                    except BrokenPipeError:
+                        pass  # pandoc exited early; its stderr explains why
+                    except Exception as e:
+                        feed_errors.append(e)
+                    finally:
+                        shared.release()
+                        try:
+                            stdin.close()
+                        except OSError:
+                            pass
+
+                feeder = threading.Thread(target=feed, name="pandoc-stdin-feeder", daemon=True)
+                feeder.start()
+                # Feeder owns stdin, so read stdout here without touching it
+                process.stdin = None
+
+            on_poll: Callable[[], None] | None = None
+            if progress is not None:
+                parser = PandocProgressParser()
+
+                def emit(events: Iterable[PandocProgress]) -> None:
+                    try:
+                        for event in events:
+                            progress(event)
+                    except Exception as e:
+                        # Progress is informational; never let it fail or orphan the run
+                        logger.warning(f"Pandoc progress reporting failed: {e}")
+
+                def on_poll() -> None:
+                    emit(event for chunk in capture.read_new() for event in parser.feed(chunk))
+
+                emit([parser.start()])
+
+            pandoc_span = span("pandoc", "pandoc", pid=process.pid)
+            try:
+                stdout, _ = self._communicate(
+                    process, timeout, cancel_event, self.stall_seconds, on_poll
+                )
+                if on_poll is not None:
+                    on_poll()  # warnings written just before exit
+            finally:
+                pandoc_span.set_attribute("returncode", process.returncode)
+                pandoc_span.end()
+                if feeder is not None:
+                    feeder.join()
+
+            if feed_errors and process.returncode == 0:
+                raise feed_errors[0]
+            output = capture.collect()
+            failed = process.returncode != 0
+            if output.omitted_bytes > 0 and (failed or self.spill_successful_output):
+                output.spill_path = capture.spill(self._spill_dir(), profile.input_path.stem)
+        usage = process.resource_usage(time.perf_counter() - start)
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, output), usage
+
+    def _spill_dir(self) -> Path:
+        """Get the directory receiving pandoc output too long to keep in memory."""
+        if self.spill_dir is None:
+            self.spill_dir = get_config_manager().logs_dir / SPILL_DIR_NAME
+        return self.spill_dir
+
+    def _communicate(
+        self,
+        process: subprocess.Popen,
+        timeout: float,
+        cancel_event: threading.Event | None,
+        stall_seconds: float | None = None,
+        on_poll: Callable[[], None] | None = None,
+    ) -> tuple[bytes | None, bytes | None]:
+        """
+        Read pandoc's piped output, killing it on timeout, cancellation or a stall.
+
+        on_poll, if given, is called at least every PROGRESS_POLL_SECONDS while
+        pandoc runs.
+
+        Raises:
+            subprocess.TimeoutExpired: If pandoc runs longer than timeout
+            ConversionCancelled: If cancel_event is set first
+            ConversionStalled: If pandoc makes no progress for stall_seconds
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        poll = None
+        if cancel_event is not None:
+            poll = CANCEL_POLL_SECONDS
+        watch_stall = stall_seconds is not None and _PROC_IO
+        if watch_stall:
+            poll = min(poll or STALL_POLL_SECONDS, STALL_POLL_SECONDS)
+        if on_poll is not None:
+            poll = min(poll or PROGRESS_POLL_SECONDS, PROGRESS_POLL_SECONDS)
+        progress: tuple[int, int] | None = None
+        progress_time = next_check = start
+        while True:
+            remaining = deadline - time.monotonic()
+            until_deadline = poll is None or remaining <= poll
+            wait = remaining if until_deadline else poll
+            try:
+                return process.communicate(timeout=max(0.0, wait))
+            except subprocess.TimeoutExpired:
+                if on_poll is not None:
+                    on_poll()
+                now = time.monotonic()
+                cancelled = cancel_event is not None and cancel_event.is_set()
+                stalled = False
+                if watch_stall and not cancelled and now >= next_check:
+                    next_check = now + STALL_POLL_SECONDS
+                    current = _read_progress(process.pid)
+                    if current is None or current != progress:
+                        progress, progress_time = current, now  # unreadable counts as progress
+                    else:
+                        stalled = now - progress_time >= stall_seconds
+                if cancelled or stalled or until_deadline or now >= deadline:
+                    _kill_process_group(process)
+                    process.communicate()
+                    if cancelled:
+                        raise ConversionCancelled() from None
+                    if stalled:
+                        raise ConversionStalled(stall_seconds) from None
+                    raise subprocess.TimeoutExpired(process.args, timeout) from None
+
+    def check_pandoc(self) -> str | None:
+        """Get an error message if the pandoc executable is missing; checked once per path."""
+        if self._checked_pandoc == self.pandoc_path:
+            return None
+        if not self.pandoc_path.exists():
+            return f"Pandoc executable not found: {self.pandoc_path}"
+        self._checked_pandoc = self.pandoc_path
+        return None
+
+    def _build_env(
+        self, profile: ConversionProfile, input_stat: os.stat_result | None = None
+    ) -> dict[str, str]:
+        """
+        Build the pandoc process environment.
+
+        With pin_source_date, SOURCE_DATE_EPOCH is set to the input's mtime
+        (unless the user set it) so writers that embed timestamps, such as docx
+        and epub, produce identical bytes for an unchanged input and the output
+        can be left untouched. It is off by default because it also changes the
+        dates those writers embed, from now to the input's last change.
+
+        Args:
+            profile: Conversion configuration
+            input_stat: Stat of the input source if the caller already has it
+        """
+        env = dict(os.environ)
+        if self.pin_source_date and "SOURCE_DATE_EPOCH" not in env:
+            if input_stat is None:
+                input_stat = _stat(profile.archive_path or profile.input_path)
+            if input_stat is not None:
+                env["SOURCE_DATE_EPOCH"] = str(int(input_stat.st_mtime))
+        return env
+
     def validate_output_format(self, format_str: str) -> bool:
         """
         Validate if output format is supported.
@@ -6,6 +6,7 @@ import json
 import logging
 from enum import Enum
 from pathlib import Path
+from collections.abc import Callable
 from typing import Any
 
 from pydantic import BaseModel, Field, field_validator
@@ -59,7 +60,14 @@ class ApplicationSettings(BaseModel):
 
     # Advanced Settings
     pandoc_timeout_seconds: int = Field(
-        default=300, ge=10, le=3600, description="Pandoc execution timeout"
+        default=300, ge=10, le=3600, description="Pandoc timeout until throughput is measured"
+    )
+    pandoc_max_timeout_seconds: int = Field(
+        default=1800, ge=60, le=86400, description="Longest timeout of measured or large inputs"
+    )
+    pin_source_date: bool = Field(
+        default=False,
+        description="Date outputs by the input's mtime so unchanged inputs keep their outputs",
     )
     log_level: str = Field(default="INFO", description="Logging level")
     auto_save_profiles: bool = Field(default=True, description="Auto-save profiles on changes")
@@ -122,6 +130,7 @@ class SettingsStore:
 
         self.settings_file = settings_file
         self._settings: ApplicationSettings | None = None
+        self._listeners: list[Callable[[ApplicationSettings], None]] = []
 
         logger.info(f"SettingsStore initialized with file: {self.settings_file}")
 
@@ -183,12 +192,30 @@ class SettingsStore:
 
             self._settings = settings
             logger.info(f"Settings saved to {self.settings_file}")
+            self._notify(settings)
             return True
 
         except Exception as e:
             logger.error(f"Failed to save settings: {str(e)}")
             return False
 
+    def add_listener(self, callback: Callable[[ApplicationSettings], None]) -> None:
+        """
+        Register a callback run with the new settings after each save.
+
+        Args:
+            callback: Called with the saved ApplicationSettings
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, settings: ApplicationSettings) -> None:
+        """Run the listeners, logging rather than propagating their errors."""
+        for callback in self._listeners:
+            try:
+                callback(settings)
+            except Exception as e:
+                logger.error(f"Settings listener failed: {str(e)}")
+
     def get_settings(self) -> ApplicationSettings:
         """
         Get current settings (loads from disk if not cached).
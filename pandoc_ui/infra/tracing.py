@@ -0,0 +1,410 @@
+"""
+Lightweight span tracing with Chrome trace and OTLP-JSON export.
+"""
+
+import functools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Spans kept per session; later ones are counted as dropped
+DEFAULT_MAX_SPANS = 1_000_000
+
+
+def now_ns() -> int:
+    """Get the tracing clock (monotonic nanoseconds)."""
+    return time.perf_counter_ns()
+
+
+class Span:
+    """A timed operation on one thread; use as a context manager or call end()."""
+
+    __slots__ = (
+        "name",
+        "category",
+        "start_ns",
+        "end_ns",
+        "thread_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "_tracer",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        category: str,
+        attributes: dict[str, Any],
+        start_ns: int | None = None,
+    ) -> None:
+        """
+        Start span on the current thread, parented to its innermost open span.
+
+        A span given start_ns is a finished interval being recorded and is not
+        opened as a parent for later spans.
+        """
+        self._tracer = tracer
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.thread_id = threading.get_ident()
+        self.span_id = secrets.randbits(64) or 1
+        stack = tracer._stack()
+        self.parent_id = stack[-1] if stack else 0
+        if start_ns is None:
+            stack.append(self.span_id)
+            start_ns = now_ns()
+        self.start_ns = start_ns
+        self.end_ns = 0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute shown with the span."""
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        """Finish the span (only the first call counts)."""
+        if self.end_ns:
+            return
+        self.end_ns = now_ns()
+        stack = self._tracer._stack()
+        if stack and stack[-1] == self.span_id:
+            stack.pop()
+        elif self.span_id in stack:
+            stack.remove(self.span_id)
+        self._tracer._finish(self)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.end()
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Collects spans in memory for one tracing session.
+
+    Disabled by default; span() then returns a shared no-op span, so
+    instrumented code costs a function call and an attribute check. Each
+    enable() starts a fresh session with its own trace id. Spans record the
+    thread they ran on, which become per-worker swimlanes in the exported
+    trace.
+    """
+
+    def __init__(self, max_spans: int = DEFAULT_MAX_SPANS) -> None:
+        """
+        Initialize disabled tracer.
+
+        Args:
+            max_spans: Spans kept per session
+        """
+        self.enabled = False
+        self.max_spans = max_spans
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._spans: list[Span] = []
+        self._dropped = 0
+        self._thread_names: dict[int, str] = {}
+        self._trace_id = 0
+        self._origin_ns = 0
+        self._epoch_offset_ns = 0
+
+    def enable(self) -> None:
+        """Start a new session, discarding spans from the previous one."""
+        with self._lock:
+            self._spans = []
+            self._dropped = 0
+            self._thread_names = {}
+            self._trace_id = secrets.randbits(128) or 1
+            self._origin_ns = now_ns()
+            self._epoch_offset_ns = time.time_ns() - self._origin_ns
+            self.enabled = True
+        logger.info("Tracing enabled")
+
+    def disable(self) -> None:
+        """Stop recording; collected spans stay available for export."""
+        self.enabled = False
+
+    @property
+    def spans(self) -> list[Span]:
+        """Get a copy of the finished spans."""
+        with self._lock:
+            return list(self._spans)
+
+    @property
+    def dropped(self) -> int:
+        """Get the number of spans dropped after max_spans was reached."""
+        with self._lock:
+            return self._dropped
+
+    def span(self, name: str, category: str = "app", **attributes: Any) -> Span | _NoopSpan:
+        """
+        Start a span on the current thread.
+
+        Args:
+            name: Operation name
+            category: Trace category (e.g. "scan", "queue", "pandoc")
+            **attributes: Values shown with the span
+
+        Returns:
+            Span to end or use as a context manager (no-op while disabled)
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, category, attributes)
+
+    def record(
+        self, name: str, start_ns: int, end_ns: int, category: str = "app", **attributes: Any
+    ) -> None:
+        """
+        Record an already finished interval on the current thread.
+
+        Used for waits that start elsewhere, such as the time a task spent
+        queued before this worker picked it up.
+
+        Args:
+            name: Operation name
+            start_ns: Start on the now_ns() clock
+            end_ns: End on the now_ns() clock
+            category: Trace category
+            **attributes: Values shown with the span
+        """
+        if not self.enabled:
+            return
+        span = Span(self, name, category, attributes, start_ns=start_ns)
+        span.end_ns = end_ns
+        self._finish(span)
+
+    def _stack(self) -> list[int]:
+        """Get the current thread's stack of open span ids."""
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = stack = []
+            return stack
+
+    def _finish(self, span: Span) -> None:
+        """Store a finished span."""
+        thread_id = span.thread_id
+        with self._lock:
+            if thread_id not in self._thread_names:
+                self._thread_names[thread_id] = threading.current_thread().name
+            if len(self._spans) < self.max_spans:
+                self._spans.append(span)
+            else:
+                self._dropped += 1
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        Build a Chrome trace (Trace Event Format), viewable in Perfetto.
+
+        Returns:
+            JSON-serializable trace with one swimlane per thread
+        """
+        with self._lock:
+            spans = list(self._spans)
+            thread_names = dict(self._thread_names)
+            origin = self._origin_ns
+
+        pid = os.getpid()
+        events: list[dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "pandoc-ui"}}
+        ]
+        for thread_id, thread_name in thread_names.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                }
+            )
+        for span in spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (span.start_ns - origin) / 1000,
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": _json_safe(span.attributes),
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otlp_json(self) -> dict[str, Any]:
+        """
+        Build an OTLP-JSON trace export request.
+
+        Returns:
+            JSON-serializable ExportTraceServiceRequest
+        """
+        with self._lock:
+            spans = list(self._spans)
+            thread_names = dict(self._thread_names)
+            trace_id = f"{self._trace_id:032x}"
+            offset = self._epoch_offset_ns
+
+        otlp_spans = []
+        for span in spans:
+            attributes = {
+                **span.attributes,
+                "category": span.category,
+                "thread.id": span.thread_id,
+                "thread.name": thread_names.get(span.thread_id, ""),
+            }
+            otlp_span = {
+                "traceId": trace_id,
+                "spanId": f"{span.span_id:016x}",
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns + offset),
+                "endTimeUnixNano": str(span.end_ns + offset),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)} for key, value in attributes.items()
+                ],
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = f"{span.parent_id:016x}"
+            if "error" in span.attributes:
+                otlp_span["status"] = {"code": 2}  # STATUS_CODE_ERROR
+            otlp_spans.append(otlp_span)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": "pandoc-ui"}},
+                            {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": "pandoc_ui"}, "spans": otlp_spans}],
+                }
+            ]
+        }
+
+    def write(self, path: Path, format: str | None = None) -> int:
+        """
+        Write the collected spans to a file.
+
+        Args:
+            path: Output file
+            format: "chrome" or "otlp" (files named *.otlp.json default to OTLP)
+
+        Returns:
+            Number of spans written
+        """
+        if format is None:
+            format = "otlp" if path.name.endswith(".otlp.json") else "chrome"
+        if format == "chrome":
+            document = self.to_chrome_trace()
+        elif format == "otlp":
+            document = self.to_otlp_json()
+        else:
+            raise ValueError(f"Unknown trace format: {format}")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f)
+
+        count = len(self.spans)
+        if self.dropped:
+            logger.warning(f"Trace is missing {self.dropped} spans beyond max_spans")
+        logger.info(f"Trace written to {path} ({count} spans, {format})")
+        return count
+
+
+def _json_safe(attributes: dict[str, Any]) -> dict[str, Any]:
+    """Convert attribute values JSON cannot hold to strings."""
+    return {
+        key: value if isinstance(value, (str, int, float, bool)) or value is None else str(value)
+        for key, value in attributes.items()
+    }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    """Wrap an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# Global instance for easy access
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get global tracer instance."""
+    return _tracer
+
+
+def span(name: str, category: str = "app", **attributes: Any) -> Span | _NoopSpan:
+    """Start a span on the global tracer (see Tracer.span)."""
+    if not _tracer.enabled:
+        return NOOP_SPAN
+    return Span(_tracer, name, category, attributes)
+
+
+def traced(name: str, category: str = "app") -> Callable[[F], F]:
+    """
+    Decorate a function so each call is recorded as a span.
+
+    Args:
+        name: Span name
+        category: Trace category
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(_tracer, name, category, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -6,11 +6,14 @@ import argparse
 import logging
 import os
 import sys
+from pathlib import Path
 
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QApplication, QMainWindow
 
 from pandoc_ui.gui.ui_components import MainWindowUI
+from pandoc_ui.infra.metrics import MetricsServer, TextfileExporter
+from pandoc_ui.infra.tracing import get_tracer
 
 
 def setup_logging():
@@ -46,6 +49,24 @@ def main():
     parser = argparse.ArgumentParser(description="Pandoc UI - Graphical interface for document conversion")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode with console output")
     parser.add_argument("--version", action="version", version="Pandoc UI 0.1.0")
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        default=os.environ.get("PANDOC_UI_TRACE") or None,
+        help="Write a span trace on exit (Chrome JSON, or OTLP JSON for *.otlp.json)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.environ.get("PANDOC_UI_METRICS_PORT") or 0) or None,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        default=os.environ.get("PANDOC_UI_METRICS_TEXTFILE") or None,
+        help="Rewrite metrics to this .prom file for node_exporter's textfile collector",
+    )
     args = parser.parse_args()
     
     # Windows console allocation for debugging
@@ -131,6 +152,20 @@ def main():
     # The AA_EnableHighDpiScaling and AA_UseHighDpiPixmaps attributes are deprecated in Qt 6
     logger.info("High DPI scaling enabled by default in Qt 6")
 
+    if args.trace:
+        get_tracer().enable()
+
+    metrics_exporters: list[MetricsServer | TextfileExporter] = []
+    try:
+        if args.metrics_port:
+            metrics_exporters.append(MetricsServer(args.metrics_port))
+        if args.metrics_textfile:
+            metrics_exporters.append(TextfileExporter(Path(args.metrics_textfile)))
+        for exporter in metrics_exporters:
+            exporter.start()
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to start metrics export: {e}")
+
     try:
         # Create and show main window
         logger.info("Starting Pandoc UI application...")
@@ -149,6 +184,16 @@ def main():
         logger.error(f"Application error: {str(e)}", exc_info=True)
         return 1
 
+    finally:
+        for exporter in metrics_exporters:
+            exporter.stop()
+        if args.trace:
+            get_tracer().disable()
+            try:
+                get_tracer().write(Path(args.trace))
+            except OSError as e:
+                logger.error(f"Failed to write trace: {e}")
+
 
 if __name__ == "__main__":
     sys.exit(main())
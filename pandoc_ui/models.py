@@ -134,6 +134,7 @@ class ConversionProfile:
     input_format: InputFormat | None = None
     output_format: OutputFormat = OutputFormat.HTML
     options: dict[str, Any] | None = None
+    archive_path: Path | None = None  # Set when input_path is a member of this archive
 
     def __post_init__(self) -> None:
         if self.options is None:
@@ -144,6 +145,34 @@ class ConversionProfile:
             suffix = f".{self.output_format.value}"
             self.output_path = self.input_path.with_suffix(suffix)
 
+    @property
+    def archive_member(self) -> str | None:
+        """Get the archive member name when the input lives inside an archive."""
+        if self.archive_path is None:
+            return None
+        return self.input_path.relative_to(self.archive_path).as_posix()
+
+
+@dataclass
+class ResourceUsage:
+    """Resources used by one pandoc run; None where the platform cannot tell."""
+
+    wall_seconds: float = 0.0  # Monotonic clock
+    user_cpu_seconds: float | None = None
+    system_cpu_seconds: float | None = None
+    peak_rss_bytes: int | None = None
+    read_bytes: int | None = None  # All bytes pandoc read, including pipes
+    write_bytes: int | None = None  # All bytes pandoc wrote, including pipes
+    input_bytes: int | None = None  # Size of the input document
+    output_bytes: int | None = None  # Size of the produced output
+
+    @property
+    def cpu_seconds(self) -> float | None:
+        """Get user plus system CPU time."""
+        if self.user_cpu_seconds is None or self.system_cpu_seconds is None:
+            return None
+        return self.user_cpu_seconds + self.system_cpu_seconds
+
 
 @dataclass
 class ConversionResult:
@@ -154,3 +183,6 @@ class ConversionResult:
     error_message: str | None = None
     duration_seconds: float = 0.0
     command: str | None = None
+    output_changed: bool | None = None  # False when an identical output was kept
+    resources: ResourceUsage | None = None  # Set when pandoc actually ran
+    exit_code: int | None = None  # Exit status of a failed run; negative: killed by that signal
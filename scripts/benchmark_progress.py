@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark TaskQueue progress signalling against GUI responsiveness.
+
+Runs a batch of instant (stubbed) conversions with per-task signals on and off
+and reports how many events reached the GUI thread per second, and how late a
+10 ms heartbeat timer fired while they were being delivered.
+
+Usage:
+    python scripts/benchmark_progress.py --tasks 20000
+    uv run python scripts/benchmark_progress.py --tasks 20000 --jobs 8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QElapsedTimer, QEventLoop, QTimer  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from pandoc_ui.app.task_queue import TaskQueue  # noqa: E402
+from pandoc_ui.models import ConversionProfile, ConversionResult, OutputFormat  # noqa: E402
+
+HEARTBEAT_MS = 10
+
+
+def run_batch(task_count: int, jobs: int, task_signals: bool) -> dict[str, float]:
+    """Run one stubbed batch and measure event rate and heartbeat latency."""
+    queue = TaskQueue(max_concurrent_jobs=jobs, task_signals=task_signals)
+    queue._conversion_service = Mock(
+        convert=Mock(
+            side_effect=lambda p: ConversionResult(success=True, output_path=p.output_path)
+        )
+    )
+    for i in range(task_count):
+        queue.add_task(
+            f"task_{i}",
+            ConversionProfile(
+                input_path=Path(f"/virtual/doc{i}.md"),
+                output_path=Path(f"/virtual/out/doc{i}.html"),
+                output_format=OutputFormat.HTML,
+            ),
+        )
+
+    events = 0
+
+    def count(*_args) -> None:
+        nonlocal events
+        events += 1
+
+    for signal in (
+        queue.task_started,
+        queue.task_completed,
+        queue.queue_progress,
+        queue.progress_snapshot,
+    ):
+        signal.connect(count)
+
+    # Heartbeat: how late does a GUI timer fire while events are delivered?
+    lateness_ms: list[float] = []
+    clock = QElapsedTimer()
+    heartbeat = QTimer()
+    heartbeat.setInterval(HEARTBEAT_MS)
+
+    def beat() -> None:
+        lateness_ms.append(max(0.0, clock.restart() - HEARTBEAT_MS))
+
+    heartbeat.timeout.connect(beat)
+
+    loop = QEventLoop()
+    queue.queue_finished.connect(lambda *_args: QTimer.singleShot(0, loop.quit))
+
+    start = time.perf_counter()
+    clock.start()
+    heartbeat.start()
+    queue.start_queue()
+    loop.exec()
+    heartbeat.stop()
+    elapsed = time.perf_counter() - start
+
+    lateness_ms.sort()
+    return {
+        "seconds": elapsed,
+        "events": events,
+        "events_per_second": events / elapsed if elapsed else 0.0,
+        "heartbeat_p50_ms": statistics.median(lateness_ms) if lateness_ms else 0.0,
+        "heartbeat_p99_ms": lateness_ms[int(len(lateness_ms) * 0.99)] if lateness_ms else 0.0,
+        "heartbeat_max_ms": lateness_ms[-1] if lateness_ms else 0.0,
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="TaskQueue progress signalling benchmark")
+    parser.add_argument("--tasks", type=int, default=20000, help="Number of tasks per run")
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent jobs")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+
+    print(f"{args.tasks} instant tasks, {args.jobs} jobs, heartbeat {HEARTBEAT_MS} ms")
+    print(
+        f"{'mode':<14}{'seconds':>9}{'events':>10}{'events/s':>11}"
+        f"{'hb p50':>9}{'hb p99':>9}{'hb max':>9}"
+    )
+    for task_signals in (True, False):
+        stats = run_batch(args.tasks, args.jobs, task_signals)
+        mode = "per-task" if task_signals else "snapshots"
+        print(
+            f"{mode:<14}{stats['seconds']:>9.2f}{stats['events']:>10}"
+            f"{stats['events_per_second']:>11.0f}{stats['heartbeat_p50_ms']:>9.1f}"
+            f"{stats['heartbeat_p99_ms']:>9.1f}{stats['heartbeat_max_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
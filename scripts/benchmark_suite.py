@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark suite with per-machine baselines.
+
+Covers folder scanning, duplicate planning, command building, TaskQueue
+overhead, end-to-end throughput per execution backend and GUI event
+delivery. Every benchmark runs warmups and then timed repeats; the median,
+p90, minimum and maximum are reported, per item where a benchmark processes
+many items.
+
+Everything runs offline on a generated corpus. End-to-end runs use a shell
+stand-in for pandoc (which copies its input) unless --pandoc is given, so
+they measure the application's own overhead rather than pandoc's.
+
+Results are compared with the baseline saved for this machine, and medians
+slower than the baseline by more than --threshold are flagged as
+regressions.
+
+Usage:
+    python scripts/benchmark_suite.py                    # run and compare
+    python scripts/benchmark_suite.py --save             # run and store baseline
+    python scripts/benchmark_suite.py --quick --fail-on-regression
+    python scripts/benchmark_suite.py --only scan plan --repeats 9
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import benchmark_progress  # noqa: E402
+import benchmark_task_queue  # noqa: E402
+from PySide6 import __version__ as PYSIDE_VERSION  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from pandoc_ui.app.batch_planner import plan_batch  # noqa: E402
+from pandoc_ui.app.conversion_service import ConversionService  # noqa: E402
+from pandoc_ui.app.deduplication import plan_deduplication  # noqa: E402
+from pandoc_ui.app.folder_scanner import FolderScanner, ScanMode  # noqa: E402
+from pandoc_ui.app.task_queue import TaskQueue  # noqa: E402
+from pandoc_ui.app.throughput import ThroughputTracker  # noqa: E402
+from pandoc_ui.infra.format_manager import FormatManager  # noqa: E402
+from pandoc_ui.infra.pandoc_detector import PandocInfo  # noqa: E402
+from pandoc_ui.infra.pandoc_runner import PandocRunner  # noqa: E402
+from pandoc_ui.models import ConversionProfile, InputFormat, OutputFormat  # noqa: E402
+from tests.support.corpus import generate_corpus  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_BASELINE_DIR = PROJECT_ROOT / ".benchmarks"
+BASELINE_VERSION = 1
+
+# Copies the input to the -o output; enough for the runner to see success
+FAKE_PANDOC = """#!/bin/sh
+input=""
+output=""
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --version) echo "pandoc 3.1.3"; exit 0 ;;
+        -o) output="$2"; shift ;;
+        -f|-t|--resource-path|--pdf-engine) shift ;;
+        -*) ;;
+        *) input="$1" ;;
+    esac
+    shift
+done
+if [ -n "$output" ]; then cat "$input" > "$output"; else cat "$input"; fi
+"""
+
+# Work sizes: (full, --quick)
+SIZES = {
+    "corpus_files": (2000, 300),
+    "commands": (20000, 2000),
+    "queue_tasks": (20000, 2000),
+    "end_to_end_files": (60, 12),
+    "gui_tasks": (5000, 500),
+}
+
+
+@dataclass
+class Stats:
+    """Timing statistics of one benchmark, in seconds per repeat."""
+
+    median: float
+    p90: float
+    minimum: float
+    maximum: float
+    stdev: float
+    repeats: int
+    items: int
+
+    @classmethod
+    def from_samples(cls, samples: list[float], items: int) -> "Stats":
+        """Summarize repeat timings."""
+        ordered = sorted(samples)
+        p90_index = max(0, min(len(ordered) - 1, round(0.9 * len(ordered) + 0.5) - 1))
+        return cls(
+            median=statistics.median(ordered),
+            p90=ordered[p90_index],
+            minimum=ordered[0],
+            maximum=ordered[-1],
+            stdev=statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+            repeats=len(ordered),
+            items=items,
+        )
+
+    @property
+    def per_item_us(self) -> float:
+        """Get the median time per item in microseconds."""
+        return self.median / max(1, self.items) * 1e6
+
+
+@dataclass
+class Benchmark:
+    """A named measurement over a workload of some number of items."""
+
+    name: str
+    group: str
+    items: int
+    # Runs one repeat; returns its own timing in seconds, or None to be timed whole
+    run: Callable[[], float | None]
+
+
+@dataclass
+class Comparison:
+    """Current result against the stored baseline."""
+
+    name: str
+    ratio: float
+    verdict: str  # "regression", "improvement" or "same"
+
+
+def machine_id() -> str:
+    """Get a file-name-safe identifier for this machine and Python."""
+    node = re.sub(r"[^A-Za-z0-9_.-]+", "_", platform.node() or "unknown")
+    return f"{node}-{platform.machine()}-py{sys.version_info.major}{sys.version_info.minor}"
+
+
+def machine_info() -> dict[str, object]:
+    """Describe the environment the results were measured in."""
+    return {
+        "id": machine_id(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "pyside6": PYSIDE_VERSION,
+    }
+
+
+def make_service(pandoc_path: Path) -> ConversionService:
+    """Create a conversion service bound to one pandoc executable."""
+    service = ConversionService()
+    service._pandoc_info = PandocInfo(pandoc_path, "benchmark")
+    service._runner = PandocRunner(pandoc_path)
+    service.throughput = ThroughputTracker()  # keep benchmark timings out of estimates
+    return service
+
+
+def build_benchmarks(work_dir: Path, pandoc_path: Path, quick: bool, jobs: int) -> list[Benchmark]:
+    """Create the corpus and the benchmarks that run on it."""
+
+    def size(key: str) -> int:
+        return SIZES[key][1 if quick else 0]
+
+    corpus_dir = work_dir / "corpus"
+    corpus = generate_corpus(corpus_dir, files=size("corpus_files"), seed=42)
+    files = corpus.documents
+    scanner = FolderScanner()
+
+    commands = size("commands")
+    runner = PandocRunner(Path("/usr/bin/pandoc"))
+    profiles = [
+        ConversionProfile(
+            input_path=files[i % len(files)],
+            output_path=work_dir / "out" / f"doc{i}.html",
+            input_format=InputFormat.MARKDOWN,
+            output_format=OutputFormat.HTML,
+            options={"custom_args": "--toc --metadata title=Benchmark"},
+        )
+        for i in range(commands)
+    ]
+
+    def build_commands() -> None:
+        for profile in profiles:
+            runner.build_command(profile)
+
+    queue_tasks = size("queue_tasks")
+
+    def queue_overhead() -> float:
+        return benchmark_task_queue.run_batch(queue_tasks, jobs)["run_seconds"]
+
+    gui_tasks = size("gui_tasks")
+
+    def gui_events() -> float:
+        return benchmark_progress.run_batch(gui_tasks, jobs, task_signals=True)["seconds"]
+
+    def scan() -> None:
+        result = scanner.scan_folder(corpus_dir, None, ScanMode.RECURSIVE, 2 * len(files))
+        assert result.filtered_count == len(files)
+
+    def plan() -> None:
+        plan_deduplication(files)
+
+    format_manager = FormatManager()
+
+    def plan_tasks() -> None:
+        batch_plan = plan_batch(
+            files, OutputFormat.HTML, work_dir / "out", PandocRunner(pandoc_path), format_manager
+        )
+        assert len(batch_plan) + len(batch_plan.skipped) == len(files)
+
+    benchmarks = [
+        Benchmark("scan_folder", "scan", len(files), scan),
+        Benchmark("plan_deduplication", "plan", len(files), plan),
+        Benchmark("plan_batch", "plan", len(files), plan_tasks),
+        Benchmark("build_command", "command", commands, build_commands),
+        Benchmark("queue_overhead", "queue", queue_tasks, queue_overhead),
+        Benchmark("gui_events", "gui", gui_tasks, gui_events),
+    ]
+
+    e2e_files = corpus.documents_with({".md"})[: size("end_to_end_files")]
+    service = make_service(pandoc_path)
+    output_dir = work_dir / "e2e"
+
+    def e2e_profiles() -> list[ConversionProfile]:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        return [
+            ConversionProfile(
+                input_path=path,
+                output_path=output_dir / f"{path.stem}.html",
+                input_format=InputFormat.MARKDOWN,
+                output_format=OutputFormat.HTML,
+            )
+            for path in e2e_files
+        ]
+
+    def sequential() -> float:
+        batch = e2e_profiles()
+        start = time.perf_counter()
+        for profile in batch:
+            assert service.convert(profile).success
+        return time.perf_counter() - start
+
+    def convert_many() -> float:
+        batch = e2e_profiles()
+        start = time.perf_counter()
+        results = list(service.convert_many(batch, max_concurrency=jobs))
+        elapsed = time.perf_counter() - start
+        assert all(result.success for _profile, result in results)
+        return elapsed
+
+    def task_queue() -> float:
+        queue = TaskQueue(max_concurrent_jobs=jobs, task_signals=False)
+        queue._conversion_service = service
+        for i, profile in enumerate(e2e_profiles()):
+            queue.add_task(f"task_{i}", profile)
+        start = time.perf_counter()
+        queue.start_queue()
+        queue.wait_for_completion(-1)
+        elapsed = time.perf_counter() - start
+        assert queue.get_queue_summary()["completed"] == len(e2e_files)
+        queue.clear_queue()
+        queue.deleteLater()
+        return elapsed
+
+    for name, run in (
+        ("sequential", sequential),
+        ("convert_many", convert_many),
+        ("task_queue", task_queue),
+    ):
+        benchmarks.append(Benchmark(f"end_to_end_{name}", "end_to_end", len(e2e_files), run))
+
+    return benchmarks
+
+
+def run_benchmark(benchmark: Benchmark, warmups: int, repeats: int) -> Stats:
+    """Warm up, then time repeated runs of one benchmark."""
+    app = QApplication.instance()
+    for _ in range(warmups):
+        benchmark.run()
+        app.processEvents()
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        measured = benchmark.run()
+        samples.append(measured if measured is not None else time.perf_counter() - start)
+        app.processEvents()
+    return Stats.from_samples(samples, benchmark.items)
+
+
+def compare(
+    results: dict[str, Stats], baseline: dict[str, dict], threshold: float
+) -> list[Comparison]:
+    """
+    Compare medians with a baseline.
+
+    Args:
+        results: Current statistics by benchmark name
+        baseline: Stored statistics by benchmark name
+        threshold: Relative change treated as significant (0.15 = 15%)
+
+    Returns:
+        Comparisons for benchmarks present in both
+    """
+    comparisons = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous or previous.get("items") != stats.items or not previous.get("median"):
+            continue
+        ratio = stats.median / previous["median"]
+        if ratio > 1 + threshold:
+            verdict = "regression"
+        elif ratio < 1 - threshold:
+            verdict = "improvement"
+        else:
+            verdict = "same"
+        comparisons.append(Comparison(name, ratio, verdict))
+    return comparisons
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    """Load stored statistics by benchmark name (empty if there is no usable baseline)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != BASELINE_VERSION:
+        return {}
+    return data.get("benchmarks", {})
+
+
+def save_results(path: Path, results: dict[str, Stats], settings: dict[str, object]) -> None:
+    """Write results as a baseline file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": BASELINE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "settings": settings,
+        "benchmarks": {name: asdict(stats) for name, stats in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main() -> int:
+    """Run the suite; returns the process exit code."""
+    parser = argparse.ArgumentParser(description="pandoc-ui benchmark suite")
+    parser.add_argument("--only", nargs="+", help="Run benchmarks whose name or group matches")
+    parser.add_argument("--quick", action="store_true", help="Use small workloads")
+    parser.add_argument("--warmups", type=int, default=1, help="Untimed runs per benchmark")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent jobs")
+    parser.add_argument(
+        "--pandoc", type=Path, help="Real pandoc for end-to-end runs (offline stand-in if unset)"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help=f"Baseline file (default: {DEFAULT_BASELINE_DIR.name}/<machine>.json)",
+    )
+    parser.add_argument("--save", action="store_true", help="Store the results as the baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15, help="Median slowdown flagged as regression"
+    )
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="Exit with 1 if anything regressed"
+    )
+    parser.add_argument("--output", type=Path, help="Also write this run's results as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)  # keep per-task log lines out of the report
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    baseline_path = args.baseline or DEFAULT_BASELINE_DIR / f"{machine_id()}.json"
+    settings = {"quick": args.quick, "jobs": args.jobs, "pandoc": str(args.pandoc or "stand-in")}
+
+    with tempfile.TemporaryDirectory(prefix="pandoc-ui-bench-") as temp:
+        work_dir = Path(temp)
+        pandoc_path = args.pandoc
+        if pandoc_path is None:
+            pandoc_path = work_dir / "pandoc"
+            pandoc_path.write_text(FAKE_PANDOC)
+            pandoc_path.chmod(0o755)
+
+        benchmarks = build_benchmarks(work_dir, pandoc_path, args.quick, args.jobs)
+        if args.only:
+            benchmarks = [
+                b
+                for b in benchmarks
+                if any(key in (b.group, b.name) or b.name.startswith(key) for key in args.only)
+            ]
+
+        print(f"Machine {machine_id()}: {args.warmups} warmup(s), {args.repeats} repeats")
+        print(
+            f"{'benchmark':<26}{'items':>7}{'median s':>10}{'p90 s':>10}"
+            f"{'min s':>10}{'max s':>10}{'µs/item':>10}"
+        )
+        results: dict[str, Stats] = {}
+        for benchmark in benchmarks:
+            stats = run_benchmark(benchmark, args.warmups, args.repeats)
+            results[benchmark.name] = stats
+            print(
+                f"{benchmark.name:<26}{stats.items:>7}{stats.median:>10.4f}{stats.p90:>10.4f}"
+                f"{stats.minimum:>10.4f}{stats.maximum:>10.4f}{stats.per_item_us:>10.1f}"
+            )
+
+    regressions = 0
+    baseline = load_baseline(baseline_path)
+    if baseline:
+        print(f"\nAgainst {baseline_path} (threshold {args.threshold:.0%}):")
+        for comparison in compare(results, baseline, args.threshold):
+            marker = {"regression": "SLOWER", "improvement": "faster", "same": ""}[
+                comparison.verdict
+            ]
+            print(f"  {comparison.name:<26}{comparison.ratio:>7.2f}x  {marker}")
+            regressions += comparison.verdict == "regression"
+    elif not args.save:
+        print(f"\nNo baseline at {baseline_path}; run with --save to create one")
+
+    if args.save:
+        save_results(baseline_path, results, settings)
+        print(f"\nBaseline saved to {baseline_path}")
+    if args.output:
+        save_results(args.output, results, settings)
+
+    if regressions:
+        print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
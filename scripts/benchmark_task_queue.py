@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for TaskQueue bookkeeping.
+
+Runs batches of no-op tasks through a stub conversion service and reports the
+cost per task of the whole run and of the completion check that runs after
+every task. With O(1) bookkeeping both stay flat as the batch grows.
+
+With --memory it instead measures, with tracemalloc, how many bytes the queue
+holds per queued task.
+
+Usage:
+    python scripts/benchmark_task_queue.py
+    python scripts/benchmark_task_queue.py --sizes 10000 100000 1000000 --jobs 4
+    python scripts/benchmark_task_queue.py --memory --sizes 100000 1000000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+
+from pandoc_ui.app.task_queue import TaskQueue  # noqa: E402
+from pandoc_ui.infra.tracing import get_tracer  # noqa: E402
+from pandoc_ui.models import (  # noqa: E402
+    ConversionProfile,
+    ConversionResult,
+    InputFormat,
+    OutputFormat,
+)
+
+
+class StubConversionService:
+    """Conversion service whose conversions succeed instantly."""
+
+    def __init__(self) -> None:
+        self._result = ConversionResult(success=True, output_path=Path("/virtual/out.html"))
+
+    def convert(self, profile: ConversionProfile) -> ConversionResult:
+        return self._result
+
+
+def run_batch(task_count: int, jobs: int) -> dict[str, float]:
+    """Run task_count no-op tasks and time the queue's bookkeeping."""
+    queue = TaskQueue(max_concurrent_jobs=jobs, task_signals=False)
+    queue._conversion_service = StubConversionService()
+
+    start = time.perf_counter()
+    for i in range(task_count):
+        queue.add_task(
+            f"task_{i}",
+            ConversionProfile(
+                input_path=Path(f"/virtual/doc{i}.md"),
+                output_path=Path(f"/virtual/out/doc{i}.html"),
+                output_format=OutputFormat.HTML,
+            ),
+        )
+    add_seconds = time.perf_counter() - start
+
+    # Time the completion check that every finished task runs
+    check_seconds = 0.0
+    check_queue_completion = queue._check_queue_completion
+
+    def timed_check() -> None:
+        nonlocal check_seconds
+        t0 = time.perf_counter()
+        check_queue_completion()
+        check_seconds += time.perf_counter() - t0
+
+    queue._check_queue_completion = timed_check
+
+    start = time.perf_counter()
+    queue.start_queue()
+    queue.wait_for_completion(-1)
+    run_seconds = time.perf_counter() - start
+
+    summary = queue.get_queue_summary()
+    assert summary["completed"] == task_count, summary
+
+    queue.clear_queue()
+    queue.deleteLater()
+    gc.collect()
+
+    return {
+        "add_us": add_seconds / task_count * 1e6,
+        "run_us": run_seconds / task_count * 1e6,
+        "check_us": check_seconds / task_count * 1e6,
+        "run_seconds": run_seconds,
+    }
+
+
+def measure_memory(task_count: int) -> float:
+    """Queue task_count tasks and return the bytes allocated per task."""
+    queue = TaskQueue()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(task_count):
+        queue.add_task(
+            f"batch_{i:07d}_doc{i}.md",
+            ConversionProfile(
+                input_path=Path(f"/data/docs/section{i % 100}/doc{i}.md"),
+                output_path=Path(f"/data/out/section{i % 100}/doc{i}.html"),
+                input_format=InputFormat.MARKDOWN,
+                output_format=OutputFormat.HTML,
+                options={"custom_args": "--toc --standalone"},
+            ),
+        )
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    queue.clear_queue()
+    queue.deleteLater()
+    return (after - before) / task_count
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="TaskQueue bookkeeping scaling benchmark")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="Batch sizes to run",
+    )
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent jobs")
+    parser.add_argument(
+        "--memory", action="store_true", help="Measure bytes per queued task instead"
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        help="Write a span trace (Chrome JSON, or OTLP JSON for *.otlp.json)",
+    )
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])  # noqa: F841
+
+    if args.memory:
+        print(f"{'tasks':>10}{'bytes/task':>12}")
+        for size in args.sizes:
+            print(f"{size:>10}{measure_memory(size):>12.0f}")
+        return
+
+    if args.trace:
+        get_tracer().enable()
+
+    print(f"No-op tasks, {args.jobs} jobs (times are per task)")
+    print(f"{'tasks':>10}{'add µs':>10}{'run µs':>10}{'check µs':>10}{'total s':>10}")
+    for size in args.sizes:
+        stats = run_batch(size, args.jobs)
+        print(
+            f"{size:>10}{stats['add_us']:>10.1f}{stats['run_us']:>10.1f}"
+            f"{stats['check_us']:>10.2f}{stats['run_seconds']:>10.1f}"
+        )
+
+    if args.trace:
+        get_tracer().disable()
+        get_tracer().write(args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ from pathlib import Path
 # Add project root to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from pandoc_ui.app.conversion_service import ConversionService
+from pandoc_ui.app.service_registry import get_conversion_service
 from pandoc_ui.models import ConversionProfile, OutputFormat
 
 
@@ -71,7 +71,7 @@ def main():
 
     # Initialize conversion service
     logger.info("Initializing pandoc-ui conversion service...")
-    service = ConversionService()
+    service = get_conversion_service()
 
     # Check pandoc availability
     if not service.is_pandoc_available():
@@ -2,7 +2,9 @@
 Pytest configuration and fixtures for pandoc-ui tests.
 """
 
+import gc
 import os
+import sys
 
 import pytest
 from PySide6.QtWidgets import QApplication
@@ -30,3 +32,28 @@ def qapp(qapp_session):
     yield qapp_session
     # Process any pending events after each test
     qapp_session.processEvents()
+    # Collect Qt objects caught in reference cycles here, on the GUI thread;
+    # left to the cyclic GC they may be destroyed from a worker thread later
+    gc.collect()
+
+
+@pytest.fixture
+def service_registry(monkeypatch):
+    """Fresh process-wide service registry for the duration of a test."""
+    from pandoc_ui.app import service_registry as registry_module
+
+    registry = registry_module.ServiceRegistry()
+    monkeypatch.setattr(registry_module, "_service_registry", registry)
+    return registry
+
+
+@pytest.fixture
+def fake_pandoc(tmp_path, monkeypatch, service_registry):
+    """Deterministic fake pandoc, first on PATH and picked up by the service registry."""
+    from tests.support.fake_pandoc import FakePandoc
+
+    if sys.platform == "win32":
+        pytest.skip("The fake pandoc is a POSIX script")
+    fake = FakePandoc(tmp_path / "fake-pandoc-bin")
+    monkeypatch.setenv("PATH", f"{fake.directory}{os.pathsep}{os.environ.get('PATH', '')}")
+    return fake
@@ -0,0 +1,105 @@
+"""
+Tests for the bounded conversion log view.
+"""
+
+import time
+
+import pytest
+
+from pandoc_ui.gui.log_view import LogModel, LogView
+
+# QApplication fixture is now in conftest.py
+
+
+@pytest.fixture
+def log_view(qapp, tmp_path):
+    """Create log view writing history into a temp directory."""
+    view = LogView(capacity=100, history_file=tmp_path / "logs" / "conversion.log")
+    yield view
+    view.shutdown()
+    view.deleteLater()
+
+
+class TestLogModel:
+    """Test LogModel ring buffer."""
+
+    def test_messages_wait_for_flush(self, qapp):
+        """Test that appended messages are coalesced until flush."""
+        model = LogModel(capacity=10)
+        for i in range(5):
+            model.append(f"message {i}")
+
+        assert model.rowCount() == 0
+        assert model.pending_count == 5
+        assert model.flush() == 5
+        assert model.rowCount() == 5
+
+    def test_capacity_bound(self, qapp):
+        """Test that only the newest entries are kept in memory."""
+        model = LogModel(capacity=10)
+        for i in range(25):
+            model.append(f"message {i}")
+            if i % 7 == 0:
+                model.flush()
+        model.flush()
+
+        entries = model.entries()
+        assert len(entries) == 10
+        assert entries[0].message == "message 15"
+        assert entries[-1].message == "message 24"
+        assert model.total_count == 25
+
+    def test_history_file_keeps_everything(self, qapp, tmp_path):
+        """Test that entries evicted from memory remain in the history file."""
+        history = tmp_path / "conversion.log"
+        model = LogModel(capacity=3, history_file=history)
+        for i in range(10):
+            model.append(f"message {i}", "ERROR" if i == 4 else "INFO")
+        model.close()
+
+        lines = history.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 10
+        assert "ERROR" in lines[4] and lines[4].endswith("message 4")
+
+
+class TestLogView:
+    """Test LogView widget."""
+
+    def test_plain_text_compatibility(self, log_view):
+        """Test the QTextEdit-style API used by MainWindowUI."""
+        log_view.append("first")
+        log_view.appendMessage("second", "WARNING")
+
+        text = log_view.toPlainText()
+        assert "first" in text and "second" in text
+
+        log_view.clear()
+        assert log_view.toPlainText() == ""
+
+    def test_level_filter_and_search(self, log_view):
+        """Test filtering by level and search text."""
+        log_view.appendMessage("Started: a.md")
+        log_view.appendMessage("Failed: b.md", "ERROR")
+        log_view.appendMessage("Completed: c.md")
+        log_view.flush()
+
+        log_view.levelComboBox.setCurrentIndex(log_view.levelComboBox.findData("ERROR"))
+        assert log_view.filter_model.rowCount() == 1
+
+        log_view.levelComboBox.setCurrentIndex(0)
+        log_view.searchEdit.setText("c.md")
+        assert log_view.filter_model.rowCount() == 1
+
+    def test_large_batch_stays_bounded(self, log_view):
+        """Test that 100k messages keep memory bounded and flushes cheap."""
+        start = time.perf_counter()
+        for i in range(100_000):
+            log_view.appendMessage(f"✅ Completed: file_{i}.md")
+            if i % 1000 == 0:
+                log_view.flush()
+        log_view.flush()
+        elapsed = time.perf_counter() - start
+
+        assert log_view.model.rowCount() == 100
+        assert log_view.model.total_count == 100_000
+        assert elapsed < 10
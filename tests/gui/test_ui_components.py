@@ -2,12 +2,16 @@
 Tests for GUI UI components.
 """
 
+import threading
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
-from PySide6.QtWidgets import QMainWindow
+from PySide6.QtCore import QThreadPool
+from PySide6.QtWidgets import QApplication, QMainWindow
 
+from pandoc_ui.app.deduplication import plan_deduplication
+from pandoc_ui.app.service_registry import get_service_registry
 from pandoc_ui.gui.ui_components import MainWindowUI
 
 # QApplication fixture is now in conftest.py
@@ -188,7 +192,7 @@ class TestMainWindowUI:
         # Should be disabled again
         assert not ui_handler.ui.convertButton.isEnabled()
 
-    @patch("pandoc_ui.app.conversion_service.ConversionService")
+    @patch("pandoc_ui.app.service_registry.get_conversion_service")
     def test_pandoc_availability_check_available(self, mock_service, ui_handler):
         """Test pandoc availability check when available."""
         # Mock service
@@ -207,7 +211,7 @@ class TestMainWindowUI:
         assert "Pandoc detected" in log_text
         assert "3.1.3" in log_text
 
-    @patch("pandoc_ui.app.conversion_service.ConversionService")
+    @patch("pandoc_ui.app.service_registry.get_conversion_service")
     @patch("pandoc_ui.gui.ui_components.QMessageBox")
     def test_pandoc_availability_check_not_available(self, mock_msgbox, mock_service, ui_handler):
         """Test pandoc availability check when not available."""
@@ -247,3 +251,44 @@ class TestMainWindowUI:
         assert result is True
         mock_worker.terminate.assert_called_once()
         mock_worker.wait.assert_called_once_with(3000)
+
+    @patch("pandoc_ui.gui.ui_components.get_service_registry")
+    @patch("pandoc_ui.gui.ui_components.plan_batch", side_effect=ValueError("stop here"))
+    @patch("pandoc_ui.gui.ui_components.QMessageBox")
+    def test_batch_deduplicated_off_gui_thread(
+        self, mock_msgbox, mock_plan, mock_registry, ui_handler, tmp_path
+    ):
+        """Test that batch inputs are hashed on a pool thread before the batch is planned."""
+        for name in ("a.md", "b.md"):
+            (tmp_path / name).write_text("same content")
+        ui_handler.batch_files = [tmp_path / "a.md", tmp_path / "b.md"]
+        ui_handler.ui.formatComboBox.setCurrentIndex(ui_handler.ui.formatComboBox.findData("html"))
+        ui_handler.ui.outputDirEdit.setText(str(tmp_path / "out"))
+        planned_on = []
+
+        def plan(files, output_format):
+            planned_on.append(threading.current_thread())
+            return plan_deduplication(files, output_format="docx")
+
+        with patch("pandoc_ui.gui.deduplication_worker.plan_deduplication", side_effect=plan):
+            ui_handler.startBatchConversion()
+            assert QThreadPool.globalInstance().waitForDone(5000)
+        QApplication.processEvents()
+
+        assert planned_on and planned_on[0] is not threading.main_thread()
+        [plan_args] = [call.args for call in mock_plan.call_args_list]
+        assert plan_args[0] == [tmp_path / "a.md"]
+        mock_msgbox.warning.assert_called_once()
+        assert ui_handler.ui.convertButton.isEnabled()
+
+    def test_timeout_settings_reapplied_on_save(self, ui_handler, tmp_path):
+        """Test that saved timeout settings replace the service's timeout policy."""
+        ui_handler.settings_store.settings_file = tmp_path / "settings.json"
+        service = get_service_registry().get_conversion_service()
+
+        assert ui_handler.settings_store.update_setting("pandoc_timeout_seconds", 2400)
+        assert ui_handler.settings_store.update_setting("pandoc_max_timeout_seconds", 600)
+
+        assert ui_handler.current_settings.pandoc_max_timeout_seconds == 600
+        assert service.timeout_policy.default_seconds == 2400
+        assert service.timeout_policy.max_seconds == 600
@@ -0,0 +1,3 @@
+"""
+Shared helpers for tests, stress tests and benchmarks.
+"""
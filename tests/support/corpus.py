@@ -0,0 +1,323 @@
+"""
+Deterministic synthetic document corpora for scaling and stress tests.
+
+generate_corpus() writes a directory tree of configurable depth and fan-out
+filled with documents in the formats FolderScanner recognises, with a
+log-normal size distribution plus a few multi-megabyte documents,
+byte-identical duplicates, images referenced from documents, and ignored
+directories (.git, node_modules, ...) whose contents the scanner must skip.
+The same spec and seed always produce the same bytes, so corpora can be
+regenerated on the fly instead of being stored.
+
+At the default ratios a corpus averages about 20 KB per document, most of
+it in the multi-megabyte ones; pass large_ratio=0 for million-file runs.
+"""
+
+import io
+import json
+import math
+import random
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pandoc_ui.app.folder_scanner import FolderScanner
+
+KIB = 1024
+MIB = 1024 * KIB
+
+# Relative frequency of each extension; text formats dominate real trees
+DEFAULT_EXTENSION_WEIGHTS: dict[str, float] = {
+    ".md": 50,
+    ".markdown": 3,
+    ".rst": 10,
+    ".adoc": 4,
+    ".textile": 1,
+    ".html": 8,
+    ".htm": 1,
+    ".tex": 5,
+    ".org": 3,
+    ".wiki": 2,
+    ".twiki": 1,
+    ".opml": 1,
+    ".json": 1,
+    ".docx": 2,
+    ".odt": 1,
+    ".epub": 1,
+}
+
+IGNORED_DIR_NAMES = (".git", "node_modules", "__pycache__", ".venv")
+
+# Smallest valid PNG (1x1, transparent)
+PNG_1X1 = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+_WORDS = (
+    "pandoc convert document batch folder archive output format heading table "
+    "figure section paragraph markdown reference citation footnote metadata "
+    "template filter option queue worker thread result summary profile"
+).split()
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a generated corpus."""
+
+    files: int = 1000  # Documents, duplicates included
+    depth: int = 3  # Directory levels below the root
+    fan_out: int = 6  # Subdirectories per directory
+    seed: int = 0
+    extension_weights: dict[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_EXTENSION_WEIGHTS)
+    )
+    median_bytes: int = 4 * KIB  # Median of the log-normal size distribution
+    size_sigma: float = 1.0  # Spread of the log-normal distribution
+    max_bytes: int = 512 * KIB  # Cap for regular documents
+    large_ratio: float = 0.002  # Documents drawn from large_bytes instead
+    large_bytes: tuple[int, int] = (1 * MIB, 8 * MIB)
+    duplicate_ratio: float = 0.05  # Documents that copy an earlier one byte for byte
+    image_ratio: float = 0.05  # Documents that reference a new image
+    ignored_dir_ratio: float = 0.05  # Directories that also hold an ignored subdirectory
+    ignored_files_per_dir: int = 3
+
+
+@dataclass
+class Corpus:
+    """What generate_corpus() wrote."""
+
+    root: Path
+    spec: CorpusSpec
+    documents: list[Path] = field(default_factory=list)  # In generation order
+    duplicates: dict[Path, Path] = field(default_factory=dict)  # Duplicate -> original
+    images: list[Path] = field(default_factory=list)
+    ignored: list[Path] = field(default_factory=list)  # Files the scanner must skip
+    large_documents: list[Path] = field(default_factory=list)
+    total_bytes: int = 0
+
+    def documents_with(self, extensions: set[str]) -> list[Path]:
+        """Get the documents a scan for these extensions should find, sorted."""
+        return sorted(path for path in self.documents if path.suffix in extensions)
+
+    def extension_counts(self) -> dict[str, int]:
+        """Count documents per extension."""
+        counts: dict[str, int] = {}
+        for path in self.documents:
+            counts[path.suffix] = counts.get(path.suffix, 0) + 1
+        return counts
+
+
+def scanner_extensions() -> set[str]:
+    """Get every extension FolderScanner looks for by default."""
+    return set().union(*FolderScanner.DEFAULT_EXTENSIONS.values())
+
+
+def directory_tree(depth: int, fan_out: int) -> list[Path]:
+    """List the relative directories of a tree, breadth first, root first."""
+    levels = [[Path()]]
+    for _ in range(depth):
+        levels.append([parent / f"dir{i:02d}" for parent in levels[-1] for i in range(fan_out)])
+    return [directory for level in levels for directory in level]
+
+
+def generate_corpus(root: Path, spec: CorpusSpec | None = None, **overrides) -> Corpus:
+    """
+    Write a corpus below root.
+
+    Args:
+        root: Directory to fill (created if needed)
+        spec: Corpus shape (defaults to CorpusSpec())
+        **overrides: CorpusSpec fields to change, e.g. files=100_000
+
+    Returns:
+        Corpus describing every file written
+    """
+    spec = spec or CorpusSpec()
+    if overrides:
+        spec = CorpusSpec(**{**spec.__dict__, **overrides})
+    unknown = set(spec.extension_weights) - scanner_extensions()
+    if unknown:
+        raise ValueError(f"Extensions FolderScanner does not recognise: {sorted(unknown)}")
+
+    rng = random.Random(spec.seed)
+    corpus = Corpus(root=root, spec=spec)
+    directories = directory_tree(spec.depth, spec.fan_out)
+    created: set[Path] = set()
+    extensions = list(spec.extension_weights)
+    weights = list(spec.extension_weights.values())
+    mu = math.log(spec.median_bytes)
+    originals: dict[str, list[Path]] = {}
+
+    for index in range(spec.files):
+        directory = root / directories[index % len(directories)]
+        if directory not in created:
+            directory.mkdir(parents=True, exist_ok=True)
+            created.add(directory)
+            if rng.random() < spec.ignored_dir_ratio:
+                _write_ignored(directory, rng, spec, corpus)
+
+        extension = rng.choices(extensions, weights)[0]
+        path = directory / f"doc{index:07d}{extension}"
+
+        previous = originals.get(extension)
+        if previous and rng.random() < spec.duplicate_ratio:
+            original = rng.choice(previous)
+            if rng.random() < 0.5:
+                # Half the duplicates sit next to their original, where they share its images
+                path = original.parent / path.name
+            data = original.read_bytes()
+            corpus.duplicates[path] = original
+        else:
+            if rng.random() < spec.large_ratio:
+                size = rng.randint(*spec.large_bytes)
+                corpus.large_documents.append(path)
+            else:
+                size = int(min(spec.max_bytes, max(256, rng.lognormvariate(mu, spec.size_sigma))))
+            image = None
+            if rng.random() < spec.image_ratio:
+                image = _write_image(directory, index, corpus)
+            data = _document(extension, index, size, image, rng)
+            originals.setdefault(extension, []).append(path)
+
+        path.write_bytes(data)
+        corpus.documents.append(path)
+        corpus.total_bytes += len(data)
+
+    return corpus
+
+
+def _write_image(directory: Path, index: int, corpus: Corpus) -> str:
+    """Write an image next to a document and return its relative reference."""
+    images = directory / "images"
+    images.mkdir(exist_ok=True)
+    path = images / f"figure{index:07d}.png"
+    path.write_bytes(PNG_1X1)
+    corpus.images.append(path)
+    return f"images/{path.name}"
+
+
+def _write_ignored(directory: Path, rng: random.Random, spec: CorpusSpec, corpus: Corpus) -> None:
+    """Add an ignored directory holding documents the scanner must not report."""
+    ignored = directory / rng.choice(IGNORED_DIR_NAMES) / "nested"
+    ignored.mkdir(parents=True, exist_ok=True)
+    for i in range(spec.ignored_files_per_dir):
+        path = ignored / f"ignored{i}.md"
+        path.write_text(f"# Ignored {i}\n", encoding="utf-8")
+        corpus.ignored.append(path)
+
+
+def _paragraph(rng: random.Random, size: int) -> str:
+    """Build one paragraph of roughly size characters."""
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def _body(rng: random.Random, size: int) -> list[str]:
+    """Build paragraphs totalling about size characters; large bodies repeat a block."""
+    block: list[str] = []
+    block_size = 0
+    while block_size < min(size, 64 * KIB):
+        paragraph = _paragraph(rng, rng.randint(100, 800))
+        block.append(paragraph)
+        block_size += len(paragraph) + 2
+    return block * max(1, -(-size // block_size))
+
+
+def _document(
+    extension: str, index: int, size: int, image: str | None, rng: random.Random
+) -> bytes:
+    """Render a document of about size bytes in the markup the extension implies."""
+    title = f"Document {index}"  # Unique, so only intended duplicates share content
+    paragraphs = _body(rng, size)
+    figure = image or ""
+
+    if extension in {".md", ".markdown", ".mdown", ".mkd", ".mkdn"}:
+        parts = [f"# {title}", *paragraphs]
+        if image:
+            parts.append(f"![Figure]({figure})")
+    elif extension in {".rst", ".rest"}:
+        parts = [title, "=" * len(title), *paragraphs]
+        if image:
+            parts.append(f".. image:: {figure}")
+    elif extension in {".adoc", ".asciidoc"}:
+        parts = [f"= {title}", *paragraphs]
+        if image:
+            parts.append(f"image::{figure}[Figure]")
+    elif extension == ".textile":
+        parts = [f"h1. {title}", *(f"p. {p}" for p in paragraphs)]
+        if image:
+            parts.append(f"!{figure}!")
+    elif extension in {".html", ".htm"}:
+        body = "\n".join(f"<p>{p}</p>" for p in paragraphs)
+        img = f'<img src="{figure}" alt="Figure">' if image else ""
+        parts = [
+            f"<html><head><title>{title}</title></head><body><h1>{title}</h1>{body}{img}"
+            "</body></html>"
+        ]
+    elif extension in {".tex", ".latex"}:
+        graphic = f"\\includegraphics{{{figure}}}" if image else ""
+        parts = [
+            "\\documentclass{article}\n\\begin{document}",
+            f"\\section{{{title}}}",
+            *paragraphs,
+            graphic,
+            "\\end{document}",
+        ]
+    elif extension == ".org":
+        parts = [f"* {title}", *paragraphs]
+        if image:
+            parts.append(f"[[file:{figure}]]")
+    elif extension == ".wiki":
+        parts = [f"= {title} =", *paragraphs]
+        if image:
+            parts.append(f"[[File:{figure}]]")
+    elif extension == ".twiki":
+        parts = [f"---+ {title}", *paragraphs]
+    elif extension == ".opml":
+        outlines = "".join(f'<outline text="{p[:200]}"/>' for p in paragraphs)
+        parts = [
+            f'<?xml version="1.0"?><opml version="2.0"><head><title>{title}</title></head>'
+            f"<body>{outlines}</body></opml>"
+        ]
+    elif extension == ".json":
+        return _pandoc_json(title, paragraphs).encode()
+    elif extension in {".docx", ".odt", ".epub"}:
+        return _zipped(extension, title, paragraphs)
+    else:
+        raise ValueError(f"No generator for {extension}")
+
+    return ("\n\n".join(parts) + "\n").encode()
+
+
+def _pandoc_json(title: str, paragraphs: list[str]) -> str:
+    """Render a document in pandoc's JSON AST."""
+    blocks = [{"t": "Header", "c": [1, ["", [], []], [{"t": "Str", "c": title}]]}]
+    blocks += [{"t": "Para", "c": [{"t": "Str", "c": p}]} for p in paragraphs]
+    return json.dumps({"pandoc-api-version": [1, 23], "meta": {}, "blocks": blocks})
+
+
+def _zipped(extension: str, title: str, paragraphs: list[str]) -> bytes:
+    """Render a minimal zip container for docx, odt or epub."""
+    text = "".join(f"<p>{p}</p>" for p in [title, *paragraphs])
+    buffer = io.BytesIO()
+    # Stored rather than deflated so the container is as large as its text;
+    # fixed timestamps keep the bytes identical between runs
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        if extension == ".docx":
+            members = {"[Content_Types].xml": "<Types/>", "word/document.xml": text}
+        elif extension == ".odt":
+            members = {
+                "mimetype": "application/vnd.oasis.opendocument.text",
+                "content.xml": text,
+            }
+        else:
+            members = {"mimetype": "application/epub+zip", "OEBPS/content.xhtml": text}
+        for name, content in members.items():
+            archive.writestr(zipfile.ZipInfo(name, (2020, 1, 1, 0, 0, 0)), content)
+    return buffer.getvalue()
@@ -0,0 +1,290 @@
+"""
+Deterministic stand-in for the pandoc executable.
+
+FakePandoc installs a small Python script named pandoc that PandocDetector
+and PandocRunner can be pointed at. It answers --version and the --list-*
+queries, accepts pandoc's command line, spends a configurable time per run
+(sleeping or burning CPU, optionally scaled by input size), writes an output
+derived only from its input and arguments, and fails for chosen inputs.
+With --verbose it reports running filters and LaTeX passes the way pandoc
+does, spread over the time it spends.
+Throughput and orchestration tests then measure the application's own
+overhead and behave the same on every machine, with or without pandoc.
+
+The script starts Python with -S and imports only what it needs, so a run
+costs little more than interpreter startup. It relies on a shebang line, so
+it is POSIX only.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+SCRIPT = r'''"""Fake pandoc; behaviour is read from fake-pandoc.json next to this file."""
+import json
+import os
+import sys
+import time
+
+INPUT_FORMATS = (
+    "asciidoc commonmark commonmark_x csv docbook docx epub gfm html ipynb json latex "
+    "man markdown markdown_mmd markdown_phpextra markdown_strict mediawiki odt opml org "
+    "rst rtf textile twiki"
+).split()
+OUTPUT_FORMATS = (
+    "asciidoc beamer commonmark context docbook docx epub epub3 gfm html html5 ipynb json "
+    "latex man markdown mediawiki odt opml org pdf plain pptx revealjs rst rtf textile"
+).split()
+# Options that take a value when written as two arguments
+VALUE_OPTIONS = {
+    "-f", "--from", "-r", "--read", "-t", "--to", "-w", "--write", "-o", "--output",
+    "-M", "--metadata", "-V", "--variable", "-c", "--css", "-F", "--filter", "-L",
+    "--lua-filter", "-H", "--include-in-header", "-B", "--include-before-body", "-A",
+    "--include-after-body", "--data-dir", "--template", "--resource-path", "--pdf-engine",
+    "--pdf-engine-opt", "--bibliography", "--csl", "--reference-doc", "--highlight-style",
+    "--toc-depth", "--columns", "--wrap", "--dpi", "--eol", "--shift-heading-level-by",
+    "--metadata-file", "--title-prefix", "--epub-cover-image", "--extract-media", "--log",
+    "--top-level-division", "--tab-stop", "--slide-level", "--id-prefix", "--defaults",
+    "-d", "--abbreviations", "--citation-abbreviations", "--default-image-extension",
+    "--email-obfuscation", "--number-offset", "--track-changes", "--reference-location",
+}
+MIB = 1024 * 1024
+
+
+def load_config():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake-pandoc.json")
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def parse(args):
+    options = {}
+    flags = []
+    inputs = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith("-") and arg != "-":
+            name, eq, value = arg.partition("=")
+            if not eq and name in VALUE_OPTIONS:
+                if i + 1 >= len(args):
+                    sys.stderr.write(f"pandoc: option {name} requires an argument\n")
+                    sys.exit(2)
+                i += 1
+                value = args[i]
+            if eq or name in VALUE_OPTIONS:
+                options.setdefault(name, []).append(value)
+            else:
+                flags.append(name)
+        else:
+            inputs.append(arg)
+        i += 1
+    return options, flags, inputs
+
+
+def first(options, *names, default=None):
+    for name in names:
+        if name in options:
+            return options[name][-1]
+    return default
+
+
+def queries(args, config):
+    arg = args[0] if args else ""
+    if arg in ("--version", "-v"):
+        print(f"pandoc {config.get('version', '3.1.3')}")
+        print("Features: +server +lua")
+        print("Scripting engine: Lua 5.4")
+        return 0
+    if arg == "--list-input-formats":
+        print("\n".join(INPUT_FORMATS))
+        return 0
+    if arg == "--list-output-formats":
+        print("\n".join(OUTPUT_FORMATS))
+        return 0
+    if arg.startswith("--list-extensions"):
+        print("\n".join(["+smart", "-raw_html", "+pipe_tables", "+yaml_metadata_block"]))
+        return 0
+    if arg == "--list-highlight-languages":
+        print("\n".join(["bash", "c", "haskell", "python"]))
+        return 0
+    if arg == "--list-highlight-styles":
+        print("\n".join(["pygments", "tango", "kate", "monochrome"]))
+        return 0
+    if arg.startswith("--print-default-template"):
+        print("$body$")
+        return 0
+    return None
+
+
+def spend(seconds, burn_cpu):
+    if seconds <= 0:
+        return
+    if not burn_cpu:
+        time.sleep(seconds)
+        return
+    deadline = time.process_time() + seconds
+    x = 0
+    while time.process_time() < deadline:
+        for i in range(10000):
+            x = (x * 31 + i) & 0xFFFFFFFF
+
+
+def main(args):
+    config = load_config()
+    if config.get("record"):
+        line = json.dumps(args) + "\n"
+        fd = os.open(config["record"], os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+
+    answered = queries(args, config)
+    if answered is not None:
+        return answered
+
+    options, flags, inputs = parse(args)
+    data = b""
+    if inputs:
+        for name in inputs:
+            try:
+                with open(name, "rb") as f:
+                    data += f.read()
+            except OSError as e:
+                sys.stderr.write(f"pandoc: {name}: withBinaryFile: {e.strerror}\n")
+                return 1
+    else:
+        data = sys.stdin.buffer.read()
+
+    source = first(options, "-f", "--from", "-r", "--read", default="markdown")
+    target = first(options, "-t", "--to", "-w", "--write", default="html")
+    phases = []
+    if "--verbose" in flags or "--trace" in flags:
+        for name in ("-F", "--filter", "-L", "--lua-filter"):
+            phases += [f"[INFO] Running filter {f}" for f in options.get(name, [])]
+        if target == "pdf":
+            # Multi-line blocks like pandoc's: headers followed by unprefixed detail
+            tex = "/tmp/tex2pdf.-4242/input.tex"
+            phases.append(
+                "[makePDF] Temp dir:\n/tmp/tex2pdf.-4242\n"
+                "[makePDF] Command line:\n"
+                f'pdflatex "-halt-on-error" "-interaction" "nonstopmode" "{tex}"\n\n'
+                "[makePDF] Source:\n\\documentclass{article}\n\\begin{document}\n"
+                + data.decode("utf-8", "replace")
+                + "\n\\end{document}"
+            )
+            for run in (1, 2):
+                phases.append(
+                    f"[makePDF] LaTeX run number {run}\n[makePDF] LaTeX output\n"
+                    "This is pdfTeX, Version 3.141592653\n(./input.tex\n[1{/usr/share/pdftex.map}]"
+                )
+    seconds = config.get("seconds", 0.0) + config.get("seconds_per_mib", 0.0) * len(data) / MIB
+    for phase in phases:
+        spend(seconds / (len(phases) + 1), config.get("burn_cpu", False))
+        sys.stderr.write(phase + "\n")
+        sys.stderr.flush()
+    spend(seconds / (len(phases) + 1), config.get("burn_cpu", False))
+
+    for i in range(config.get("warnings", 0)):
+        sys.stderr.write(f"[WARNING] Fake warning {i + 1}\n")
+
+    fail_inputs = config.get("fail_inputs") or []
+    if fail_inputs:
+        from fnmatch import fnmatch
+
+        failing = [n for n in inputs if any(fnmatch(os.path.basename(n), p) for p in fail_inputs)]
+    else:
+        failing = []
+    marker = config.get("fail_marker")
+    if failing or (marker and marker.encode() in data):
+        what = failing[0] if failing else "stdin" if not inputs else inputs[0]
+        sys.stderr.write(f"pandoc: simulated failure converting {what}\n")
+        return config.get("fail_exit_code", 1)
+
+    output = (f"fake-pandoc {source} -> {target}\n").encode() + data
+    path = first(options, "-o", "--output")
+    if path is None or path == "-":
+        sys.stdout.buffer.write(output)
+    else:
+        with open(path, "wb") as f:
+            f.write(output)
+    return 0
+
+
+sys.exit(main(sys.argv[1:]))
+'''
+
+
+def expected_output(data: bytes, source: str = "markdown", target: str = "html") -> bytes:
+    """Get what the fake pandoc writes for an input."""
+    return f"fake-pandoc {source} -> {target}\n".encode() + data
+
+
+class FakePandoc:
+    """
+    A fake pandoc executable installed in a directory.
+
+    Behaviour can be changed between runs with configure(); it is read from
+    fake-pandoc.json by every invocation.
+
+    Options:
+        version: Version reported by --version
+        seconds: Time spent on every conversion
+        seconds_per_mib: Additional time per MiB of input
+        burn_cpu: Spend the time on CPU instead of sleeping
+        fail_inputs: Glob patterns of input file names that fail
+        fail_marker: Text that makes any input containing it fail
+        fail_exit_code: Exit status of failed conversions
+        warnings: Number of [WARNING] lines written to stderr per conversion
+        record: Log every invocation's arguments to calls.jsonl
+    """
+
+    DEFAULTS = {
+        "version": "3.1.3",
+        "seconds": 0.0,
+        "seconds_per_mib": 0.0,
+        "burn_cpu": False,
+        "fail_inputs": [],
+        "fail_marker": "FAKE_PANDOC_FAIL",
+        "fail_exit_code": 1,
+        "warnings": 0,
+        "record": False,
+    }
+
+    def __init__(self, directory: Path, **options) -> None:
+        """
+        Install the fake pandoc.
+
+        Args:
+            directory: Directory to install pandoc into (created if needed)
+            **options: Behaviour, see the class docstring
+        """
+        self.directory = directory
+        self.path = directory / "pandoc"
+        self.calls_path = directory / "calls.jsonl"
+        self._config = dict(self.DEFAULTS)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(f"#!{sys.executable} -S\n{SCRIPT}")
+        self.path.chmod(0o755)
+        self.configure(**options)
+
+    def configure(self, **options) -> None:
+        """Change the behaviour of subsequent runs."""
+        unknown = set(options) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown fake pandoc options: {sorted(unknown)}")
+        self._config.update(options)
+        config = dict(self._config)
+        config["record"] = str(self.calls_path) if config["record"] else None
+        (self.directory / "fake-pandoc.json").write_text(json.dumps(config))
+
+    def calls(self) -> list[list[str]]:
+        """Get the arguments of every recorded invocation."""
+        if not self.calls_path.exists():
+            return []
+        with open(self.calls_path) as f:
+            return [json.loads(line) for line in f]
@@ -0,0 +1,450 @@
+"""
+Tests for streaming archive input and output.
+"""
+
+import io
+import sys
+import tarfile
+import threading
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pandoc_ui.app.conversion_service import ConversionService
+from pandoc_ui.app.folder_scanner import FolderScanner
+from pandoc_ui.app.task_queue import TaskQueue
+from pandoc_ui.infra.archive_io import (
+    ArchiveFormat,
+    ArchiveReader,
+    ArchiveWriter,
+    SharedArchive,
+    get_shared_archive,
+)
+from pandoc_ui.infra.pandoc_runner import PandocRunner
+from pandoc_ui.models import ConversionProfile, ConversionResult, OutputFormat
+
+STDOUT_PANDOC = """#!{python}
+import sys
+args = sys.argv[1:]
+data = open(args[0], "rb").read().upper()
+if "-o" in args:
+    open(args[args.index("-o") + 1], "wb").write(b"BINARY:" + data)
+else:
+    sys.stdout.buffer.write(data)
+"""
+
+STDIN_PANDOC = """#!{python}
+import os
+import sys
+args = sys.argv[1:]
+assert args[args.index("-f") + 1] == "markdown", args
+resources = args[args.index("--resource-path") + 1]
+image = open(os.path.join(resources, "img", "logo.png"), "rb").read()
+data = sys.stdin.buffer.read()
+open(args[args.index("-o") + 1], "wb").write(data.upper() + b"|" + image)
+"""
+
+
+def _make_zip(path: Path, members: dict[str, bytes]) -> Path:
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return path
+
+
+def _make_tar(path: Path, members: dict[str, bytes]) -> Path:
+    with tarfile.open(path, "w:gz") as tf:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return path
+
+
+class TestArchiveFormat:
+    """Test cases for ArchiveFormat."""
+
+    def test_from_path(self):
+        """Test archive type detection from file names."""
+        assert ArchiveFormat.from_path(Path("out.zip")) == ArchiveFormat.ZIP
+        assert ArchiveFormat.from_path(Path("out.TAR.GZ")) == ArchiveFormat.TAR_GZ
+        assert ArchiveFormat.from_path(Path("out.tgz")) == ArchiveFormat.TAR_GZ
+        assert ArchiveFormat.from_path(Path("out")) is None
+
+    def test_unsupported_path_rejected(self, tmp_path):
+        """Test that a non-archive path is rejected."""
+        with pytest.raises(ValueError, match="Unsupported archive"):
+            ArchiveWriter(tmp_path / "out.rar")
+
+
+class TestArchiveWriter:
+    """Test cases for ArchiveWriter."""
+
+    def test_zip_roundtrip(self, tmp_path):
+        """Test bytes, files and aliases in a zip archive."""
+        source = tmp_path / "book.docx"
+        source.write_bytes(b"docx-bytes")
+        archive_path = tmp_path / "out.zip"
+
+        with ArchiveWriter(archive_path) as writer:
+            writer.add_bytes("a.html", b"<p>a</p>", aliases=("copy/a.html",))
+            writer.add_file(source, "book.docx", remove=True)
+
+        with zipfile.ZipFile(archive_path) as zf:
+            assert sorted(zf.namelist()) == ["a.html", "book.docx", "copy/a.html"]
+            assert zf.read("copy/a.html") == b"<p>a</p>"
+            assert zf.read("book.docx") == b"docx-bytes"
+        assert not source.exists()
+        assert writer.entry_count == 3
+
+    def test_tar_gz_roundtrip(self, tmp_path):
+        """Test that tar aliases are stored as hardlinks."""
+        archive_path = tmp_path / "out.tar.gz"
+
+        with ArchiveWriter(archive_path) as writer:
+            writer.add_bytes("a.html", b"content", aliases=("b.html",))
+
+        with tarfile.open(archive_path) as tf:
+            alias = tf.getmember("b.html")
+            assert alias.islnk()
+            assert tf.extractfile("b.html").read() == b"content"
+
+    def test_duplicate_member_skipped(self, tmp_path):
+        """Test that a member name is only written once."""
+        archive_path = tmp_path / "out.zip"
+
+        with ArchiveWriter(archive_path) as writer:
+            writer.add_bytes("a.html", b"first")
+            writer.add_bytes("a.html", b"second")
+
+        with zipfile.ZipFile(archive_path) as zf:
+            assert zf.namelist() == ["a.html"]
+            assert zf.read("a.html") == b"first"
+
+    def test_abort_discards_archive(self, tmp_path):
+        """Test that an aborted archive leaves nothing behind."""
+        archive_path = tmp_path / "out.zip"
+
+        writer = ArchiveWriter(archive_path)
+        writer.add_bytes("a.html", b"content")
+        writer.abort()
+
+        assert list(tmp_path.iterdir()) == []
+        with pytest.raises(RuntimeError, match="closed"):
+            writer.add_bytes("b.html", b"content")
+
+    def test_memory_bound(self, tmp_path):
+        """Test that concurrent producers never exceed the pending byte bound."""
+        archive_path = tmp_path / "out.zip"
+        payload = b"x" * 10_000
+
+        writer = ArchiveWriter(archive_path, max_pending_bytes=50_000)
+
+        def produce(worker: int) -> None:
+            for i in range(200):
+                writer.add_bytes(f"w{worker}/doc{i}.html", payload)
+
+        threads = [threading.Thread(target=produce, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+        assert writer.peak_pending_bytes <= 50_000
+        with zipfile.ZipFile(archive_path) as zf:
+            assert len(zf.namelist()) == 1600
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a POSIX script as pandoc")
+class TestRunnerToArchive:
+    """Test PandocRunner.execute_to_archive."""
+
+    @pytest.fixture
+    def runner(self, tmp_path):
+        script = tmp_path / "fake-pandoc"
+        script.write_text(STDOUT_PANDOC.format(python=sys.executable))
+        script.chmod(0o755)
+        return PandocRunner(script)
+
+    def test_text_and_binary_writers(self, runner, tmp_path):
+        """Test stdout capture for text writers and temp files for binary writers."""
+        input_file = tmp_path / "doc.md"
+        input_file.write_text("hello")
+        archive_path = tmp_path / "out.zip"
+
+        with ArchiveWriter(archive_path) as writer:
+            html = runner.execute_to_archive(
+                ConversionProfile(input_path=input_file, output_format=OutputFormat.HTML),
+                writer,
+                "doc.html",
+            )
+            docx = runner.execute_to_archive(
+                ConversionProfile(input_path=input_file, output_format=OutputFormat.DOCX),
+                writer,
+                "doc.docx",
+            )
+
+        assert html.success and docx.success
+        assert " -o " not in html.command
+        with zipfile.ZipFile(archive_path) as zf:
+            assert zf.read("doc.html") == b"HELLO"
+            assert zf.read("doc.docx") == b"BINARY:HELLO"
+        assert not (tmp_path / "doc.html").exists()
+
+
+class TestArchiveReader:
+    """Test ArchiveReader member access."""
+
+    def test_stream_member_extracts_referenced_resources(self, tmp_path):
+        """Test that only resources the document references are extracted."""
+        archive_path = _make_zip(
+            tmp_path / "docs.zip",
+            {
+                "docs/guide.md": b"# Guide\n\n![logo](img/logo.png)\n",
+                "docs/img/logo.png": b"PNG",
+                "docs/img/unused.png": b"PNG",
+            },
+        )
+        sink = io.BytesIO()
+        resource_dir = tmp_path / "res"
+
+        with ArchiveReader(archive_path) as reader:
+            extracted = reader.stream_member("docs/guide.md", sink, resource_dir)
+
+        assert extracted == 1
+        assert sink.getvalue().startswith(b"# Guide")
+        assert (resource_dir / "docs" / "img" / "logo.png").read_bytes() == b"PNG"
+        assert not (resource_dir / "docs" / "img" / "unused.png").exists()
+
+    def test_unsafe_reference_not_extracted(self, tmp_path):
+        """Test that references escaping the archive root are refused."""
+        archive_path = _make_zip(tmp_path / "docs.zip", {"doc.md": b"![x](../../etc/passwd)\n"})
+        with ArchiveReader(archive_path) as reader:
+            assert reader.stream_member("doc.md", io.BytesIO(), tmp_path / "res") == 0
+            assert reader.extract("../escape.md", tmp_path / "res") is None
+
+    def test_dot_prefixed_tar_members(self, tmp_path):
+        """Test that members of a `tar czf x.tgz .` archive are found by their plain names."""
+        archive_path = _make_tar(
+            tmp_path / "docs.tgz",
+            {"./docs/a.md": b"![logo](img/logo.png)", "./docs/img/logo.png": b"PNG"},
+        )
+        sink = io.BytesIO()
+
+        with ArchiveReader(archive_path) as reader:
+            assert reader.members() == [("docs/a.md", 21), ("docs/img/logo.png", 3)]
+            assert reader.stream_member("docs/a.md", sink, tmp_path / "res") == 1
+
+        assert sink.getvalue() == b"![logo](img/logo.png)"
+        assert (tmp_path / "res" / "docs" / "img" / "logo.png").read_bytes() == b"PNG"
+
+    @pytest.mark.parametrize("mode", ["w:gz", "w:bz2", "w:xz", "w"])
+    def test_shared_tar_read_in_place(self, tmp_path, monkeypatch, mode):
+        """Test that a shared tar is indexed once and read without a temporary copy."""
+        members = {f"doc{i}.md": f"document {i}".encode() * (i + 1) for i in range(50)}
+        # Compression is detected from the content, as tarfile's "r:*" does
+        archive_path = tmp_path / "docs.tar.gz"
+        with tarfile.open(archive_path, mode) as tf:
+            for name, data in members.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+        monkeypatch.setattr(
+            "tempfile.mkstemp", Mock(side_effect=AssertionError("archive spooled to disk"))
+        )
+
+        with get_shared_archive(archive_path) as shared:
+            with get_shared_archive(archive_path) as again:
+                assert again is shared
+            for name, data in [*reversed(members.items()), *members.items()]:
+                with shared.reader() as reader:
+                    assert reader.index is shared.index
+                    with reader.open(name) as f:
+                        assert f.read() == data
+
+    def test_gzip_checkpoints_bound_rereads(self, tmp_path, monkeypatch):
+        """Test that a late tar.gz member is read from a checkpoint, not the start."""
+        monkeypatch.setattr(SharedArchive, "CHECKPOINT_SPACING", 1024 * 1024)
+        members = {f"doc{i}.bin": bytes([i]) * 1024 * 1024 for i in range(20)}
+        shared = SharedArchive(_make_tar(tmp_path / "docs.tar.gz", members)).open()
+
+        assert len(shared._checkpoints) > 10
+        with shared.reader() as reader, reader.open("doc17.bin") as f:
+            assert f.read() == members["doc17.bin"]
+        with shared.reader() as reader, reader.open("doc3.bin") as f:
+            assert f.read() == members["doc3.bin"]
+        shared.close()
+
+    def test_evicted_archive_stays_open_until_released(self, tmp_path, monkeypatch):
+        """Test that evicting a shared archive does not close it under its user."""
+        monkeypatch.setattr("pandoc_ui.infra.archive_io._shared_archives", OrderedDict())
+        paths = [
+            _make_zip(tmp_path / f"docs{i}.zip", {"doc.md": bytes([i]) * 10}) for i in range(3)
+        ]
+
+        held = get_shared_archive(paths[0])
+        for path in paths[1:]:
+            get_shared_archive(path).release()
+        assert held.zip_file is not None and held.zip_file.fp is not None
+        with held.reader() as reader, reader.open("doc.md") as f:
+            assert f.read() == bytes([0]) * 10
+
+        held.release()
+        assert held.zip_file.fp is None
+        with get_shared_archive(paths[0]) as reopened:
+            assert reopened is not held
+
+    def test_shared_zip(self, tmp_path):
+        """Test that zip readers share the archive's ZipFile across threads."""
+        members = {f"sub/doc{i}.md": bytes([i]) * 1000 for i in range(20)}
+        shared = SharedArchive(_make_zip(tmp_path / "docs.zip", members)).open()
+        errors = []
+
+        def read(name, data):
+            try:
+                with shared.reader() as reader, reader.open(name) as f:
+                    assert f.read() == data
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read, args=item) for item in members.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        shared.close()
+
+        assert errors == []
+
+
+class TestArchiveScan:
+    """Test FolderScanner on archive inputs."""
+
+    @pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+    def test_scan_archive_members(self, tmp_path, suffix):
+        """Test that archive members are listed as virtual inputs."""
+        members = {
+            "a.md": b"a",
+            "sub/b.rst": b"b",
+            "sub/image.png": b"png",
+            ".hidden/c.md": b"c",
+            "node_modules/d.md": b"d",
+        }
+        archive_path = tmp_path / f"docs{suffix}"
+        if suffix == ".zip":
+            _make_zip(archive_path, members)
+        else:
+            _make_tar(archive_path, members)
+
+        result = FolderScanner().scan_folder(archive_path, extensions={".md", ".rst"})
+
+        assert result.success
+        assert result.archive_path == archive_path
+        assert result.files == [archive_path / "a.md", archive_path / "sub" / "b.rst"]
+        assert result.total_count == 3
+
+    def test_unreadable_archive(self, tmp_path):
+        """Test that a corrupt archive is reported as a scan error."""
+        archive_path = tmp_path / "broken.zip"
+        archive_path.write_bytes(b"not a zip")
+
+        result = FolderScanner().scan_folder(archive_path)
+
+        assert not result.success
+        assert result.files == []
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a POSIX script as pandoc")
+class TestRunnerFromArchive:
+    """Test converting archive members streamed on stdin."""
+
+    def test_member_streamed_with_resources(self, tmp_path):
+        """Test stdin streaming, -f from the member name and lazy resources."""
+        script = tmp_path / "fake-pandoc"
+        script.write_text(STDIN_PANDOC.format(python=sys.executable))
+        script.chmod(0o755)
+        archive_path = _make_zip(
+            tmp_path / "docs.zip",
+            {"docs/guide.md": b"see ![](img/logo.png)", "docs/img/logo.png": b"PNG"},
+        )
+        profile = ConversionProfile(
+            input_path=archive_path / "docs" / "guide.md",
+            output_path=tmp_path / "out" / "guide.docx",
+            output_format=OutputFormat.DOCX,
+            archive_path=archive_path,
+        )
+
+        service = ConversionService()
+        service._runner = PandocRunner(script)
+        result = service.convert(profile)
+
+        assert result.success, result.error_message
+        assert str(archive_path / "docs" / "guide.md") not in result.command
+        assert (tmp_path / "out" / "guide.docx").read_bytes() == b"SEE ![](IMG/LOGO.PNG)|PNG"
+
+    def test_member_of_dot_prefixed_tar(self, tmp_path):
+        """Test converting a scanned member of an archive made with `tar czf x.tgz .`."""
+        script = tmp_path / "fake-pandoc"
+        script.write_text(STDIN_PANDOC.format(python=sys.executable))
+        script.chmod(0o755)
+        archive_path = _make_tar(
+            tmp_path / "docs.tgz",
+            {"./docs/guide.md": b"see ![](img/logo.png)", "./docs/img/logo.png": b"PNG"},
+        )
+        [input_path] = FolderScanner().scan_folder(archive_path, extensions={".md"}).files
+        profile = ConversionProfile(
+            input_path=input_path,
+            output_path=tmp_path / "out" / "guide.docx",
+            output_format=OutputFormat.DOCX,
+            archive_path=archive_path,
+        )
+
+        service = ConversionService()
+        service._runner = PandocRunner(script)
+        result = service.convert(profile)
+
+        assert result.success, result.error_message
+        assert (tmp_path / "out" / "guide.docx").read_bytes() == b"SEE ![](IMG/LOGO.PNG)|PNG"
+
+
+class TestTaskQueueArchive:
+    """Test batch output into an archive."""
+
+    def test_10k_file_batch(self, tmp_path):
+        """Test a 10k-task batch streamed into one zip through a bounded queue."""
+        archive_path = tmp_path / "batch.zip"
+        output_root = tmp_path / "virtual"
+        writer = ArchiveWriter(archive_path, max_pending_bytes=256 * 1024)
+
+        def fake_convert_to_archive(profile, archive_writer, arcname, aliases):
+            archive_writer.add_bytes(arcname, f"<p>{profile.input_path.stem}</p>".encode() * 50)
+            return ConversionResult(success=True, output_path=archive_writer.archive_path)
+
+        queue = TaskQueue(max_concurrent_jobs=8)
+        queue._conversion_service = Mock(
+            convert_to_archive=Mock(side_effect=fake_convert_to_archive)
+        )
+        queue.set_archive_output(writer, output_root=output_root)
+
+        for i in range(10_000):
+            profile = ConversionProfile(
+                input_path=tmp_path / f"doc{i:05d}.md",
+                output_path=output_root / f"part{i % 10}" / f"doc{i:05d}.html",
+                output_format=OutputFormat.HTML,
+            )
+            queue.add_task(f"task_{i}", profile)
+
+        queue.start_queue()
+        assert queue.wait_for_completion(120_000)
+        writer.close()
+
+        assert len(queue.get_successful_tasks()) == 10_000
+        assert writer.peak_pending_bytes <= 256 * 1024
+        with zipfile.ZipFile(archive_path) as zf:
+            names = zf.namelist()
+        assert len(names) == 10_000
+        assert "part3/doc00003.html" in names
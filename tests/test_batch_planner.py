@@ -0,0 +1,152 @@
+"""
+Tests for batch planning and planned task queues.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from pandoc_ui.app.batch_planner import plan_batch
+from pandoc_ui.app.scheduler import ConversionScheduler
+from pandoc_ui.app.task_queue import TaskQueue, TaskStatus
+from pandoc_ui.infra.format_manager import FormatManager
+from pandoc_ui.infra.pandoc_runner import PandocRunner
+from pandoc_ui.models import InputFormat, OutputFormat
+from tests.support.fake_pandoc import expected_output
+
+
+@pytest.fixture
+def inputs(tmp_path) -> list[Path]:
+    """Create inputs in two directories, in three formats."""
+    files = []
+    for directory, names in (("a", ["one.md", "two.rst", "three.md"]), ("b", ["four.html"])):
+        (tmp_path / directory).mkdir()
+        for name in names:
+            path = tmp_path / directory / name
+            path.write_text(f"content of {name}")
+            files.append(path)
+    return files
+
+
+def _plan(runner, inputs, tmp_path, **kwargs):
+    return plan_batch(
+        inputs, OutputFormat.HTML, tmp_path / "out", runner, FormatManager(), **kwargs
+    )
+
+
+class TestPlanBatch:
+    """Test planning a batch."""
+
+    @pytest.fixture
+    def runner(self, fake_pandoc) -> PandocRunner:
+        return PandocRunner(fake_pandoc.path)
+
+    def test_rows_and_templates(self, runner, inputs, tmp_path):
+        """Test that each input format gets one template and rows keep batch order."""
+        plan = _plan(runner, inputs, tmp_path, custom_args="--toc -M title='A B'")
+
+        assert plan.inputs == inputs
+        assert len(plan.commands) == 3
+        assert plan.input_formats[plan.template_rows[0]] == InputFormat.MARKDOWN
+        assert plan.template_rows[0] == plan.template_rows[2]
+        assert plan.names == ["one.md", "two.rst", "three.md", "four.html"]
+        assert [plan.directories[row] for row in plan.dir_rows] == [p.parent for p in inputs]
+        assert not plan.skipped
+
+    def test_commands_match_runner(self, runner, inputs, tmp_path):
+        """Test that filled templates equal the commands the runner builds per profile."""
+        plan = _plan(runner, inputs, tmp_path, custom_args="--toc -M title='A B'")
+
+        for row in range(len(plan)):
+            profile = plan.profile(row)
+            assert plan.command(row) == runner.build_command(profile)
+            assert profile.output_path == tmp_path / "out" / f"{inputs[row].stem}.html"
+
+    def test_skips(self, runner, inputs, tmp_path):
+        """Test that missing, non-file and unconvertible inputs are skipped with a reason."""
+        missing = tmp_path / "a" / "missing.md"
+        directory = tmp_path / "a" / "folder.md"
+        directory.mkdir()
+        beamer = tmp_path / "b" / "slides.tex"
+        beamer.write_text("\\begin{frame}")
+
+        plan = plan_batch(
+            [*inputs, missing, directory, beamer],
+            OutputFormat.HTML,
+            tmp_path / "out",
+            runner,
+            FormatManager(),
+        )
+
+        assert len(plan) == len(inputs)
+        reasons = dict(plan.skipped)
+        assert reasons[missing] == "Input file does not exist"
+        assert reasons[directory] == "Input file does not exist"
+        assert reasons[beamer].startswith("Cannot convert")
+
+    def test_archive_members_not_checked(self, runner, tmp_path):
+        """Test that archive members are planned without touching the filesystem."""
+        archive = tmp_path / "docs.zip"
+        archive.write_bytes(b"")
+        members = [archive / "dir" / "doc.md", archive / "doc2.md"]
+
+        plan = _plan(runner, members, tmp_path, archive_path=archive)
+
+        assert plan.inputs == members
+        assert plan.command(0) == runner.build_command(plan.profile(0))
+        assert str(members[0]) not in plan.command(0)
+
+    def test_validation(self, fake_pandoc, inputs, tmp_path):
+        """Test that bad custom arguments and a missing pandoc fail the whole plan."""
+        with pytest.raises(ValueError):
+            _plan(PandocRunner(fake_pandoc.path), inputs, tmp_path, custom_args="--title 'open")
+        with pytest.raises(RuntimeError):
+            _plan(PandocRunner(tmp_path / "no-pandoc"), inputs, tmp_path)
+
+
+class TestAddPlan:
+    """Test queueing a plan in bulk."""
+
+    def test_add_plan_matches_add_task(self, qapp, fake_pandoc, inputs, tmp_path):
+        """Test that planned tasks store the same profiles and duplicates as add_task."""
+        plan = _plan(PandocRunner(fake_pandoc.path), inputs, tmp_path, custom_args="--toc")
+        duplicate = tmp_path / "out" / "copy.html"
+        queue = TaskQueue(max_concurrent_jobs=2)
+        queue.add_task("manual", plan.profile(1))
+
+        assert queue.add_plan(plan, {2: [duplicate]}) == 4
+
+        summary = queue.get_queue_summary()
+        assert summary["total"] == 5 and summary["pending"] == 5
+        row = queue._store.row("batch_0001_one.md")
+        assert queue._store.profile(row) == plan.profile(0)
+        assert queue._store.duplicate_outputs(queue._store.row("batch_0003_three.md")) == [
+            duplicate
+        ]
+        queue.clear_queue()
+
+    def test_add_plan_rejects_taken_ids(self, qapp, fake_pandoc, inputs, tmp_path):
+        """Test that a plan whose generated ids are taken is not added at all."""
+        plan = _plan(PandocRunner(fake_pandoc.path), inputs, tmp_path)
+        queue = TaskQueue(max_concurrent_jobs=2)
+        queue.add_task("batch_0002_two.rst", plan.profile(1))
+
+        with pytest.raises(ValueError):
+            queue.add_plan(plan)
+        assert queue.get_queue_summary()["total"] == 1
+        queue.clear_queue()
+
+    def test_planned_batch_runs(self, qapp, fake_pandoc, inputs, tmp_path):
+        """Test a planned batch end to end against the fake pandoc."""
+        plan = _plan(PandocRunner(fake_pandoc.path), inputs, tmp_path)
+        queue = TaskQueue(max_concurrent_jobs=2, scheduler=ConversionScheduler(budget=2))
+        queue.add_plan(plan)
+
+        queue.start_queue()
+        assert queue.wait_for_completion(30_000)
+
+        assert queue.get_task_status("batch_0001_two.rst") == TaskStatus.COMPLETED
+        assert len(queue.get_successful_tasks()) == 4
+        assert (tmp_path / "out" / "four.html").read_bytes() == expected_output(
+            b"content of four.html", "html", "html"
+        )
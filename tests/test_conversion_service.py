@@ -2,13 +2,21 @@
 Tests for conversion service functionality.
 """
 
+import sys
+import threading
+import time
+from concurrent.futures import Future
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
 
 from pandoc_ui.app.conversion_service import ConversionService
+from pandoc_ui.app.scheduler import ConversionScheduler
+from pandoc_ui.app.service_registry import ServiceRegistry
+from pandoc_ui.app.throughput import ThroughputTracker
 from pandoc_ui.infra.pandoc_detector import PandocInfo
+from pandoc_ui.infra.pandoc_runner import PandocRunner
 from pandoc_ui.models import ConversionProfile, ConversionResult, OutputFormat
 
 
@@ -94,12 +102,19 @@ class TestConversionService:
         mock_get_runner.return_value = mock_runner
 
         profile = ConversionProfile(input_path=Path("input.md"), output_format=OutputFormat.HTML)
+        self.service.throughput = ThroughputTracker()
 
         result = self.service.convert(profile)
 
         assert result.success is True
         assert result.output_path == Path("output.html")
-        mock_runner.execute.assert_called_once_with(profile)
+        # No measurements of markdown -> html yet, so the timeout is the policy's default
+        mock_runner.execute.assert_called_once_with(
+            profile,
+            timeout=self.service.timeout_policy.default_seconds,
+            cancel_event=None,
+            progress=None,
+        )
 
     @patch("pandoc_ui.app.conversion_service.ConversionService._get_runner")
     def test_convert_failure(self, mock_get_runner):
@@ -129,16 +144,32 @@ class TestConversionService:
         assert "Test exception" in result.error_message
 
     @patch("pandoc_ui.app.conversion_service.ConversionService.convert")
-    def test_convert_async_delegates_to_sync(self, mock_convert):
-        """Test that convert_async delegates to convert in Phase 1."""
+    def test_convert_async_returns_future(self, mock_convert):
+        """Test that convert_async runs convert on a worker thread and returns a future."""
         profile = ConversionProfile(input_path=Path("input.md"), output_format=OutputFormat.HTML)
         expected_result = ConversionResult(success=True)
         mock_convert.return_value = expected_result
 
-        result = self.service.convert_async(profile)
+        future = self.service.convert_async(profile, timeout=5)
+
+        assert isinstance(future, Future)
+        assert future.result(timeout=5) is expected_result
+        mock_convert.assert_called_once_with(profile, 5, None)
+        self.service.shutdown()
+
+    def test_convert_async_runs_in_interactive_lane(self):
+        """Test that convert_async counts against the scheduler budget while it runs."""
+        self.service.scheduler = ConversionScheduler(budget=2)
+        seen = []
+        self.service.convert = Mock(
+            side_effect=lambda *args: seen.append(self.service.scheduler.interactive_count)
+        )
+
+        self.service.convert_async(Mock(), timeout=5).result(timeout=5)
 
-        assert result is expected_result
-        mock_convert.assert_called_once_with(profile)
+        assert seen == [1]
+        assert self.service.scheduler.interactive_count == 0
+        self.service.shutdown()
 
     @patch("pathlib.Path.exists")
     @patch("pathlib.Path.is_file")
@@ -195,3 +226,129 @@ class TestConversionService:
         assert self.service._pandoc_info is None
         assert self.service._runner is None
         mock_clear_cache.assert_called_once()
+
+    def test_pin_source_date_reaches_runner(self):
+        """Test that pin_source_date applies to the current runner and later ones."""
+        self.service._runner = PandocRunner(Path("/usr/bin/pandoc"))
+
+        self.service.pin_source_date = True
+
+        assert self.service._runner.pin_source_date is True
+        self.service._runner = None
+        self.service._pandoc_info = PandocInfo(Path("/usr/bin/pandoc"), "3.1.8")
+        assert self.service._get_runner().pin_source_date is True
+
+    def test_refresh_shared_service_invalidates_registry(self):
+        """Test that refreshing the shared service goes through the registry."""
+        registry = ServiceRegistry()
+        service = registry.get_conversion_service()
+
+        with (
+            patch("pandoc_ui.app.service_registry.get_service_registry", return_value=registry),
+            patch.object(service, "invalidate") as mock_invalidate,
+        ):
+            service.refresh_pandoc_detection()
+
+        assert registry.generation == 1
+        mock_invalidate.assert_called_once_with()
+
+
+# Copies its input to -o; sleeps for inputs containing "SLOW"
+SLEEPING_PANDOC = """#!{python}
+import sys, time
+args = sys.argv[1:]
+output = args[args.index("-o") + 1]
+data = open(args[0], "rb").read()
+if b"SLOW" in data:
+    time.sleep(30)
+open(output, "wb").write(data)
+"""
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a POSIX script as pandoc")
+class TestConvertMany:
+    """Test the streaming batch API."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        script = tmp_path / "fake-pandoc"
+        script.write_text(SLEEPING_PANDOC.format(python=sys.executable))
+        script.chmod(0o755)
+        service = ConversionService()
+        service._runner = PandocRunner(script)
+        service.scheduler = ConversionScheduler(budget=4)
+        return service
+
+    def _profiles(self, tmp_path, contents: list[str]):
+        for i, content in enumerate(contents):
+            input_path = tmp_path / f"doc{i}.md"
+            input_path.write_text(content)
+            yield ConversionProfile(
+                input_path=input_path,
+                output_path=tmp_path / "out" / f"doc{i}.html",
+                output_format=OutputFormat.HTML,
+            )
+
+    def test_streams_results_with_bounded_concurrency(self, service, tmp_path):
+        """Test that every profile yields a result and the input is consumed lazily."""
+        pulled = []
+
+        def profiles():
+            for profile in self._profiles(tmp_path, [f"doc {i}" for i in range(12)]):
+                pulled.append(profile)
+                yield profile
+
+        results = service.convert_many(profiles(), max_concurrency=3)
+        first_profile, first_result = next(results)
+        assert len(pulled) <= 4
+        rest = list(results)
+
+        assert first_result.success
+        assert len(rest) == 11 and all(result.success for _, result in rest)
+        assert (tmp_path / "out" / "doc11.html").read_text() == "doc 11"
+
+    def test_timeout_per_call(self, service, tmp_path):
+        """Test that a slow conversion is killed after the per-call timeout."""
+        start = time.monotonic()
+        results = {
+            profile.input_path.name: result
+            for profile, result in service.convert_many(
+                self._profiles(tmp_path, ["fast", "SLOW"]), timeout=1
+            )
+        }
+
+        assert time.monotonic() - start < 10
+        assert results["doc0.md"].success
+        assert not results["doc1.md"].success
+        assert "timed out" in results["doc1.md"].error_message
+
+    def test_cancel_event_kills_running_conversions(self, service, tmp_path):
+        """Test that setting the cancel event stops the batch promptly."""
+        cancel = threading.Event()
+        profiles = self._profiles(tmp_path, ["SLOW"] * 2 + ["fast"] * 10)
+        threading.Timer(0.5, cancel.set).start()
+
+        start = time.monotonic()
+        results = list(service.convert_many(profiles, max_concurrency=2, cancel_event=cancel))
+
+        assert time.monotonic() - start < 10
+        assert len(results) == 2
+        assert all(result.error_message == "Conversion cancelled" for _, result in results)
+        assert not (tmp_path / "out" / "doc2.html").exists()
+
+    def test_waits_for_scheduler_share(self, service, tmp_path):
+        """Test that a batch starts nothing while interactive work holds the whole budget."""
+        service.scheduler = ConversionScheduler(budget=1)
+        finished = []
+
+        def consume():
+            finished.extend(service.convert_many(self._profiles(tmp_path, ["a", "b"])))
+
+        with service.scheduler.interactive():
+            thread = threading.Thread(target=consume)
+            thread.start()
+            time.sleep(0.5)
+            assert not (tmp_path / "out").exists()
+        thread.join(timeout=10)
+
+        assert [result.success for _, result in finished] == [True, True]
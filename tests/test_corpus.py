@@ -0,0 +1,132 @@
+"""
+Tests for the synthetic corpus generator, and scaling tests that run on it.
+
+The scaling tests use PANDOC_UI_STRESS_FILES documents (1000 by default);
+set it to 100000 or 1000000 for a stress run.
+"""
+
+import os
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pandoc_ui.app.deduplication import plan_deduplication
+from pandoc_ui.app.folder_scanner import FolderScanner, ScanMode
+from pandoc_ui.app.task_queue import TaskQueue
+from pandoc_ui.models import ConversionProfile, ConversionResult, InputFormat, OutputFormat
+from tests.support.corpus import CorpusSpec, directory_tree, generate_corpus, scanner_extensions
+
+STRESS_FILES = int(os.environ.get("PANDOC_UI_STRESS_FILES", "1000"))
+
+
+def _tree(root: Path) -> dict[str, bytes]:
+    return {
+        str(path.relative_to(root)): path.read_bytes()
+        for path in sorted(root.rglob("*"))
+        if path.is_file()
+    }
+
+
+class TestCorpusGenerator:
+    """Test the shape and determinism of generated corpora."""
+
+    def test_deterministic(self, tmp_path):
+        """Test that the same seed writes the same bytes and another seed does not."""
+        spec = CorpusSpec(files=200, seed=7)
+        generate_corpus(tmp_path / "a", spec)
+        generate_corpus(tmp_path / "b", spec)
+        generate_corpus(tmp_path / "c", spec, seed=8)
+
+        assert _tree(tmp_path / "a") == _tree(tmp_path / "b")
+        assert _tree(tmp_path / "a") != _tree(tmp_path / "c")
+
+    def test_shape(self, tmp_path):
+        """Test depth, fan-out, formats, duplicates, images and ignored directories."""
+        corpus = generate_corpus(
+            tmp_path,
+            files=400,
+            depth=2,
+            fan_out=3,
+            duplicate_ratio=0.2,
+            image_ratio=0.2,
+            ignored_dir_ratio=0.5,
+            large_ratio=0.01,
+            large_bytes=(1024 * 1024, 1024 * 1024),
+        )
+
+        assert len(corpus.documents) == 400
+        assert len(directory_tree(2, 3)) == 1 + 3 + 9
+        assert max(len(p.relative_to(tmp_path).parts) for p in corpus.documents) == 3
+        assert set(corpus.extension_counts()) <= scanner_extensions()
+        assert len(corpus.extension_counts()) > 8
+
+        assert corpus.duplicates
+        for duplicate, original in corpus.duplicates.items():
+            assert duplicate.read_bytes() == original.read_bytes()
+            assert original not in corpus.duplicates
+
+        assert corpus.images
+        markdown = [p for p in corpus.documents if p.suffix == ".md"]
+        assert any("![Figure](images/" in p.read_text() for p in markdown)
+
+        assert corpus.ignored
+        assert all(p.exists() for p in corpus.ignored)
+        assert all(p.stat().st_size >= 1024 * 1024 for p in corpus.large_documents)
+        assert corpus.total_bytes == sum(p.stat().st_size for p in corpus.documents)
+
+    def test_rejects_unknown_extension(self, tmp_path):
+        """Test that only extensions the scanner recognises can be generated."""
+        with pytest.raises(ValueError):
+            generate_corpus(tmp_path, files=1, extension_weights={".txt": 1})
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    """Generate the corpus the scaling tests share."""
+    return generate_corpus(
+        tmp_path_factory.mktemp("corpus"), files=STRESS_FILES, large_ratio=0.0005
+    )
+
+
+class TestScaling:
+    """Run the scan, plan and queue stages on a generated corpus."""
+
+    def test_scan_finds_documents(self, corpus):
+        """Test that a recursive scan finds every document and nothing ignored."""
+        result = FolderScanner().scan_folder(
+            corpus.root, mode=ScanMode.RECURSIVE, max_files=2 * STRESS_FILES
+        )
+
+        assert sorted(result.files) == corpus.documents_with(scanner_extensions())
+        assert not set(result.files) & set(corpus.ignored)
+
+    def test_plan_finds_duplicates(self, corpus):
+        """Test that duplicate planning groups exactly the generated same-folder duplicates."""
+        plan = plan_deduplication(corpus.documents, output_format="docx")
+
+        expected: dict[Path, list[Path]] = {}
+        for duplicate, original in corpus.duplicates.items():
+            if duplicate.parent == original.parent:  # relative images resolve per folder
+                expected.setdefault(original, []).append(duplicate)
+        assert expected and plan.duplicates == expected
+        assert len(plan.unique_files) == len(corpus.documents) - plan.duplicate_count
+
+    def test_queue_runs_every_task(self, qapp, corpus, tmp_path):
+        """Test that the queue completes one task per document."""
+        queue = TaskQueue(max_concurrent_jobs=4, task_signals=False)
+        queue._conversion_service = Mock(convert=Mock(return_value=ConversionResult(success=True)))
+        for i, path in enumerate(corpus.documents):
+            queue.add_task(
+                f"task_{i}",
+                ConversionProfile(
+                    input_path=path,
+                    output_path=tmp_path / f"{i}.html",
+                    input_format=InputFormat.MARKDOWN,
+                    output_format=OutputFormat.HTML,
+                ),
+            )
+
+        queue.start_queue()
+        assert queue.wait_for_completion(600_000)
+        assert queue.get_queue_summary()["completed"] == len(corpus.documents)
@@ -0,0 +1,186 @@
+"""
+Tests for duplicate input detection.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from pandoc_ui.app.deduplication import link_or_copy, plan_deduplication
+from pandoc_ui.app.task_queue import TaskQueue
+from pandoc_ui.models import ConversionProfile, ConversionResult, OutputFormat
+
+
+class TestPlanDeduplication:
+    """Test cases for plan_deduplication."""
+
+    def test_identical_content_grouped(self, tmp_path):
+        """Test that byte-identical files form one group."""
+        first = tmp_path / "README.md"
+        second = tmp_path / "README.markdown"
+        other = tmp_path / "README.mdown"
+        first.write_text("# Same\n")
+        second.write_text("# Same\n")
+        other.write_text("# Diff\n")  # same size, different content
+
+        plan = plan_deduplication([first, second, other])
+
+        assert plan.unique_files == [first, other]
+        assert plan.duplicates == {first: [second]}
+        assert plan.duplicate_count == 1
+
+    def test_different_directories_not_grouped(self, tmp_path):
+        """Test that identical bytes whose relative images differ stay separate."""
+        documents = []
+        for folder, pixel in (("a", b"red"), ("b", b"blue")):
+            (tmp_path / folder).mkdir()
+            (tmp_path / folder / "img.png").write_bytes(pixel)
+            document = tmp_path / folder / "README.md"
+            document.write_text("![Figure](img.png)\n")
+            documents.append(document)
+
+        plan = plan_deduplication(documents, output_format="docx")
+
+        assert plan.unique_files == documents
+        assert plan.duplicate_count == 0
+
+    def test_names_matter_for_title_writers(self, tmp_path):
+        """Test that standalone HTML, whose default title is the file name, keeps names apart."""
+        first = tmp_path / "intro.md"
+        second = tmp_path / "preface.md"
+        first.write_text("Same text\n")
+        second.write_text("Same text\n")
+
+        assert plan_deduplication([first, second], output_format="html").duplicate_count == 0
+        assert plan_deduplication([first, second]).duplicate_count == 0
+        assert plan_deduplication([first, second], output_format="docx").duplicates == {
+            first: [second]
+        }
+
+    def test_symlink_grouped_by_inode(self, tmp_path):
+        """Test that symlinked inputs are grouped without hashing."""
+        chapter = tmp_path / "chapter.md"
+        chapter.write_text("Chapter")
+        link = tmp_path / "link.md"
+        try:
+            link.symlink_to(chapter)
+        except OSError:
+            pytest.skip("Symlinks not supported")
+
+        plan = plan_deduplication([link, chapter], output_format="docx")
+
+        assert plan.unique_files == [link]
+        assert plan.duplicates == {link: [chapter]}
+
+    def test_different_readers_not_grouped(self, tmp_path):
+        """Test that identical bytes read by different readers stay separate."""
+        md_file = tmp_path / "doc.md"
+        rst_file = tmp_path / "doc.rst"
+        md_file.write_text("Title\n=====\n")
+        rst_file.write_text("Title\n=====\n")
+
+        plan = plan_deduplication([md_file, rst_file])
+
+        assert plan.unique_files == [md_file, rst_file]
+        assert plan.duplicate_count == 0
+
+    def test_missing_file_kept(self, tmp_path):
+        """Test that unreadable inputs are passed through for the runner to report."""
+        missing = tmp_path / "missing.md"
+
+        plan = plan_deduplication([missing])
+
+        assert plan.unique_files == [missing]
+        assert len(plan.errors) == 1
+
+
+class TestLinkOrCopy:
+    """Test cases for link_or_copy."""
+
+    def test_hardlink(self, tmp_path):
+        """Test materializing a duplicate output."""
+        source = tmp_path / "out.html"
+        source.write_text("<p>x</p>")
+        target = tmp_path / "nested" / "copy.html"
+
+        mode = link_or_copy(source, target)
+
+        assert mode in ("hardlink", "copy")
+        assert target.read_text() == "<p>x</p>"
+
+    def test_replaces_existing_target(self, tmp_path):
+        """Test that stale duplicate outputs are replaced."""
+        source = tmp_path / "out.html"
+        source.write_text("new")
+        target = tmp_path / "dup.html"
+        target.write_text("old")
+
+        link_or_copy(source, target)
+
+        assert target.read_text() == "new"
+        assert not any(p.name.endswith(".link") for p in tmp_path.iterdir())
+
+    def test_same_path(self, tmp_path):
+        """Test that linking a file onto itself is a no-op."""
+        source = tmp_path / "out.html"
+        source.write_text("x")
+
+        assert link_or_copy(source, source) == "same"
+
+
+class TestTaskQueueDuplicates:
+    """Test that TaskQueue materializes duplicate outputs."""
+
+    def test_duplicate_outputs_written(self, tmp_path):
+        """Test one conversion serving several outputs."""
+        output = tmp_path / "out" / "a.html"
+
+        def fake_convert(profile):
+            profile.output_path.parent.mkdir(parents=True, exist_ok=True)
+            profile.output_path.write_text("converted")
+            return ConversionResult(success=True, output_path=profile.output_path)
+
+        queue = TaskQueue(max_concurrent_jobs=1)
+        queue._conversion_service = Mock(convert=Mock(side_effect=fake_convert))
+        duplicates = [tmp_path / "out" / "b.html", tmp_path / "out" / "c.html"]
+        profile = ConversionProfile(
+            input_path=tmp_path / "a.md", output_path=output, output_format=OutputFormat.HTML
+        )
+
+        queue.add_task("task_0", profile, duplicate_outputs=duplicates)
+        queue.start_queue()
+        assert queue.wait_for_completion(5000)
+
+        assert queue._conversion_service.convert.call_count == 1
+        assert all(path.read_text() == "converted" for path in duplicates)
+        assert queue.deduplicated_count == 2
+        assert queue.get_queue_summary()["deduplicated"] == 2
+
+    def test_duplicates_fail_with_representative(self, qapp, tmp_path):
+        """Test that duplicates of a failed task count as failed in the batch totals."""
+
+        def fake_convert(profile):
+            if profile.input_path.name == "a.md":
+                return ConversionResult(success=False, error_message="pandoc: bad input")
+            return ConversionResult(success=True, output_path=profile.output_path)
+
+        queue = TaskQueue(max_concurrent_jobs=1)
+        queue._conversion_service = Mock(convert=Mock(side_effect=fake_convert))
+        for name, duplicates in (("a", ["a2", "a3"]), ("b", [])):
+            profile = ConversionProfile(
+                input_path=tmp_path / f"{name}.md",
+                output_path=tmp_path / f"{name}.html",
+                output_format=OutputFormat.HTML,
+            )
+            queue.add_task(name, profile, [tmp_path / f"{d}.html" for d in duplicates])
+        finished = []
+        queue.queue_finished.connect(lambda *args: finished.append(args))
+
+        queue.start_queue()
+        assert queue.wait_for_completion(5000)
+        qapp.processEvents()
+
+        [(total, successful, _)] = finished
+        assert (total, successful) == (4, 1)
+        summary = queue.get_queue_summary()
+        assert (summary["failed"], summary["duplicates_failed"]) == (1, 2)
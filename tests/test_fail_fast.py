@@ -0,0 +1,190 @@
+"""
+Tests for fail-fast batches: error signatures, the circuit breaker and canary runs.
+"""
+
+from unittest.mock import Mock
+
+from PySide6.QtCore import QMutexLocker
+
+from pandoc_ui.app.circuit_breaker import CircuitBreaker, error_signature
+from pandoc_ui.app.scheduler import ConversionScheduler
+from pandoc_ui.app.task_queue import STATUS_CODES, TaskQueue, TaskStatus
+from pandoc_ui.models import ConversionProfile, ConversionResult, OutputFormat
+
+
+def _queue(tmp_path, sizes: list[int], fails, jobs: int = 1) -> tuple[TaskQueue, list[str]]:
+    """Create a queue over real files whose stub conversions fail when fails(name) is true."""
+    converted = []
+
+    def convert(profile):
+        converted.append(profile.input_path.name)
+        if fails(profile.input_path.name):
+            return ConversionResult(
+                success=False, error_message=f"pandoc: {profile.input_path}: Unknown option --tco"
+            )
+        return ConversionResult(success=True, output_path=profile.output_path)
+
+    queue = TaskQueue(max_concurrent_jobs=jobs, scheduler=ConversionScheduler(budget=jobs))
+    queue._conversion_service = Mock(convert=Mock(side_effect=convert))
+    for i, size in enumerate(sizes):
+        input_path = tmp_path / f"doc{i}.md"
+        input_path.write_bytes(b"x" * size)
+        profile = ConversionProfile(
+            input_path=input_path,
+            output_path=tmp_path / "out" / f"doc{i}.html",
+            output_format=OutputFormat.HTML,
+        )
+        queue.add_task(f"task_{i}", profile)
+    return queue, converted
+
+
+class TestErrorSignature:
+    """Test error message normalization."""
+
+    def test_per_file_details_removed(self):
+        """Test that messages differing only in paths, names and numbers match."""
+        first = error_signature("pandoc: /data/a/one.md: line 3: Unknown option --tco")
+        second = error_signature("pandoc: C:\\docs\\two.md: line 41: Unknown option --tco")
+
+        assert first == second
+        assert "--tco" in first
+        assert error_signature("Could not find data file 'x.html'") != first
+
+    def test_first_lines_kept(self):
+        """Test that only the first non-empty lines count."""
+        message = "Error producing PDF.\n\n! Undefined control sequence.\nl.1\ndetail 1\n"
+        other = "Error producing PDF.\n! Undefined control sequence.\nl.2\ndetail 2\n"
+
+        assert error_signature(message) == error_signature(other)
+        assert error_signature(None) == error_signature("") == ""
+
+
+class TestCircuitBreaker:
+    """Test the consecutive-failure breaker."""
+
+    def test_trips_on_same_signature(self):
+        """Test that K consecutive matching failures trip the breaker once."""
+        breaker = CircuitBreaker(threshold=3)
+
+        results = [breaker.record(False, f"pandoc: doc{i}.md: bad option") for i in range(4)]
+
+        assert results == [False, False, True, False]
+        assert breaker.error_message == "pandoc: doc3.md: bad option"
+
+    def test_success_and_new_signature_restart(self):
+        """Test that a success or a different error starts the count over."""
+        breaker = CircuitBreaker(threshold=2)
+
+        assert not breaker.record(False, "bad option")
+        assert not breaker.record(True)
+        assert not breaker.record(False, "bad option")
+        assert not breaker.record(False, "missing template")
+        assert breaker.record(False, "missing template")
+        assert not CircuitBreaker(threshold=0).record(False, "x")
+
+
+class TestTaskQueueFailFast:
+    """Test canary runs and the breaker in TaskQueue."""
+
+    def test_canary_runs_smallest_first_and_halts(self, qapp, tmp_path):
+        """Test that the smallest inputs run first and nothing else runs if all fail."""
+        queue, converted = _queue(tmp_path, [50, 40, 5, 30, 1, 20, 3], lambda name: True)
+        queue.set_fail_fast(canary_size=3, failure_threshold=0)
+        halts = []
+        queue.batch_halted.connect(lambda *args: halts.append(args))
+
+        queue.start_queue()
+        assert queue.wait_for_completion(10_000)
+        qapp.processEvents()
+
+        assert converted == ["doc4.md", "doc6.md", "doc2.md"]
+        assert queue.is_halted and queue.is_paused
+        [(reason, message, failed)] = halts
+        assert (reason, failed) == ("canary", 3)
+        assert "Unknown option --tco" in message
+        assert queue.get_queue_summary()["pending"] == 4
+        queue.clear_queue()
+
+    def test_canary_halts_without_discarded_row(self, qapp, tmp_path):
+        """Test that the canary run halts when every canary task that ran failed."""
+        queue, converted = _queue(tmp_path, [50, 40, 5, 30, 1, 20, 3], lambda name: True)
+        queue.set_fail_fast(canary_size=3, failure_threshold=0)
+        halts = []
+        queue.batch_halted.connect(lambda *args: halts.append(args))
+
+        queue.pause_queue()
+        queue.start_queue()
+        with QMutexLocker(queue._mutex):
+            # doc6.md leaves the canary run before it is submitted
+            queue._set_status(6, STATUS_CODES[TaskStatus.CANCELLED])
+        queue.resume_queue()
+        assert queue.wait_for_completion(10_000)
+        qapp.processEvents()
+
+        assert converted == ["doc4.md", "doc2.md"]
+        assert [(reason, failed) for reason, _, failed in halts] == [("canary", 2)]
+        queue.clear_queue()
+
+    def test_canary_pass_runs_rest(self, qapp, tmp_path):
+        """Test that the batch continues in order once a canary succeeds."""
+        queue, converted = _queue(tmp_path, [9, 1, 2, 8, 7], lambda name: name == "doc1.md")
+        queue.set_fail_fast(canary_size=2, failure_threshold=0)
+
+        queue.start_queue()
+        assert queue.wait_for_completion(10_000)
+
+        assert converted == ["doc1.md", "doc2.md", "doc0.md", "doc3.md", "doc4.md"]
+        assert not queue.is_halted
+        assert len(queue.get_successful_tasks()) == 4
+        queue.clear_queue()
+
+    def test_breaker_halts_and_resumes(self, qapp, tmp_path):
+        """Test that the breaker stops submission and resume_queue() continues the batch."""
+        sizes = [10] * 30
+        queue, converted = _queue(tmp_path, sizes, lambda name: name not in {"doc0.md"}, jobs=2)
+        queue.set_fail_fast(canary_size=0, failure_threshold=4)
+        halts = []
+        queue.batch_halted.connect(lambda *args: halts.append(args))
+
+        queue.start_queue()
+        assert queue.wait_for_completion(10_000)
+        qapp.processEvents()
+
+        assert [(reason, failed) for reason, _, failed in halts] == [("circuit_breaker", 4)]
+        # Results arrive out of order with two workers, so allow a little slack
+        assert len(converted) <= 10
+        summary = queue.get_queue_summary()
+        assert summary["pending"] == 30 - len(converted)
+
+        queue.resume_queue()
+        assert queue.wait_for_completion(10_000)
+        qapp.processEvents()
+        assert len(halts) == 2
+        assert queue.get_queue_summary()["pending"] == 30 - len(converted)
+        assert len(set(converted)) == len(converted)
+        queue.clear_queue()
+
+    def test_halted_by_fake_pandoc(self, qapp, fake_pandoc, tmp_path):
+        """Test a canary run against the fake pandoc failing every input."""
+        fake_pandoc.configure(fail_inputs=["*"], record=True)
+        queue = TaskQueue(max_concurrent_jobs=2, scheduler=ConversionScheduler(budget=2))
+        queue.set_fail_fast(canary_size=2, failure_threshold=5)
+        for i in range(10):
+            input_path = tmp_path / f"doc{i}.md"
+            input_path.write_text("x" * (i + 1))
+            queue.add_task(
+                f"task_{i}",
+                ConversionProfile(
+                    input_path=input_path,
+                    output_path=tmp_path / "out" / f"doc{i}.html",
+                    output_format=OutputFormat.HTML,
+                ),
+            )
+
+        queue.start_queue()
+        assert queue.wait_for_completion(30_000)
+
+        assert len([call for call in fake_pandoc.calls() if call != ["--version"]]) == 2
+        assert queue.get_task_status("task_0") == TaskStatus.FAILED
+        assert queue.get_task_status("task_5") == TaskStatus.PENDING
+        queue.clear_queue()
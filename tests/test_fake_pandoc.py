@@ -0,0 +1,103 @@
+"""
+Tests for the fake pandoc and the fixture that wires it in.
+"""
+
+import subprocess
+import time
+
+from pandoc_ui.app.scheduler import ConversionScheduler
+from pandoc_ui.app.service_registry import get_conversion_service
+from pandoc_ui.app.task_queue import TaskQueue, TaskStatus
+from pandoc_ui.infra.pandoc_detector import PandocDetector
+from pandoc_ui.infra.pandoc_runner import PandocRunner
+from pandoc_ui.models import ConversionProfile, InputFormat, OutputFormat
+from tests.support.fake_pandoc import expected_output
+
+
+def _profile(tmp_path, name: str, content: str = "hello") -> ConversionProfile:
+    input_path = tmp_path / "in" / name
+    input_path.parent.mkdir(exist_ok=True)
+    input_path.write_text(content)
+    return ConversionProfile(
+        input_path=input_path,
+        output_path=tmp_path / "out" / f"{input_path.stem}.html",
+        input_format=InputFormat.MARKDOWN,
+        output_format=OutputFormat.HTML,
+    )
+
+
+class TestFakePandoc:
+    """Test the fake pandoc as detector and runner see it."""
+
+    def test_detected(self, fake_pandoc):
+        """Test that detection finds the fake on PATH and reads its version."""
+        fake_pandoc.configure(version="9.9.1")
+
+        info = PandocDetector().detect()
+
+        assert info.available
+        assert info.path == fake_pandoc.path
+        assert info.version == "9.9.1"
+        assert get_conversion_service().get_pandoc_info().path == fake_pandoc.path
+
+    def test_queries(self, fake_pandoc):
+        """Test the --list-* queries."""
+        formats = subprocess.run(
+            [fake_pandoc.path, "--list-output-formats"], capture_output=True, text=True
+        ).stdout.split()
+
+        assert {"html", "docx", "pdf"} <= set(formats)
+
+    def test_deterministic_output(self, fake_pandoc, tmp_path):
+        """Test that conversion output depends only on input and formats."""
+        fake_pandoc.configure(record=True)
+        profile = _profile(tmp_path, "doc.md", "# Title")
+
+        result = PandocRunner(fake_pandoc.path).execute(profile)
+
+        assert result.success
+        assert profile.output_path.read_bytes() == expected_output(b"# Title")
+        [call] = fake_pandoc.calls()
+        assert call[:2] == ["-f", "markdown"] and "--standalone" in call
+
+    def test_failure_on_request(self, fake_pandoc, tmp_path):
+        """Test failures chosen by file name and by content."""
+        fake_pandoc.configure(fail_inputs=["broken*"], fail_exit_code=64)
+        runner = PandocRunner(fake_pandoc.path)
+
+        by_name = runner.execute(_profile(tmp_path, "broken.md"))
+        by_content = runner.execute(_profile(tmp_path, "doc.md", "x FAKE_PANDOC_FAIL x"))
+
+        assert not by_name.success and "simulated failure" in by_name.error_message
+        assert not by_content.success
+        assert not (tmp_path / "out" / "broken.html").exists()
+
+    def test_burns_cpu(self, fake_pandoc, tmp_path):
+        """Test that CPU mode shows up in the run's resource usage."""
+        fake_pandoc.configure(seconds=0.2, burn_cpu=True)
+
+        result = PandocRunner(fake_pandoc.path).execute(_profile(tmp_path, "doc.md"))
+
+        assert result.success
+        assert result.resources.user_cpu_seconds >= 0.15
+
+
+class TestTaskQueueWithFakePandoc:
+    """Run TaskQueue end to end against the fake pandoc."""
+
+    def test_concurrent_batch(self, qapp, fake_pandoc, tmp_path):
+        """Test that sleeping conversions overlap and failures are reported per task."""
+        fake_pandoc.configure(seconds=0.3, fail_inputs=["doc7.md"])
+        queue = TaskQueue(max_concurrent_jobs=4, scheduler=ConversionScheduler(budget=4))
+        for i in range(8):
+            queue.add_task(f"task_{i}", _profile(tmp_path, f"doc{i}.md", f"doc {i}"))
+
+        start = time.monotonic()
+        queue.start_queue()
+        assert queue.wait_for_completion(30_000)
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 8 * 0.3
+        assert queue.get_task_status("task_7") == TaskStatus.FAILED
+        assert len(queue.get_successful_tasks()) == 7
+        assert (tmp_path / "out" / "doc3.html").read_bytes() == expected_output(b"doc 3")
@@ -232,6 +232,83 @@ class TestFolderScanner:
         assert estimate["recursive_estimate"] >= estimate["single_level_estimate"]
         assert estimate["recommended_batch_size"] > 0
 
+    def test_estimate_batch_size_exact_for_small_tree(self, scanner, temp_dir, nested_structure):
+        """Test that small trees are enumerated exactly."""
+        estimate = scanner.estimate_batch_size(temp_dir, extensions={".md", ".rst"})
+        scan = scanner.scan_folder(temp_dir, extensions={".md", ".rst"})
+
+        assert estimate["is_exact"] is True
+        assert estimate["recursive_estimate"] == scan.filtered_count
+        assert estimate["single_level_estimate"] == 1
+        lo, hi = estimate["files_confidence_interval"]
+        assert lo == hi == scan.filtered_count
+        assert estimate["estimated_total_bytes"] > 0
+
+    def test_estimate_batch_size_sampling(self, scanner, temp_dir):
+        """Test sampled estimate on a tree larger than the exact-walk limit."""
+        for i in range(8):
+            for j in range(8):
+                leaf = temp_dir / f"part{i}" / f"chapter{j}"
+                leaf.mkdir(parents=True)
+                for k in range(5):
+                    (leaf / f"section{k}.md").write_text("x" * 100)
+
+        with patch.object(FolderScanner, "ESTIMATE_EXACT_DIR_LIMIT", 4):
+            estimate = scanner.estimate_batch_size(
+                temp_dir, extensions={".md"}, time_budget_seconds=0.2, seed=42
+            )
+
+        assert estimate["is_exact"] is False
+        assert estimate["probe_count"] > 1
+        # Uniform tree: every probe sees the same weighted total
+        assert estimate["recursive_estimate"] == 8 * 8 * 5
+        assert estimate["estimated_total_bytes"] == pytest.approx(8 * 8 * 5 * 100)
+        assert estimate["estimation_seconds"] < 1.0
+
+    def test_estimate_batch_size_respects_time_budget(self, scanner, temp_dir):
+        """Test that the estimate returns within its time budget."""
+        for i in range(30):
+            leaf = temp_dir / f"dir{i}" / "nested"
+            leaf.mkdir(parents=True)
+            (leaf / "doc.md").write_text("content")
+
+        with patch.object(FolderScanner, "ESTIMATE_EXACT_DIR_LIMIT", 2):
+            estimate = scanner.estimate_batch_size(
+                temp_dir, extensions={".md"}, time_budget_seconds=0.05
+            )
+
+        assert estimate["estimation_seconds"] < 0.5
+        lo, hi = estimate["files_confidence_interval"]
+        assert lo <= estimate["estimated_files"] <= hi
+
+    def test_estimate_batch_size_uses_throughput(self, scanner, temp_dir):
+        """Test that duration estimates come from measured throughput."""
+        from pandoc_ui.app.throughput import ThroughputTracker
+
+        for i in range(10):
+            (temp_dir / f"doc{i}.md").write_text("x" * 1000)
+
+        tracker = ThroughputTracker()
+        for _ in range(3):
+            tracker.record("markdown", "html", 1000, 6.0)
+
+        estimate = scanner.estimate_batch_size(
+            temp_dir,
+            extensions={".md"},
+            output_format=OutputFormat.HTML,
+            concurrency=2,
+            throughput=tracker,
+        )
+
+        assert estimate["estimated_duration_seconds"] == pytest.approx(30.0)
+        assert estimate["estimated_duration_minutes"] == 1
+
+    def test_input_format_for(self):
+        """Test reader detection from file extension."""
+        assert FolderScanner.input_format_for("notes.md") == "markdown"
+        assert FolderScanner.input_format_for(Path("guide.RST")) == "rst"
+        assert FolderScanner.input_format_for("image.png") is None
+
     def test_scan_statistics(self, scanner, temp_dir, sample_files):
         """Test scan statistics tracking."""
         initial_stats = scanner.scan_statistics
@@ -0,0 +1,198 @@
+"""
+Tests for the metrics registry and its exporters.
+"""
+
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pandoc_ui.app import conversion_service, task_queue
+from pandoc_ui.app.conversion_service import ConversionService
+from pandoc_ui.app.task_queue import TaskQueue
+from pandoc_ui.infra.metrics import MetricsRegistry, MetricsServer, TextfileExporter
+from pandoc_ui.models import (
+    ConversionProfile,
+    ConversionResult,
+    InputFormat,
+    OutputFormat,
+    ResourceUsage,
+)
+
+
+def _registry() -> MetricsRegistry:
+    """Create a registry with one metric of each kind."""
+    registry = MetricsRegistry()
+    tasks = registry.counter("demo_tasks_total", "Tasks done", ("status",))
+    tasks.labels("completed").inc(3)
+    tasks.labels('we"ird\n').inc()
+    registry.gauge("demo_depth", "Queue depth").set(7)
+    latency = registry.histogram("demo_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        latency.observe(value)
+    return registry
+
+
+class TestMetricsRegistry:
+    """Test metric families and text exposition."""
+
+    def test_prometheus_text(self):
+        """Test the Prometheus 0.0.4 rendering of each metric kind."""
+        text = _registry().render()
+
+        assert "# TYPE demo_tasks_total counter" in text
+        assert 'demo_tasks_total{status="completed"} 3' in text
+        assert 'demo_tasks_total{status="we\\"ird\\n"} 1' in text
+        assert "# TYPE demo_depth gauge\ndemo_depth 7\n" in text
+        assert 'demo_seconds_bucket{le="0.1"} 1' in text
+        assert 'demo_seconds_bucket{le="1"} 3' in text
+        assert 'demo_seconds_bucket{le="+Inf"} 4' in text
+        assert "demo_seconds_sum 3.05" in text
+        assert "demo_seconds_count 4" in text
+        assert "# EOF" not in text
+
+    def test_openmetrics_text(self):
+        """Test OpenMetrics family names and terminator."""
+        text = _registry().render(openmetrics=True)
+        assert "# TYPE demo_tasks counter" in text
+        assert 'demo_tasks_total{status="completed"} 3' in text
+        assert text.endswith("# EOF\n")
+
+    def test_get_or_create(self):
+        """Test that registering a name twice returns the same metric unless it differs."""
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_total", "Demo", ("a",))
+        assert registry.counter("demo_total", "Demo", ("a",)) is counter
+        with pytest.raises(ValueError):
+            registry.gauge("demo_total", "Demo", ("a",))
+        with pytest.raises(ValueError):
+            counter.labels("x", "y")
+        with pytest.raises(ValueError):
+            registry.counter("plain_total", "Plain").inc(-1)
+
+    def test_function_gauge(self):
+        """Test gauges computed at collection time."""
+        registry = MetricsRegistry()
+        depth = registry.gauge("demo_depth", "Depth")
+        values = iter([5, 9])
+        depth.set_function(lambda: next(values))
+        assert "demo_depth 5" in registry.render()
+        assert depth.value() == 9
+
+
+class TestExporters:
+    """Test the HTTP endpoint and textfile writer."""
+
+    def test_http_endpoint(self):
+        """Test /metrics on a loopback port, with content negotiation."""
+        server = MetricsServer(registry=_registry())
+        server.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert response.headers["Content-Type"].startswith("text/plain")
+                assert b"demo_depth 7" in response.read()
+
+            request = urllib.request.Request(
+                url, headers={"Accept": "application/openmetrics-text"}
+            )
+            with urllib.request.urlopen(request, timeout=5) as response:
+                assert response.read().endswith(b"# EOF\n")
+
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"http://127.0.0.1:{server.port}/other", timeout=5)
+            assert error.value.code == 404
+        finally:
+            server.stop()
+
+    def test_loopback_only(self):
+        """Test that the endpoint refuses non-loopback addresses."""
+        with pytest.raises(ValueError):
+            MetricsServer(host="0.0.0.0")
+
+    def test_textfile(self, tmp_path):
+        """Test that the textfile is written atomically and on stop."""
+        registry = _registry()
+        path = tmp_path / "textfile" / "pandoc_ui.prom"
+        exporter = TextfileExporter(path, interval=3600, registry=registry)
+        exporter.start()
+        registry.gauge("demo_depth", "Queue depth").set(8)
+        exporter.stop()
+
+        assert "demo_depth 8" in path.read_text()
+        assert [p.name for p in path.parent.iterdir()] == ["pandoc_ui.prom"]
+
+
+class TestPipelineMetrics:
+    """Test metrics fed by TaskQueue and ConversionService."""
+
+    def _profile(self, i: int) -> ConversionProfile:
+        return ConversionProfile(
+            input_path=Path(f"/virtual/doc{i}.md"),
+            output_path=Path(f"/virtual/out/doc{i}.html"),
+            input_format=InputFormat.MARKDOWN,
+            output_format=OutputFormat.HTML,
+        )
+
+    def test_task_queue_metrics(self, qapp):
+        """Test task counts, cache hits, queue wait and queue gauges."""
+        tasks = task_queue.TASKS
+        labels = ("markdown", "html")
+        before = {
+            status: tasks.value(status, *labels) for status in ("completed", "failed", "cancelled")
+        }
+        unchanged = task_queue.CACHE_HITS.value("unchanged_output")
+        waits = task_queue.QUEUE_WAIT.labels().count
+        depth = task_queue.QUEUE_DEPTH.value()
+
+        queue = TaskQueue(max_concurrent_jobs=1)
+        queue._conversion_service = Mock(
+            convert=Mock(
+                side_effect=[
+                    ConversionResult(success=True, output_changed=False),
+                    ConversionResult(success=False, error_message="bad"),
+                ]
+            )
+        )
+        for i in range(2):
+            queue.add_task(f"task_{i}", self._profile(i))
+        assert task_queue.QUEUE_DEPTH.value() == depth + 2
+
+        queue.start_queue()
+        assert queue.wait_for_completion(5000)
+        for i in range(2, 5):
+            queue.add_task(f"task_{i}", self._profile(i))
+        queue.cancel_queue()
+
+        assert tasks.value("completed", *labels) == before["completed"] + 1
+        assert tasks.value("failed", *labels) == before["failed"] + 1
+        assert tasks.value("cancelled", *labels) == before["cancelled"] + 3
+        assert task_queue.CACHE_HITS.value("unchanged_output") == unchanged + 1
+        assert task_queue.QUEUE_WAIT.labels().count == waits + 2
+        assert task_queue.QUEUE_DEPTH.value() == depth
+
+    def test_conversion_service_metrics(self):
+        """Test conversion counts, latency and output size."""
+        service = ConversionService()
+        service._runner = Mock(
+            execute=Mock(
+                return_value=ConversionResult(
+                    success=True,
+                    duration_seconds=0.2,
+                    resources=ResourceUsage(wall_seconds=0.2, output_bytes=5000),
+                )
+            )
+        )
+        service._pandoc_info = Mock(is_available=True)
+        counter = conversion_service.CONVERSIONS
+        before = counter.value("success", "markdown", "html")
+        sizes = conversion_service.OUTPUT_BYTES.labels("html").count
+        latencies = conversion_service.CONVERSION_SECONDS.labels("html").count
+
+        assert service.convert(self._profile(0)).success
+
+        assert counter.value("success", "markdown", "html") == before + 1
+        assert conversion_service.OUTPUT_BYTES.labels("html").count == sizes + 1
+        assert conversion_service.CONVERSION_SECONDS.labels("html").count == latencies + 1
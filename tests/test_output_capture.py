@@ -0,0 +1,121 @@
+"""
+Tests for bounded capture of pandoc's output.
+"""
+
+import os
+
+from pandoc_ui.infra.output_capture import CapturedOutput, OutputCapture, prune_spill_files
+from pandoc_ui.infra.pandoc_runner import PandocRunner
+from pandoc_ui.models import ConversionProfile, InputFormat, OutputFormat
+
+
+class TestOutputCapture:
+    """Test head/tail capture and spilling."""
+
+    def test_short_output_kept_whole(self):
+        """Test that output within the limits is returned unchanged."""
+        with OutputCapture(head_bytes=8, tail_bytes=8) as capture:
+            capture.file.write("warnung äöü\n".encode())
+            capture.file.flush()
+            output = capture.collect()
+
+        assert output.omitted_bytes == 0
+        assert output.text() == "warnung äöü\n"
+        assert CapturedOutput().text() == ""
+
+    def test_long_output_bounded_and_spilled(self, tmp_path):
+        """Test that only head and tail stay in memory and the spill file holds everything."""
+        data = b"".join(f"[WARNING] line {i}\n".encode() for i in range(100_000))
+        with OutputCapture(head_bytes=1024, tail_bytes=512) as capture:
+            os.write(capture.file.fileno(), data)
+            output = capture.collect()
+            output.spill_path = capture.spill(tmp_path, "doc")
+
+        assert len(output.head) == 1024 and len(output.tail) == 512
+        assert output.total_bytes == len(data)
+        assert output.spill_path.read_bytes() == data
+        text = output.text()
+        assert text.startswith("[WARNING] line 0\n")
+        assert text.endswith("[WARNING] line 99999\n")
+        assert f"{len(data) - 1536} bytes omitted; full output in {output.spill_path}" in text
+
+    def test_prune_keeps_newest(self, tmp_path):
+        """Test that pruning deletes the oldest spill files."""
+        for i in range(5):
+            path = tmp_path / f"doc{i}.log"
+            path.write_text(str(i))
+            os.utime(path, (1000 + i, 1000 + i))
+
+        prune_spill_files(tmp_path, keep=2)
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["doc3.log", "doc4.log"]
+
+
+class TestRunnerCapture:
+    """Test that verbose pandoc runs cost bounded memory."""
+
+    def test_verbose_failure(self, fake_pandoc, tmp_path):
+        """Test the error message of a failure after a flood of warnings."""
+        fake_pandoc.configure(warnings=50_000, fail_inputs=["doc*"])
+        runner = PandocRunner(fake_pandoc.path)
+        runner.spill_dir = tmp_path / "spill"
+        input_path = tmp_path / "doc.md"
+        input_path.write_text("hello")
+        profile = ConversionProfile(
+            input_path=input_path,
+            output_path=tmp_path / "out" / "doc.html",
+            input_format=InputFormat.MARKDOWN,
+            output_format=OutputFormat.HTML,
+        )
+
+        result = runner.execute(profile)
+
+        assert not result.success
+        assert len(result.error_message) < 40_000
+        assert result.error_message.startswith("[WARNING] Fake warning 1\n")
+        assert result.error_message.endswith(
+            "pandoc: simulated failure converting " + str(input_path)
+        )
+        [spilled] = (tmp_path / "spill").iterdir()
+        assert spilled.name.startswith("doc-")
+        assert spilled.name in result.error_message
+        assert b"[WARNING] Fake warning 25000\n" in spilled.read_bytes()
+
+    def test_successful_verbose_run_not_spilled(self, fake_pandoc, tmp_path):
+        """Test that long output of a successful run is spilled only on request."""
+        fake_pandoc.configure(warnings=50_000)
+        runner = PandocRunner(fake_pandoc.path)
+        runner.spill_dir = tmp_path / "spill"
+        input_path = tmp_path / "doc.md"
+        input_path.write_text("hello")
+        profile = ConversionProfile(
+            input_path=input_path,
+            output_path=tmp_path / "doc.html",
+            output_format=OutputFormat.HTML,
+        )
+
+        assert runner.execute(profile).success
+        assert not (tmp_path / "spill").exists()
+
+        runner.spill_successful_output = True
+        assert runner.execute(profile).success
+        assert len(list((tmp_path / "spill").iterdir())) == 1
+
+    def test_quiet_run_not_spilled(self, fake_pandoc, tmp_path):
+        """Test that ordinary runs leave no spill file."""
+        fake_pandoc.configure(warnings=3)
+        runner = PandocRunner(fake_pandoc.path)
+        runner.spill_dir = tmp_path / "spill"
+        input_path = tmp_path / "doc.md"
+        input_path.write_text("hello")
+
+        result = runner.execute(
+            ConversionProfile(
+                input_path=input_path,
+                output_path=tmp_path / "doc.html",
+                output_format=OutputFormat.HTML,
+            )
+        )
+
+        assert result.success
+        assert not (tmp_path / "spill").exists()
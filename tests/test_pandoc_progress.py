@@ -0,0 +1,178 @@
+"""
+Tests for live progress and warnings parsed from pandoc's --verbose output.
+"""
+
+import time
+
+from pandoc_ui.app.circuit_breaker import error_signature
+from pandoc_ui.app.scheduler import ConversionScheduler
+from pandoc_ui.app.task_queue import TaskQueue
+from pandoc_ui.infra.pandoc_progress import (
+    PandocPhase,
+    PandocProgressParser,
+    strip_verbose,
+    with_verbose,
+)
+from pandoc_ui.infra.pandoc_runner import PandocRunner
+from pandoc_ui.models import ConversionProfile, InputFormat, OutputFormat
+
+PDF_RUN = (
+    b"[INFO] Running filter pandoc-crossref\n"
+    b"[INFO] Completed filter pandoc-crossref in 40 ms\n"
+    b"[WARNING] Could not fetch resource missing.png\n"
+    b"[makePDF] Temp dir:\n"
+    b"/tmp/tex2pdf.-1234\n"
+    b"[makePDF] Command line:\n"
+    b'pdflatex "-halt-on-error" "/tmp/tex2pdf.-1234/input.tex"\n'
+    b"\n"
+    b"[makePDF] Relevant environment variables:\n"
+    b'("TEXINPUTS","/tmp/tex2pdf.-1234:")\n'
+    b"[makePDF] Source:\n"
+    b"\\documentclass{article}\n"
+    b"[makePDF] LaTeX run number 1\n"
+    b"[makePDF] LaTeX output\n"
+    b"This is pdfTeX, Version 3.141592653\n"
+    b"[1{/usr/share/texmf/fonts/map/pdftex.map}]\n"
+    b"[makePDF] Run #2\n"
+)
+
+
+def _pdf_failure(latex_error: str) -> str:
+    """Get the output of a verbose run failing with a LaTeX error."""
+    return PDF_RUN.decode() + f"! {latex_error}\nError producing PDF.\n! {latex_error}\nl.3\n"
+
+
+def _profile(tmp_path, output_format: OutputFormat = OutputFormat.PDF) -> ConversionProfile:
+    input_path = tmp_path / "doc.md"
+    input_path.write_text("hello")
+    return ConversionProfile(
+        input_path=input_path,
+        output_path=tmp_path / "out" / f"doc.{output_format.value}",
+        input_format=InputFormat.MARKDOWN,
+        output_format=output_format,
+    )
+
+
+class TestPandocProgressParser:
+    """Test parsing of pandoc's verbose messages."""
+
+    def test_phases_and_warnings(self):
+        """Test the events of a PDF run with a filter."""
+        parser = PandocProgressParser()
+
+        events = [parser.start()] + parser.feed(PDF_RUN)
+
+        assert [(e.phase, e.percent, e.message, e.warning) for e in events] == [
+            (PandocPhase.PARSING, 10, "Parsing input", False),
+            (PandocPhase.FILTERS, 40, "Running filter pandoc-crossref", False),
+            (PandocPhase.FILTERS, 40, "Could not fetch resource missing.png", True),
+            (PandocPhase.WRITING, 60, "Writing LaTeX source", False),
+            (PandocPhase.LATEX, 70, "LaTeX run 1", False),
+            (PandocPhase.LATEX, 80, "LaTeX run 2", False),
+        ]
+        assert parser.warnings == 1
+
+    def test_lines_split_across_chunks(self):
+        """Test that lines arriving in pieces give the same events as whole output."""
+        whole = PandocProgressParser().feed(PDF_RUN)
+        parser = PandocProgressParser()
+
+        pieces = [parser.feed(PDF_RUN[i : i + 7]) for i in range(0, len(PDF_RUN), 7)]
+
+        assert [event for events in pieces for event in events] == whole
+        assert parser.feed(b"[trace] Parsed Para\n" * 1000 + b"\r\n") == []
+
+    def test_command_and_error_message(self):
+        """Test that --verbose is added once and its lines stay out of error messages."""
+        assert with_verbose(["pandoc", "in.md", "-o", "out.pdf"]) == [
+            "pandoc",
+            "--verbose",
+            "in.md",
+            "-o",
+            "out.pdf",
+        ]
+        assert with_verbose(["pandoc", "--quiet", "in.md"]) == ["pandoc", "--quiet", "in.md"]
+        assert strip_verbose(_pdf_failure("Undefined control sequence.")) == (
+            "[WARNING] Could not fetch resource missing.png\n"
+            "Error producing PDF.\n"
+            "! Undefined control sequence.\n"
+            "l.3"
+        )
+        assert strip_verbose("[INFO] Running filter f.py\nTraceback in f.py\n") == (
+            "Traceback in f.py"
+        )
+
+    def test_error_signature_by_cause(self):
+        """Test that verbose PDF failures with different causes keep different signatures."""
+        undefined = strip_verbose(_pdf_failure("Undefined control sequence."))
+        missing = strip_verbose(_pdf_failure("LaTeX Error: File `foo.sty' not found."))
+
+        assert error_signature(undefined) != error_signature(missing)
+
+
+class TestLiveProgress:
+    """Test progress reported while the fake pandoc runs."""
+
+    def test_events_arrive_while_running(self, fake_pandoc, tmp_path):
+        """Test that phases are reported before pandoc exits, warnings included."""
+        fake_pandoc.configure(seconds=1.2, warnings=2, record=True)
+        runner = PandocRunner(fake_pandoc.path)
+        received = []
+
+        result = runner.execute(
+            _profile(tmp_path), progress=lambda event: received.append((time.monotonic(), event))
+        )
+        finished = time.monotonic()
+
+        assert result.success
+        assert "--verbose" in fake_pandoc.calls()[-1]
+        messages = [event.message for _, event in received]
+        assert messages == [
+            "Parsing input",
+            "Writing LaTeX source",
+            "LaTeX run 1",
+            "LaTeX run 2",
+            "Fake warning 1",
+            "Fake warning 2",
+        ]
+        [latex_run] = [at for at, event in received if event.message == "LaTeX run 1"]
+        assert finished - latex_run > 0.3
+
+    def test_failing_callback_ignored(self, fake_pandoc, tmp_path):
+        """Test that an exception in the callback does not fail the conversion."""
+        runner = PandocRunner(fake_pandoc.path)
+
+        def progress(event):
+            raise RuntimeError("GUI gone")
+
+        assert runner.execute(_profile(tmp_path, OutputFormat.HTML), progress=progress).success
+
+    def test_verbose_failure_message(self, fake_pandoc, tmp_path):
+        """Test that a failed verbose run reports pandoc's error, not its progress lines."""
+        fake_pandoc.configure(fail_inputs=["doc*"])
+        runner = PandocRunner(fake_pandoc.path)
+
+        result = runner.execute(_profile(tmp_path), progress=lambda event: None)
+
+        assert not result.success
+        assert result.error_message == "pandoc: simulated failure converting " + str(
+            tmp_path / "doc.md"
+        )
+
+    def test_task_queue_signals(self, qapp, fake_pandoc, tmp_path):
+        """Test task_progress and task_warning of a batch with live progress."""
+        fake_pandoc.configure(warnings=1)
+        queue = TaskQueue(max_concurrent_jobs=1, scheduler=ConversionScheduler(budget=1))
+        queue.add_task("task_0", _profile(tmp_path))
+        progress, warnings = [], []
+        queue.task_progress.connect(lambda *args: progress.append(args))
+        queue.task_warning.connect(lambda *args: warnings.append(args))
+
+        queue.set_live_progress(True)
+        queue.start_queue()
+        assert queue.wait_for_completion(30_000)
+        qapp.processEvents()
+
+        assert progress[-1] == ("task_0", "doc.md", 80, "LaTeX run 2")
+        assert warnings == [("task_0", "doc.md", "Fake warning 1")]
+        queue.clear_queue()
@@ -2,12 +2,33 @@
 Tests for pandoc runner functionality.
 """
 
+import os
 import subprocess
+import sys
 from pathlib import Path
 from unittest.mock import Mock, patch
 
-from pandoc_ui.infra.pandoc_runner import PandocRunner
-from pandoc_ui.models import ConversionProfile, OutputFormat
+import pytest
+
+from pandoc_ui.infra.pandoc_runner import (
+    AccountedPopen,
+    PandocRunner,
+    commit_output,
+    temp_output_path,
+)
+from pandoc_ui.models import ConversionProfile, OutputFormat, ResourceUsage
+
+COPYING_PANDOC = """#!{python}
+import sys
+args = sys.argv[1:]
+output = args[args.index("-o") + 1]
+data = open(args[0], "rb").read()
+if b"FAIL" in data:
+    open(output, "wb").write(b"partial")
+    sys.stderr.write("pandoc: failed")
+    sys.exit(1)
+open(output, "wb").write(data.upper())
+"""
 
 
 class TestPandocRunner:
@@ -100,17 +121,28 @@ class TestPandocRunner:
         assert result.success is False
         assert "does not exist" in result.error_message
 
+    @staticmethod
+    def _process(mock_popen: Mock, returncode: int = 0, stderr: bytes = b"") -> Mock:
+        """Make mock_popen start a mock pandoc process that writes stderr to its capture."""
+        process = Mock(returncode=returncode, args=["pandoc"])
+        process.communicate.return_value = (None, None)
+        process.resource_usage.return_value = ResourceUsage(wall_seconds=0.1)
+
+        def spawn(cmd, **kwargs):
+            kwargs["stderr"].write(stderr)
+            kwargs["stderr"].flush()
+            return process
+
+        mock_popen.side_effect = spawn
+        return process
+
     @patch("pathlib.Path.exists")
     @patch("pathlib.Path.mkdir")
-    @patch("subprocess.run")
-    def test_execute_success(self, mock_run, mock_mkdir, mock_exists):
+    @patch("pandoc_ui.infra.pandoc_runner.AccountedPopen")
+    def test_execute_success(self, mock_popen, mock_mkdir, mock_exists):
         """Test successful execution."""
         mock_exists.return_value = True
-        mock_result = Mock()
-        mock_result.returncode = 0
-        mock_result.stdout = ""
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+        self._process(mock_popen)
 
         profile = ConversionProfile(
             input_path=Path("input.md"),
@@ -123,18 +155,15 @@ class TestPandocRunner:
         assert result.success is True
         assert result.output_path == Path("output/result.html")
         assert result.duration_seconds >= 0
+        assert result.resources.wall_seconds == 0.1
         mock_mkdir.assert_called_once()
 
     @patch("pathlib.Path.exists")
-    @patch("subprocess.run")
-    def test_execute_pandoc_failure(self, mock_run, mock_exists):
+    @patch("pandoc_ui.infra.pandoc_runner.AccountedPopen")
+    def test_execute_pandoc_failure(self, mock_popen, mock_exists):
         """Test execution when pandoc command fails."""
         mock_exists.return_value = True
-        mock_result = Mock()
-        mock_result.returncode = 1
-        mock_result.stdout = ""
-        mock_result.stderr = "pandoc: input.md: openBinaryFile: does not exist"
-        mock_run.return_value = mock_result
+        self._process(mock_popen, 1, b"pandoc: input.md: openBinaryFile: does not exist")
 
         profile = ConversionProfile(input_path=Path("input.md"), output_format=OutputFormat.HTML)
 
@@ -143,12 +172,16 @@ class TestPandocRunner:
         assert result.success is False
         assert "does not exist" in result.error_message
 
+    @patch("pandoc_ui.infra.pandoc_runner._PROCESS_GROUPS", False)
     @patch("pathlib.Path.exists")
-    @patch("subprocess.run")
-    def test_execute_timeout(self, mock_run, mock_exists):
+    @patch("pandoc_ui.infra.pandoc_runner.AccountedPopen")
+    def test_execute_timeout(self, mock_popen, mock_exists):
         """Test execution timeout handling."""
         mock_exists.return_value = True
-        mock_run.side_effect = subprocess.TimeoutExpired("pandoc", 300)
+        process = self._process(mock_popen)
+        process.communicate.side_effect = [subprocess.TimeoutExpired("pandoc", 300), (None, None)]
+        # Without stall polling, communicate() only times out at the deadline
+        self.runner.stall_seconds = None
 
         profile = ConversionProfile(input_path=Path("input.md"), output_format=OutputFormat.HTML)
 
@@ -156,13 +189,14 @@ class TestPandocRunner:
 
         assert result.success is False
         assert "timed out" in result.error_message
+        process.kill.assert_called_once()
 
     @patch("pathlib.Path.exists")
-    @patch("subprocess.run")
-    def test_execute_exception(self, mock_run, mock_exists):
+    @patch("pandoc_ui.infra.pandoc_runner.AccountedPopen")
+    def test_execute_exception(self, mock_popen, mock_exists):
         """Test execution exception handling."""
         mock_exists.return_value = True
-        mock_run.side_effect = Exception("Test exception")
+        mock_popen.side_effect = Exception("Test exception")
 
         profile = ConversionProfile(input_path=Path("input.md"), output_format=OutputFormat.HTML)
 
@@ -181,3 +215,169 @@ class TestPandocRunner:
         """Test validation of invalid output formats."""
         assert self.runner.validate_output_format("invalid") is False
         assert self.runner.validate_output_format("") is False
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a POSIX script as pandoc")
+class TestAtomicOutput:
+    """Test atomic output writes."""
+
+    @pytest.fixture
+    def runner(self, tmp_path):
+        script = tmp_path / "fake-pandoc"
+        script.write_text(COPYING_PANDOC.format(python=sys.executable))
+        script.chmod(0o755)
+        return PandocRunner(script)
+
+    def test_commit_output_new_file(self, tmp_path):
+        """Test that a new output is moved into place."""
+        temp = tmp_path / ".out.tmp.html"
+        temp.write_text("content")
+        output = tmp_path / "out.html"
+
+        assert commit_output(temp, output) is True
+        assert output.read_text() == "content"
+        assert not temp.exists()
+
+    def test_commit_output_identical_keeps_mtime(self, tmp_path):
+        """Test that identical content leaves the existing output untouched."""
+        output = tmp_path / "out.html"
+        output.write_text("content")
+        os.utime(output, (1_000_000, 1_000_000))
+        temp = tmp_path / ".out.tmp.html"
+        temp.write_text("content")
+
+        assert commit_output(temp, output) is False
+        assert output.stat().st_mtime == 1_000_000
+        assert not temp.exists()
+
+    def test_commit_output_changed(self, tmp_path):
+        """Test that changed content replaces the output."""
+        output = tmp_path / "out.html"
+        output.write_text("old!!!!")
+        temp = tmp_path / ".out.tmp.html"
+        temp.write_text("content")
+
+        assert commit_output(temp, output) is True
+        assert output.read_text() == "content"
+
+    def test_commit_output_missing_temp(self, tmp_path):
+        """Test that a missing temp output is reported as None."""
+        assert commit_output(tmp_path / "missing", tmp_path / "out.html") is None
+
+    def test_temp_output_path(self):
+        """Test temp path is a hidden sibling with the same suffix."""
+        temp = temp_output_path(Path("/out/doc.pdf"))
+
+        assert temp.parent == Path("/out")
+        assert temp.name.startswith(".doc.")
+        assert temp.suffix == ".pdf"
+
+    def test_rerun_leaves_unchanged_output(self, runner, tmp_path):
+        """Test that converting twice keeps the first output's mtime."""
+        input_file = tmp_path / "doc.md"
+        input_file.write_text("hello")
+        output = tmp_path / "out" / "doc.html"
+        profile = ConversionProfile(
+            input_path=input_file, output_path=output, output_format=OutputFormat.HTML
+        )
+
+        first = runner.execute(profile)
+        os.utime(output, (1_000_000, 1_000_000))
+        second = runner.execute(profile)
+
+        assert first.success and first.output_changed is True
+        assert second.success and second.output_changed is False
+        assert output.read_text() == "HELLO"
+        assert output.stat().st_mtime == 1_000_000
+        assert "-o" in second.command and str(output) in second.command
+
+    def test_source_date_pinned_only_when_enabled(self, tmp_path, monkeypatch):
+        """Test that SOURCE_DATE_EPOCH follows the input's mtime only with pin_source_date."""
+        monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+        input_file = tmp_path / "doc.md"
+        input_file.write_text("hello")
+        os.utime(input_file, (1_000_000, 1_000_000))
+        profile = ConversionProfile(input_path=input_file, output_format=OutputFormat.DOCX)
+        runner = PandocRunner(Path("/usr/bin/pandoc"))
+
+        assert "SOURCE_DATE_EPOCH" not in runner._build_env(profile)
+        runner.pin_source_date = True
+        assert runner._build_env(profile)["SOURCE_DATE_EPOCH"] == "1000000"
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", "42")
+        assert runner._build_env(profile)["SOURCE_DATE_EPOCH"] == "42"
+
+    def test_failure_leaves_no_partial_output(self, runner, tmp_path):
+        """Test that failed runs never touch the output path."""
+        input_file = tmp_path / "doc.md"
+        input_file.write_text("FAIL")
+        output = tmp_path / "doc.html"
+        output.write_text("previous")
+
+        result = runner.execute(
+            ConversionProfile(
+                input_path=input_file, output_path=output, output_format=OutputFormat.HTML
+            )
+        )
+
+        assert result.success is False
+        assert output.read_text() == "previous"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["doc.html", "doc.md", "fake-pandoc"]
+
+
+# Burns some CPU and memory, then copies its input to -o
+HUNGRY_PANDOC = """#!{python}
+import sys
+args = sys.argv[1:]
+output = args[args.index("-o") + 1]
+data = open(args[0], "rb").read()
+ballast = bytearray(64 * 1024 * 1024)
+total = sum(range(3_000_000))
+open(output, "wb").write(data * 10)
+"""
+
+
+@pytest.mark.skipif(not hasattr(os, "wait4"), reason="Needs os.wait4")
+class TestResourceAccounting:
+    """Test per-run resource usage."""
+
+    def test_usage_recorded(self, tmp_path):
+        """Test CPU, memory, I/O and size accounting of a real child process."""
+        script = tmp_path / "fake-pandoc"
+        script.write_text(HUNGRY_PANDOC.format(python=sys.executable))
+        script.chmod(0o755)
+        input_file = tmp_path / "doc.md"
+        input_file.write_bytes(b"x" * 1000)
+        profile = ConversionProfile(
+            input_path=input_file,
+            output_path=tmp_path / "doc.html",
+            output_format=OutputFormat.HTML,
+        )
+
+        result = PandocRunner(script).execute(profile)
+
+        usage = result.resources
+        assert result.success
+        assert usage.wall_seconds > 0
+        assert usage.cpu_seconds > 0
+        assert usage.peak_rss_bytes > 64 * 1024 * 1024
+        assert usage.input_bytes == 1000
+        assert usage.output_bytes == 10_000
+        if sys.platform.startswith("linux"):
+            assert usage.read_bytes >= 1000
+            assert usage.write_bytes >= 10_000
+
+    def test_popen_reaps_with_usage(self):
+        """Test that poll() and wait() with a timeout reap the child with its usage."""
+        burner = (
+            "import time\nend = time.process_time() + 0.2\nwhile time.process_time() < end: pass"
+        )
+        process = AccountedPopen([sys.executable, "-c", burner + "\nraise SystemExit(3)"])
+
+        with pytest.raises(subprocess.TimeoutExpired):
+            process.wait(timeout=0.01)
+        assert process.poll() is None
+        assert process.wait(timeout=30) == 3
+
+        usage = process.resource_usage(1.0)
+        assert usage.cpu_seconds >= 0.15
+        assert process.poll() == 3
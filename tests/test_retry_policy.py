@@ -0,0 +1,239 @@
+"""
+Tests for failure classification and retries of transient failures.
+"""
+
+import random
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pandoc_ui.app.retry_policy import FailureKind, RetryPolicy, classify_failure
+from pandoc_ui.app.scheduler import ConversionScheduler
+from pandoc_ui.app.task_queue import STATUS_CODES, TaskQueue, TaskStatus
+from pandoc_ui.models import ConversionProfile, ConversionResult, OutputFormat
+
+FAST = RetryPolicy(max_attempts=3, base_delay_seconds=0.01, max_delay_seconds=0.05)
+
+
+def _failure(message: str, exit_code: int | None = 1) -> ConversionResult:
+    return ConversionResult(success=False, error_message=message, exit_code=exit_code)
+
+
+class TestClassifyFailure:
+    """Test transient/deterministic classification."""
+
+    @pytest.mark.parametrize(
+        ("result", "category"),
+        [
+            (_failure("Pandoc conversion timed out after 30 seconds", None), "timeout"),
+            (_failure("", -9), "out_of_memory"),
+            (_failure("", 137), "out_of_memory"),
+            (
+                _failure("pandoc: Heap exhausted;\nCurrent maximum heap size is 1GB"),
+                "out_of_memory",
+            ),
+            (
+                _failure("Conversion failed: [Errno 11] Resource temporarily unavailable", None),
+                "resource_exhausted",
+            ),
+            (
+                _failure("pandoc: out.docx: openBinaryFile: resource busy (file is locked)"),
+                "file_locked",
+            ),
+            (
+                _failure("Could not fetch https://example.com/a.png\nHttpExceptionRequest", 61),
+                "network",
+            ),
+        ],
+    )
+    def test_transient(self, result, category):
+        """Test that load, locking and network failures are transient."""
+        failure = classify_failure(result)
+
+        assert failure.kind == FailureKind.TRANSIENT
+        assert failure.category == category
+
+    @pytest.mark.parametrize(
+        ("result", "category"),
+        [
+            (
+                _failure("Unknown option --tco.\nTry pandoc --help for more information.", 6),
+                "pandoc_error",
+            ),
+            (_failure("Could not find data file templates/missing.html", 97), "pandoc_error"),
+            (_failure("Input file does not exist: /tmp/x.md", None), "error"),
+            (_failure("Conversion cancelled", None), "cancelled"),
+            (_failure("", -11), "crashed"),
+        ],
+    )
+    def test_deterministic(self, result, category):
+        """Test that option, template, input and crash failures are never transient."""
+        failure = classify_failure(result)
+
+        assert failure.kind == FailureKind.DETERMINISTIC
+        assert failure.category == category
+
+
+class TestRetryPolicy:
+    """Test retry decisions and backoff."""
+
+    def test_only_transient_failures_retried(self):
+        """Test the attempt limit and that deterministic failures are final."""
+        policy = RetryPolicy(max_attempts=3)
+        transient = classify_failure(_failure("", -9))
+        deterministic = classify_failure(_failure("Unknown option --tco", 6))
+
+        assert policy.should_retry(transient, 1)
+        assert policy.should_retry(transient, 2)
+        assert not policy.should_retry(transient, 3)
+        assert not policy.should_retry(deterministic, 1)
+
+    def test_backoff_with_jitter(self):
+        """Test that delays double up to the cap and jitter only shortens them."""
+        policy = RetryPolicy(base_delay_seconds=1.0, max_delay_seconds=4.0, jitter=0.5)
+        rng = random.Random(1)
+
+        delays = [policy.delay(attempts, rng) for attempts in (1, 2, 3, 4, 5)]
+
+        for delay, full in zip(delays, (1.0, 2.0, 4.0, 4.0, 4.0), strict=True):
+            assert full * 0.5 <= delay <= full
+        assert RetryPolicy(jitter=0.0).delay(3) == 4.0
+
+
+class TestTaskQueueRetries:
+    """Test retries in TaskQueue."""
+
+    def _queue(self, count: int, outcome, jobs: int = 4) -> tuple[TaskQueue, list[str]]:
+        """Create a queue whose stub conversions return outcome(name, attempt)."""
+        calls: list[str] = []
+
+        def convert(profile):
+            name = profile.input_path.name
+            calls.append(name)
+            return outcome(name, calls.count(name)) or ConversionResult(
+                success=True, output_path=profile.output_path
+            )
+
+        queue = TaskQueue(max_concurrent_jobs=jobs, scheduler=ConversionScheduler(budget=jobs))
+        queue._conversion_service = Mock(convert=Mock(side_effect=convert))
+        queue.set_retry_policy(FAST)
+        for i in range(count):
+            queue.add_task(
+                f"task_{i}",
+                ConversionProfile(
+                    input_path=Path(f"/virtual/doc{i}.md"),
+                    output_path=Path(f"/virtual/out/doc{i}.html"),
+                    output_format=OutputFormat.HTML,
+                ),
+            )
+        return queue, calls
+
+    def test_transient_failures_converge(self, qapp):
+        """Test that tasks failing transiently a few times still complete."""
+
+        def outcome(name, attempt):
+            if name in ("doc1.md", "doc5.md") and attempt < 3:
+                return _failure("pandoc: out.html: openBinaryFile: resource busy (file is locked)")
+            return None
+
+        queue, calls = self._queue(10, outcome)
+        failures = []
+        queue.task_failed.connect(lambda *args: failures.append(args))
+
+        queue.start_queue()
+        assert queue.wait_for_completion(10_000)
+        qapp.processEvents()
+
+        summary = queue.get_queue_summary()
+        assert summary["completed"] == 10 and summary["retried"] == 4
+        assert calls.count("doc1.md") == calls.count("doc5.md") == 3
+        assert failures == []
+        queue.clear_queue()
+
+    def test_wait_forever_with_pending_retry(self, qapp):
+        """Test that timeout_ms=-1 waits through retry backoffs instead of returning at once."""
+        slow = RetryPolicy(max_attempts=2, base_delay_seconds=0.3, max_delay_seconds=0.3, jitter=0)
+
+        def outcome(name, attempt):
+            if attempt == 1:
+                return _failure("Pandoc conversion timed out after 1 seconds", None)
+            return None
+
+        queue, calls = self._queue(2, outcome, jobs=1)
+        queue.set_retry_policy(slow)
+
+        queue.start_queue()
+        assert queue.wait_for_completion(-1)
+
+        assert len(calls) == 4
+        assert queue.get_queue_summary()["completed"] == 2
+        queue.clear_queue()
+
+    def test_deterministic_and_exhausted_failures(self, qapp):
+        """Test that deterministic failures run once and transient ones stop at max_attempts."""
+
+        def outcome(name, attempt):
+            if name == "doc0.md":
+                return _failure("Unknown option --tco", 6)
+            if name == "doc1.md":
+                return _failure("Pandoc conversion timed out after 1 seconds", None)
+            return None
+
+        queue, calls = self._queue(4, outcome)
+
+        queue.start_queue()
+        assert queue.wait_for_completion(10_000)
+
+        assert calls.count("doc0.md") == 1
+        assert calls.count("doc1.md") == FAST.max_attempts
+        assert queue.get_task_status("task_1") == TaskStatus.FAILED
+        assert queue.get_queue_summary()["completed"] == 2
+        queue.clear_queue()
+
+    def test_load_failures_lower_concurrency(self, qapp):
+        """Test that OOM kills halve concurrency, which recovers after successes."""
+        queue, _ = self._queue(1, lambda name, attempt: None)
+        queue._max_jobs = 8
+        with_limit = []
+
+        queue._mutex.lock()
+        try:
+            queue._set_status(0, STATUS_CODES[TaskStatus.RUNNING])
+            queue._active_jobs = 1
+            assert queue._schedule_retry(0, _failure("", -9))
+            with_limit.append(queue._concurrency())
+            for _ in range(TaskQueue.PRESSURE_RECOVERY_TASKS):
+                queue._relieve_pressure()
+            with_limit.append(queue._concurrency())
+        finally:
+            queue._mutex.unlock()
+
+        assert with_limit == [4, 5]
+        queue.clear_queue()
+
+    def test_oom_kill_retried_against_fake_pandoc(self, qapp, fake_pandoc, tmp_path):
+        """Test that the exit status of a killed pandoc reaches the classifier."""
+        fake_pandoc.configure(fail_inputs=["oom*"], fail_exit_code=137, record=True)
+        queue = TaskQueue(max_concurrent_jobs=2, scheduler=ConversionScheduler(budget=2))
+        queue.set_retry_policy(FAST)
+        for name in ("ok.md", "oom.md"):
+            input_path = tmp_path / name
+            input_path.write_text(name)
+            queue.add_task(
+                name,
+                ConversionProfile(
+                    input_path=input_path,
+                    output_path=tmp_path / "out" / f"{input_path.stem}.html",
+                    output_format=OutputFormat.HTML,
+                ),
+            )
+
+        queue.start_queue()
+        assert queue.wait_for_completion(30_000)
+
+        runs = [call for call in fake_pandoc.calls() if str(tmp_path / "oom.md") in call]
+        assert len(runs) == FAST.max_attempts
+        assert queue.get_task_status("ok.md") == TaskStatus.COMPLETED
+        assert queue.get_task_status("oom.md") == TaskStatus.FAILED
+        queue.clear_queue()
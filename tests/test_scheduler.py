@@ -0,0 +1,147 @@
+"""
+Tests for the application-wide conversion scheduler.
+"""
+
+import gc
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pandoc_ui.app.scheduler import ConversionScheduler, Lane
+from pandoc_ui.app.task_queue import TaskQueue
+from pandoc_ui.models import ConversionProfile, ConversionResult, OutputFormat
+
+
+class RecordingClient:
+    """Scheduler client that records the limits it receives."""
+
+    def __init__(self):
+        self.limits: list[int] = []
+
+    def set_concurrency_limit(self, limit: int) -> None:
+        self.limits.append(limit)
+
+    @property
+    def limit(self) -> int | None:
+        return self.limits[-1] if self.limits else None
+
+
+class TestConversionScheduler:
+    """Test budget allocation between lanes."""
+
+    def test_lanes_share_budget_in_priority_order(self):
+        """Test that batch clients are served before background clients."""
+        scheduler = ConversionScheduler(budget=4)
+        background = RecordingClient()
+        batch = RecordingClient()
+
+        scheduler.register(background, Lane.BACKGROUND, 4)
+        assert background.limit == 4
+
+        scheduler.register(batch, Lane.BATCH, 3)
+        assert (batch.limit, background.limit) == (3, 1)
+
+        scheduler.unregister(batch)
+        assert background.limit == 4
+        assert scheduler.limit_for(batch) is None
+
+    def test_interactive_shrinks_batches(self):
+        """Test that interactive work is admitted at once and batches make room."""
+        scheduler = ConversionScheduler(budget=2)
+        batch = RecordingClient()
+        scheduler.register(batch, Lane.BATCH, 4)
+        assert batch.limit == 2
+
+        with scheduler.interactive():
+            assert scheduler.interactive_count == 1
+            assert batch.limit == 1
+            with scheduler.interactive(), scheduler.interactive():
+                assert batch.limit == 0
+            assert batch.limit == 1
+
+        assert batch.limit == 2
+        assert scheduler.interactive_count == 0
+
+    def test_budget_change_and_dead_clients(self):
+        """Test set_budget and that garbage-collected clients are dropped."""
+        scheduler = ConversionScheduler(budget=1)
+        first = RecordingClient()
+        second = RecordingClient()
+        scheduler.register(first, Lane.BATCH, 2)
+        scheduler.register(second, Lane.BATCH, 2)
+        assert (first.limit, second.limit) == (1, 0)
+
+        scheduler.set_budget(3)
+        assert (first.limit, second.limit) == (2, 1)
+
+        del first
+        gc.collect()
+        scheduler.set_budget(3)
+        assert second.limit == 2
+
+    def test_interactive_lane_cannot_register(self):
+        """Test that interactive work must use interactive()."""
+        with pytest.raises(ValueError):
+            ConversionScheduler().register(RecordingClient(), Lane.INTERACTIVE, 1)
+
+
+class TestTaskQueueScheduling:
+    """Test TaskQueue under a scheduler."""
+
+    def _queue(self, scheduler: ConversionScheduler, count: int) -> TaskQueue:
+        queue = TaskQueue(max_concurrent_jobs=4, scheduler=scheduler)
+        queue._conversion_service = Mock(
+            convert=Mock(
+                side_effect=lambda p: ConversionResult(success=True, output_path=p.output_path)
+            )
+        )
+        for i in range(count):
+            queue.add_task(
+                f"task_{i}",
+                ConversionProfile(
+                    input_path=Path(f"/virtual/doc{i}.md"),
+                    output_path=Path(f"/virtual/out/doc{i}.html"),
+                    output_format=OutputFormat.HTML,
+                ),
+            )
+        return queue
+
+    def test_batch_waits_for_interactive(self, qapp):
+        """Test that a batch starts nothing new while interactive work uses the budget."""
+        scheduler = ConversionScheduler(budget=1)
+        queue = self._queue(scheduler, 20)
+
+        interactive = scheduler.interactive()
+        interactive.__enter__()
+        queue.start_queue()
+        assert scheduler.limit_for(queue) == 0
+        assert queue.wait_for_completion(5000)
+        assert queue.get_queue_summary()["completed"] == 0
+
+        interactive.__exit__(None, None, None)
+        assert queue.max_thread_count == 1
+        assert queue.wait_for_completion(5000)
+        assert queue.get_queue_summary()["completed"] == 20
+
+        # Finishing releases the queue's share
+        deadline = time.monotonic() + 5
+        while scheduler.limit_for(queue) is not None and time.monotonic() < deadline:
+            qapp.processEvents()
+        assert scheduler.limit_for(queue) is None
+
+    def test_queue_finishes_once_after_cancel(self, qapp):
+        """Test that cancelled in-flight tasks do not report the queue finished twice."""
+        scheduler = ConversionScheduler(budget=2)
+        queue = self._queue(scheduler, 50)
+        finished = []
+        queue.queue_finished.connect(lambda *args: finished.append(args))
+
+        queue.start_queue()
+        queue.cancel_queue()
+        assert queue.wait_for_completion(5000)
+        qapp.processEvents()
+
+        assert len(finished) == 1
+        assert scheduler.limit_for(queue) is None
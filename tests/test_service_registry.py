@@ -0,0 +1,61 @@
+"""
+Tests for the process-wide service registry.
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from pandoc_ui.app.service_registry import (
+    ServiceRegistry,
+    get_conversion_service,
+    get_service_registry,
+)
+from pandoc_ui.app.task_queue import TaskQueue
+from pandoc_ui.gui.conversion_worker import ConversionWorker
+from pandoc_ui.infra.pandoc_detector import PandocInfo
+from pandoc_ui.models import ConversionProfile, OutputFormat
+
+
+class TestServiceRegistry:
+    """Test shared service ownership and invalidation."""
+
+    def test_single_instances(self):
+        """Test that the registry hands out one detector, service and format table."""
+        registry = ServiceRegistry()
+        service = registry.get_conversion_service()
+
+        assert registry.get_conversion_service() is service
+        assert service.detector is registry.get_detector()
+        assert registry.get_format_manager() is registry.get_format_manager()
+
+    def test_consumers_share_global_service(self, qapp, service_registry):
+        """Test that task queues and workers use the global service."""
+        profile = ConversionProfile(input_path=Path("doc.md"), output_format=OutputFormat.HTML)
+        queue = TaskQueue()
+        worker = ConversionWorker(profile)
+
+        assert get_service_registry() is service_registry
+        assert queue._conversion_service is get_conversion_service()
+        assert worker.service is get_conversion_service()
+
+    @patch("pandoc_ui.infra.pandoc_detector.PandocDetector.detect")
+    def test_detection_runs_once_until_invalidated(self, mock_detect):
+        """Test that pandoc is probed once and again after invalidate()."""
+        mock_detect.return_value = PandocInfo(Path("/usr/bin/pandoc"), "3.1.3")
+        registry = ServiceRegistry()
+        service = registry.get_conversion_service()
+
+        runner = service._get_runner()
+        assert service._get_runner() is runner
+        assert registry.get_conversion_service().get_pandoc_info().version == "3.1.3"
+        assert mock_detect.call_count == 1
+
+        generation = registry.generation
+        mock_detect.return_value = PandocInfo(Path("/opt/pandoc/bin/pandoc"), "3.2")
+        registry.invalidate()
+
+        assert registry.generation == generation + 1
+        assert registry.get_conversion_service() is service
+        assert service._get_runner() is not runner
+        assert service._get_runner().pandoc_path == Path("/opt/pandoc/bin/pandoc")
+        assert mock_detect.call_count == 2
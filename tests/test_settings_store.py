@@ -5,6 +5,7 @@ Test settings store functionality.
 import json
 import tempfile
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
 
@@ -28,6 +29,8 @@ class TestApplicationSettings:
         assert settings.default_recursive_scan is True
         assert settings.max_batch_files == 1000
         assert settings.pandoc_timeout_seconds == 300
+        assert settings.pandoc_max_timeout_seconds == 1800
+        assert settings.pin_source_date is False
         assert settings.log_level == "INFO"
         assert settings.auto_save_profiles is True
         assert settings.confirm_batch_operations is True
@@ -236,6 +239,18 @@ class TestSettingsStore:
         reloaded_settings = settings_store.load_settings()
         assert reloaded_settings.theme == "dark"
 
+    def test_listeners_run_after_save(self, settings_store):
+        """Test that listeners get the new settings once they are saved."""
+        settings_store.load_settings()
+        seen = []
+        settings_store.add_listener(seen.append)
+        settings_store.add_listener(Mock(side_effect=RuntimeError("broken listener")))
+
+        assert settings_store.update_setting("pandoc_timeout_seconds", 900)
+        assert not settings_store.update_setting("pandoc_timeout_seconds", 1)
+
+        assert [settings.pandoc_timeout_seconds for settings in seen] == [900]
+
     def test_update_invalid_setting(self, settings_store):
         """Test updating with invalid value."""
         settings_store.load_settings()
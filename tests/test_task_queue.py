@@ -0,0 +1,248 @@
+"""
+Tests for TaskQueue progress reporting and bookkeeping.
+"""
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pandoc_ui.app.task_queue import ProgressSnapshot, TaskQueue
+from pandoc_ui.models import ConversionProfile, ConversionResult, OutputFormat
+
+
+def _stub_queue(count: int, task_signals: bool = True, fail_every: int = 0) -> TaskQueue:
+    """Create a queue whose conversions finish instantly."""
+
+    def convert(profile):
+        index = int(profile.input_path.stem[3:])
+        if fail_every and index % fail_every == 0:
+            return ConversionResult(success=False, error_message="stub failure")
+        return ConversionResult(success=True, output_path=profile.output_path)
+
+    queue = TaskQueue(max_concurrent_jobs=4, task_signals=task_signals)
+    queue._conversion_service = Mock(convert=Mock(side_effect=convert))
+    for i in range(count):
+        profile = ConversionProfile(
+            input_path=Path(f"/virtual/doc{i}.md"),
+            output_path=Path(f"/virtual/out/doc{i}.html"),
+            output_format=OutputFormat.HTML,
+        )
+        queue.add_task(f"task_{i}", profile)
+    return queue
+
+
+def _run_until_finished(qapp, queue: TaskQueue, timeout: float = 60.0) -> None:
+    """Start queue and pump the event loop until queue_finished arrives."""
+    finished = []
+    queue.queue_finished.connect(lambda *args: finished.append(args))
+    queue.start_queue()
+    deadline = time.monotonic() + timeout
+    while not finished and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.001)
+    assert finished, "queue did not finish"
+    assert queue.wait_for_completion(5000)
+
+
+class TestProgressSnapshot:
+    """Test aggregated progress signalling."""
+
+    def test_snapshot_properties(self):
+        """Test derived snapshot values."""
+        snapshot = ProgressSnapshot(
+            total=10,
+            completed=5,
+            failed=1,
+            running=2,
+            elapsed_seconds=3.0,
+            throughput=2.0,
+            eta_seconds=2.0,
+            cancelled=1,
+        )
+        assert snapshot.finished == 6
+        assert snapshot.pending == 1
+        assert snapshot.percent == 60
+        assert not snapshot.done
+
+    def test_coalesced_snapshots(self, qapp):
+        """Test that thousands of tasks produce a bounded number of snapshots."""
+        queue = _stub_queue(3000, task_signals=False, fail_every=100)
+        snapshots: list[ProgressSnapshot] = []
+        per_task = []
+        queue.progress_snapshot.connect(snapshots.append)
+        queue.task_started.connect(lambda *args: per_task.append(args))
+        queue.task_completed.connect(lambda *args: per_task.append(args))
+        queue.queue_progress.connect(lambda *args: per_task.append(args))
+        failures = []
+        queue.task_failed.connect(lambda *args: failures.append(args))
+
+        _run_until_finished(qapp, queue)
+        qapp.processEvents()
+
+        assert per_task == []
+        assert len(failures) == 30
+        assert 1 <= len(snapshots) < 3000
+        final = snapshots[-1]
+        assert final.done
+        assert (final.completed, final.failed, final.running) == (2970, 30, 0)
+        assert final.eta_seconds == 0.0
+
+    def test_per_task_signals_enabled_by_default(self, qapp):
+        """Test that per-task signals are still emitted for small batches."""
+        queue = _stub_queue(20)
+        started = []
+        queue.task_started.connect(lambda *args: started.append(args))
+
+        _run_until_finished(qapp, queue)
+        qapp.processEvents()
+
+        assert len(started) == 20
+        assert queue.get_progress_snapshot().completed == 20
+
+    def test_cancelled_tasks_finish_snapshot(self, qapp):
+        """Test that cancelled tasks count towards completion."""
+        queue = _stub_queue(5)
+        queue.cancel_queue()
+
+        snapshot = queue.get_progress_snapshot()
+        assert snapshot.cancelled == 5
+        assert snapshot.done
+
+
+@pytest.mark.parametrize("task_signals", [True, False])
+def test_event_rate_benchmark(qapp, task_signals):
+    """Test that turning off per-task signals cuts GUI-thread events to a bounded few."""
+    queue = _stub_queue(2000, task_signals=task_signals)
+    events = []
+    for signal in (
+        queue.task_started,
+        queue.task_completed,
+        queue.queue_progress,
+        queue.progress_snapshot,
+    ):
+        signal.connect(lambda *args: events.append(1))
+
+    _run_until_finished(qapp, queue)
+    qapp.processEvents()
+
+    if task_signals:
+        assert len(events) >= 2000 * 3
+    else:
+        assert len(events) < 200
+
+
+class TestBookkeeping:
+    """Test per-status counters and indexes."""
+
+    def test_counters_match_task_states(self, qapp):
+        """Test that summary and task lists agree with individual task states."""
+        queue = _stub_queue(500, fail_every=7)
+        _run_until_finished(qapp, queue)
+
+        summary = queue.get_queue_summary()
+        failed = queue.get_failed_tasks()
+        successful = queue.get_successful_tasks()
+        finished = queue.get_completed_tasks()
+
+        assert summary["total"] == 500
+        assert summary["failed"] == len(failed) == 72
+        assert summary["completed"] == len(successful) == 428
+        assert summary["pending"] == summary["running"] == 0
+        assert [task.id for task in finished] == [f"task_{i}" for i in range(500)]
+        assert all(queue.get_task_status(task.id).value == "failed" for task in failed)
+
+    def test_cancel_and_clear(self, qapp):
+        """Test that cancel and clear keep counters consistent."""
+        queue = _stub_queue(10)
+        queue.cancel_queue()
+        assert queue.get_queue_summary()["cancelled"] == 10
+
+        queue.clear_queue()
+        summary = queue.get_queue_summary()
+        assert summary["total"] == summary["cancelled"] == summary["pending"] == 0
+
+    def test_completion_cost_is_flat(self, qapp):
+        """Test that per-task overhead does not grow with batch size."""
+
+        def per_task_seconds(count: int) -> float:
+            queue = _stub_queue(count, task_signals=False)
+            start = time.perf_counter()
+            queue.start_queue()
+            assert queue.wait_for_completion(120_000)
+            return (time.perf_counter() - start) / count
+
+        small = per_task_seconds(2_000)
+        large = per_task_seconds(20_000)
+        # Quadratic bookkeeping would make the large batch ~10x slower per task
+        assert large < small * 4
+
+
+class TestLazySubmission:
+    """Test windowed task submission, pause and resume."""
+
+    def test_in_flight_tasks_are_bounded(self, qapp):
+        """Test that only a small window of tasks is handed to the pool."""
+        queue = _stub_queue(1000)
+        window = TaskQueue.SUBMIT_WINDOW_FACTOR * queue.max_thread_count
+        in_flight = []
+        convert = queue._conversion_service.convert.side_effect
+
+        def tracking_convert(profile):
+            in_flight.append(queue._in_flight)
+            return convert(profile)
+
+        queue._conversion_service.convert.side_effect = tracking_convert
+        _run_until_finished(qapp, queue)
+
+        assert len(in_flight) == 1000
+        assert max(in_flight) <= window
+        assert queue._in_flight == 0
+
+    def test_pause_and_resume(self, qapp):
+        """Test that pausing stops refilling without dropping tasks."""
+        queue = _stub_queue(50)
+        queue.set_max_concurrent_jobs(1)
+        convert = queue._conversion_service.convert.side_effect
+        paused = threading.Event()
+
+        def blocking_convert(profile):
+            paused.wait(5)
+            return convert(profile)
+
+        queue._conversion_service.convert.side_effect = blocking_convert
+        finished = []
+        queue.queue_finished.connect(lambda *args: finished.append(args))
+
+        queue.start_queue()
+        queue.pause_queue()
+        paused.set()
+        assert queue.is_paused
+        assert queue.wait_for_completion(5000)
+
+        summary = queue.get_queue_summary()
+        assert summary["completed"] <= TaskQueue.SUBMIT_WINDOW_FACTOR
+        assert summary["pending"] >= 50 - TaskQueue.SUBMIT_WINDOW_FACTOR
+        qapp.processEvents()
+        assert finished == []
+
+        queue.resume_queue()
+        assert queue.wait_for_completion(10000)
+        qapp.processEvents()
+        assert queue.get_queue_summary()["completed"] == 50
+        assert len(finished) == 1
+
+    def test_cancel_while_paused(self, qapp):
+        """Test that cancelling a paused queue finishes it without running the rest."""
+        queue = _stub_queue(100)
+        queue.start_queue()
+        queue.pause_queue()
+        queue.cancel_queue()
+        assert queue.wait_for_completion(5000)
+
+        summary = queue.get_queue_summary()
+        assert summary["completed"] + summary["cancelled"] == 100
+        assert summary["completed"] <= TaskQueue.SUBMIT_WINDOW_FACTOR * queue.max_thread_count
+        assert queue._conversion_service.convert.call_count == summary["completed"]
@@ -0,0 +1,235 @@
+"""
+Tests for compact batch task storage.
+"""
+
+import csv
+import gc
+import tracemalloc
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pandoc_ui.app.task_queue import TaskQueue, TaskStatus
+from pandoc_ui.app.task_store import TaskStore
+from pandoc_ui.models import (
+    ConversionProfile,
+    ConversionResult,
+    InputFormat,
+    OutputFormat,
+    ResourceUsage,
+)
+
+
+def _profile(i: int, **overrides) -> ConversionProfile:
+    """Create a batch-style profile for document i."""
+    values = {
+        "input_path": Path(f"/data/docs/section{i % 10}/doc{i}.md"),
+        "output_path": Path(f"/data/out/section{i % 10}/doc{i}.html"),
+        "input_format": InputFormat.MARKDOWN,
+        "output_format": OutputFormat.HTML,
+        "options": {"custom_args": "--toc"},
+    }
+    values.update(overrides)
+    return ConversionProfile(**values)
+
+
+class TestTaskStore:
+    """Test TaskStore columns."""
+
+    def test_profile_round_trip(self):
+        """Test that stored profiles are rebuilt unchanged."""
+        store = TaskStore()
+        profiles = [
+            _profile(0),
+            _profile(1, output_path=Path("/elsewhere/renamed.html")),
+            _profile(2, output_path=None, options={}),
+            _profile(3, archive_path=Path("/data/docs.zip")),
+        ]
+        for i, profile in enumerate(profiles):
+            assert store.add(f"task_{i}", profile, 0) == i
+
+        for i, profile in enumerate(profiles):
+            rebuilt = store.profile(i)
+            assert rebuilt.input_path == profile.input_path
+            assert rebuilt.output_path == profile.output_path
+            assert rebuilt.input_format == profile.input_format
+            assert rebuilt.output_format == profile.output_format
+            assert rebuilt.options == (profile.options or {})
+            assert rebuilt.archive_path == profile.archive_path
+
+    def test_shared_tables(self):
+        """Test that directories and option templates are interned."""
+        store = TaskStore()
+        for i in range(100):
+            store.add(f"task_{i}", _profile(i), 0)
+
+        assert len(store._dirs) == 20
+        assert len(store._templates) == 1
+        assert store.profile(0).options is store.profile(99).options
+
+    def test_result_round_trip(self):
+        """Test that finished rows rebuild their results."""
+        store = TaskStore()
+        store.add("ok", _profile(0), 0)
+        store.add("bad", _profile(1), 0)
+        store.add("waiting", _profile(2), 0)
+
+        store.mark_started(0, 10.0)
+        store.mark_finished(
+            0,
+            12.5,
+            ConversionResult(
+                success=True, output_path=_profile(0).output_path, output_changed=False
+            ),
+        )
+        store.mark_started(1, 10.0)
+        store.mark_finished(1, 11.0, ConversionResult(success=False, error_message="boom"))
+        store.set_error(1, "boom")
+
+        ok = store.result(0, True)
+        assert ok.success and ok.output_path == _profile(0).output_path
+        assert ok.duration_seconds == 2.5
+        assert ok.output_changed is False
+
+        bad = store.result(1, False)
+        assert not bad.success and bad.error_message == "boom"
+        assert bad.output_path is None
+
+        assert store.result(2, False) is None
+        assert store.start_time(2) is None and store.duration(2) is None
+
+    def test_resource_round_trip(self):
+        """Test that resource usage is kept per row and totalled."""
+        store = TaskStore()
+        for i in range(3):
+            store.add(f"task_{i}", _profile(i), 0)
+
+        usages = [
+            ResourceUsage(
+                wall_seconds=1.5,
+                user_cpu_seconds=1.0,
+                system_cpu_seconds=0.25,
+                peak_rss_bytes=50_000_000,
+                read_bytes=4096,
+                write_bytes=8192,
+                input_bytes=1000,
+                output_bytes=3000,
+            ),
+            ResourceUsage(
+                wall_seconds=0.5,
+                user_cpu_seconds=0.1,
+                system_cpu_seconds=0.1,
+                peak_rss_bytes=80_000_000,
+                input_bytes=10,
+            ),
+        ]
+        for row, usage in enumerate(usages):
+            store.mark_started(row, 0.0)
+            store.mark_finished(row, 2.0, ConversionResult(success=True, resources=usage))
+
+        assert store.resources(0) == usages[0]
+        assert store.resources(1) == usages[1]
+        assert store.resources(2) is None
+        assert store.result(1, True).resources == usages[1]
+
+        summary = store.resource_summary(top=1)
+        assert summary.measured_tasks == 2
+        assert summary.wall_seconds == 2.0
+        assert summary.cpu_seconds == pytest.approx(1.45)
+        assert summary.peak_rss_bytes == 80_000_000
+        assert (summary.read_bytes, summary.write_bytes) == (4096, 8192)
+        assert (summary.input_bytes, summary.output_bytes) == (1010, 3000)
+        assert summary.most_expensive == [("task_0", 1.25)]
+
+    def test_rows_with_status(self):
+        """Test status scans in insertion order."""
+        store = TaskStore()
+        for i in range(10):
+            store.add(f"task_{i}", _profile(i), i % 3)
+
+        assert store.rows_with_status(1) == [1, 4, 7]
+        assert store.rows_with_status(2, 0) == [0, 2, 3, 5, 6, 8, 9]
+
+        store.clear()
+        assert len(store) == 0 and "task_0" not in store
+
+
+class TestCompactQueue:
+    """Test TaskQueue on top of the compact store."""
+
+    def test_memory_per_task(self, qapp):
+        """Test that a queued task stays well under the old ~1.4 KB footprint."""
+        queue = TaskQueue()
+        count = 20_000
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(count):
+            queue.add_task(f"task_{i}", _profile(i))
+        gc.collect()
+        per_task = (tracemalloc.get_traced_memory()[0] - before) / count
+        tracemalloc.stop()
+
+        print(f"{per_task:.0f} bytes per queued task")
+        assert per_task < 600
+
+    def test_results_stream_to_sink(self, qapp):
+        """Test that full results go to the sink and summaries stay queryable."""
+        results = {
+            "task_0": ConversionResult(
+                success=True, output_path=_profile(0).output_path, command=["pandoc", "doc0.md"]
+            ),
+            "task_1": ConversionResult(success=False, error_message="bad input"),
+        }
+        queue = TaskQueue(max_concurrent_jobs=1)
+        queue._conversion_service = Mock(
+            convert=Mock(side_effect=lambda profile: results[f"task_{profile.input_path.stem[3:]}"])
+        )
+        for i in range(2):
+            queue.add_task(f"task_{i}", _profile(i))
+
+        streamed = {}
+        queue.set_result_sink(lambda task_id, result: streamed.__setitem__(task_id, result))
+        queue.start_queue()
+        assert queue.wait_for_completion(5000)
+
+        assert streamed == results
+        assert queue.get_task_status("task_1") == TaskStatus.FAILED
+        assert queue.get_task_result("task_0").output_path == _profile(0).output_path
+        assert queue.get_task_result("task_1").error_message == "bad input"
+        assert queue.get_failed_tasks()[0].profile.input_path == _profile(1).input_path
+
+    def test_export_report(self, qapp, tmp_path):
+        """Test the per-task CSV report."""
+        usage = ResourceUsage(
+            wall_seconds=0.75, user_cpu_seconds=0.5, system_cpu_seconds=0.125, input_bytes=42
+        )
+        queue = TaskQueue(max_concurrent_jobs=1)
+        queue._conversion_service = Mock(
+            convert=Mock(
+                side_effect=[
+                    ConversionResult(success=True, resources=usage),
+                    ConversionResult(success=False, error_message="bad input"),
+                ]
+            )
+        )
+        for i in range(2):
+            queue.add_task(f"task_{i}", _profile(i))
+        queue.start_queue()
+        assert queue.wait_for_completion(5000)
+
+        assert queue.get_resource_summary().cpu_seconds == 0.625
+        report = tmp_path / "logs" / "batch.csv"
+        assert queue.export_report(report) == 2
+
+        with open(report, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]["task_id"] == "task_0"
+        assert rows[0]["status"] == "completed"
+        assert float(rows[0]["user_cpu_seconds"]) == 0.5
+        assert rows[0]["input_bytes"] == "42"
+        assert rows[0]["peak_rss_bytes"] == ""
+        assert rows[1]["status"] == "failed"
+        assert rows[1]["wall_seconds"] == ""
+        assert rows[1]["error"] == "bad input"
@@ -0,0 +1,48 @@
+"""
+Tests for conversion throughput tracking.
+"""
+
+import pytest
+
+from pandoc_ui.app.throughput import ThroughputTracker
+
+
+class TestThroughputTracker:
+    """Test cases for ThroughputTracker."""
+
+    def test_defaults_without_measurements(self):
+        """Test fallback to built-in defaults."""
+        tracker = ThroughputTracker()
+
+        overhead, per_byte = tracker.model("markdown", "html")
+
+        assert overhead == ThroughputTracker.DEFAULT_OVERHEAD_SECONDS
+        assert per_byte == pytest.approx(1.0 / ThroughputTracker.DEFAULT_BYTES_PER_SECOND)
+
+    def test_linear_fit(self):
+        """Test fitting per-file overhead and per-byte cost."""
+        tracker = ThroughputTracker()
+        for size in (1_000, 10_000, 100_000, 1_000_000):
+            tracker.record("markdown", "html", size, 0.2 + size / 1_000_000)
+
+        overhead, per_byte = tracker.model("markdown", "html")
+
+        assert overhead == pytest.approx(0.2)
+        assert per_byte == pytest.approx(1e-6)
+        assert tracker.estimate_seconds("markdown", 500_000, "html") == pytest.approx(0.7)
+
+    def test_fallback_to_input_format(self):
+        """Test that unknown pairs fall back to the input format."""
+        tracker = ThroughputTracker()
+        tracker.record("rst", "docx", 100, 2.0)
+
+        assert tracker.estimate_seconds("rst", 100, "pdf") == pytest.approx(2.0)
+        assert tracker.sample_count("rst") == 1
+        assert tracker.sample_count() == 1
+
+    def test_ignores_invalid_samples(self):
+        """Test that negative measurements are dropped."""
+        tracker = ThroughputTracker()
+        tracker.record("markdown", "html", 100, -1.0)
+
+        assert tracker.sample_count() == 0
@@ -0,0 +1,175 @@
+"""
+Tests for adaptive timeouts and the stall detector.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from pandoc_ui.app.conversion_service import ConversionService
+from pandoc_ui.app.retry_policy import classify_failure
+from pandoc_ui.app.throughput import ThroughputTracker
+from pandoc_ui.app.timeout_policy import TimeoutPolicy
+from pandoc_ui.infra.pandoc_runner import PandocRunner, _read_progress
+from pandoc_ui.models import ConversionProfile, InputFormat, OutputFormat
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+
+
+def _profile(tmp_path, name: str = "doc.md", content: str = "hello") -> ConversionProfile:
+    input_path = tmp_path / name
+    input_path.write_text(content)
+    return ConversionProfile(
+        input_path=input_path,
+        output_path=tmp_path / "out" / f"{input_path.stem}.html",
+        input_format=InputFormat.MARKDOWN,
+        output_format=OutputFormat.HTML,
+    )
+
+
+def _alive(pid: int) -> bool:
+    """Check whether a process exists and has not exited (zombies count as dead)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return False
+
+
+class TestTimeoutPolicy:
+    """Test timeouts derived from throughput."""
+
+    def test_default_until_measured(self):
+        """Test that unmeasured pairs get the default, and the cap only for large inputs."""
+        policy = TimeoutPolicy(default_seconds=300, max_seconds=900, min_samples=3)
+        tracker = ThroughputTracker()
+        for _ in range(5):
+            tracker.record("markdown", "docx", 1000, 0.1)
+
+        assert policy.timeout_for(tracker, "markdown", "html", 1000) == 300
+        assert policy.timeout_for(tracker, "markdown", "html", 50_000_000) == 900
+        assert policy.timeout_for(tracker, None, "docx", 50_000_000) == 300
+        assert policy.timeout_for(tracker, "markdown", "docx", None) == 300
+        assert policy.timeout_for(tracker, "markdown", "docx", 1000) < 300
+
+    def test_scales_with_size(self):
+        """Test that small inputs get short timeouts and big ones long, up to the cap."""
+        policy = TimeoutPolicy(factor=10, min_seconds=30, max_seconds=1800)
+        tracker = ThroughputTracker()
+        for size, seconds in ((10_000, 0.2), (1_000_000, 1.1), (5_000_000, 5.1)):
+            tracker.record("latex", "pdf", size, seconds)
+
+        small = policy.timeout_for(tracker, "latex", "pdf", 2_000)
+        book = policy.timeout_for(tracker, "latex", "pdf", 50_000_000)
+        huge = policy.timeout_for(tracker, "latex", "pdf", 10_000_000_000)
+
+        assert 30 < small < 35
+        assert 400 < book < 600
+        assert huge == 1800
+
+    def test_cap_at_least_default(self):
+        """Test that a cap below the default never shortens a timeout under the default."""
+        policy = TimeoutPolicy(factor=10, min_seconds=30, default_seconds=2400, max_seconds=600)
+        tracker = ThroughputTracker()
+        for size, seconds in ((10_000, 0.2), (1_000_000, 1.1), (5_000_000, 5.1)):
+            tracker.record("latex", "pdf", size, seconds)
+
+        assert policy.timeout_for(tracker, "markdown", "pdf", 50_000_000) == 2400
+        assert policy.timeout_for(tracker, "latex", "pdf", 10_000_000_000) == 2400
+
+    def test_service_uses_policy(self, tmp_path):
+        """Test that the service derives the timeout when none is given."""
+        service = ConversionService()
+        service.throughput = ThroughputTracker()
+        service.timeout_policy = TimeoutPolicy(min_seconds=5, default_seconds=120)
+        profile = _profile(tmp_path, content="x" * 4000)
+
+        assert service._timeout_for(profile) == 120
+        for _ in range(3):
+            service.throughput.record("markdown", "html", 4000, 0.5)
+        assert 5 < service._timeout_for(profile) < 20
+
+
+@linux_only
+class TestStallDetector:
+    """Test killing pandoc runs that stop making progress."""
+
+    def test_sleeping_pandoc_killed(self, fake_pandoc, tmp_path):
+        """Test that a run using no CPU and doing no I/O is killed long before its timeout."""
+        fake_pandoc.configure(seconds=30)
+        runner = PandocRunner(fake_pandoc.path, stall_seconds=1.0)
+
+        start = time.monotonic()
+        result = runner.execute(_profile(tmp_path), timeout=60)
+
+        assert time.monotonic() - start < 10
+        assert not result.success
+        assert result.error_message.startswith("Pandoc stalled")
+        assert classify_failure(result).category == "stalled"
+        assert not (tmp_path / "out" / "doc.html").exists()
+
+    def test_busy_pandoc_not_killed(self, fake_pandoc, tmp_path):
+        """Test that a run that keeps using CPU outlives the stall limit."""
+        fake_pandoc.configure(seconds=2.5, burn_cpu=True)
+        runner = PandocRunner(fake_pandoc.path, stall_seconds=1.0)
+
+        result = runner.execute(_profile(tmp_path), timeout=60)
+
+        assert result.success
+
+    def test_children_killed_with_pandoc(self, tmp_path):
+        """Test that killing a stalled pandoc also kills the processes it started."""
+        pid_file = tmp_path / "child.pid"
+        pandoc = tmp_path / "pandoc"
+        pandoc.write_text(
+            f"#!{sys.executable}\n"
+            "import subprocess, sys, time\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+            "time.sleep(60)\n"
+        )
+        pandoc.chmod(0o755)
+        runner = PandocRunner(pandoc, stall_seconds=1.0)
+
+        result = runner.execute(_profile(tmp_path), timeout=60)
+
+        assert result.error_message.startswith("Pandoc stalled")
+        child = int(pid_file.read_text())
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and _alive(child):
+            time.sleep(0.05)
+        assert not _alive(child)
+
+    @pytest.mark.parametrize("proc_children", [True, False])
+    def test_progress_includes_children(self, monkeypatch, proc_children):
+        """Test that CPU used by a child counts, with or without /proc/<pid>/task/*/children."""
+        if not proc_children:
+
+            def unsupported(pid, threads):
+                raise FileNotFoundError(f"/proc/{pid}/task/{pid}/children")
+
+            monkeypatch.setattr("pandoc_ui.infra.pandoc_runner._read_task_children", unsupported)
+        burner = "import time\nend = time.time() + 5\nwhile time.time() < end: pass"
+        parent = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                f"import subprocess, sys; subprocess.run([sys.executable, '-c', {burner!r}])",
+            ],
+            start_new_session=True,
+        )
+        try:
+            time.sleep(0.5)
+            first = _read_progress(parent.pid)
+            time.sleep(0.5)
+            second = _read_progress(parent.pid)
+        finally:
+            os.killpg(parent.pid, signal.SIGKILL)
+            parent.wait()
+
+        assert first is not None and second is not None
+        assert second[0] > first[0]
@@ -0,0 +1,163 @@
+"""
+Tests for span tracing and trace export.
+"""
+
+import json
+import threading
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pandoc_ui.app.task_queue import TaskQueue
+from pandoc_ui.infra.tracing import NOOP_SPAN, Tracer, get_tracer, traced
+from pandoc_ui.models import ConversionProfile, ConversionResult, OutputFormat
+
+
+@pytest.fixture
+def tracer():
+    """Enable the global tracer for one test."""
+    tracer = get_tracer()
+    tracer.enable()
+    yield tracer
+    tracer.disable()
+
+
+class TestTracer:
+    """Test span collection."""
+
+    def test_disabled_is_noop(self):
+        """Test that nothing is recorded while tracing is disabled."""
+        tracer = Tracer()
+        assert tracer.span("work") is NOOP_SPAN
+        with tracer.span("work") as work:
+            work.set_attribute("ignored", True)
+        tracer.record("wait", 0, 10)
+        assert tracer.spans == []
+
+    def test_nesting_and_threads(self):
+        """Test parent links within a thread and separate lanes per thread."""
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span("outer", "test", size=3) as outer:
+            with tracer.span("inner", "test"):
+                pass
+            worker = threading.Thread(target=lambda: tracer.span("other").end(), name="lane-2")
+            worker.start()
+            worker.join()
+        tracer.record("wait", outer.start_ns, outer.end_ns, "test")
+
+        spans = {s.name: s for s in tracer.spans}
+        assert spans["inner"].parent_id == spans["outer"].span_id
+        assert spans["outer"].parent_id == 0
+        assert spans["other"].parent_id == 0
+        assert spans["other"].thread_id != spans["outer"].thread_id
+        assert spans["outer"].attributes == {"size": 3}
+        assert spans["wait"].end_ns - spans["wait"].start_ns == outer.end_ns - outer.start_ns
+
+        # The recorded interval did not become a parent
+        with tracer.span("after") as after:
+            pass
+        assert after.parent_id == 0
+
+    def test_error_and_max_spans(self):
+        """Test that exceptions are noted and overflow is counted."""
+        tracer = Tracer(max_spans=1)
+        tracer.enable()
+        with pytest.raises(ValueError), tracer.span("failing"):
+            raise ValueError("boom")
+        tracer.span("dropped").end()
+
+        assert tracer.spans[0].attributes["error"] == "ValueError"
+        assert tracer.dropped == 1
+
+    def test_traced_decorator(self, tracer):
+        """Test that decorated functions are recorded only while enabled."""
+
+        @traced("decorated", "test")
+        def work(value):
+            return value * 2
+
+        assert work(2) == 4
+        tracer.disable()
+        assert work(3) == 6
+        assert [s.name for s in tracer.spans] == ["decorated"]
+
+
+class TestTraceExport:
+    """Test Chrome trace and OTLP-JSON output."""
+
+    def _tracer(self) -> Tracer:
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span("outer", "test", path=Path("/tmp/doc.md")):
+            tracer.span("inner", "test", count=2).end()
+        return tracer
+
+    def test_chrome_trace(self, tmp_path):
+        """Test complete events with thread metadata."""
+        path = tmp_path / "trace.json"
+        assert self._tracer().write(path) == 2
+
+        events = json.loads(path.read_text())["traceEvents"]
+        complete = {e["name"]: e for e in events if e["ph"] == "X"}
+        threads = [e for e in events if e["name"] == "thread_name"]
+        assert set(complete) == {"outer", "inner"}
+        assert complete["outer"]["args"] == {"path": "/tmp/doc.md"}
+        assert complete["outer"]["ts"] <= complete["inner"]["ts"]
+        assert complete["inner"]["dur"] <= complete["outer"]["dur"]
+        assert threads[0]["tid"] == complete["inner"]["tid"]
+
+    def test_otlp_json(self, tmp_path):
+        """Test OTLP span ids, parents and attributes."""
+        path = tmp_path / "trace.otlp.json"
+        self._tracer().write(path)
+
+        document = json.loads(path.read_text())
+        spans = {s["name"]: s for s in document["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+        assert len(spans["outer"]["traceId"]) == 32
+        assert spans["inner"]["parentSpanId"] == spans["outer"]["spanId"]
+        assert "parentSpanId" not in spans["outer"]
+        assert int(spans["outer"]["endTimeUnixNano"]) >= int(spans["outer"]["startTimeUnixNano"])
+        attributes = {a["key"]: a["value"] for a in spans["inner"]["attributes"]}
+        assert attributes["count"] == {"intValue": "2"}
+        assert attributes["category"] == {"stringValue": "test"}
+
+    def test_unknown_format(self, tmp_path):
+        """Test that an unknown format is rejected."""
+        with pytest.raises(ValueError):
+            self._tracer().write(tmp_path / "trace.json", format="xml")
+
+
+class TestBatchTrace:
+    """Test the spans a traced batch produces."""
+
+    def test_queue_wait_and_task_per_worker(self, qapp, tracer):
+        """Test that every task records a queue wait and an execution span on its worker."""
+        queue = TaskQueue(max_concurrent_jobs=2)
+        queue._conversion_service = Mock(
+            convert=Mock(
+                side_effect=lambda p: ConversionResult(success=True, output_path=p.output_path)
+            )
+        )
+        for i in range(5):
+            queue.add_task(
+                f"task_{i}",
+                ConversionProfile(
+                    input_path=Path(f"/virtual/doc{i}.md"),
+                    output_path=Path(f"/virtual/out/doc{i}.html"),
+                    output_format=OutputFormat.HTML,
+                ),
+            )
+        queue.start_queue()
+        assert queue.wait_for_completion(5000)
+
+        spans = tracer.spans
+        tasks = {s.attributes["task_id"]: s for s in spans if s.name == "task"}
+        waits = {s.attributes["task_id"]: s for s in spans if s.name == "queue_wait"}
+        assert set(tasks) == set(waits) == {f"task_{i}" for i in range(5)}
+        for task_id, task in tasks.items():
+            assert task.attributes["status"] == "completed"
+            assert waits[task_id].thread_id == task.thread_id != threading.get_ident()
+            assert waits[task_id].end_ns <= task.start_ns
+        assert any(s.name == "start_queue" for s in spans)